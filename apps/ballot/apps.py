@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BallotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ballot'
+
+    def ready(self):
+        import apps.ballot.signals
@@ -1,6 +1,6 @@
 from channels.db import database_sync_to_async
 from django.db import transaction
-from django.db.models import QuerySet, Q, Count
+from django.db.models import QuerySet, Q
 from django.utils import timezone
 from djangochannelsrestframework.decorators import action
 from djangochannelsrestframework.generics import GenericAsyncAPIConsumer
@@ -11,13 +11,16 @@ from rest_framework.exceptions import PermissionDenied, NotFound, ValidationErro
 from apps.ballot.models import Ballot, Option, Reason, BallotVote
 from apps.ballot.querysets import annotate_ballot_metrics
 from apps.ballot.serializers import BallotSerializer, OptionSerializer
+from apps.ballot.services.tally import get_tallies, record_vote_change, tally_group_name
 from apps.ballot.tasks import redact_reason
+from apps.geo.audience import get_user_regions, is_in_region, region_audience_count
 from apps.geo.serializers import CountySerializer, ConstituencySerializer, WardSerializer
+from apps.utils.instrumentation import InstrumentedConsumerMixin, query_budget
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import rate_limit, interaction_rate_limit
 
 
-class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
+class BallotConsumer(InstrumentedConsumerMixin, RetrieveModelMixin, GenericAsyncAPIConsumer):
     serializer_class = BallotSerializer
     lookup_field = "pk"
     page_size = 20
@@ -30,6 +33,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
     # ── connection ──────────────────────────────────────────────
     async def connect(self):
+        self.tally_groups = set()
         if self.scope['user'].is_authenticated:
             await self.accept()
         else:
@@ -80,32 +84,28 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
             'response_status': 200,
         }
 
-    @model_observer(BallotVote)
-    async def vote_activity(self, message, **kwargs):
+    # Vote counts are pushed by apps.ballot.tasks.broadcast_ballot_tally,
+    # coalesced per ballot, instead of once per BallotVote save.
+    async def ballot_tally(self, event):
+        message = dict(event)
+        message.pop("type", None)
         await self.send_json(message)
 
-    @vote_activity.groups_for_signal
-    def vote_activity_signal_groups(self, instance: BallotVote, **kwargs):
-        yield f"ballot__{instance.ballot_id}"
+    async def subscribe_tally(self, pk):
+        group = tally_group_name(pk)
+        await self.channel_layer.group_add(group, self.channel_name)
+        self.tally_groups.add(group)
 
-    @vote_activity.groups_for_consumer
-    def vote_activity_consumer_groups(self, pk=None, **kwargs):
-        if pk is not None:
-            yield f"ballot__{pk}"
-
-    @vote_activity.serializer
-    def vote_activity_serializer(self, instance: BallotVote, action, **kwargs):
-        return {
-            "data": get_activity_data_for_ballot_id(instance.ballot_id),
-            "action": "update",
-            "pk": instance.ballot_id,
-            "response_status": 200,
-        }
+    async def unsubscribe_tally(self, pk=None):
+        groups = {tally_group_name(pk)} if pk is not None else set(self.tally_groups)
+        for group in groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.tally_groups -= groups
 
     async def disconnect(self, code):
         await self.ballot_activity.unsubscribe()
         await self.option_activity.unsubscribe()
-        await self.vote_activity.unsubscribe()
+        await self.unsubscribe_tally()
         await super().disconnect(code)
 
     # ====================== Filter ======================
@@ -184,6 +184,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
     # ====================== List Action ======================
     @action()
+    @query_budget(10)
     @rate_limit(limit=40, period=60)
     async def list(self, request_id: str, page_size=None, **kwargs):
         # Get user's region asynchronously
@@ -194,8 +195,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
     @database_sync_to_async
     def get_regions(self):
-        user = self.scope['user']
-        return user.county, user.constituency, user.ward
+        return get_user_regions(self.scope['user'].pk)
 
     @database_sync_to_async
     def list_(self, queryset: QuerySet, page_size: int, **kwargs):
@@ -226,7 +226,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
         if pk:
             await self.ballot_activity.subscribe(pk=pk, request_id=request_id)
             await self.option_activity.subscribe(pk=pk, request_id=request_id)
-            await self.vote_activity.subscribe(pk=pk, request_id=request_id)
+            await self.subscribe_tally(pk)
         return response, status
 
     @action()
@@ -234,7 +234,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
     async def unsubscribe(self, pk: int, request_id: str, **kwargs):
         await self.ballot_activity.unsubscribe(pk=pk, request_id=request_id)
         await self.option_activity.unsubscribe(pk=pk, request_id=request_id)
-        await self.vote_activity.unsubscribe(pk=pk, request_id=request_id)
+        await self.unsubscribe_tally(pk)
         return {}, 200
 
     # ====================== Voting Actions ======================
@@ -259,7 +259,8 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
                 self._user_can_vote_in_ballot(user, ballot)
 
-                vote, created = BallotVote.objects.get_or_create(
+                # Locked so a concurrent switch waits and sees the updated option.
+                vote, created = BallotVote.objects.select_for_update().get_or_create(
                     user=user,
                     ballot=ballot,
                     defaults={
@@ -270,6 +271,7 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
                 # First time voting in this ballot.
                 if created:
+                    record_vote_change(ballot.pk, None, option.pk)
                     return {
                         "ballot_id": ballot.pk,
                         "option_id": option.pk,
@@ -291,10 +293,13 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
                 # The previous reason no longer applies.
                 Reason.objects.filter(ballot=ballot, user=user).delete()
 
+                previous_option_id = vote.option_id
                 vote.option = option
                 vote.voted_at = timezone.now()
                 vote.save(update_fields=["option", "voted_at"])
 
+                record_vote_change(ballot.pk, previous_option_id, option.pk)
+
                 return {
                     "ballot_id": ballot.pk,
                     "option_id": option.pk,
@@ -321,16 +326,16 @@ class BallotConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
             raise PermissionDenied('Voting has ended')
 
         # Region check
-        if not ballot.county:
-            return True  # National
+        regions = get_user_regions(user.pk)
+        if is_in_region(regions, ballot):
+            return True
 
-        if ballot.county != user.county:
+        county_id, constituency_id, _ = regions
+        if ballot.county_id != county_id:
             raise PermissionDenied(f'You are not a registered voter in {ballot.county.name} county')
-        if ballot.constituency and ballot.constituency != user.constituency:
+        if ballot.constituency_id and ballot.constituency_id != constituency_id:
             raise PermissionDenied(f'You are not a registered voter in {ballot.constituency.name} constituency')
-        if ballot.ward and ballot.ward != user.ward:
-            raise PermissionDenied(f'You are not a registered voter in {ballot.ward.name} ward')
-        return True
+        raise PermissionDenied(f'You are not a registered voter in {ballot.ward.name} ward')
 
     @action()
     @interaction_rate_limit
@@ -400,15 +405,12 @@ def get_activity_data_for_ballot_id(ballot_id: int) -> dict:
 def get_activity_data(ballot: Ballot) -> dict:
     now = timezone.now()
 
-    total_votes = getattr(ballot, "total_votes", None)
-    if total_votes is None:
-        total_votes = ballot.votes.count()
+    tallies = get_tallies(ballot.pk)
+    total_votes = sum(tallies.values())
 
-    options = (
-        ballot.options.annotate(
-            vote_count=Count("votes", distinct=True),
-        ).order_by("number", "id")
-    )
+    options = list(ballot.options.order_by("number", "id"))
+    for option in options:
+        option.vote_count = tallies.get(option.pk, 0)
 
     return {
         "id": ballot.pk,
@@ -426,6 +428,7 @@ def get_activity_data(ballot: Ballot) -> dict:
         "has_started": now >= ballot.start_time,
         "has_ended": ballot.end_time < now,
         "total_votes": total_votes,
+        "eligible_voters": region_audience_count(ballot),
         "options": OptionSerializer(options, many=True).data,
         "is_active": ballot.is_active,
     }
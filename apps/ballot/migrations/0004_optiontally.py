@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_tallies(apps, schema_editor):
+    Option = apps.get_model("ballot", "Option")
+    OptionTally = apps.get_model("ballot", "OptionTally")
+
+    options = Option.objects.annotate(vote_count=Count("votes")).values_list(
+        "id", "ballot_id", "vote_count"
+    )
+
+    batch = []
+    for option_id, ballot_id, vote_count in options.iterator(chunk_size=2000):
+        batch.append(OptionTally(option_id=option_id, ballot_id=ballot_id, votes=vote_count))
+        if len(batch) >= 2000:
+            OptionTally.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+
+    if batch:
+        OptionTally.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ballot", "0003_add_reason_embedding_hnsw"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OptionTally",
+            fields=[
+                ("option", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="tally", serialize=False, to="ballot.option")),
+                ("ballot", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="tallies", to="ballot.ballot")),
+                ("votes", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Option Tally",
+                "verbose_name_plural": "Option Tallies",
+                "db_table": "OptionTally",
+                "indexes": [models.Index(fields=["ballot"], name="OptionTally_ballot__bf04e8_idx")],
+            },
+        ),
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ballot", "0004_optiontally"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reasonembedding",
+            name="cluster",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="members", to="ballot.reasoncluster"),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ballot", "0005_reasonembedding_cluster"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballotsummary",
+            name="clustering_metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ballot", "0006_ballotsummary_clustering_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballotsummary",
+            name="progress",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
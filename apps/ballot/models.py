@@ -166,6 +166,33 @@ class BallotVote(models.Model):
         )
 
 
+class OptionTally(models.Model):
+    """
+    Running vote count per option, kept in step with BallotVote by the tally engine.
+    """
+
+    option = models.OneToOneField(
+        Option,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="tally",
+    )
+    ballot = models.ForeignKey(Ballot, on_delete=models.CASCADE, related_name="tallies")
+    votes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "OptionTally"
+        verbose_name = "Option Tally"
+        verbose_name_plural = "Option Tallies"
+        indexes = [
+            models.Index(fields=["ballot"]),
+        ]
+
+    def __str__(self):
+        return f"{self.votes} votes for option {self.option_id}"
+
+
 class Reason(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reasons')
     ballot = models.ForeignKey(Ballot, on_delete=models.CASCADE, related_name='reasons')
@@ -216,6 +243,10 @@ class BallotSummary(BaseModel):
 
     reasons_total = models.PositiveIntegerField(default=0)
     reasons_processed = models.PositiveIntegerField(default=0)
+    # Cluster-count sweep, merges, timings and LLM label counts per run.
+    clustering_metrics = models.JSONField(default=dict, blank=True)
+    # Current LLM stage as {"stage", "done", "total", "updated_at"}.
+    progress = models.JSONField(default=dict, blank=True)
     attempts = models.PositiveIntegerField(default=0)
     error = models.TextField(blank=True)
 
@@ -254,6 +285,13 @@ class ReasonEmbedding(models.Model):
         blank=True,
     )
     embedding = VectorField(dimensions=settings.EMBEDDING_DIMENSIONS)
+    cluster = models.ForeignKey(
+        "ReasonCluster",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="members",
+    )
 
     class Meta:
         db_table = "ReasonEmbedding"
@@ -1,19 +1,33 @@
 from django.db.models import (
-    Count,
+    F,
     IntegerField,
     OuterRef,
     Prefetch,
     Subquery,
+    Sum,
     TextField,
+    Value,
 )
+from django.db.models.functions import Coalesce
 
-from apps.ballot.models import BallotVote, Option, Reason
+from apps.ballot.models import BallotVote, Option, OptionTally, Reason
 
 
 def annotate_ballot_metrics(queryset, user):
     """
     Annotate ballot queryset with counts and user-specific flags.
+
+    Vote counts come from OptionTally, so reading a ballot never recounts votes.
     """
+    total_votes = Subquery(
+        OptionTally.objects.filter(ballot=OuterRef("pk"))
+        .order_by()
+        .values("ballot")
+        .annotate(total=Sum("votes"))
+        .values("total")[:1],
+        output_field=IntegerField(),
+    )
+
     voted_option_id = Subquery(
         BallotVote.objects.filter(
             user=user,
@@ -35,14 +49,14 @@ def annotate_ballot_metrics(queryset, user):
     )
 
     return queryset.annotate(
-        total_votes=Count("votes", distinct=True),
+        total_votes=Coalesce(total_votes, Value(0)),
         voted_option_id=voted_option_id,
         user_reason=user_reason,
     ).prefetch_related(
         Prefetch(
             "options",
             queryset=Option.objects.annotate(
-                vote_count=Count("votes", distinct=True),
+                vote_count=Coalesce(F("tally__votes"), Value(0)),
             ).order_by("number", "id"),
         ),
     ).select_related(
@@ -1,6 +1,7 @@
 import json
+import logging
 import random
-from collections import Counter
+import time
 from itertools import islice
 
 import numpy as np
@@ -8,18 +9,31 @@ from django.conf import settings
 from django.db import connection
 from django.utils import timezone
 from sklearn.cluster import MiniBatchKMeans
-from sklearn.preprocessing import normalize
 
 from apps.ballot.models import (
     Ballot,
+    BallotSummary,
     Option,
     Reason,
     ReasonCluster,
     ReasonEmbedding,
 )
-from apps.utils.embedding import embed_texts
+from apps.utils.clustering import (
+    CentroidTopK,
+    candidate_cluster_counts,
+    merge_similar_centroids,
+    select_cluster_count,
+)
+from apps.utils.embedding_dispatcher import dispatch_embeddings
 from apps.utils.llm import chat_json
-from apps.utils.pii import redact_text
+from apps.utils.llm_runner import LLMJobRunner, run_llm_jobs
+from apps.utils.pii import redact_text, redact_texts
+from apps.utils.vectors import export_vector_matrix, update_from_values, vector_block_size
+
+logger = logging.getLogger(__name__)
+
+# Reasons shown to the LLM per cluster, picked while clustering.
+REPRESENTATIVE_TEXTS = 10
 
 # ──────────────────────────────────────────────────────────────
 # System prompts
@@ -134,31 +148,33 @@ def ensure_ballot_reasons_redacted(ballot_id: int, batch_size: int = 1000):
         .order_by("id")
     )
 
-    updates = []
     now = timezone.now()
+    updates = []
 
-    for reason in queryset.iterator(chunk_size=batch_size):
-        result = redact_text(reason.text)
-        reason.redacted_text = result["text"]
-        reason.pii_entities = result["entities"]
-        reason.pii_redacted_at = now
-        updates.append(reason)
+    def flush():
+        results = redact_texts([reason.text for reason in updates])
 
-        if len(updates) >= batch_size:
-            Reason.objects.bulk_update(
-                updates,
-                ["redacted_text", "pii_entities", "pii_redacted_at"],
-                batch_size=batch_size,
-            )
-            updates = []
+        for reason, result in zip(updates, results):
+            reason.redacted_text = result["text"]
+            reason.pii_entities = result["entities"]
+            reason.pii_redacted_at = now
 
-    if updates:
         Reason.objects.bulk_update(
             updates,
             ["redacted_text", "pii_entities", "pii_redacted_at"],
             batch_size=batch_size,
         )
 
+    for reason in queryset.iterator(chunk_size=batch_size):
+        updates.append(reason)
+
+        if len(updates) >= batch_size:
+            flush()
+            updates = []
+
+    if updates:
+        flush()
+
 
 # ──────────────────────────────────────────────────────────────
 # Embedding stage
@@ -169,55 +185,45 @@ def ensure_ballot_reason_embeddings(ballot_id: int):
     Create embeddings for all redacted reasons that do not yet have one.
     """
 
-    embedding_batch_size = getattr(settings, "EMBEDDING_BATCH_SIZE", 64)
-
     missing = (
         Reason.objects.filter(
             ballot_id=ballot_id,
             embedding__isnull=True,
         )
         .exclude(redacted_text="")
-        .select_related("option")
-        .only("id", "option_id", "redacted_text")
+        .only("id", "option_id", "text", "redacted_text")
         .order_by("id")
     )
 
-    for batch in batched(missing.iterator(chunk_size=1000), embedding_batch_size):
-        items = []
-        for reason in batch:
+    def source():
+        for reason in missing.iterator(chunk_size=1000):
             text = reason.redacted_text or normalize_text(reason.text)
             if text:
-                items.append((reason, text))
-
-        if not items:
-            continue
-
-        texts = [text for _, text in items]
+                yield (reason.id, reason.option_id), text
 
-        try:
-            vectors = embed_texts(texts)
-        except Exception:
-            raise
-
-        embeddings_to_create = []
-        for (reason, _text), vector in zip(items, vectors):
-            if not vector:
-                continue
-            embeddings_to_create.append(
+    def write(results):
+        ReasonEmbedding.objects.bulk_create(
+            [
                 ReasonEmbedding(
-                    reason_id=reason.id,
+                    reason_id=reason_id,
                     ballot_id=ballot_id,
-                    option_id=reason.option_id,
+                    option_id=option_id,
                     embedding=vector,
                 )
-            )
-
-        ReasonEmbedding.objects.bulk_create(
-            embeddings_to_create,
-            batch_size=len(embeddings_to_create),
+                for (reason_id, option_id), vector in results
+            ],
+            batch_size=1000,
             ignore_conflicts=True,
         )
 
+    stats = dispatch_embeddings(source(), write)
+
+    logger.info(
+        "Embedded %s/%s reasons for ballot %s in %.1fs (%.1f texts/s, %s requests, %s failed)",
+        stats.embedded, stats.texts, ballot_id, stats.seconds,
+        stats.texts_per_second, stats.requests, stats.failed,
+    )
+
 
 # ──────────────────────────────────────────────────────────────
 # Clustering stage
@@ -246,6 +252,8 @@ def cluster_ballot_reasons(ballot_id: int):
     options = Option.objects.filter(ballot_id=ballot_id).order_by("number", "id")
 
     min_cluster_size = getattr(settings, "BALLOT_CLUSTER_MIN_REASONS", 50)
+    started = time.perf_counter()
+    option_metrics = []
 
     for option in options:
         count = ReasonEmbedding.objects.filter(
@@ -256,99 +264,131 @@ def cluster_ballot_reasons(ballot_id: int):
         if count < min_cluster_size:
             continue
 
-        cluster_option_embeddings(
-            ballot_id=ballot_id,
-            option=option,
-            embedding_count=count,
+        option_metrics.append(
+            cluster_option_embeddings(
+                ballot_id=ballot_id,
+                option=option,
+                embedding_count=count,
+            )
         )
 
+    return {
+        "options": option_metrics,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
 
-def cluster_option_embeddings(ballot_id: int, option: Option, embedding_count: int):
-    n_clusters = choose_cluster_count(embedding_count)
 
-    kmeans = MiniBatchKMeans(
-        n_clusters=n_clusters,
-        batch_size=4096,
-        n_init=3,
-        random_state=42,
-    )
-
-    embeddings_qs = (
-        ReasonEmbedding.objects.filter(ballot_id=ballot_id, option=option)
-        .order_by("id")
-    )
+def cluster_option_embeddings(ballot_id: int, option: Option, embedding_count: int) -> dict:
+    """
+    Cluster one option's reasons. k is picked by a sweep around
+    choose_cluster_count() and near-duplicate clusters are merged.
 
-    # Train in batches
-    for batch in embeddings_qs.values_list("embedding", flat=True).iterator(chunk_size=4096):
-        if not batch:
-            continue
-        X = np.asarray(batch, dtype=np.float32)
-        if X.ndim == 1:
-            X = X.reshape(1, -1)
-        if X.shape[0] == 0:
-            continue
-        X = normalize(X, norm="l2")
-        kmeans.partial_fit(X)
+    Returns timing and cluster-count metrics for the option.
+    """
+    block_size = vector_block_size()
+    table = ReasonEmbedding._meta.db_table
+    filters = {"ballot_id": ballot_id, "option_id": option.id}
+    timings = {}
+
+    # One export serves selection, training and assignment; it is removed on exit
+    started = time.perf_counter()
+    with export_vector_matrix(table, filters, count=embedding_count) as matrix:
+        timings["export"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidates = candidate_cluster_counts(len(matrix), choose_cluster_count(len(matrix)))
+        n_clusters, sweep = select_cluster_count(matrix.vectors, candidates)
+        timings["select"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=block_size,
+            n_init=3,
+            random_state=42,
+        )
 
-    # Remove previous clusters for this option
-    ReasonCluster.objects.filter(ballot_id=ballot_id, option=option).delete()
+        for _ids, X in matrix.blocks(block_size):
+            kmeans.partial_fit(X)
 
-    # Create cluster rows
-    centers = normalize(kmeans.cluster_centers_, norm="l2")
-    clusters_by_label = {}
+        labels = np.concatenate([kmeans.predict(X) for _ids, X in matrix.blocks(block_size)])
+        timings["train"] = time.perf_counter() - started
 
-    for label, centroid in enumerate(centers):
-        cluster = ReasonCluster.objects.create(
-            ballot_id=ballot_id,
-            option=option,
-            external_cluster_id=int(label),
-            centroid=centroid.tolist(),
-            size=0,
+        started = time.perf_counter()
+        remap, centers, sizes = merge_similar_centroids(
+            kmeans.cluster_centers_,
+            np.bincount(labels, minlength=n_clusters),
         )
-        clusters_by_label[int(label)] = cluster
-
-    # Assign embeddings to clusters
-    sizes = Counter()
-    update_buffer = []
+        labels = remap[labels]
+        timings["merge"] = time.perf_counter() - started
+
+        # Representative texts: the reasons nearest each centroid, kept per block
+        started = time.perf_counter()
+        nearest = CentroidTopK(centers, k=REPRESENTATIVE_TEXTS)
+        offset = 0
+        for ids, X in matrix.blocks(block_size):
+            nearest.add(ids, X, labels[offset:offset + len(ids)])
+            offset += len(ids)
+
+        examples = load_representative_texts(nearest.ids_by_label())
+        timings["representatives"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+
+        # Remove previous clusters for this option
+        ReasonCluster.objects.filter(ballot_id=ballot_id, option=option).delete()
+
+        # Create cluster rows
+        clusters = ReasonCluster.objects.bulk_create([
+            ReasonCluster(
+                ballot_id=ballot_id,
+                option=option,
+                external_cluster_id=label,
+                centroid=centroid.tolist(),
+                size=int(size),
+                representative_texts=examples.get(label, []),
+            )
+            for label, (centroid, size) in enumerate(zip(centers, sizes))
+        ])
+        cluster_ids = np.array([cluster.id for cluster in clusters], dtype=np.int64)
 
-    for embeddings in embeddings_qs.only("id", "embedding").iterator(chunk_size=2000):
-        if not embeddings:
-            continue
+        # Assign embeddings to clusters
+        offset = 0
+        for ids, _X in matrix.blocks(block_size):
+            update_from_values(table, "cluster_id", ids, cluster_ids[labels[offset:offset + len(ids)]])
+            offset += len(ids)
 
-        X = np.asarray([item.embedding for item in embeddings], dtype=np.float32)
-        if X.ndim == 1:
-            X = X.reshape(1, -1)
-        X = normalize(X, norm="l2")
+        timings["assign"] = time.perf_counter() - started
 
-        labels = kmeans.predict(X)
+    return {
+        "option_id": option.id,
+        "embeddings": len(labels),
+        "candidates": candidates,
+        "sweep": sweep,
+        "k": n_clusters,
+        "clusters": len(clusters),
+        "merged": n_clusters - len(clusters),
+        "seconds": {name: round(value, 3) for name, value in timings.items()},
+    }
 
-        for item, label in zip(embeddings, labels):
-            label = int(label)
-            item.cluster_id = clusters_by_label[label].id
-            sizes[label] += 1
-            update_buffer.append(item)
 
-        if len(update_buffer) >= 1000:
-            ReasonEmbedding.objects.bulk_update(
-                update_buffer, ["cluster_id"], batch_size=1000
-            )
-            update_buffer = []
-
-    if update_buffer:
-        ReasonEmbedding.objects.bulk_update(
-            update_buffer, ["cluster_id"], batch_size=1000
-        )
+def load_representative_texts(embedding_ids_by_label: dict[int, list[int]]) -> dict[int, list[str]]:
+    """
+    Redacted reasons for the chosen embeddings, in one query, keyed by label.
+    """
+    embedding_ids = [embedding_id for ids in embedding_ids_by_label.values() for embedding_id in ids]
 
-    for label, cluster in clusters_by_label.items():
-        cluster.size = sizes.get(label, 0)
-        cluster.save(update_fields=["size", "updated_at"])
+    texts = dict(
+        ReasonEmbedding.objects.filter(id__in=embedding_ids)
+        .values_list("id", "reason__redacted_text")
+    )
 
+    examples = {}
+    for label, ids in embedding_ids_by_label.items():
+        cleaned = (" ".join((texts.get(embedding_id) or "").split())[:300] for embedding_id in ids)
+        examples[label] = [text for text in cleaned if text]
 
-# Add cluster_id to ReasonEmbedding model:
-# cluster = models.ForeignKey(
-#     ReasonCluster, null=True, blank=True,
-#     on_delete=models.SET_NULL, related_name="members",
-# )
+    return examples
 
 
 # ──────────────────────────────────────────────────────────────
@@ -363,6 +403,10 @@ def summarize_ballot_clusters(ballot_id: int):
     max_clusters = getattr(settings, "BALLOT_MAX_CLUSTERS_TO_SUMMARIZE", 15)
 
     options = Option.objects.filter(ballot_id=ballot_id).order_by("number", "id")
+    started = time.perf_counter()
+    runner = LLMJobRunner(on_progress=ballot_progress(ballot_id, "labelling clusters"))
+    labelled = []
+    llm_calls = 0
 
     for option in options:
         clusters = (
@@ -370,30 +414,70 @@ def summarize_ballot_clusters(ballot_id: int):
             .order_by("-size")[:max_clusters]
         )
 
-        for cluster in clusters:
-            examples = get_representative_texts(cluster, limit=10)
+        for rank, cluster in enumerate(clusters):
+            # Picked while clustering; the query is for clusters built before that
+            examples = cluster.representative_texts or get_representative_texts(cluster)
             cluster.representative_texts = examples
 
             if examples:
-                label, summary, sentiment = generate_cluster_label(
+                # Every option's largest themes are labelled before anyone's long tail
+                job = runner.submit(
+                    generate_cluster_label,
                     option=option,
                     cluster=cluster,
                     examples=examples,
+                    priority=rank,
                 )
+                llm_calls += 1
             else:
-                label = f"Theme {cluster.external_cluster_id}"
-                summary = ""
-                sentiment = "neutral"
+                job = None
 
-            cluster.label = label
-            cluster.summary = summary
-            cluster.sentiment = sentiment
-            cluster.save(
-                update_fields=["label", "summary", "sentiment", "representative_texts", "updated_at"]
-            )
+            labelled.append((cluster, job))
+
+    results = runner.run()
+    now = timezone.now()
 
+    for cluster, job in labelled:
+        cluster.updated_at = now
+        if job is None:
+            cluster.label = f"Theme {cluster.external_cluster_id}"
+            cluster.summary = ""
+            cluster.sentiment = "neutral"
+        else:
+            cluster.label, cluster.summary, cluster.sentiment = results[job]
+
+    ReasonCluster.objects.bulk_update(
+        [cluster for cluster, _ in labelled],
+        ["label", "summary", "sentiment", "representative_texts", "updated_at"],
+        batch_size=500,
+    )
+
+    return {
+        "clusters": len(labelled),
+        "llm_calls": llm_calls,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def ballot_progress(ballot_id: int, stage: str):
+    """
+    LLMJobRunner progress callback that stores progress on BallotSummary.
+    """
+
+    def report(done: int, total: int) -> None:
+        BallotSummary.objects.filter(ballot_id=ballot_id).update(
+            progress={
+                "stage": stage,
+                "done": done,
+                "total": total,
+                "updated_at": timezone.now().isoformat(),
+            },
+        )
 
-def get_representative_texts(cluster: ReasonCluster, limit: int = 10) -> list[str]:
+    return report
+
+
+def get_representative_texts(cluster: ReasonCluster, limit: int = REPRESENTATIVE_TEXTS) -> list[str]:
     if not cluster.centroid:
         return []
 
@@ -487,8 +571,8 @@ def summarize_ballot_reasons(ballot_id: int) -> dict:
         method = "clusters"
 
         ensure_ballot_reason_embeddings(ballot_id)
-        cluster_ballot_reasons(ballot_id)
-        summarize_ballot_clusters(ballot_id)
+        clustering = cluster_ballot_reasons(ballot_id)
+        summarization = summarize_ballot_clusters(ballot_id)
 
         option_themes, processed = build_option_themes_from_clusters(ballot_id)
         executive = build_executive_summary(ballot, total, option_themes)
@@ -501,6 +585,7 @@ def summarize_ballot_reasons(ballot_id: int) -> dict:
             "reasons_processed": processed,
             "method": method,
             "model": settings.LOCAL_QWEN_MODEL,
+            "clustering_metrics": {"clustering": clustering, "summarization": summarization},
         }
 
     else:
@@ -539,18 +624,26 @@ def build_option_themes_from_clusters(ballot_id: int):
                 "examples": cluster.representative_texts[:3],
             })
 
-        # Generate per-option narrative summary
-        option_summary = generate_option_summary(option, themes)
-
         option_themes.append({
-            "option": option.text,
+            "option": option,
             "option_id": option.id,
-            "summary": option_summary,
+            "summary": "",
             "themes": themes,
         })
 
         processed_total += sum(c.size for c in clusters)
 
+    # Generate per-option narrative summaries side by side
+    summaries = run_llm_jobs(
+        lambda theme: generate_option_summary(theme["option"], theme["themes"]),
+        option_themes,
+        on_progress=ballot_progress(ballot_id, "summarizing options"),
+    )
+
+    for theme, option_summary in zip(option_themes, summaries):
+        theme["option"] = theme["option"].text
+        theme["summary"] = option_summary
+
     return option_themes, processed_total
 
 
@@ -879,16 +972,20 @@ Return ONLY valid JSON.
     return normalize_llm_summary(data)
 
 
-def hierarchical_reduce(partials):
+def merge_partial_batch(batch):
+    if len(batch) == 1:
+        return batch[0]
+    return merge_partial_summaries([compact_partial(p) for p in batch])
+
+
+def hierarchical_reduce(partials, on_progress=None):
+    # Each level's merges are independent, so they run side by side.
     while len(partials) > 1:
-        merged = []
-        for batch in batched(partials, settings.BALLOT_SUMMARY_REDUCE_BATCH_SIZE):
-            if len(batch) == 1:
-                merged.append(batch[0])
-            else:
-                compacted = [compact_partial(p) for p in batch]
-                merged.append(merge_partial_summaries(compacted))
-        partials = merged
+        partials = run_llm_jobs(
+            merge_partial_batch,
+            list(batched(partials, settings.BALLOT_SUMMARY_REDUCE_BATCH_SIZE)),
+            on_progress=on_progress,
+        )
     return partials[0]
 
 
@@ -921,11 +1018,13 @@ def map_reduce_summarize(ballot_id: int, total: int) -> dict:
 
     random.shuffle(texts)
 
-    partials = []
-    for batch in batched(texts, chunk_size):
-        partials.append(summarize_reason_chunk(batch))
+    partials = run_llm_jobs(
+        summarize_reason_chunk,
+        list(batched(texts, chunk_size)),
+        on_progress=ballot_progress(ballot_id, "summarizing chunks"),
+    )
 
-    final = hierarchical_reduce(partials)
+    final = hierarchical_reduce(partials, on_progress=ballot_progress(ballot_id, "merging summaries"))
 
     final.update({
         "reasons_total": total,
@@ -0,0 +1,244 @@
+"""
+Real-time ballot tallies.
+
+Each option's vote count lives in a Redis hash per ballot (HINCRBY on every
+vote change) and is mirrored to the OptionTally table inside the vote
+transaction. Reads never recount BallotVote; reconcile_ballot() does that
+nightly and repairs any drift.
+
+A missing hash is loaded from OptionTally, but only if no vote was applied
+since the load started (a per-ballot version counter), so a vote committed
+mid-load is not lost. The hash expires after BALLOT_TALLY_TTL_SECONDS, which
+bounds any drift from a vote applied in the gap between its commit and its
+increment.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django_redis import get_redis_connection
+
+from apps.ballot.models import BallotVote, Option, OptionTally
+from apps.utils.coalesce import release_coalesced, schedule_coalesced
+
+logger = logging.getLogger(__name__)
+
+# ====================== SETTINGS ======================
+
+BROADCAST_INTERVAL_MS = getattr(settings, "BALLOT_TALLY_BROADCAST_INTERVAL_MS", 500)
+TALLY_TTL_SECONDS = getattr(settings, "BALLOT_TALLY_TTL_SECONDS", 600)
+
+# ====================== LUA SCRIPTS ======================
+
+# Only increment a hash that is already loaded; a missing hash is rebuilt from
+# the database on the next read, which already includes this change. The
+# version bump makes any load that started before this change give up.
+INCREMENT_IF_LOADED_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# Store counts read from the database, unless a vote was applied since the
+# version was read (the counts may predate it) or another reader won.
+LOAD_IF_UNCHANGED_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+def _tally_key(ballot_id: int) -> str:
+    return cache.make_key(f"ballot:tally:{ballot_id}")
+
+
+def _version_key(ballot_id: int) -> str:
+    return cache.make_key(f"ballot:tally-version:{ballot_id}")
+
+
+def tally_group_name(ballot_id: int) -> str:
+    return f"ballot_tally_{ballot_id}"
+
+
+# ====================== WRITES ======================
+
+def record_vote_change(ballot_id: int, old_option_id: int | None, new_option_id: int | None) -> None:
+    """
+    Apply one vote change. Call inside the transaction that writes the
+    BallotVote, after locking it, so concurrent switches cannot both move
+    the same vote.
+    """
+    deltas = {}
+    if old_option_id:
+        deltas[old_option_id] = deltas.get(old_option_id, 0) - 1
+    if new_option_id:
+        deltas[new_option_id] = deltas.get(new_option_id, 0) + 1
+    deltas = {option_id: delta for option_id, delta in deltas.items() if delta}
+
+    if not deltas:
+        return
+
+    for option_id, delta in deltas.items():
+        updated = OptionTally.objects.filter(option_id=option_id).update(votes=F("votes") + delta)
+        if not updated and delta > 0:
+            # Options created after the tally backfill start without a row.
+            # A missing row on a decrement means the option is being deleted.
+            OptionTally.objects.bulk_create(
+                [OptionTally(option_id=option_id, ballot_id=ballot_id, votes=0)],
+                ignore_conflicts=True,
+            )
+            OptionTally.objects.filter(option_id=option_id).update(votes=F("votes") + delta)
+
+    def apply():
+        args = [TALLY_TTL_SECONDS]
+        for option_id, delta in deltas.items():
+            args.extend([option_id, delta])
+        try:
+            _redis().eval(INCREMENT_IF_LOADED_SCRIPT, 2, _tally_key(ballot_id), _version_key(ballot_id), *args)
+        except Exception:
+            logger.exception("Failed to update redis tally for ballot_id=%s", ballot_id)
+            cache.delete(f"ballot:tally:{ballot_id}")
+        schedule_tally_broadcast(ballot_id)
+
+    transaction.on_commit(apply)
+
+
+# ====================== READS ======================
+
+def get_tallies(ballot_id: int) -> dict[int, int]:
+    """
+    Return {option_id: votes} for a ballot.
+    """
+    redis = _redis()
+    key = _tally_key(ballot_id)
+
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.get(_version_key(ballot_id))
+            raw, version = pipe.execute()
+    except Exception:
+        logger.exception("Failed to read redis tally for ballot_id=%s", ballot_id)
+        raw, version = None, None
+
+    if raw:
+        return {int(option_id): int(votes) for option_id, votes in raw.items()}
+
+    tallies = dict(
+        OptionTally.objects.filter(ballot_id=ballot_id).values_list("option_id", "votes")
+    )
+    for option_id in Option.objects.filter(ballot_id=ballot_id).values_list("id", flat=True):
+        tallies.setdefault(option_id, 0)
+
+    if tallies:
+        _load(ballot_id, tallies, int(version or 0))
+
+    return tallies
+
+
+def _load(ballot_id: int, tallies: dict[int, int], version: int) -> None:
+    args = [version, TALLY_TTL_SECONDS]
+    for option_id, votes in tallies.items():
+        args.extend([option_id, votes])
+    try:
+        _redis().eval(LOAD_IF_UNCHANGED_SCRIPT, 2, _tally_key(ballot_id), _version_key(ballot_id), *args)
+    except Exception:
+        logger.exception("Failed to load redis tally for ballot_id=%s", ballot_id)
+
+
+def _store(ballot_id: int, tallies: dict[int, int]) -> None:
+    """
+    Overwrite the hash with recounted tallies. Only safe while votes are
+    blocked, as in reconcile_ballot().
+    """
+    key = _tally_key(ballot_id)
+    try:
+        with _redis().pipeline() as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={str(option_id): votes for option_id, votes in tallies.items()})
+            pipe.expire(key, TALLY_TTL_SECONDS)
+            pipe.execute()
+    except Exception:
+        logger.exception("Failed to store redis tally for ballot_id=%s", ballot_id)
+
+
+# ====================== RECONCILIATION ======================
+
+def reconcile_ballot(ballot_id: int) -> dict[int, int]:
+    """
+    Recount BallotVote for one ballot and overwrite both tally stores.
+
+    Returns the options whose stored count was wrong, as {option_id: drift}.
+    """
+    with transaction.atomic():
+        # Locking the tally rows blocks concurrent votes until the recount commits.
+        stored = dict(
+            OptionTally.objects.select_for_update()
+            .filter(ballot_id=ballot_id)
+            .values_list("option_id", "votes")
+        )
+
+        counts = dict(
+            BallotVote.objects.filter(ballot_id=ballot_id)
+            .order_by()
+            .values("option_id")
+            .annotate(votes=Count("id"))
+            .values_list("option_id", "votes")
+        )
+
+        option_ids = list(Option.objects.filter(ballot_id=ballot_id).values_list("id", flat=True))
+        tallies = {option_id: counts.get(option_id, 0) for option_id in option_ids}
+
+        OptionTally.objects.bulk_create(
+            [
+                OptionTally(option_id=option_id, ballot_id=ballot_id, votes=votes)
+                for option_id, votes in tallies.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["option"],
+            update_fields=["votes", "updated_at"],
+        )
+
+        transaction.on_commit(lambda: _store(ballot_id, tallies))
+
+    return {
+        option_id: votes - stored.get(option_id, 0)
+        for option_id, votes in tallies.items()
+        if votes != stored.get(option_id, 0)
+    }
+
+
+# ====================== BROADCAST ======================
+
+def schedule_tally_broadcast(ballot_id: int) -> None:
+    """
+    Push the tally at most once per ballot every BROADCAST_INTERVAL_MS.
+    """
+    from apps.ballot.tasks import broadcast_ballot_tally
+
+    schedule_coalesced(broadcast_ballot_tally, f"ballot:tally:{ballot_id}", BROADCAST_INTERVAL_MS, ballot_id)
+
+
+def release_tally_broadcast(ballot_id: int) -> None:
+    release_coalesced(f"ballot:tally:{ballot_id}")
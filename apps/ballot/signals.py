@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.ballot.models import BallotVote
+from apps.ballot.services.tally import record_vote_change
+
+
+@receiver(post_delete, sender=BallotVote)
+def remove_vote_from_tally(sender, instance, **kwargs):
+    """
+    Covers direct deletes and cascades from user, ballot or option deletion.
+    """
+    record_vote_change(instance.ballot_id, instance.option_id, None)
@@ -1,14 +1,20 @@
+import logging
 from datetime import timedelta
 
+from asgiref.sync import async_to_sync
 from celery import shared_task
+from channels.layers import get_channel_layer
 from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
 
 from .models import Ballot, BallotSummary, Reason
 from .services.summarizer import summarize_ballot_reasons
+from .services.tally import reconcile_ballot, release_tally_broadcast, tally_group_name
 from ..utils.pii import redact_text
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task(queue="pii")
 def redact_reason(reason_id: int):
@@ -77,13 +83,16 @@ def summarize_ballot(self, ballot_id: int):
         summary.status = BallotSummary.Status.PROCESSING
         summary.started_at = timezone.now()
         summary.error = ""
+        summary.progress = {}
         summary.save(
-            update_fields=["attempts", "status", "started_at", "error", "updated_at"]
+            update_fields=["attempts", "status", "started_at", "error", "progress", "updated_at"]
         )
 
         try:
             result = summarize_ballot_reasons(ballot_id)
 
+            # Keep the last progress written by the LLM stages.
+            summary.refresh_from_db(fields=["progress"])
             summary.status = BallotSummary.Status.COMPLETED
             summary.summary = result.get("summary", "")
             summary.themes = result.get("themes", [])
@@ -92,6 +101,7 @@ def summarize_ballot(self, ballot_id: int):
             summary.method = result.get("method", "")
             summary.reasons_total = result.get("reasons_total", 0)
             summary.reasons_processed = result.get("reasons_processed", 0)
+            summary.clustering_metrics = result.get("clustering_metrics", {})
             summary.finished_at = timezone.now()
             summary.error = ""
             summary.save()
@@ -99,6 +109,7 @@ def summarize_ballot(self, ballot_id: int):
             return "completed"
 
         except Exception as exc:
+            summary.refresh_from_db(fields=["progress"])
             summary.status = BallotSummary.Status.FAILED
             summary.error = str(exc)[:10000]
             summary.finished_at = timezone.now()
@@ -107,3 +118,49 @@ def summarize_ballot(self, ballot_id: int):
 
     finally:
         cache.delete(lock_key)
+
+
+@shared_task
+def broadcast_ballot_tally(ballot_id: int):
+    """
+    Push the current tally to everyone watching the ballot.
+    """
+    from .consumers import get_activity_data_for_ballot_id
+
+    # Release first so votes landing while we read schedule the next push.
+    release_tally_broadcast(ballot_id)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    async_to_sync(channel_layer.group_send)(
+        tally_group_name(ballot_id),
+        {
+            "type": "ballot.tally",
+            "data": get_activity_data_for_ballot_id(ballot_id),
+            "action": "update",
+            "pk": ballot_id,
+            "response_status": 200,
+        },
+    )
+
+
+@shared_task
+def reconcile_ballot_tallies(days: int = 2):
+    """
+    Recount votes for recent ballots and repair tally drift.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    ballot_ids = list(
+        Ballot.objects.filter(end_time__gte=cutoff).values_list("id", flat=True)
+    )
+
+    drifted = 0
+    for ballot_id in ballot_ids:
+        drift = reconcile_ballot(ballot_id)
+        if drift:
+            drifted += 1
+            logger.warning("Repaired tally drift for ballot_id=%s: %s", ballot_id, drift)
+
+    return {"ballots": len(ballot_ids), "drifted": drifted}
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.ballot.models import Ballot, BallotVote, Option, OptionTally
+from apps.ballot.services import tally
+from apps.ballot.services.tally import get_tallies, reconcile_ballot, record_vote_change
+
+User = get_user_model()
+
+
+class TestBallotTally(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.ballot = Ballot.objects.create(
+            title='Ballot',
+            start_time=now - timedelta(days=1),
+            end_time=now + timedelta(days=1),
+        )
+        self.yes = Option.objects.create(ballot=self.ballot, number=1, text='Yes')
+        self.no = Option.objects.create(ballot=self.ballot, number=2, text='No')
+        self.users = [
+            User.objects.create(username=f'voter{index}', email=f'voter{index}@gmail.com', name='Voter')
+            for index in range(3)
+        ]
+
+    def vote(self, user, option):
+        vote = BallotVote.objects.create(user=user, ballot=self.ballot, option=option)
+        record_vote_change(self.ballot.pk, None, option.pk)
+        return vote
+
+    def tallies(self):
+        return dict(OptionTally.objects.filter(ballot=self.ballot).values_list('option_id', 'votes'))
+
+    def test_votes_and_switches_match_a_recount(self):
+        for user in self.users:
+            vote = self.vote(user, self.yes)
+
+        vote.option = self.no
+        vote.save(update_fields=['option'])
+        record_vote_change(self.ballot.pk, self.yes.pk, self.no.pk)
+
+        self.assertEqual(self.tallies(), {self.yes.pk: 2, self.no.pk: 1})
+        self.assertEqual(reconcile_ballot(self.ballot.pk), {})
+
+    def test_deleted_votes_leave_the_tally(self):
+        vote = self.vote(self.users[0], self.yes)
+        self.vote(self.users[1], self.yes)
+        self.vote(self.users[2], self.no)
+
+        vote.delete()
+        self.users[2].delete()
+
+        self.assertEqual(self.tallies(), {self.yes.pk: 1, self.no.pk: 0})
+        self.assertEqual(reconcile_ballot(self.ballot.pk), {})
+
+    def test_deleting_the_ballot_cascades_cleanly(self):
+        for user in self.users:
+            self.vote(user, self.yes)
+
+        self.ballot.delete()
+
+        self.assertFalse(OptionTally.objects.exists())
+
+    def test_reconcile_repairs_drift(self):
+        self.vote(self.users[0], self.yes)
+        OptionTally.objects.filter(option=self.yes).update(votes=5)
+
+        self.assertEqual(reconcile_ballot(self.ballot.pk), {self.yes.pk: -4})
+        self.assertEqual(self.tallies(), {self.yes.pk: 1, self.no.pk: 0})
+
+    def test_a_vote_during_a_load_is_not_lost(self):
+        load = tally._load
+
+        def vote_then_load(*args):
+            # Commits after get_tallies() read OptionTally, before the hash is stored.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.vote(self.users[0], self.yes)
+            load(*args)
+
+        with mock.patch('apps.ballot.services.tally._load', side_effect=vote_then_load), \
+                mock.patch('apps.ballot.services.tally.schedule_tally_broadcast'):
+            self.assertEqual(get_tallies(self.ballot.pk), {self.yes.pk: 0, self.no.pk: 0})
+
+        self.assertEqual(get_tallies(self.ballot.pk), {self.yes.pk: 1, self.no.pk: 0})
+        self.assertGreater(tally._redis().ttl(tally._tally_key(self.ballot.pk)), 0)
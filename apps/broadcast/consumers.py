@@ -25,6 +25,7 @@ from apps.broadcast.models import Broadcast, SpeakerRequest
 from apps.broadcast.querysets import annotate_broadcast_metrics
 from apps.broadcast.serializers import BroadcastSerializer, SpeakerRequestSerializer
 from apps.broadcast.services import BroadcastParticipantService
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import interaction_rate_limit, rate_limit
 
@@ -37,6 +38,7 @@ SEARCH_TERM_LIMIT = 200
 
 
 class BroadcastConsumer(
+    InstrumentedConsumerMixin,
     CreateModelMixin,
     ListModelMixin,
     PatchModelMixin,
@@ -19,12 +19,13 @@ from apps.chat.serializers import (
     is_blocked_pair,
 )
 from apps.notification.tasks import delete_notification_on_marked_as_read
+from apps.utils.instrumentation import InstrumentedConsumerMixin, query_budget
 from apps.utils.throttles import interaction_rate_limit, rate_limit
 
 User = get_user_model()
 
 
-class ChatConsumer(GenericAsyncAPIConsumer):
+class ChatConsumer(InstrumentedConsumerMixin, GenericAsyncAPIConsumer):
     serializer_class = ChatSerializer
     queryset = Chat.objects.all()
     lookup_field = "pk"
@@ -236,6 +237,7 @@ class ChatConsumer(GenericAsyncAPIConsumer):
     # ==================== Chat List ====================
 
     @action()
+    @query_budget(10)
     @rate_limit(limit=40, period=60)
     async def list(self, request_id: str, last_chat: int = None, page_size=None, **kwargs):
         data = await self.list_chats(
@@ -22,6 +22,7 @@ from apps.posts.models import Post
 from apps.posts.serializers import PostSerializer
 from apps.survey.models import Survey
 from apps.survey.serializers import SurveySerializer
+from apps.users.graph import get_graph
 from apps.users.serializers import UserSerializer
 from apps.utils.link_extractor import extract_linked_object
 from apps.utils.presigned_url import generate_presigned_url, s3_client
@@ -70,6 +71,10 @@ def is_blocked_pair(user, other):
     if user.pk == other.pk:
         return False
 
+    graph = get_graph()
+    if graph is not None:
+        return graph.is_blocked_pair(user.pk, other.pk)
+
     blocked_manager = getattr(other, "blocked", None)
     if blocked_manager is not None and blocked_manager.filter(pk=user.pk).exists():
         return True
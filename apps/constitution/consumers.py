@@ -10,6 +10,7 @@ from apps.constitution.models import (
     Section,
 )
 from apps.constitution.serializers import SectionSerializer
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.throttles import rate_limit
 
 CONSTITUTION_LIST_CACHE_PREFIX = "constitution:list:v1"
@@ -69,7 +70,7 @@ def build_section_depth_cache():
     return depth_map
 
 
-class ConstitutionConsumer(ListModelMixin, RetrieveModelMixin, GenericAsyncAPIConsumer):
+class ConstitutionConsumer(InstrumentedConsumerMixin, ListModelMixin, RetrieveModelMixin, GenericAsyncAPIConsumer):
     serializer_class = SectionSerializer
     queryset = Section.objects.select_related("parent").order_by("id")
     lookup_field = "pk"
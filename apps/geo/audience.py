@@ -0,0 +1,319 @@
+"""
+Region audiences.
+
+Keeps, per county / constituency / ward, the set of active user ids living
+there, plus a cached (county_id, constituency_id, ward_id) tuple per user.
+
+Sets are patched from the User save/delete signals and rebuilt nightly by
+apps.geo.tasks.rebuild_region_audiences, which also refreshes the per-user
+tuples; those expire after two missed rebuilds. Until the first rebuild has
+run, counts fall back to a briefly cached database count and a rebuild is
+queued.
+
+A rebuild swaps freshly built sets over the live ones, which would drop
+signal updates made while it ran. So while one is running the signals also
+log the sets each changed user is leaving, and the rebuild replays those
+users from the database after the swap.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+REGION_LEVELS = ("county", "constituency", "ward")
+NO_REGIONS = (None, None, None)
+
+AUDIENCE_BUILT_KEY = "geo:audience:built"
+AUDIENCE_REBUILD_QUEUED_KEY = "geo:audience:rebuild-queued"
+AUDIENCE_REBUILDING_KEY = "geo:audience:rebuilding"
+
+USER_REGIONS_TIMEOUT = 2 * 24 * 60 * 60
+FALLBACK_COUNT_TIMEOUT = 5 * 60
+REBUILDING_TIMEOUT = 2 * 60 * 60
+
+User = get_user_model()
+
+
+def _audience_key(level: str, region_id) -> str:
+    # Raw redis keys still carry the cache KEY_PREFIX so they live with the rest.
+    return cache.make_key(f"geo:audience:{level}:{region_id}")
+
+
+def _all_users_key() -> str:
+    return cache.make_key("geo:audience:all")
+
+
+def _rebuild_changes_key() -> str:
+    return cache.make_key("geo:audience:rebuild-changes")
+
+
+def _user_regions_key(user_id: int) -> str:
+    return f"geo:user-regions:{user_id}"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+# ======================
+# Per-user regions
+# ======================
+
+def get_user_regions(user_id: int) -> tuple:
+    """
+    Return (county_id, constituency_id, ward_id) for a user, served from cache.
+    """
+    if not user_id:
+        return NO_REGIONS
+
+    key = _user_regions_key(user_id)
+    regions = cache.get(key)
+
+    if regions is None:
+        regions = (
+            User.objects.filter(pk=user_id)
+            .values_list("county_id", "constituency_id", "ward_id")
+            .first()
+        ) or NO_REGIONS
+        regions = tuple(regions)
+        cache.set(key, regions, timeout=USER_REGIONS_TIMEOUT)
+
+    return regions
+
+
+def is_in_region(regions: tuple, obj) -> bool:
+    """
+    Whether a user with ``regions`` belongs to the audience of ``obj``.
+
+    ``obj`` is anything with county_id / constituency_id / ward_id
+    (Ballot, Survey, Petition, Broadcast). Objects without a county are national.
+    """
+    if not getattr(obj, "county_id", None):
+        return True
+
+    county_id, constituency_id, ward_id = regions
+
+    if obj.county_id != county_id:
+        return False
+    if getattr(obj, "constituency_id", None) and obj.constituency_id != constituency_id:
+        return False
+    if getattr(obj, "ward_id", None) and obj.ward_id != ward_id:
+        return False
+    return True
+
+
+# ======================
+# Audience sets
+# ======================
+
+def update_user_audience(user_id: int, old_regions: tuple, new_regions: tuple,
+                         was_active: bool, is_active: bool) -> None:
+    """
+    Move a user between region sets after a region or is_active change.
+    """
+    # Inactive users are never part of an audience.
+    old_member = old_regions if was_active else NO_REGIONS
+    new_member = new_regions if is_active else NO_REGIONS
+
+    pipe = _redis().pipeline()
+
+    if was_active != is_active:
+        if is_active:
+            pipe.sadd(_all_users_key(), user_id)
+        else:
+            pipe.srem(_all_users_key(), user_id)
+
+    for level, old_id, new_id in zip(REGION_LEVELS, old_member, new_member):
+        if old_id == new_id:
+            continue
+        if old_id:
+            pipe.srem(_audience_key(level, old_id), user_id)
+        if new_id:
+            pipe.sadd(_audience_key(level, new_id), user_id)
+
+    _log_rebuild_change(pipe, user_id, old_member)
+    pipe.execute()
+
+    cache.set(_user_regions_key(user_id), tuple(new_regions), timeout=USER_REGIONS_TIMEOUT)
+
+
+def remove_user_audience(user_id: int, regions: tuple) -> None:
+    pipe = _redis().pipeline()
+    pipe.srem(_all_users_key(), user_id)
+    for level, region_id in zip(REGION_LEVELS, regions):
+        if region_id:
+            pipe.srem(_audience_key(level, region_id), user_id)
+    _log_rebuild_change(pipe, user_id, regions)
+    pipe.execute()
+
+    cache.delete(_user_regions_key(user_id))
+
+
+def _log_rebuild_change(pipe, user_id: int, old_member: tuple) -> None:
+    """
+    While a rebuild runs, log the sets ``user_id`` is leaving so the
+    rebuild can replay the change after swapping its sets in.
+    """
+    if cache.get(AUDIENCE_REBUILDING_KEY):
+        entry = ":".join(str(value or "") for value in (user_id, *old_member))
+        pipe.rpush(_rebuild_changes_key(), entry)
+
+
+def _target_key(obj):
+    """
+    The most specific region set covering ``obj``. A ward lies inside one
+    constituency and county, so the deepest level alone identifies the audience.
+    """
+    for level in reversed(REGION_LEVELS):
+        region_id = getattr(obj, f"{level}_id", None)
+        if region_id:
+            return level, region_id, _audience_key(level, region_id)
+    return None, None, _all_users_key()
+
+
+def region_audience_count(obj) -> int:
+    """
+    Number of active users in the audience of ``obj`` (the eligible voters).
+    """
+    level, region_id, key = _target_key(obj)
+
+    if cache.get(AUDIENCE_BUILT_KEY):
+        return int(_redis().scard(key))
+
+    _queue_rebuild()
+
+    count_key = f"geo:audience-count:{level or 'all'}:{region_id or 0}"
+    count = cache.get(count_key)
+
+    if count is None:
+        users = User.objects.filter(is_active=True)
+        if level:
+            users = users.filter(**{f"{level}_id": region_id})
+        count = users.count()
+        cache.set(count_key, count, timeout=FALLBACK_COUNT_TIMEOUT)
+
+    return count
+
+
+def region_audience_ids(obj) -> set[int] | None:
+    """
+    Active user ids in the audience of ``obj``, or None before the first rebuild.
+    """
+    if not cache.get(AUDIENCE_BUILT_KEY):
+        return None
+
+    _, _, key = _target_key(obj)
+    return {int(user_id) for user_id in _redis().smembers(key)}
+
+
+def _queue_rebuild() -> None:
+    # Imported here: apps.geo.tasks imports this module.
+    from apps.geo.tasks import rebuild_region_audiences
+
+    if cache.add(AUDIENCE_REBUILD_QUEUED_KEY, True, timeout=60 * 60):
+        rebuild_region_audiences.delay()
+
+
+def rebuild_audiences(batch_size: int = 5000) -> int:
+    """
+    Rebuild every region set, and refresh every active user's cached
+    regions, from the database. Returns the number of users seen.
+    """
+    redis = _redis()
+
+    # Set before reading the database, so every change the snapshot may miss is logged.
+    redis.delete(_rebuild_changes_key())
+    cache.set(AUDIENCE_REBUILDING_KEY, True, timeout=REBUILDING_TIMEOUT)
+
+    stale = list(redis.scan_iter(match=_audience_key("*", "*")))
+    stale.append(_all_users_key())
+
+    users = (
+        User.objects.filter(is_active=True)
+        .values_list("pk", "county_id", "constituency_id", "ward_id")
+        .order_by("pk")
+    )
+
+    # Build into temporary keys, then swap them in so readers never see a half-built set.
+    suffix = ":rebuild"
+    built = set()
+    seen = 0
+    pipe = redis.pipeline()
+    user_regions = {}
+
+    for user_id, *regions in users.iterator(chunk_size=batch_size):
+        seen += 1
+        user_regions[_user_regions_key(user_id)] = tuple(regions)
+        keys = [_all_users_key()]
+        for level, region_id in zip(REGION_LEVELS, regions):
+            if region_id:
+                keys.append(_audience_key(level, region_id))
+
+        for key in keys:
+            pipe.sadd(key + suffix, user_id)
+            built.add(key)
+
+        if seen % batch_size == 0:
+            pipe.execute()
+            cache.set_many(user_regions, timeout=USER_REGIONS_TIMEOUT)
+            user_regions.clear()
+
+    pipe.execute()
+    cache.set_many(user_regions, timeout=USER_REGIONS_TIMEOUT)
+
+    pipe = redis.pipeline()
+    for key in built:
+        pipe.rename(key + suffix, key)
+    for key in stale:
+        key = key.decode() if isinstance(key, bytes) else key
+        if key not in built and not key.endswith(suffix):
+            pipe.delete(key)
+    pipe.execute()
+
+    _replay_rebuild_changes(redis)
+
+    cache.set(AUDIENCE_BUILT_KEY, True, timeout=None)
+    cache.delete(AUDIENCE_REBUILD_QUEUED_KEY)
+    return seen
+
+
+def _replay_rebuild_changes(redis) -> None:
+    """
+    Re-apply the user changes logged during a rebuild: take each user out of
+    every set they were leaving, then put them back where the database says.
+    """
+    cache.delete(AUDIENCE_REBUILDING_KEY)
+
+    pipe = redis.pipeline()
+    pipe.lrange(_rebuild_changes_key(), 0, -1)
+    pipe.delete(_rebuild_changes_key())
+    entries, _ = pipe.execute()
+    if not entries:
+        return
+
+    leaving = {}
+    for entry in entries:
+        user_id, *regions = entry.decode().split(":")
+        old_member = tuple(int(region_id) if region_id else None for region_id in regions)
+        leaving.setdefault(int(user_id), set()).add(old_member)
+
+    current = {
+        user_id: regions
+        for user_id, *regions in User.objects.filter(pk__in=leaving, is_active=True)
+        .values_list("pk", "county_id", "constituency_id", "ward_id")
+    }
+
+    pipe = redis.pipeline()
+    for user_id, old_members in leaving.items():
+        pipe.srem(_all_users_key(), user_id)
+        for old_member in old_members:
+            for level, region_id in zip(REGION_LEVELS, old_member):
+                if region_id:
+                    pipe.srem(_audience_key(level, region_id), user_id)
+
+        if user_id in current:
+            pipe.sadd(_all_users_key(), user_id)
+            for level, region_id in zip(REGION_LEVELS, current[user_id]):
+                if region_id:
+                    pipe.sadd(_audience_key(level, region_id), user_id)
+    pipe.execute()
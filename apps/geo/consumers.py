@@ -18,6 +18,7 @@ from apps.geo.serializers import (
     WardSerializer,
     WardListSerializer,
 )
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.throttles import rate_limit
 
 GEO_CACHE_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
@@ -125,7 +126,7 @@ def _get_wards_data(constituency_id: int, include_boundaries: bool = True):
     return serializer_class(queryset, many=True).data
 
 
-class GeoConsumer(GenericAsyncAPIConsumer):
+class GeoConsumer(InstrumentedConsumerMixin, GenericAsyncAPIConsumer):
     async def connect(self):
         user = self.scope.get("user")
 
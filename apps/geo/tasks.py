@@ -0,0 +1,17 @@
+import logging
+
+from celery import shared_task
+
+from apps.geo.audience import rebuild_audiences
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_region_audiences():
+    """
+    Rebuild the per-region audience sets from the User table.
+    """
+    count = rebuild_audiences()
+    logger.info("Rebuilt region audiences for %s active users", count)
+    return count
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.ballot.models import Ballot
+from apps.geo import audience
+from apps.geo.models import Constituency, County, Ward
+from apps.notification.tasks import _notification_enabled_users, _region_audience_users
+
+User = get_user_model()
+
+
+class TestRegionAudiences(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.county = County.objects.create(name='County')
+        self.constituency = Constituency.objects.create(name='Constituency', county=self.county)
+        self.ward = Ward.objects.create(name='Ward', constituency=self.constituency)
+        self.other_county = County.objects.create(name='Other county')
+
+        self.local = User.objects.create(
+            username='local', email='local@gmail.com', name='Local',
+            county=self.county, constituency=self.constituency, ward=self.ward,
+        )
+        self.neighbour = User.objects.create(
+            username='neighbour', email='neighbour@gmail.com', name='Neighbour', county=self.county,
+        )
+        self.outsider = User.objects.create(
+            username='outsider', email='outsider@gmail.com', name='Outsider', county=self.other_county,
+        )
+
+    def test_counts_fall_back_to_the_database_and_queue_a_rebuild(self):
+        ballot = Ballot(county=self.county)
+
+        with mock.patch('apps.geo.tasks.rebuild_region_audiences.delay') as rebuild:
+            self.assertEqual(audience.region_audience_count(ballot), 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(audience.region_audience_count(ballot), 2)
+
+        rebuild.assert_called_once_with()
+        self.assertIsNone(audience.region_audience_ids(ballot))
+
+    def test_rebuild_and_signals_keep_sets_in_sync(self):
+        self.assertEqual(audience.rebuild_audiences(), 3)
+
+        ward_ballot = Ballot(county=self.county, constituency=self.constituency, ward=self.ward)
+        self.assertEqual(audience.region_audience_ids(Ballot(county=self.county)), {self.local.id, self.neighbour.id})
+        self.assertEqual(audience.region_audience_ids(ward_ballot), {self.local.id})
+
+        self.outsider.county = self.county
+        self.outsider.save()
+        self.local.is_active = False
+        self.local.save()
+
+        self.assertEqual(audience.region_audience_count(Ballot(county=self.county)), 2)
+        self.assertEqual(audience.region_audience_ids(ward_ballot), set())
+        self.assertEqual(audience.get_user_regions(self.outsider.id), (self.county.id, None, None))
+
+    def test_changes_during_a_rebuild_are_replayed(self):
+        set_many = cache.set_many
+
+        def move_outsider(*args, **kwargs):
+            # Runs after the rebuild has read the outsider from the database.
+            self.outsider.county = self.county
+            self.outsider.save()
+            self.neighbour.delete()
+            return set_many(*args, **kwargs)
+
+        with mock.patch('apps.geo.audience.cache.set_many', side_effect=move_outsider):
+            audience.rebuild_audiences()
+
+        self.assertEqual(audience.region_audience_ids(Ballot(county=self.county)), {self.local.id, self.outsider.id})
+        self.assertEqual(audience.region_audience_ids(Ballot(county=self.other_county)), set())
+        self.assertEqual(audience.region_audience_count(Ballot()), 2)
+
+    def test_rebuild_refreshes_cached_user_regions(self):
+        cache.set(f'geo:user-regions:{self.neighbour.id}', (self.other_county.id, None, None))
+
+        audience.rebuild_audiences()
+
+        self.assertEqual(audience.get_user_regions(self.neighbour.id), (self.county.id, None, None))
+
+    def test_notifications_target_the_region_set(self):
+        audience.rebuild_audiences()
+        ballot = Ballot(county=self.county)
+
+        users = _region_audience_users(_notification_enabled_users(), ballot)
+
+        self.assertEqual({user.id for user in users}, {self.local.id, self.neighbour.id})
@@ -2,7 +2,7 @@ import logging
 
 from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
-from django.db.models import QuerySet, Prefetch
+from django.db.models import QuerySet
 from djangochannelsrestframework.decorators import action
 from djangochannelsrestframework.generics import GenericAsyncAPIConsumer
 from djangochannelsrestframework.mixins import ListModelMixin
@@ -10,14 +10,14 @@ from djangochannelsrestframework.mixins import ListModelMixin
 from apps.notification.models import Notification, Preferences
 from apps.notification.serializers import NotificationSerializer, PreferencesSerializer
 from apps.notification.tasks import send_notification_update
-from apps.posts.models import Post
-from apps.posts.querysets import annotate_post_metrics
+from apps.posts.loader import attach_posts
+from apps.utils.instrumentation import InstrumentedConsumerMixin, query_budget
 from apps.utils.throttles import interaction_rate_limit, rate_limit
 
 logger = logging.getLogger(__name__)
 
 
-class NotificationConsumer(ListModelMixin, GenericAsyncAPIConsumer):
+class NotificationConsumer(InstrumentedConsumerMixin, ListModelMixin, GenericAsyncAPIConsumer):
     serializer_class = NotificationSerializer
     lookup_field = "pk"
 
@@ -85,10 +85,6 @@ class NotificationConsumer(ListModelMixin, GenericAsyncAPIConsumer):
             "chat",
             "message__author",
         ).prefetch_related(
-            Prefetch(
-                "post",
-                queryset=annotate_post_metrics(Post.objects.all(), self.scope.get("user")),
-            ),
             "users",
         ).order_by("-id")
         return queryset
@@ -96,9 +92,18 @@ class NotificationConsumer(ListModelMixin, GenericAsyncAPIConsumer):
     # ====================== ACTIONS ======================
 
     @action()
+    @query_budget(10)
     @rate_limit(limit=40, period=60)
     async def list(self, request_id=None, page_size=None, **kwargs):
-        return await super().list(request_id=request_id, **kwargs)
+        data = await self._list(request_id=request_id, **kwargs)
+        return data, 200
+
+    @database_sync_to_async
+    def _list(self, **kwargs):
+        notifications = list(self.filter_queryset(self.get_queryset(**kwargs), **kwargs))
+        attach_posts(notifications, self.scope.get("user"))
+        serializer = self.get_serializer(instance=notifications, many=True, action_kwargs=kwargs)
+        return serializer.data
 
     @action()
     @interaction_rate_limit
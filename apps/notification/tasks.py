@@ -14,12 +14,13 @@ from apps.ballot.querysets import annotate_ballot_metrics
 from apps.broadcast.models import Broadcast
 from apps.broadcast.querysets import annotate_broadcast_metrics
 from apps.chat.models import Message
+from apps.geo.audience import region_audience_count, region_audience_ids
 from apps.notification.models import Notification, Preferences
 from apps.notification.serializers import NotificationSerializer
 from apps.petition.models import Petition
 from apps.petition.querysets import annotate_petition_metrics
+from apps.posts.loader import attach_posts
 from apps.posts.models import Post
-from apps.posts.querysets import annotate_post_metrics
 from apps.survey.models import Survey
 from apps.utils.firebase import get_firebase_app
 
@@ -82,6 +83,25 @@ def _apply_location_filters(users, obj):
     return users
 
 
+def _region_audience_users(users, obj, batch_size: int = 500):
+    """
+    Narrow ``users`` to the audience of a regional ``obj`` using the
+    precomputed region set (apps.geo.audience), one id batch at a time.
+    Falls back to the location filters for national objects, whose set is
+    every active user, and before the sets are first built.
+    """
+    audience_ids = region_audience_ids(obj) if getattr(obj, "county_id", None) else None
+    if audience_ids is None:
+        return _apply_location_filters(users, obj)
+
+    audience_ids = sorted(audience_ids)
+    return (
+        user
+        for start in range(0, len(audience_ids), batch_size)
+        for user in users.filter(pk__in=audience_ids[start:start + batch_size])
+    )
+
+
 def _allows_notification(user, preference_name: str | None = None) -> bool:
     """
     Checks:
@@ -184,10 +204,6 @@ def _serialize_notification(notification: Notification) -> dict:
     notification = Notification.objects.filter(
         pk=notification.pk
     ).prefetch_related(
-        Prefetch(
-            "post",
-            queryset=annotate_post_metrics(Post.objects.all(), notification.recipient),
-        ),
         Prefetch(
             "ballot",
             queryset=annotate_ballot_metrics(Ballot.objects.all(), notification.recipient),
@@ -201,6 +217,7 @@ def _serialize_notification(notification: Notification) -> dict:
             queryset=annotate_petition_metrics(Petition.objects.all(), notification.recipient),
         )
     ).first()
+    attach_posts([notification], notification.recipient)
     return NotificationSerializer(
         instance=notification,
         context={"scope": {"user": notification.recipient}},
@@ -470,8 +487,11 @@ def create_ballot_notifications_on_create(ballot_id):
     if not ballot:
         return
 
-    users = _notification_enabled_users()
-    users = _apply_location_filters(users, ballot)
+    # Nobody lives in the target region yet; skip the audience query entirely.
+    if not region_audience_count(ballot):
+        return
+
+    users = _region_audience_users(_notification_enabled_users(), ballot)
 
     _notify_users(
         users=users,
@@ -492,8 +512,11 @@ def create_survey_notifications_on_create(survey_id):
     if not survey:
         return
 
-    users = _notification_enabled_users()
-    users = _apply_location_filters(users, survey)
+    # Nobody lives in the target region yet; skip the audience query entirely.
+    if not region_audience_count(survey):
+        return
+
+    users = _region_audience_users(_notification_enabled_users(), survey)
 
     _notify_users(
         users=users,
@@ -11,5 +11,6 @@ class PetitionSupportInline(admin.TabularInline):
 
 @admin.register(Petition)
 class PetitionAdmin(admin.ModelAdmin):
-    list_display = ['title', 'county', 'constituency', 'ward', 'created_at']
+    list_display = ['title', 'county', 'constituency', 'ward', 'supporters_count', 'created_at']
+    readonly_fields = ['supporters_count']
     inlines = [PetitionSupportInline]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PetitionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.petition'
+
+    def ready(self):
+        import apps.petition.signals
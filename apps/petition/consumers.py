@@ -16,11 +16,13 @@ from djangochannelsrestframework.mixins import (
 from djangochannelsrestframework.observer import model_observer
 from rest_framework.exceptions import NotFound, PermissionDenied
 
+from apps.geo.audience import get_user_regions, is_in_region
 from apps.geo.serializers import CountySerializer, ConstituencySerializer, WardSerializer
-from apps.petition.models import Petition, PetitionClick, PetitionSupport
+from apps.petition.models import Petition, PetitionClick
 from apps.petition.querysets import annotate_petition_metrics
 from apps.petition.serializers import PetitionSerializer, recent_supporters
-from apps.users.serializers import SimpleUserSerializer
+from apps.petition.support import support_group_name, toggle_support
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import interaction_rate_limit, rate_limit
 
@@ -28,6 +30,7 @@ User = get_user_model()
 
 
 class PetitionConsumer(
+    InstrumentedConsumerMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -48,6 +51,7 @@ class PetitionConsumer(
     # ── connection ──────────────────────────────────────────────
 
     async def connect(self):
+        self.support_groups = set()
         user = self.scope.get("user")
 
         if user and getattr(user, "is_authenticated", False):
@@ -89,40 +93,28 @@ class PetitionConsumer(
             ),
         }
 
-    @model_observer(PetitionSupport, many_to_many=True)
-    async def support_activity(self, message, **kwargs):
+    async def petition_support(self, event):
         """
-        Observer for PetitionSupport changes.
+        Coalesced support activity from apps.petition.tasks.broadcast_petition_support.
         """
+        message = dict(event)
+        message.pop("type", None)
         await self.send_json(message)
 
-    @support_activity.groups_for_signal
-    def support_activity_signal_groups(self, instance: PetitionSupport, **kwargs):
-        if instance.petition_id:
-            yield f"petition__{instance.petition_id}"
+    async def subscribe_support(self, pk):
+        group = support_group_name(pk)
+        await self.channel_layer.group_add(group, self.channel_name)
+        self.support_groups.add(group)
 
-    @support_activity.groups_for_consumer
-    def support_activity_consumer_groups(self, pk=None, **kwargs):
-        if pk is not None:
-            yield f"petition__{pk}"
-
-    @support_activity.serializer
-    def support_activity_serializer(
-            self,
-            instance: PetitionSupport,
-            action,
-            **kwargs,
-    ):
-        return {
-            "data": get_activity_data_for_petition_id(instance.petition_id),
-            "action": "update",
-            "pk": instance.petition_id,
-            "response_status": 200,
-        }
+    async def unsubscribe_support(self, pk=None):
+        groups = {support_group_name(pk)} if pk is not None else set(self.support_groups)
+        for group in groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.support_groups -= groups
 
     async def disconnect(self, code):
         await self.petition_activity.unsubscribe()
-        await self.support_activity.unsubscribe()
+        await self.unsubscribe_support()
         await super().disconnect(code)
 
     # ====================== Queryset / Helpers ======================
@@ -385,8 +377,7 @@ class PetitionConsumer(
 
     @database_sync_to_async
     def get_user_regions(self):
-        user = self.scope.get("user")
-        return user.county, user.constituency, user.ward
+        return get_user_regions(self.scope.get("user").pk)
 
     @database_sync_to_async
     def list_(self, queryset: QuerySet, page_size=None, **kwargs):
@@ -436,10 +427,7 @@ class PetitionConsumer(
                 pk=response["id"],
                 request_id=request_id,
             )
-            await self.support_activity.subscribe(
-                pk=response["id"],
-                request_id=request_id,
-            )
+            await self.subscribe_support(response["id"])
 
         return response, status
 
@@ -453,10 +441,7 @@ class PetitionConsumer(
                 pk=response["id"],
                 request_id=request_id,
             )
-            await self.support_activity.subscribe(
-                pk=response["id"],
-                request_id=request_id,
-            )
+            await self.subscribe_support(response["id"])
 
         return response, status
 
@@ -466,10 +451,7 @@ class PetitionConsumer(
             pk=pk,
             request_id=request_id,
         )
-        await self.support_activity.unsubscribe(
-            pk=pk,
-            request_id=request_id,
-        )
+        await self.unsubscribe_support(pk)
 
         return {}, 200
 
@@ -494,8 +476,7 @@ class PetitionConsumer(
         """
         Atomic support toggle.
 
-        Uses select_for_update on the petition to avoid race conditions.
-        Uses the through model directly so observers fire correctly.
+        Does not lock the petition; see apps.petition.support.toggle_support.
         """
         user_pk = self.scope.get("user").id
 
@@ -507,7 +488,12 @@ class PetitionConsumer(
         ).get(pk=user_pk)
 
         with transaction.atomic():
-            petition = Petition.objects.select_for_update().get(
+            petition = Petition.objects.only(
+                "id",
+                "county_id",
+                "constituency_id",
+                "ward_id",
+            ).get(
                 pk=pk,
                 is_open=True,
                 is_active=True,
@@ -518,22 +504,7 @@ class PetitionConsumer(
                     "You are not a registered voter in the region."
                 )
 
-            support = PetitionSupport.objects.filter(
-                petition=petition,
-                user_id=user.id,
-            ).first()
-
-            if support:
-                support.delete()
-                is_supported = False
-            else:
-                PetitionSupport.objects.create(
-                    petition=petition,
-                    user_id=user.id,
-                )
-                is_supported = True
-
-            supporters_count = petition.supporters.count()
+            is_supported, supporters_count = toggle_support(petition.pk, user.id)
 
             return {
                 "pk": petition.pk,
@@ -544,24 +515,9 @@ class PetitionConsumer(
     @staticmethod
     def _user_can_support(petition: Petition, user) -> bool:
         """
-        Region eligibility check using IDs to avoid extra object fetches.
+        Region eligibility check against the user's cached region ids.
         """
-        if not petition.county_id:
-            return True
-
-        if petition.county_id != getattr(user, "county_id", None):
-            return False
-
-        if (
-                petition.constituency_id
-                and petition.constituency_id != getattr(user, "constituency_id", None)
-        ):
-            return False
-
-        if petition.ward_id and petition.ward_id != getattr(user, "ward_id", None):
-            return False
-
-        return True
+        return is_in_region(get_user_regions(user.pk), petition)
 
     # ====================== Status / Views / Clicks ======================
 
@@ -699,11 +655,6 @@ def get_activity_data_for_petition_id(petition_id: int) -> dict:
 
 
 def get_activity_data(petition: Petition) -> dict:
-    supporters_count = getattr(petition, "supporters_count", None)
-
-    if supporters_count is None:
-        supporters_count = petition.supporters.count()
-
     return {
         "id": petition.pk,
         "title": petition.title,
@@ -715,7 +666,7 @@ def get_activity_data(petition: Petition) -> dict:
             else None
         ),
         "ward": WardSerializer(petition.ward).data if petition.ward else None,
-        "supporters": supporters_count,
+        "supporters": petition.supporters_count,
         "recent_supporters": recent_supporters(petition_id=petition.pk),
         "image": petition.image.url,
         "video": petition.video.url if petition.video else None,
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_supporters_count(apps, schema_editor):
+    Petition = apps.get_model("petition", "Petition")
+    PetitionSupport = apps.get_model("petition", "PetitionSupport")
+
+    counts = (
+        PetitionSupport.objects.filter(petition=OuterRef("pk"))
+        .order_by()
+        .values("petition")
+        .annotate(total=Count("id"))
+        .values("total")[:1]
+    )
+
+    Petition.objects.update(
+        supporters_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('petition', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petition',
+            name='supporters_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_supporters_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='petition',
+            index=models.Index(fields=['is_active', 'is_open', '-supporters_count'], name='Petition_is_acti_4cd5d8_idx'),
+        ),
+    ]
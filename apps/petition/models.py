@@ -120,6 +120,8 @@ class Petition(BaseModel):
         through="PetitionSupport",
         related_name="supported_petitions",
     )
+    # Kept in step with PetitionSupport by apps.petition.signals.
+    supporters_count = models.PositiveIntegerField(default=0)
 
     is_open = models.BooleanField(_("open"), default=True)
     is_active = models.BooleanField(_("active"), default=True)
@@ -130,6 +132,7 @@ class Petition(BaseModel):
 
         indexes = [
             models.Index(fields=["is_active", "is_open", "-created_at"]),
+            models.Index(fields=["is_active", "is_open", "-supporters_count"]),
             models.Index(fields=["author", "-created_at"]),
             models.Index(fields=["county", "constituency", "ward"]),
         ]
@@ -1,4 +1,4 @@
-from django.db.models import Count, Exists, OuterRef
+from django.db.models import Exists, OuterRef
 
 from apps.petition.models import PetitionSupport
 
@@ -14,7 +14,6 @@ def annotate_petition_metrics(queryset, user):
         "constituency",
         "ward",
     ).annotate(
-        supporters_count=Count("supporters", distinct=True),
         is_supported=Exists(
             PetitionSupport.objects.filter(
                 petition_id=OuterRef("pk"),
@@ -73,12 +73,9 @@ class PetitionSerializer(serializers.ModelSerializer):
     @staticmethod
     def get_supporters(instance: Petition) -> int:
         """
-        Prefer annotated supporters_count if present.
-        This avoids an extra COUNT query per petition in list views.
+        Stored counter, maintained by apps.petition.signals.
         """
-        if hasattr(instance, "supporters_count"):
-            return instance.supporters_count
-        return instance.supporters.count()
+        return instance.supporters_count
 
     @staticmethod
     def get_recent_supporters(instance: Petition):
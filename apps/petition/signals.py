@@ -0,0 +1,35 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.petition.models import Petition, PetitionSupport
+from apps.petition.support import adjust_supporters_count, recount_supporters
+
+
+@receiver(post_save, sender=PetitionSupport)
+def increment_supporters_count(sender, instance: PetitionSupport, created, **kwargs):
+    if created:
+        adjust_supporters_count(instance.petition_id, 1)
+
+
+@receiver(post_delete, sender=PetitionSupport)
+def decrement_supporters_count(sender, instance: PetitionSupport, **kwargs):
+    adjust_supporters_count(instance.petition_id, -1)
+
+
+@receiver(m2m_changed, sender=Petition.supporters.through)
+def recount_supporters_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """m2m add/remove/clear bypass the through model signals, so recount"""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            recount_supporters([instance.pk])
+        return
+
+    # user.supported_petitions.*: pk_set holds petition ids, except on clear.
+    if action == "pre_clear":
+        instance._cleared_petition_ids = list(
+            instance.supported_petitions_through.values_list("petition_id", flat=True)
+        )
+    elif action == "post_clear":
+        recount_supporters(getattr(instance, "_cleared_petition_ids", []))
+    elif action in ("post_add", "post_remove"):
+        recount_supporters(pk_set or [])
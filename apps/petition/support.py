@@ -0,0 +1,103 @@
+"""
+Petition support toggling and the supporters_count counter.
+
+A toggle never locks the petition: it deletes the user's PetitionSupport row
+and, if there was none, inserts one, relying on unique_petition_support to
+settle concurrent double-taps. The counter is adjusted with an F() update
+from the PetitionSupport signals, the last statement before commit, so the
+petition row is only held for the commit itself.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.petition.models import Petition, PetitionSupport
+from apps.utils.coalesce import release_coalesced, schedule_coalesced
+
+BROADCAST_INTERVAL_MS = getattr(settings, "PETITION_SUPPORT_BROADCAST_INTERVAL_MS", 500)
+
+
+def support_group_name(petition_id: int) -> str:
+    return f"petition_support_{petition_id}"
+
+
+def toggle_support(petition_id: int, user_id: int) -> tuple[bool, int]:
+    """
+    Flip the user's support for a petition.
+
+    Returns (is_supported, supporters_count). Call inside a transaction.
+    """
+    deleted, _ = PetitionSupport.objects.filter(
+        petition_id=petition_id,
+        user_id=user_id,
+    ).delete()
+
+    is_supported = not deleted
+
+    if is_supported:
+        try:
+            with transaction.atomic():
+                PetitionSupport.objects.create(petition_id=petition_id, user_id=user_id)
+        except IntegrityError:
+            # A concurrent toggle from the same user inserted first.
+            pass
+
+    supporters_count = (
+        Petition.objects.filter(pk=petition_id)
+        .values_list("supporters_count", flat=True)
+        .first()
+    )
+
+    return is_supported, supporters_count or 0
+
+
+def adjust_supporters_count(petition_id: int, delta: int) -> None:
+    Petition.objects.filter(pk=petition_id).update(
+        # Never below zero: supporters_count is unsigned.
+        supporters_count=Greatest(F("supporters_count") + delta, 0),
+    )
+    transaction.on_commit(lambda: schedule_support_broadcast(petition_id))
+
+
+def recount_supporters(petition_ids) -> None:
+    """
+    Recompute supporters_count from PetitionSupport, for bulk m2m changes.
+    """
+    petition_ids = [petition_id for petition_id in set(petition_ids) if petition_id]
+    if not petition_ids:
+        return
+
+    counts = (
+        PetitionSupport.objects.filter(petition=OuterRef("pk"))
+        .order_by()
+        .values("petition")
+        .annotate(total=Count("id"))
+        .values("total")[:1]
+    )
+
+    Petition.objects.filter(pk__in=petition_ids).update(
+        supporters_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0),
+    )
+
+    for petition_id in petition_ids:
+        transaction.on_commit(lambda petition_id=petition_id: schedule_support_broadcast(petition_id))
+
+
+def schedule_support_broadcast(petition_id: int) -> None:
+    """
+    Push support activity at most once per petition every BROADCAST_INTERVAL_MS.
+    """
+    from apps.petition.tasks import broadcast_petition_support
+
+    schedule_coalesced(
+        broadcast_petition_support,
+        f"petition:support:{petition_id}",
+        BROADCAST_INTERVAL_MS,
+        petition_id,
+    )
+
+
+def release_support_broadcast(petition_id: int) -> None:
+    release_coalesced(f"petition:support:{petition_id}")
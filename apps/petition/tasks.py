@@ -0,0 +1,31 @@
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+
+from .support import release_support_broadcast, support_group_name
+
+
+@shared_task
+def broadcast_petition_support(petition_id: int):
+    """
+    Push the current supporter count to everyone watching the petition.
+    """
+    from .consumers import get_activity_data_for_petition_id
+
+    # Release first so supports landing while we read schedule the next push.
+    release_support_broadcast(petition_id)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    async_to_sync(channel_layer.group_send)(
+        support_group_name(petition_id),
+        {
+            "type": "petition.support",
+            "data": get_activity_data_for_petition_id(petition_id),
+            "action": "update",
+            "pk": petition_id,
+            "response_status": 200,
+        },
+    )
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, tag
+
+from apps.petition.models import Petition, PetitionSupport
+from apps.petition.support import toggle_support
+
+User = get_user_model()
+
+SUPPORTERS = 500
+WORKERS = 50
+
+
+class TestSupport(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.petition = Petition.objects.create(author=self.author, title='Petition', image='petition.jpg')
+        self.users = [
+            User.objects.create(username=f'supporter{index}', email=f'supporter{index}@gmail.com', name='Supporter')
+            for index in range(3)
+        ]
+
+    def supporters_count(self):
+        self.petition.refresh_from_db()
+        return self.petition.supporters_count
+
+    def test_toggle_on_and_off(self):
+        self.assertEqual(toggle_support(self.petition.pk, self.users[0].pk), (True, 1))
+        self.assertEqual(toggle_support(self.petition.pk, self.users[1].pk), (True, 2))
+        self.assertEqual(toggle_support(self.petition.pk, self.users[0].pk), (False, 1))
+
+        self.assertEqual(
+            list(PetitionSupport.objects.filter(petition=self.petition).values_list('user_id', flat=True)),
+            [self.users[1].pk],
+        )
+
+    def test_m2m_changes_recount(self):
+        self.petition.supporters.add(*self.users)
+        self.assertEqual(self.supporters_count(), 3)
+
+        self.petition.supporters.remove(self.users[0])
+        self.assertEqual(self.supporters_count(), 2)
+
+        self.users[1].supported_petitions.clear()
+        self.assertEqual(self.supporters_count(), 1)
+
+        self.petition.supporters.clear()
+        self.assertEqual(self.supporters_count(), 0)
+
+    def test_counter_never_goes_negative(self):
+        toggle_support(self.petition.pk, self.users[0].pk)
+        Petition.objects.filter(pk=self.petition.pk).update(supporters_count=0)
+
+        self.assertEqual(toggle_support(self.petition.pk, self.users[0].pk), (False, 0))
+        self.assertEqual(self.supporters_count(), 0)
+
+
+@tag("benchmark")
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks")
+class TestConcurrentSupport(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.petition = Petition.objects.create(author=self.author, title='Petition', image='petition.jpg')
+        User.objects.bulk_create([
+            User(username=f'supporter{index}', email=f'supporter{index}@gmail.com', name=f'Supporter {index}')
+            for index in range(SUPPORTERS)
+        ])
+        self.user_ids = list(User.objects.exclude(pk=self.author.pk).values_list('pk', flat=True))
+
+    def _toggle_all(self):
+        def toggle(user_id):
+            try:
+                with transaction.atomic():
+                    return toggle_support(self.petition.pk, user_id)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            return list(pool.map(toggle, self.user_ids))
+
+    def test_concurrent_supporters_keep_the_counter_exact(self):
+        results = self._toggle_all()
+        self.assertTrue(all(is_supported for is_supported, _ in results))
+
+        self.petition.refresh_from_db()
+        self.assertEqual(self.petition.supporters_count, SUPPORTERS)
+        self.assertEqual(PetitionSupport.objects.filter(petition=self.petition).count(), SUPPORTERS)
+
+        results = self._toggle_all()
+        self.assertFalse(any(is_supported for is_supported, _ in results))
+
+        self.petition.refresh_from_db()
+        self.assertEqual(self.petition.supporters_count, 0)
@@ -18,18 +18,21 @@ from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.generics import get_object_or_404
 from taggit.models import Tag
 
+from apps.posts.loader import load_posts
 from apps.posts.models import Post, PostLike, PostClick, SearchHistory
 from apps.posts.querysets import annotate_post_metrics
+from apps.posts.seen import mark_seen
 from apps.posts.serializers import PostSerializer, ReportSerializer, ThreadSerializer
 from apps.recommendations.post_recommender import PostRecommender
 from apps.recommendations.tasks import record_interaction
+from apps.utils.instrumentation import InstrumentedConsumerMixin, query_budget
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import rate_limit, interaction_rate_limit
 
 User = get_user_model()
 
 
-class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer):
+class PostConsumer(InstrumentedConsumerMixin, RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer):
     serializer_class = PostSerializer
     lookup_field = "pk"
     page_size = 10
@@ -96,11 +99,14 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
 
     # ====================== Filter ======================
     def get_queryset(self, **kwargs):
-        qs = Post.objects.all()
-        qs = qs.filter(is_active=True, status="published")
-        qs = annotate_post_metrics(qs, self.scope['user'])
+        qs = annotate_post_metrics(self.get_base_queryset(), self.scope['user'])
         return qs.order_by("-published_at")
 
+    @staticmethod
+    def get_base_queryset():
+        """Unannotated feed queryset for ids-first paths hydrated by load_posts()"""
+        return Post.objects.filter(is_active=True, status="published").order_by("-published_at")
+
     @staticmethod
     def _apply_body_search(queryset: QuerySet, search_term: str):
         search_query = SearchQuery(
@@ -419,43 +425,75 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
         return queryset.order_by('-published_at', '-id')
 
     # ====================== Pagination Helper ======================
+    def get_page_size(self, page_size=None):
+        return self.page_size if page_size is None else page_size
+
     @database_sync_to_async
     def paginate_posts(self, queryset, page_size=None, serializer_class=None, **kwargs):
         """Unified pagination helper"""
-        if page_size is None:
-            page_size = self.page_size
-
+        page_size = self.get_page_size(page_size)
         page_obj = list_paginator(queryset=queryset, page=1, page_size=page_size)
         serializer_cls = serializer_class or self.serializer_class
 
         serializer = serializer_cls(page_obj.object_list, many=True, context={'scope': self.scope})
+        results = serializer.data
 
         return {
-            'results': serializer.data,
+            'results': results,
             'has_next': page_obj.has_next(),
             'previous_posts': kwargs.get('previous_posts')
         }
 
+    @database_sync_to_async
+    def mark_served(self, results):
+        """Served posts drop out of the recommendation feeds (apps.posts.seen)"""
+        mark_seen(self.scope['user'].id, [post.get('id') for post in results])
+
     # ====================== Main Actions ======================
     @action()
+    @query_budget(15)
     @rate_limit(limit=40, period=60)
     async def list(self, **kwargs):
-        posts = self.filter_queryset(self.get_queryset(**kwargs), **kwargs)
+        if kwargs.get('search_term', '').strip():
+            posts = await self.get_search_posts(**kwargs)
+        else:
+            posts = self.filter_queryset(self.get_queryset(**kwargs), **kwargs)
         data = await self.paginate_posts(posts, **kwargs)
         return data, 200
 
+    @database_sync_to_async
+    def get_search_posts(self, page_size=None, **kwargs):
+        queryset = self.filter_queryset(self.get_base_queryset(), **kwargs)
+
+        fields = ['id']
+        if 'highlighted_body' in queryset.query.annotations:
+            fields.append('highlighted_body')
+
+        # One row past the page so paginate_posts can still report has_next
+        rows = list(queryset.values_list(*fields)[:self.get_page_size(page_size) + 1])
+        posts = load_posts([row[0] for row in rows], self.scope['user'])
+
+        if len(fields) > 1:
+            highlights = {row[0]: row[1] for row in rows}
+            for post in posts:
+                post.highlighted_body = highlights.get(post.id) or post.body
+
+        return posts
+
     @action()
+    @query_budget(25)
     @rate_limit(limit=25, period=60)
     async def for_you(self, **kwargs):
         posts = await self.get_for_you(**kwargs)
         data = await self.paginate_posts(posts, **kwargs)
+        await self.mark_served(data['results'])
         return data, 200
 
     @database_sync_to_async
     def get_for_you(self, **kwargs):
-        recommender = PostRecommender(self.scope['user'])
+        recommender = PostRecommender(self.scope['user'], session_key=self.channel_name)
         posts = recommender.get_recommendations(limit=50, diversity_factor=0.08,
-                                                exclude_post_ids=kwargs.get('previous_posts'))
+                                                exclude_post_ids=kwargs.get('previous_posts'), exclude_seen=True)
         return posts
 
     @action()
@@ -465,16 +503,19 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
         return data, 200
 
     @action()
+    @query_budget(20)
     @rate_limit(limit=20, period=60)
     async def trending(self, **kwargs):
         posts = await self.get_trending(**kwargs)
         data = await self.paginate_posts(posts, **kwargs)
+        await self.mark_served(data['results'])
         return data, 200
 
     @database_sync_to_async
     def get_trending(self, **kwargs):
         recommender = PostRecommender(self.scope['user'])
-        posts = recommender.get_trending_posts(limit=50, exclude_post_ids=kwargs.get('previous_posts'))
+        posts = recommender.get_trending_posts(limit=50, exclude_post_ids=kwargs.get('previous_posts'),
+                                                exclude_seen=True)
         return posts
 
     @action()
@@ -807,6 +848,8 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
         if not updated:
             raise NotFound("Post not found.")
 
+        mark_seen(user.id, [pk])
+
         if should_record_interaction:
             record_interaction.delay(
                 user_id=user.id,
@@ -949,10 +992,9 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
         previous_posts = self.clean_previous_posts(kwargs.get("previous_posts"))
 
         queryset = (
-            self.queryset
+            self.get_base_queryset()
             .filter(
                 is_deleted=False,
-                status="published",
                 community_note_of=None,
                 hashtags__name__iexact=tag,
             )
@@ -960,7 +1002,9 @@ class PostConsumer(RetrieveModelMixin, DeleteModelMixin, GenericAsyncAPIConsumer
             .order_by("-published_at", "-id")
         )
 
-        return queryset.distinct()
+        page_size = self.get_page_size(kwargs.get("page_size"))
+        post_ids = queryset.distinct().values_list("id", flat=True)[:page_size + 1]
+        return load_posts(list(post_ids), self.scope['user'])
 
     @staticmethod
     def _signal_post_update(post: Post):
@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Value
+
+from apps.posts.models import Post, PostLike
+from apps.posts.querysets import annotate_public_post_metrics
+
+# Bump this when the cached post shape changes (new annotations, relations, ...).
+POST_OBJECT_CACHE_VERSION = "v1"
+
+VIEWER_FLAGS = (
+    "is_liked",
+    "is_bookmarked",
+    "is_reposted",
+    "is_quoted",
+    "is_upvoted",
+    "is_downvoted",
+)
+
+
+def post_cache_key(post_id: int) -> str:
+    return f"post_obj:{POST_OBJECT_CACHE_VERSION}:{post_id}"
+
+
+def invalidate_posts(post_ids) -> None:
+    """
+    Drop cached post objects so the next load refetches them.
+    """
+    keys = [post_cache_key(post_id) for post_id in {post_id for post_id in post_ids if post_id}]
+    if keys:
+        cache.delete_many(keys)
+
+
+def load_posts(ids, viewer) -> list[Post]:
+    """
+    Hydrate posts by id for one viewer.
+
+    The viewer-independent part of each post (body, author, assets, embedded
+    ballot/survey/petition/broadcast/section and public counters) is served from
+    a per-post cache; only misses are fetched, in a single query. Viewer flags
+    are then overlaid in one batched query.
+
+    Returns posts in the order of ``ids``; unknown ids and duplicates are dropped.
+    """
+    ordered_ids = []
+    seen = set()
+    for post_id in ids or []:
+        try:
+            post_id = int(post_id)
+        except (TypeError, ValueError):
+            continue
+        if post_id not in seen:
+            seen.add(post_id)
+            ordered_ids.append(post_id)
+
+    if not ordered_ids:
+        return []
+
+    keys = {post_id: post_cache_key(post_id) for post_id in ordered_ids}
+    cached = cache.get_many(list(keys.values()))
+
+    posts = {}
+    for post_id, key in keys.items():
+        post = cached.get(key)
+        if isinstance(post, Post):
+            posts[post_id] = post
+
+    missing = [post_id for post_id in ordered_ids if post_id not in posts]
+    if missing:
+        fetched = annotate_public_post_metrics(Post.objects.filter(id__in=missing))
+        to_cache = {}
+        for post in fetched:
+            posts[post.id] = post
+            to_cache[keys[post.id]] = post
+
+        if to_cache:
+            cache.set_many(
+                to_cache,
+                timeout=getattr(settings, "POST_OBJECT_CACHE_TIMEOUT", 300),
+            )
+
+    loaded = [posts[post_id] for post_id in ordered_ids if post_id in posts]
+    overlay_viewer_flags(loaded, viewer)
+    return loaded
+
+
+def overlay_viewer_flags(posts, viewer) -> None:
+    """
+    Set the per-viewer flags PostSerializer reads (is_liked, is_bookmarked, ...).
+    """
+    if not posts:
+        return
+
+    for post in posts:
+        for flag in VIEWER_FLAGS:
+            setattr(post, flag, False)
+
+    if viewer is None or not getattr(viewer, "is_authenticated", False):
+        return
+
+    by_id = {post.id: post for post in posts}
+    post_ids = list(by_id)
+
+    def marks(queryset, post_field, flag):
+        return queryset.order_by().annotate(
+            flag=Value(flag, output_field=CharField()),
+        ).values_list(post_field, "flag")
+
+    rows = marks(
+        PostLike.objects.filter(user_id=viewer.pk, post_id__in=post_ids),
+        "post_id",
+        "is_liked",
+    ).union(
+        marks(
+            Post.bookmarks.through.objects.filter(user_id=viewer.pk, post_id__in=post_ids),
+            "post_id",
+            "is_bookmarked",
+        ),
+        marks(
+            Post.upvotes.through.objects.filter(user_id=viewer.pk, post_id__in=post_ids),
+            "post_id",
+            "is_upvoted",
+        ),
+        marks(
+            Post.downvotes.through.objects.filter(user_id=viewer.pk, post_id__in=post_ids),
+            "post_id",
+            "is_downvoted",
+        ),
+        marks(
+            Post.objects.filter(
+                author_id=viewer.pk,
+                is_active=True,
+                repost_of_id__in=post_ids,
+                repost_type=Post.RepostType.REPOST,
+            ),
+            "repost_of_id",
+            "is_reposted",
+        ),
+        marks(
+            Post.objects.filter(
+                author_id=viewer.pk,
+                is_active=True,
+                repost_of_id__in=post_ids,
+                repost_type=Post.RepostType.QUOTE,
+            ),
+            "repost_of_id",
+            "is_quoted",
+        ),
+        all=True,
+    )
+
+    for post_id, flag in rows:
+        post = by_id.get(post_id)
+        if post is not None:
+            setattr(post, flag, True)
+
+
+def attach_posts(objects, viewer, field: str = "post") -> None:
+    """
+    Replace ``obj.<field>`` on each object with a hydrated post from load_posts().
+    """
+    objects = [obj for obj in objects if getattr(obj, f"{field}_id", None)]
+    if not objects:
+        return
+
+    posts = {
+        post.id: post
+        for post in load_posts([getattr(obj, f"{field}_id") for obj in objects], viewer)
+    }
+
+    for obj in objects:
+        post = posts.get(getattr(obj, f"{field}_id"))
+        if post is not None:
+            setattr(obj, field, post)
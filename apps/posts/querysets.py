@@ -64,9 +64,11 @@ def top_community_note_body_subquery():
     )
 
 
-def annotate_post_metrics(queryset, user, include_top_community_note=True):
+def annotate_public_post_metrics(queryset, include_top_community_note=True):
     """
-    Annotate post queryset with counts and user-specific flags.
+    Annotate post queryset with viewer-independent relations and counts.
+
+    The result is safe to cache and share between viewers.
     """
     qs = queryset.select_related(
         "author",
@@ -121,7 +123,24 @@ def annotate_post_metrics(queryset, user, include_top_community_note=True):
             ),
             distinct=True,
         ),
+    )
+
+    if include_top_community_note:
+        qs = qs.annotate(
+            top_community_note_body=top_community_note_body_subquery(),
+        )
+
+    return qs
 
+
+def annotate_post_metrics(queryset, user, include_top_community_note=True):
+    """
+    Annotate post queryset with counts and user-specific flags.
+    """
+    qs = annotate_public_post_metrics(
+        queryset,
+        include_top_community_note=include_top_community_note,
+    ).annotate(
         # Current-user-specific counts
         liked_count=Count(
             "likes",
@@ -203,9 +222,4 @@ def annotate_post_metrics(queryset, user, include_top_community_note=True):
         ),
     )
 
-    if include_top_community_note:
-        qs = qs.annotate(
-            top_community_note_body=top_community_note_body_subquery(),
-        )
-
     return qs
@@ -0,0 +1,140 @@
+"""
+Per-user "seen posts" sets for feed de-duplication.
+
+Each user has one Redis bitmap per day, used as a Bloom filter: a post id
+sets SEEN_POSTS_HASHES bits out of SEEN_POSTS_BITS. A post counts as seen if
+all its bits are set in any bitmap of the last SEEN_POSTS_WINDOW_DAYS days;
+older bitmaps expire on their own. With the defaults (16384 bits, 4 hashes)
+a day with 1000 served posts has a false-positive rate of about 0.2%, and an
+active user costs at most 2 KB per day.
+
+Posts are marked when they are served in a recommendation feed page (for
+you, trending) or viewed (add_view). Those feeds then drop seen candidates
+after retrieval, so clients no longer need to send back the ids they already
+have. While Redis is unreachable nothing is marked and every post counts as
+unseen.
+"""
+
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _settings():
+    return (
+        int(getattr(settings, "SEEN_POSTS_BITS", 16384)),
+        int(getattr(settings, "SEEN_POSTS_HASHES", 4)),
+        int(getattr(settings, "SEEN_POSTS_WINDOW_DAYS", 7)),
+    )
+
+
+def _seen_key(user_id: int, day) -> str:
+    return cache.make_key(f"seen-posts:{user_id}:{day:%Y%m%d}")
+
+
+def _window_keys(user_id: int, days: int) -> list[str]:
+    today = timezone.now().date()
+    return [_seen_key(user_id, today - timedelta(days=offset)) for offset in range(days)]
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finaliser: spreads sequential ids over the whole range.
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def bit_positions(post_ids, bits: int, hashes: int) -> np.ndarray:
+    """
+    (len(post_ids), hashes) bit offsets, by double hashing.
+    """
+    with np.errstate(over="ignore"):
+        ids = np.asarray(post_ids, dtype=np.uint64)
+        first = _mix(ids)
+        second = _mix(ids + _GOLDEN) | np.uint64(1)
+        steps = np.arange(hashes, dtype=np.uint64)
+        return ((first[:, None] + steps[None, :] * second[:, None]) % np.uint64(bits)).astype(np.int64)
+
+
+def mark_seen(user_id: int, post_ids) -> None:
+    """
+    Add ``post_ids`` to today's bitmap for the user.
+    """
+    post_ids = [int(post_id) for post_id in post_ids if post_id is not None]
+    if not user_id or not post_ids:
+        return
+
+    bits, hashes, days = _settings()
+    key = _seen_key(user_id, timezone.now().date())
+
+    arguments = []
+    for offset in np.unique(bit_positions(post_ids, bits, hashes)):
+        arguments.extend(("SET", "u1", int(offset), 1))
+
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.execute_command("BITFIELD", key, *arguments)
+        pipe.expire(key, int(timedelta(days=days + 1).total_seconds()))
+        pipe.execute()
+    except RedisError as exc:
+        logger.warning("Could not mark posts seen for user %s: %s", user_id, exc)
+
+
+def seen_mask(user_id: int, post_ids) -> np.ndarray:
+    """
+    Boolean array: whether each of ``post_ids`` was (probably) seen in the
+    window. One pipelined BITFIELD GET per day.
+    """
+    post_ids = list(post_ids)
+    if not user_id or not post_ids:
+        return np.zeros(len(post_ids), dtype=bool)
+
+    bits, hashes, days = _settings()
+    positions = bit_positions(post_ids, bits, hashes)
+
+    arguments = []
+    for offset in positions.ravel():
+        arguments.extend(("GET", "u1", int(offset)))
+
+    seen = np.zeros(len(post_ids), dtype=bool)
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for key in _window_keys(user_id, days):
+            pipe.execute_command("BITFIELD_RO", key, *arguments)
+        results = pipe.execute()
+    except RedisError as exc:
+        logger.warning("Could not read seen posts for user %s, treating all as unseen: %s", user_id, exc)
+        return seen
+
+    for values in results:
+        seen |= np.asarray(values, dtype=bool).reshape(positions.shape).all(axis=1)
+    return seen
+
+
+def filter_unseen(user_id: int, posts: list) -> list:
+    """
+    Drop posts (objects with ``id``) the user has already seen, keeping order.
+    """
+    if not posts:
+        return posts
+    seen = seen_mask(user_id, [post.id for post in posts])
+    return [post for post, was_seen in zip(posts, seen) if not was_seen]
+
+
+def clear_seen(user_id: int) -> None:
+    _, _, days = _settings()
+    _redis().delete(*_window_keys(user_id, days))
@@ -0,0 +1,40 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.posts.loader import invalidate_posts
+from apps.posts.models import Asset, Post, PostLike
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance: Post, **kwargs):
+    """Drop the cached post and the parents whose reply/repost counts it feeds"""
+    invalidate_posts([
+        instance.pk,
+        instance.reply_to_id,
+        instance.repost_of_id,
+        instance.community_note_of_id,
+    ])
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def invalidate_post_cache_for_related(sender, instance, **kwargs):
+    invalidate_posts([instance.post_id])
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+@receiver(m2m_changed, sender=Post.bookmarks.through)
+@receiver(m2m_changed, sender=Post.upvotes.through)
+@receiver(m2m_changed, sender=Post.downvotes.through)
+@receiver(m2m_changed, sender=Post.tagged_users.through)
+def invalidate_post_cache_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        invalidate_posts(pk_set or [])
+    else:
+        invalidate_posts([instance.pk])
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.posts.loader import load_posts
+from apps.posts.models import Post
+
+User = get_user_model()
+
+
+class TestLoadPosts(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.viewer = User.objects.create(username='viewer', email='viewer@gmail.com', name='Viewer')
+        self.posts = [
+            Post.objects.create(author=self.author, body=f'post {index}', status='published')
+            for index in range(3)
+        ]
+
+    def test_preserves_input_order_and_drops_unknown_ids(self):
+        ids = [self.posts[2].pk, 999999, self.posts[0].pk, self.posts[2].pk]
+        loaded = load_posts(ids, self.viewer)
+        self.assertEqual([post.pk for post in loaded], [self.posts[2].pk, self.posts[0].pk])
+
+    def test_viewer_flags_are_not_shared_through_the_cache(self):
+        self.posts[0].likes.add(self.viewer)
+
+        viewer_post = load_posts([self.posts[0].pk], self.viewer)[0]
+        self.assertTrue(viewer_post.is_liked)
+        self.assertEqual(viewer_post.likes_count, 1)
+
+        with self.assertNumQueries(1):
+            author_post = load_posts([self.posts[0].pk], self.author)[0]
+        self.assertFalse(author_post.is_liked)
+        self.assertEqual(author_post.likes_count, 1)
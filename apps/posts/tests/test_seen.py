@@ -0,0 +1,45 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from redis.exceptions import ConnectionError
+
+from apps.posts import seen
+
+
+class TestSeenPosts(SimpleTestCase):
+    user_id = 987654321
+
+    def setUp(self):
+        seen.clear_seen(self.user_id)
+        self.addCleanup(seen.clear_seen, self.user_id)
+
+    def test_marked_posts_are_seen(self):
+        seen.mark_seen(self.user_id, [1, 2, 3])
+
+        self.assertEqual(seen.seen_mask(self.user_id, [1, 4, 3]).tolist(), [True, False, True])
+        posts = [SimpleNamespace(id=post_id) for post_id in (3, 5, 1, 6)]
+        self.assertEqual([post.id for post in seen.filter_unseen(self.user_id, posts)], [5, 6])
+
+    def test_posts_drop_out_after_the_window(self):
+        long_ago = timezone.now() - timedelta(days=30)
+        with mock.patch('apps.posts.seen.timezone.now', return_value=long_ago):
+            seen.mark_seen(self.user_id, [42])
+
+        self.assertFalse(seen.seen_mask(self.user_id, [42])[0])
+
+    def test_false_positive_rate_is_low(self):
+        seen.mark_seen(self.user_id, range(1, 1001))
+
+        false_positives = seen.seen_mask(self.user_id, range(100_000, 110_000)).sum()
+        self.assertLess(false_positives, 100)
+        self.assertTrue(seen.seen_mask(self.user_id, range(1, 1001)).all())
+
+    def test_redis_errors_mean_unseen(self):
+        with mock.patch('apps.posts.seen._redis', side_effect=ConnectionError('connection refused')):
+            seen.mark_seen(self.user_id, [7])
+            self.assertEqual(seen.seen_mask(self.user_id, [7, 8]).tolist(), [False, False])
+
+        self.assertFalse(seen.seen_mask(self.user_id, [7])[0])
@@ -0,0 +1,163 @@
+"""
+Latency / query benchmarks for the recommender entry points.
+
+run_benchmarks() calls each entry point for a deterministic sample of
+viewers and reports latency percentiles, SQL query counts and, optionally,
+the EXPLAIN (ANALYZE, BUFFERS) plan of the slowest SELECT each entry point
+issued. Caches are bypassed by calling the _compute_* methods directly, but
+load_posts() still reads the post cache, so repeated iterations are warm.
+
+Meant to run against the synthetic dataset (see synthetic.py) so numbers
+are comparable between runs and branches.
+"""
+
+import random
+import time
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.posts.models import Post
+from .follow_recommender import FollowRecommender
+from .mutuals import rebuild_mutual_counts
+from .post_recommender import PostRecommender
+
+User = get_user_model()
+
+PERCENTILES = (50, 90, 95, 99)
+
+def _follow_full_scan(recommender):
+    # The single-pass scoring the two-stage candidate query replaced, kept for comparison.
+    return recommender._score_users(recommender._eligible_users())
+
+
+def _rank_by(expression, limit: int = 50) -> list:
+    # One scoring component over the whole candidate pool, as _compute_scored_posts evaluates it.
+    candidates = Post.objects.filter(
+        status="published", is_active=True, is_deleted=False,
+        reply_to__isnull=True, community_note_of__isnull=True,
+    ).exclude(repost_type=Post.RepostType.REPOST)
+    return list(candidates.annotate(score=expression).order_by("-score", "-id").values_list("id", "score")[:limit])
+
+
+class _Diversity:
+    """
+    _apply_diversity over a viewer's top ``size`` scored posts. The pool is
+    scored in prepare(), outside the timings, so only the re-rank is timed.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pools = {}
+
+    def prepare(self, user):
+        recommender = PostRecommender(user)
+        self.pools[user.id] = recommender._compute_scored_posts(exclude_post_ids=[], fetch_limit=self.size)
+
+    def __call__(self, user):
+        return PostRecommender(user)._apply_diversity(self.pools[user.id])
+
+
+ENTRY_POINTS = {
+    "posts.scored": lambda user: PostRecommender(user)._compute_scored_posts(exclude_post_ids=[], fetch_limit=40),
+    # Embedding inner product vs the Case/IN match on shared ballots, surveys, petitions and broadcasts.
+    "posts.content_similarity": lambda user: _rank_by(PostRecommender(user)._get_content_similarity_score()),
+    "posts.related_item_similarity": lambda user: _rank_by(PostRecommender(user)._get_related_item_similarity_score()),
+    # Flat from 50 to 500 candidates means SCORED_LIMIT can grow without slowing the feed.
+    "posts.diversity_50": _Diversity(50),
+    "posts.diversity_500": _Diversity(500),
+    "posts.trending": lambda user: PostRecommender(user).get_trending_posts(),
+    "posts.trending_words": lambda user: PostRecommender._compute_trending_words(),
+    "posts.trending_hashtags": lambda user: PostRecommender._compute_trending_hashtags(),
+    "users.follow_candidates": lambda user: FollowRecommender(user)._compute_candidates(),
+    "users.follow_full_scan": lambda user: _follow_full_scan(FollowRecommender(user)),
+}
+
+
+def sample_viewers(count: int, seed: int = 42, queryset=None) -> list:
+    """
+    ``count`` recently active users, the same ones for the same seed.
+    """
+    queryset = queryset if queryset is not None else User.objects.filter(is_active=True)
+    user_ids = list(queryset.order_by("-last_login", "id").values_list("id", flat=True)[:count * 10])
+    chosen = random.Random(seed).sample(user_ids, min(count, len(user_ids)))
+    return list(User.objects.filter(id__in=chosen).order_by("id"))
+
+
+def explain(sql: str) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def _slowest_select(queries) -> str | None:
+    selects = [query for query in queries if query["sql"].lstrip().upper().startswith(("SELECT", "WITH"))]
+    if not selects:
+        return None
+    return max(selects, key=lambda query: float(query["time"]))["sql"]
+
+
+def benchmark_entry_point(run, viewers, iterations: int = 3, with_plan: bool = False) -> dict:
+    """
+    Time ``run(viewer)`` ``iterations`` times per viewer, after
+    ``run.prepare(viewer)`` if the entry point has one.
+    """
+    timings, query_counts = [], []
+    slowest = (0.0, None)
+
+    for viewer in viewers:
+        if hasattr(run, "prepare"):
+            run.prepare(viewer)
+
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                run(viewer)
+                elapsed = time.perf_counter() - started
+
+            timings.append(elapsed * 1000)
+            query_counts.append(len(queries))
+            if elapsed > slowest[0]:
+                slowest = (elapsed, queries.captured_queries)
+
+    report = {
+        "calls": len(timings),
+        "latency_ms": {
+            f"p{percentile}": round(float(value), 2)
+            for percentile, value in zip(PERCENTILES, np.percentile(timings, PERCENTILES))
+        },
+        "queries": {"min": min(query_counts), "max": max(query_counts), "mean": round(float(np.mean(query_counts)), 1)},
+    }
+
+    if with_plan and slowest[1]:
+        sql = _slowest_select(slowest[1])
+        report["plan"] = explain(sql) if sql else None
+
+    return report
+
+
+def run_benchmarks(viewers: int = 20, iterations: int = 3, seed: int = 42, with_plan: bool = False,
+                   entry_points=None, queryset=None) -> dict:
+    """
+    Benchmark every entry point (or the named subset) and return a report
+    keyed by entry point name.
+    """
+    names = entry_points or list(ENTRY_POINTS)
+    sample = sample_viewers(viewers, seed=seed, queryset=queryset)
+
+    # Mutual counts are maintained incrementally in production; bulk-loaded
+    # follows bypass that, so build them up front, outside the timings.
+    for viewer in sample:
+        rebuild_mutual_counts(viewer.id)
+
+    return {
+        "viewers": len(sample),
+        "iterations": iterations,
+        "seed": seed,
+        "results": {
+            name: benchmark_entry_point(ENTRY_POINTS[name], sample, iterations, with_plan)
+            for name in names
+        },
+    }
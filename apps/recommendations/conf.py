@@ -9,9 +9,23 @@ POST_RECOMMENDER_CONFIG = {
     "RECOMMENDATIONS": {
         "DEFAULT_LIMIT": 20,
         "SCORED_LIMIT": 50,
+        # Candidates fetched per requested post when seen posts are dropped.
+        "SEEN_OVERFETCH": 4,
         "DIVERSITY_FACTOR": 0.08,
     },
 
+    # MMR re-ranking of the feed: LAMBDA trades relevance (1.0) against
+    # similarity to posts already picked (0.0).
+    "DIVERSITY": {
+        "LAMBDA": 0.7,
+        "WEIGHTS": {
+            "content_type": 0.25,
+            "region": 0.20,
+            "hashtags": 0.25,
+            "embedding": 0.30,
+        },
+    },
+
     "TRENDING_POSTS": {
         "DEFAULT_LIMIT": 20,
         "WINDOW_DAYS": 7,
@@ -171,6 +185,27 @@ FOLLOW_RECOMMENDER_CONFIG = {
     "DEFAULT_LIMIT": 15,
     "SCORED_LIMIT": 80,
     "DIVERSITY_FACTOR": 0.10,
+    # MMR re-ranking of follow suggestions by shared region.
+    "DIVERSITY_LAMBDA": 0.8,
+
+    # Stage one: a few hundred candidate ids from cheap sources, so only
+    # those are scored instead of every active user.
+    "CANDIDATES": {
+        "LIMIT": 400,
+        # Top "people you may know" from the mutual-follow counts.
+        "MUTUALS": 150,
+        # Friends-of-friends via random walks over the follow graph.
+        "WALKS": 300,
+        "WALK_LENGTH": 2,
+        "WALK_FANOUT": 50,
+        "FRIENDS_OF_FRIENDS": 200,
+        # Authors of posts the user recently interacted with.
+        "ENGAGED_AUTHORS": 100,
+        "ENGAGED_DAYS": 30,
+        "PROFILE_VISITS": 50,
+        # Users in the same ward, widening to constituency and county.
+        "LOCAL": 150,
+    },
 
     # Final follow recommendation weights.
     # These should sum to 1.0.
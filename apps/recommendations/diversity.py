@@ -0,0 +1,224 @@
+"""
+Maximal marginal relevance (MMR) re-ranking for recommendation lists.
+
+Each candidate is described by feature blocks (content type, region,
+hashtags, embedding, ...). Every block is L2-normalised per row and scaled
+by sqrt(weight), so the dot product of two rows is the weighted sum of the
+per-block cosine similarities. mmr_rerank() then picks greedily
+
+    argmax  lambda * relevance - (1 - lambda) * max similarity to the picks so far
+
+keeping a running max-similarity vector, so each pick costs one
+matrix-vector product over the candidates and latency stays flat as the
+candidate list grows from tens to hundreds.
+"""
+
+import zlib
+
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from taggit.models import TaggedItem
+
+from apps.posts.models import Post
+from .models import PostEmbedding
+
+# Ids are folded into this many one-hot columns; collisions only make two
+# unrelated regions or hashtags look alike, which costs a little diversity.
+HASH_BUCKETS = 128
+
+CONTENT_TYPES = ("ballot", "petition", "survey", "broadcast", "section")
+
+
+def session_rng(user_id, session_key=None) -> np.random.Generator:
+    """
+    The same generator for the same user and session, so re-ranking a
+    cached list does not reshuffle it between requests.
+    """
+    seed = zlib.crc32(f"{user_id}:{session_key or ''}".encode())
+    return np.random.default_rng(seed)
+
+
+def one_hot(values, buckets: int = HASH_BUCKETS) -> np.ndarray:
+    """
+    One row per value; ``None`` gives an empty row.
+    """
+    matrix = np.zeros((len(values), buckets), dtype=np.float32)
+    rows = [row for row, value in enumerate(values) if value is not None]
+    matrix[rows, [int(values[row]) % buckets for row in rows]] = 1.0
+    return matrix
+
+
+def multi_hot(value_lists, buckets: int = HASH_BUCKETS) -> np.ndarray:
+    matrix = np.zeros((len(value_lists), buckets), dtype=np.float32)
+    for row, values in enumerate(value_lists):
+        if values:
+            matrix[row, [int(value) % buckets for value in values]] = 1.0
+    return matrix
+
+
+def build_features(blocks: dict, weights: dict, count: int) -> tuple[np.ndarray, dict]:
+    """
+    Concatenate weighted, row-normalised blocks. Returns the feature matrix
+    and the column slice of each block, for explanations.
+    """
+    parts, slices, offset = [np.zeros((count, 0), dtype=np.float32)], {}, 0
+
+    for name, block in blocks.items():
+        weight = float(weights.get(name, 0.0))
+        if weight <= 0 or block is None or not block.size:
+            continue
+
+        block = np.asarray(block, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block = np.divide(block, norms, out=np.zeros_like(block), where=norms > 0) * np.sqrt(weight)
+
+        parts.append(block)
+        slices[name] = slice(offset, offset + block.shape[1])
+        offset += block.shape[1]
+
+    return np.hstack(parts), slices
+
+
+def mmr_rerank(
+        relevance,
+        features: np.ndarray,
+        limit: int,
+        lambda_: float = 0.7,
+        groups=None,
+        max_per_group: int = 0,
+        jitter: float = 0.0,
+        rng: np.random.Generator | None = None,
+        block_slices: dict | None = None,
+) -> tuple[list[int], list[dict]]:
+    """
+    Re-rank candidates and return (indexes in pick order, explanations).
+
+    ``relevance`` is min-max scaled to [0, 1] so ``lambda_`` means the same
+    for any score range. ``jitter`` adds uniform noise of that size to the
+    raw relevance first. At most ``max_per_group`` items per group (author)
+    are picked while others remain; capped items fill any leftover slots.
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    count = len(relevance)
+    limit = min(int(limit), count)
+
+    if limit <= 0:
+        return [], []
+
+    if jitter > 0:
+        relevance = relevance + (rng or np.random.default_rng()).uniform(-jitter, jitter, count)
+
+    span = relevance.max() - relevance.min()
+    scaled = (relevance - relevance.min()) / span if span > 0 else np.zeros(count)
+
+    if groups is not None and max_per_group > 0:
+        _, group_index = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        group_counts = np.zeros(group_index.max() + 1, dtype=np.int64)
+    else:
+        group_index = None
+
+    max_similarity = np.zeros(count)
+    nearest = np.full(count, -1)
+    available = np.ones(count, dtype=bool)
+    order, explanations = [], []
+
+    def pick(index, mmr, capped):
+        order.append(int(index))
+        explanation = {
+            "relevance": round(float(relevance[index]), 4),
+            "mmr": round(float(mmr), 4),
+            "max_similarity": round(float(max_similarity[index]), 4),
+            "similar_to": int(nearest[index]) if nearest[index] >= 0 else None,
+            "shared": {},
+            "capped": capped,
+        }
+        if nearest[index] >= 0 and block_slices:
+            for name, columns in block_slices.items():
+                shared = float(features[index, columns] @ features[nearest[index], columns])
+                if shared > 0:
+                    explanation["shared"][name] = round(shared, 4)
+        explanations.append(explanation)
+
+        available[index] = False
+        if features.shape[1]:
+            similarities = features @ features[index]
+            closer = available & (similarities > max_similarity)
+            max_similarity[closer] = similarities[closer]
+            nearest[closer] = index
+
+    while len(order) < limit:
+        mmr = lambda_ * scaled - (1 - lambda_) * max_similarity
+        eligible = available
+        if group_index is not None:
+            eligible = available & (group_counts[group_index] < max_per_group)
+        if not eligible.any():
+            break
+
+        index = int(np.argmax(np.where(eligible, mmr, -np.inf)))
+        pick(index, mmr[index], capped=False)
+        if group_index is not None:
+            group_counts[group_index[index]] += 1
+
+    if len(order) < limit:
+        mmr = lambda_ * scaled - (1 - lambda_) * max_similarity
+        remaining = np.flatnonzero(available)
+        for index in remaining[np.argsort(-mmr[remaining], kind="stable")][:limit - len(order)]:
+            pick(index, mmr[index], capped=True)
+
+    return order, explanations
+
+
+# ====================== Post features ======================
+
+def post_feature_blocks(post_ids) -> dict:
+    """
+    Diversity feature blocks for ``post_ids``, in that order: content type,
+    region (the linked civic item's, else the author's), hashtags and,
+    for posts that have one, the stored embedding. Three queries.
+    """
+    position = {post_id: row for row, post_id in enumerate(post_ids)}
+    count = len(post_ids)
+
+    rows = (
+        Post.objects.filter(id__in=post_ids)
+        .annotate(
+            region_county=Coalesce(
+                F("ballot__county"), F("petition__county"), F("survey__county"), F("author__county"),
+            ),
+            region_ward=Coalesce(
+                F("ballot__ward"), F("petition__ward"), F("survey__ward"), F("author__ward"),
+            ),
+        )
+        .values_list("id", "region_county", "region_ward", *(f"{name}_id" for name in CONTENT_TYPES))
+    )
+
+    content_types = np.zeros((count, len(CONTENT_TYPES) + 1), dtype=np.float32)
+    counties, wards = [None] * count, [None] * count
+    for post_id, county_id, ward_id, *linked in rows:
+        row = position[post_id]
+        kinds = [column for column, linked_id in enumerate(linked) if linked_id is not None]
+        content_types[row, kinds[0] if kinds else len(CONTENT_TYPES)] = 1.0
+        counties[row], wards[row] = county_id, ward_id
+
+    hashtags = [[] for _ in range(count)]
+    for post_id, tag_id in TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id__in=post_ids,
+    ).values_list("object_id", "tag_id"):
+        hashtags[position[post_id]].append(tag_id)
+
+    embeddings = None
+    for post_id, embedding in PostEmbedding.objects.filter(post_id__in=post_ids).values_list("post_id", "embedding"):
+        if embeddings is None:
+            embeddings = np.zeros((count, len(embedding)), dtype=np.float32)
+        embeddings[position[post_id]] = embedding
+
+    return {
+        "content_type": content_types,
+        # Same county counts half, same ward the other half.
+        "region": np.hstack([one_hot(counties), one_hot(wards)]),
+        "hashtags": multi_hot(hashtags),
+        "embedding": embeddings,
+    }
@@ -0,0 +1,255 @@
+"""
+Viewer-independent post features for PostRecommender.
+
+The content type, media, freshness and note quality scores, the raw
+interaction counts and the controversy multiplier are the same for every
+viewer, so they are computed once per post into PostFeatures instead of
+inside every user's scoring query. Signals queue a refresh for the posts that
+change (coalesced per post), freshness is re-bucketed every few minutes, and a
+nightly recompute repairs any drift.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, Count, Exists, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from apps.posts.models import Post, PostClick, PostLike, Report
+from apps.utils.coalesce import schedule_coalesced
+from .models import PostFeatures
+
+FEATURE_FIELDS = [
+    "published_at",
+    "content_type_score",
+    "media_score",
+    "freshness_score",
+    "note_quality_score",
+    "likes_count",
+    "bookmarks_count",
+    "clicks_count",
+    "reposts_count",
+    "reports_count",
+    "has_contested_note",
+    "controversy_multiplier",
+]
+
+REPOST_FILTER = Q(
+    reply_to__isnull=True,
+    community_note_of__isnull=True,
+    status="published",
+    is_active=True,
+    is_deleted=False,
+)
+
+
+def _scorer():
+    # The viewer-independent score components of PostRecommender never touch the user.
+    from .post_recommender import PostRecommender
+
+    return PostRecommender(user=None)
+
+
+def _counts(queryset, field: str, post_ids) -> dict[int, int]:
+    return dict(
+        queryset.filter(**{f"{field}__in": post_ids})
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values_list(field, "total")
+    )
+
+
+def controversy_multiplier(reports_count: int, has_contested_note: bool) -> float:
+    if reports_count >= 10:
+        return 0.40
+    if has_contested_note:
+        return 0.30
+    return 1.0
+
+
+def _contested_note():
+    return Post.objects.filter(
+        community_note_of=OuterRef("pk"),
+        status="published", is_active=True, is_deleted=False,
+    ).annotate(
+        ups=Count("upvotes", distinct=True),
+        downs=Count("downvotes", distinct=True),
+    ).filter(
+        downs__gt=F("ups") * 2,
+        downs__gte=5,
+    )
+
+
+def _live_count(queryset, field: str):
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")[:1]
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def live_count(name: str):
+    """
+    Per-post expression computing a PostFeatures count, for posts whose
+    features are not stored yet.
+    """
+    relations = {
+        "likes_count": (PostLike.objects.all(), "post_id"),
+        "bookmarks_count": (Post.bookmarks.through.objects.all(), "post_id"),
+        "clicks_count": (PostClick.objects.all(), "post_id"),
+        "reposts_count": (Post.objects.filter(REPOST_FILTER), "repost_of_id"),
+        "reports_count": (Report.objects.all(), "post_id"),
+    }
+    return _live_count(*relations[name])
+
+
+def live_controversy_multiplier():
+    """
+    controversy_multiplier() as a per-post expression.
+    """
+    return Case(
+        When(GreaterThanOrEqual(live_count("reports_count"), 10), then=Value(0.40)),
+        When(Exists(_contested_note()), then=Value(0.30)),
+        default=Value(1.0),
+        output_field=FloatField(),
+    )
+
+
+def compute_post_features(post_ids) -> list[PostFeatures]:
+    """
+    Build PostFeatures for ``post_ids``: one annotated query for the scores
+    plus one grouped count per relation, instead of a join across all of them.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return []
+
+    scorer = _scorer()
+    now = timezone.now()
+
+    rows = Post.objects.filter(id__in=post_ids).annotate(
+        content_type_score=scorer._get_content_type_score(),
+        media_score=scorer._get_media_score(),
+        freshness_score=scorer._get_freshness_score(now=now),
+        note_quality_score=scorer._get_note_quality_score(),
+        has_contested_note=Exists(_contested_note()),
+    ).values_list(
+        "id",
+        "published_at",
+        "content_type_score",
+        "media_score",
+        "freshness_score",
+        "note_quality_score",
+        "has_contested_note",
+    )
+
+    likes = _counts(PostLike.objects.all(), "post_id", post_ids)
+    bookmarks = _counts(Post.bookmarks.through.objects.all(), "post_id", post_ids)
+    clicks = _counts(PostClick.objects.all(), "post_id", post_ids)
+    reposts = _counts(Post.objects.filter(REPOST_FILTER), "repost_of_id", post_ids)
+    reports = _counts(Report.objects.all(), "post_id", post_ids)
+
+    features = []
+    for post_id, published_at, content_type, media, freshness, note_quality, contested in rows:
+        features.append(
+            PostFeatures(
+                post_id=post_id,
+                published_at=published_at,
+                content_type_score=content_type,
+                media_score=media,
+                freshness_score=freshness,
+                note_quality_score=note_quality,
+                likes_count=likes.get(post_id, 0),
+                bookmarks_count=bookmarks.get(post_id, 0),
+                clicks_count=clicks.get(post_id, 0),
+                reposts_count=reposts.get(post_id, 0),
+                reports_count=reports.get(post_id, 0),
+                has_contested_note=contested,
+                controversy_multiplier=controversy_multiplier(reports.get(post_id, 0), contested),
+            )
+        )
+
+    return features
+
+
+def refresh_post_features(post_ids) -> int:
+    """
+    Recompute and upsert the features of ``post_ids``.
+    """
+    features = compute_post_features(post_ids)
+
+    PostFeatures.objects.bulk_create(
+        features,
+        update_conflicts=True,
+        unique_fields=["post"],
+        update_fields=FEATURE_FIELDS + ["computed_at"],
+        batch_size=1000,
+    )
+
+    return len(features)
+
+
+def refresh_freshness_scores(now=None) -> int:
+    """
+    Re-bucket freshness_score for posts young enough to still be changing
+    buckets, in one UPDATE.
+    """
+    scorer = _scorer()
+    now = now or timezone.now()
+
+    # A day of margin past the last bucket catches posts missed while beat was down.
+    horizon = now - timedelta(hours=scorer._as_int("FRESHNESS.WEEK_HOURS", 168) + 24)
+
+    return PostFeatures.objects.filter(published_at__gte=horizon).update(
+        freshness_score=scorer._get_freshness_score(now=now),
+    )
+
+
+def recompute_post_features(batch_size: int = 2000) -> int:
+    """
+    Recompute every eligible post's features, in id batches.
+    """
+    post_ids = (
+        Post.objects.filter(
+            status="published", is_active=True, is_deleted=False,
+            reply_to__isnull=True, community_note_of__isnull=True,
+        )
+        .exclude(repost_type=Post.RepostType.REPOST)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    refreshed = 0
+    batch = []
+    for post_id in post_ids.iterator(chunk_size=batch_size):
+        batch.append(post_id)
+        if len(batch) >= batch_size:
+            refreshed += refresh_post_features(batch)
+            batch = []
+
+    if batch:
+        refreshed += refresh_post_features(batch)
+
+    return refreshed
+
+
+def post_features_key(post_id: int) -> str:
+    return f"post-features:{post_id}"
+
+
+def schedule_post_features_refresh(post_ids) -> None:
+    """
+    Queue a features refresh for each post, at most one per post per
+    POST_FEATURES_REFRESH_INTERVAL_MS.
+    """
+    from .tasks import refresh_post_features_task
+
+    interval_ms = getattr(settings, "POST_FEATURES_REFRESH_INTERVAL_MS", 2000)
+
+    for post_id in {post_id for post_id in post_ids if post_id}:
+        schedule_coalesced(refresh_post_features_task, post_features_key(post_id), interval_ms, post_id)
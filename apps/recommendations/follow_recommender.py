@@ -1,6 +1,7 @@
 import random
 from datetime import timedelta
 
+import numpy as np
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
@@ -13,13 +14,18 @@ from django.db.models import (
     FloatField,
     OuterRef,
     Q,
+    Subquery,
     Value,
     When,
+    Window,
 )
-from django.db.models.functions import Coalesce, Least
+from django.db.models.functions import Coalesce, Least, Random, RowNumber
 from django.utils import timezone
 
-from .models import FollowRecommendationCache
+from apps.users.graph import get_graph
+from apps.users.models import ProfileVisit
+from .diversity import build_features, mmr_rerank, one_hot, session_rng
+from .models import FollowRecommendationCache, MutualFollowCount, UserInteraction
 
 User = get_user_model()
 
@@ -31,7 +37,20 @@ DEFAULT_FOLLOW_RECOMMENDER_CONFIG = {
     "DEFAULT_LIMIT": 15,
     "SCORED_LIMIT": 80,
     "DIVERSITY_FACTOR": 0.10,
+    "DIVERSITY_LAMBDA": 0.8,
     "RANDOM_SEED": None,
+    "CANDIDATES": {
+        "LIMIT": 400,
+        "MUTUALS": 150,
+        "WALKS": 300,
+        "WALK_LENGTH": 2,
+        "WALK_FANOUT": 50,
+        "FRIENDS_OF_FRIENDS": 200,
+        "ENGAGED_AUTHORS": 100,
+        "ENGAGED_DAYS": 30,
+        "PROFILE_VISITS": 50,
+        "LOCAL": 150,
+    },
     "WEIGHTS": {
         "location": 0.25,
         "mutual": 0.30,
@@ -127,10 +146,12 @@ class FollowRecommender:
         # 3. Compute fresh candidates.
         candidates = self._compute_candidates()
 
+        ranked = self._apply_diversity(candidates, diversity_factor, limit)
+
         if candidates:
-            self._save_to_cache(candidates)
+            self._save_to_cache(candidates, ranked)
 
-        return self._apply_diversity(candidates, diversity_factor, limit)
+        return ranked
 
     def clear_cache(self) -> None:
         """
@@ -139,9 +160,220 @@ class FollowRecommender:
         cache.delete(self.cache_key)
         FollowRecommendationCache.objects.filter(user=self.user).delete()
 
-    # ====================== CANDIDATE SCORING ======================
+    # ====================== CANDIDATE GENERATION ======================
 
     def _compute_candidates(self):
+        """
+        Two stages: collect a few hundred candidate ids from cheap sources,
+        then score only those.
+        """
+        candidate_ids = self._generate_candidate_ids()
+
+        if not candidate_ids:
+            return []
+
+        return self._score_users(self._eligible_users().filter(id__in=candidate_ids))
+
+    def _candidates_config(self):
+        return self.config.get("CANDIDATES", DEFAULT_FOLLOW_RECOMMENDER_CONFIG["CANDIDATES"])
+
+    def _generate_candidate_ids(self) -> list[int]:
+        candidates_cfg = self._candidates_config()
+        limit = int(candidates_cfg["LIMIT"])
+
+        excluded = {self.user.id}
+        graph = get_graph()
+        if graph is not None:
+            for ids in (
+                graph.neighbours("following", self.user.id),
+                graph.neighbours("muted", self.user.id),
+                graph.hidden_ids(self.user.id),
+            ):
+                excluded.update(ids.tolist())
+        else:
+            excluded.update(self.user.following.values_list("id", flat=True))
+            excluded.update(self.user.muted.values_list("id", flat=True))
+            excluded.update(self.user.blocked.values_list("id", flat=True))
+            excluded.update(self.user.blockers.values_list("id", flat=True))
+
+        # Sources in priority order; ids keep the position of their first source.
+        sources = (
+            self._mutual_follow_candidates,
+            self._friends_of_friends_candidates,
+            self._engaged_author_candidates,
+            self._profile_visit_candidates,
+            self._local_candidates,
+        )
+
+        candidate_ids = {}
+        for source in sources:
+            for user_id in source(candidates_cfg, excluded):
+                if user_id not in excluded:
+                    candidate_ids.setdefault(user_id, None)
+
+            if len(candidate_ids) >= limit:
+                break
+
+        return list(candidate_ids)[:limit]
+
+    def _mutual_follow_candidates(self, candidates_cfg, excluded) -> list[int]:
+        """
+        Users followed by the most of the people the user follows.
+        """
+        return list(
+            MutualFollowCount.objects.filter(user=self.user, mutuals__gt=0)
+            .order_by("-mutuals")
+            .values_list("candidate_id", flat=True)[:int(candidates_cfg.get("MUTUALS", 150)) + len(excluded)]
+        )
+
+    def _friends_of_friends_candidates(self, candidates_cfg, excluded) -> list[int]:
+        """
+        Users reached by short random walks from the user over the follow
+        graph, most visited first. All walks advance together, so each hop is
+        one query for the sampled out-edges of the nodes they stand on.
+        """
+        walks = int(candidates_cfg["WALKS"])
+        walk_length = int(candidates_cfg["WALK_LENGTH"])
+        fanout = int(candidates_cfg["WALK_FANOUT"])
+
+        neighbours = {}
+        positions = [self.user.id] * walks
+        visits = {}
+
+        for hop in range(walk_length):
+            unseen = {position for position in positions if position not in neighbours}
+            if unseen:
+                sampled = self._sample_following(unseen, fanout)
+                for user_id in unseen:
+                    neighbours[user_id] = sampled.get(user_id, [])
+
+            next_positions = []
+            for position in positions:
+                if not neighbours[position]:
+                    continue
+
+                position = self._rng.choice(neighbours[position])
+                next_positions.append(position)
+
+                # The first hop only reaches users already followed.
+                if hop > 0 and position not in excluded:
+                    visits[position] = visits.get(position, 0) + 1
+
+            positions = next_positions
+            if not positions:
+                break
+
+        ranked = sorted(visits, key=visits.get, reverse=True)
+        return ranked[:int(candidates_cfg["FRIENDS_OF_FRIENDS"])]
+
+    def _sample_following(self, user_ids, fanout: int) -> dict[int, list[int]]:
+        """
+        Up to ``fanout`` random followees for each of ``user_ids``, from the
+        social graph when it is loaded.
+        """
+        graph = get_graph()
+        if graph is not None:
+            sampled = {}
+            for user_id in user_ids:
+                following = graph.neighbours("following", user_id).tolist()
+                if len(following) > fanout:
+                    following = self._rng.sample(following, fanout)
+                if following:
+                    sampled[user_id] = following
+            return sampled
+
+        follows = (
+            User.following.through.objects.filter(from_user_id__in=user_ids)
+            .annotate(
+                rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F("from_user_id")],
+                    order_by=Random(),
+                ),
+            )
+            .filter(rank__lte=fanout)
+            .values_list("from_user_id", "to_user_id")
+        )
+
+        sampled = {}
+        for from_user_id, to_user_id in follows:
+            sampled.setdefault(from_user_id, []).append(to_user_id)
+
+        return sampled
+
+    def _engaged_author_candidates(self, candidates_cfg, excluded) -> list[int]:
+        """
+        Authors of the posts the user interacted with most recently.
+        """
+        since = timezone.now() - timedelta(days=int(candidates_cfg["ENGAGED_DAYS"]))
+
+        return list(
+            UserInteraction.objects.filter(user=self.user, created_at__gte=since)
+            .values("post__author_id")
+            .annotate(interactions=Count("id"))
+            .order_by("-interactions")
+            .values_list("post__author_id", flat=True)[:int(candidates_cfg["ENGAGED_AUTHORS"])]
+        )
+
+    def _profile_visit_candidates(self, candidates_cfg, excluded) -> list[int]:
+        return list(
+            ProfileVisit.objects.filter(visitor=self.user)
+            .order_by("-visited_at")
+            .values_list("visited_id", flat=True)[:int(candidates_cfg["PROFILE_VISITS"])]
+        )
+
+    def _local_candidates(self, candidates_cfg, excluded) -> list[int]:
+        """
+        Recently active users in the user's ward, widening to constituency and
+        county while short. Users without a location get recently active
+        users anywhere.
+        """
+        limit = int(candidates_cfg["LOCAL"])
+        recent_first = F("last_login").desc(nulls_last=True)
+
+        areas = [
+            (field, getattr(self.user, f"{field}_id", None))
+            for field in ("ward", "constituency", "county")
+        ]
+        areas = [(field, area_id) for field, area_id in areas if area_id]
+
+        if not areas:
+            return list(
+                User.objects.filter(is_active=True, last_login__isnull=False)
+                .order_by(recent_first)
+                .values_list("id", flat=True)[:limit]
+            )
+
+        local_ids = {}
+        for field, area_id in areas:
+            # Over-fetch by the excluded count so followed users do not crowd out new ones.
+            area_users = (
+                User.objects.filter(is_active=True, **{f"{field}_id": area_id})
+                .order_by(recent_first)
+                .values_list("id", flat=True)[:limit + len(excluded)]
+            )
+            for user_id in area_users:
+                if user_id not in excluded:
+                    local_ids.setdefault(user_id, None)
+
+            if len(local_ids) >= limit:
+                break
+
+        return list(local_ids)[:limit]
+
+    # ====================== CANDIDATE SCORING ======================
+
+    def _eligible_users(self):
+        return (
+            User.objects.filter(is_active=True)
+            .exclude(id=self.user.id)
+            .exclude(blocked=self.user)
+            .exclude(id__in=self.user.following.all())
+            .exclude(id__in=self.user.muted.all())
+            .exclude(id__in=self.user.blocked.all())
+        )
+
+    def _score_users(self, base_qs):
         scored_limit = int(self.config["SCORED_LIMIT"])
         now = timezone.now()
 
@@ -160,26 +392,21 @@ class FollowRecommender:
             self.user.visits.all().filter(pk=OuterRef("pk"))
         )
 
-        base_qs = (
-            User.objects.filter(is_active=True)
-            .exclude(id=self.user.id)
-            .exclude(blocked=self.user)
-            .exclude(id__in=self.user.following.all())
-            .exclude(id__in=self.user.muted.all())
-            .exclude(id__in=self.user.blocked.all())
-        )
-
         scored_users = (
             base_qs.annotate(
                 location_score=self._get_location_score(),
 
                 # IMPORTANT:
                 # distinct=True prevents Cartesian product issues caused by
-                # multiple joins across followers/posts/likes/clicks.
-                mutual_count=Count(
-                    "followers",
-                    filter=Q(followers__in=self.user.following.all()),
-                    distinct=True,
+                # multiple joins across posts/likes/clicks.
+                mutual_count=Coalesce(
+                    Subquery(
+                        MutualFollowCount.objects.filter(
+                            user=self.user,
+                            candidate=OuterRef("pk"),
+                        ).values("mutuals")[:1]
+                    ),
+                    Value(0),
                 ),
                 liked_post_count=Count(
                     "posts",
@@ -269,6 +496,11 @@ class FollowRecommender:
             diversity_factor: float = 0.10,
             limit: int = 15,
     ):
+        """
+        MMR re-rank so suggestions are not all from one ward or county,
+        with seeded score jitter. Each returned user carries a
+        ``diversity_explanation``.
+        """
         if limit <= 0:
             return []
 
@@ -277,20 +509,39 @@ class FollowRecommender:
         if not items:
             return []
 
-        if diversity_factor <= 0:
-            return items[:limit]
+        features, block_slices = build_features(
+            {
+                "county": one_hot([getattr(item, "county_id", None) for item in items]),
+                "ward": one_hot([getattr(item, "ward_id", None) for item in items]),
+            },
+            {"county": 0.5, "ward": 0.5},
+            len(items),
+        )
+        order, explanations = mmr_rerank(
+            [float(getattr(item, "final_score", 0.0) or 0.0) for item in items],
+            features,
+            limit=limit,
+            lambda_=float(self.config.get("DIVERSITY_LAMBDA", DEFAULT_FOLLOW_RECOMMENDER_CONFIG["DIVERSITY_LAMBDA"])),
+            jitter=diversity_factor,
+            rng=self._np_rng(),
+            block_slices=block_slices,
+        )
 
-        for item in items:
-            base_score = float(getattr(item, "final_score", 0.0) or 0.0)
-            jitter = self._rng.uniform(-diversity_factor, diversity_factor)
-            item.final_score_with_jitter = base_score + jitter
+        ranked = []
+        for index, explanation in zip(order, explanations):
+            item = items[index]
+            if explanation["similar_to"] is not None:
+                explanation["similar_to"] = items[explanation["similar_to"]].id
+            item.final_score_with_jitter = explanation["relevance"]
+            item.diversity_explanation = explanation
+            ranked.append(item)
 
-        items.sort(
-            key=lambda item: float(getattr(item, "final_score_with_jitter", 0.0)),
-            reverse=True,
-        )
+        return ranked
 
-        return items[:limit]
+    def _np_rng(self):
+        if self.random_seed is not None:
+            return np.random.default_rng(self.random_seed)
+        return session_rng(self.user.id)
 
     # ====================== SCORE EXPRESSION HELPERS ======================
 
@@ -480,7 +731,7 @@ class FollowRecommender:
 
         return hydrated_users
 
-    def _save_to_cache(self, scored_list) -> None:
+    def _save_to_cache(self, scored_list, ranked=()) -> None:
         user_ids = [user.id for user in scored_list]
 
         scores = {
@@ -499,6 +750,11 @@ class FollowRecommender:
         payload = {
             "user_ids": user_ids,
             "scores": scores,
+            "explanations": {
+                str(user.id): user.diversity_explanation
+                for user in ranked
+                if getattr(user, "diversity_explanation", None) is not None
+            },
             "generated_at": timezone.now().isoformat(),
         }
 
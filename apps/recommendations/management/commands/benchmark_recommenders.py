@@ -0,0 +1,46 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.recommendations.benchmark import ENTRY_POINTS, run_benchmarks
+from apps.recommendations.synthetic import SYNTHETIC_PREFIX
+
+
+class Command(BaseCommand):
+    help = "Report latency percentiles, query counts and query plans for the recommender entry points."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--viewers", type=int, default=20)
+        parser.add_argument("--iterations", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--entry-point", action="append", choices=list(ENTRY_POINTS), dest="entry_points")
+        parser.add_argument("--explain", action="store_true", help="Include EXPLAIN ANALYZE of the slowest query.")
+        parser.add_argument("--all-users", action="store_true", help="Sample viewers from all users, not just synthetic ones.")
+        parser.add_argument("--json", dest="json_path", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        queryset = get_user_model().objects.filter(is_active=True)
+        if not options["all_users"]:
+            queryset = queryset.filter(username__startswith=SYNTHETIC_PREFIX)
+
+        report = run_benchmarks(
+            viewers=options["viewers"],
+            iterations=options["iterations"],
+            seed=options["seed"],
+            with_plan=options["explain"],
+            entry_points=options["entry_points"],
+            queryset=queryset,
+        )
+
+        for name, result in report["results"].items():
+            latency = ", ".join(f"{key} {value}ms" for key, value in result["latency_ms"].items())
+            queries = result["queries"]
+            self.stdout.write(f"{name}: {latency}; queries {queries['min']}-{queries['max']} (mean {queries['mean']})")
+            if result.get("plan"):
+                self.stdout.write(result["plan"])
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
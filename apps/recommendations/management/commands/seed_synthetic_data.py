@@ -0,0 +1,32 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+
+from apps.recommendations.synthetic import DatasetOptions, flush_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic civic dataset for recommender benchmarks."
+
+    def add_arguments(self, parser):
+        for field in fields(DatasetOptions):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                type=type(field.default),
+                default=field.default,
+            )
+        parser.add_argument("--flush", action="store_true", help="Delete existing synthetic data first.")
+        parser.add_argument("--flush-only", action="store_true", help="Delete existing synthetic data and exit.")
+
+    def handle(self, *args, **options):
+        if options["flush"] or options["flush_only"]:
+            removed = flush_dataset()
+            self.stdout.write(f"Removed {removed} synthetic users and their data")
+            if options["flush_only"]:
+                return
+
+        dataset = DatasetOptions(**{field.name: options[field.name] for field in fields(DatasetOptions)})
+        summary = generate_dataset(dataset, log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary['users']} users and {summary['posts']} posts (seed {dataset.seed})"
+        ))
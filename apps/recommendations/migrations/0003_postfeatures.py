@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+        ('recommendations', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostFeatures',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='posts.post')),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('content_type_score', models.FloatField(default=0.0)),
+                ('media_score', models.FloatField(default=0.0)),
+                ('freshness_score', models.FloatField(default=0.0)),
+                ('note_quality_score', models.FloatField(default=0.0)),
+                ('likes_count', models.PositiveIntegerField(default=0)),
+                ('bookmarks_count', models.PositiveIntegerField(default=0)),
+                ('clicks_count', models.PositiveIntegerField(default=0)),
+                ('reposts_count', models.PositiveIntegerField(default=0)),
+                ('reports_count', models.PositiveIntegerField(default=0)),
+                ('has_contested_note', models.BooleanField(default=False)),
+                ('controversy_multiplier', models.FloatField(default=1.0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Post Features',
+                'verbose_name_plural': 'Post Features',
+                'db_table': 'PostFeatures',
+                'indexes': [models.Index(fields=['published_at'], name='postfeatures_published_idx')],
+            },
+        ),
+    ]
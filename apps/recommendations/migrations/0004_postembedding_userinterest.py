@@ -0,0 +1,56 @@
+import django.db.models.deletion
+import django.utils.timezone
+import pgvector.django.vector
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+        ('recommendations', '0003_postfeatures'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostEmbedding',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='posts.post')),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=1024)),
+                ('model_name', models.CharField(max_length=100)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Post Embedding',
+                'db_table': 'PostEmbedding',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserInterest',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='interest', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=1024)),
+                ('weight', models.FloatField(default=0.0)),
+                ('interactions', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'User Interest',
+                'db_table': 'UserInterest',
+            },
+        ),
+        # Post embeddings are unit length, so inner product ranks like cosine.
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX IF NOT EXISTS post_embedding_hnsw_idx
+            ON "PostEmbedding"
+            USING hnsw (embedding vector_ip_ops);
+            """,
+            reverse_sql="""
+            DROP INDEX IF EXISTS post_embedding_hnsw_idx;
+            """,
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0005_mutualfollowcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postrecommendationcache',
+            name='explanations',
+            field=models.JSONField(default=dict),
+        ),
+    ]
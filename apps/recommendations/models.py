@@ -1,9 +1,12 @@
 from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
+from pgvector.django import VectorField
 
+from apps.posts.loader import load_posts
 from apps.posts.models import Post
 
 User = get_user_model()
@@ -34,10 +37,109 @@ class UserInteraction(models.Model):
         ]
 
 
+class PostFeatures(models.Model):
+    """
+    Viewer-independent ranking features of a post, stored so PostRecommender
+    does not recompute them per user (see apps.recommendations.features).
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='features')
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    content_type_score = models.FloatField(default=0.0)
+    media_score = models.FloatField(default=0.0)
+    freshness_score = models.FloatField(default=0.0)
+    note_quality_score = models.FloatField(default=0.0)
+
+    likes_count = models.PositiveIntegerField(default=0)
+    bookmarks_count = models.PositiveIntegerField(default=0)
+    clicks_count = models.PositiveIntegerField(default=0)
+    reposts_count = models.PositiveIntegerField(default=0)
+    reports_count = models.PositiveIntegerField(default=0)
+    has_contested_note = models.BooleanField(default=False)
+    controversy_multiplier = models.FloatField(default=1.0)
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'PostFeatures'
+        verbose_name = 'Post Features'
+        verbose_name_plural = 'Post Features'
+        indexes = [
+            models.Index(fields=['published_at'], name='postfeatures_published_idx'),
+        ]
+
+    def __str__(self):
+        return f"PostFeatures(post_id={self.post_id})"
+
+
+class PostEmbedding(models.Model):
+    """
+    Unit-length embedding of a post's text, used for the similarity score
+    (see apps.recommendations.similarity).
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    embedding = VectorField(dimensions=settings.EMBEDDING_DIMENSIONS)
+    model_name = models.CharField(max_length=100)
+    # sha256 of the embedded text, so unchanged posts are not re-embedded
+    text_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'PostEmbedding'
+        verbose_name = 'Post Embedding'
+
+    def __str__(self):
+        return f"PostEmbedding(post_id={self.post_id})"
+
+
+class UserInterest(models.Model):
+    """
+    Decayed running mean of the embeddings of the posts a user interacted
+    with, weighted by interaction type.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='interest')
+    embedding = VectorField(dimensions=settings.EMBEDDING_DIMENSIONS)
+    # Total decayed interaction weight behind the mean, as of updated_at
+    weight = models.FloatField(default=0.0)
+    interactions = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'UserInterest'
+        verbose_name = 'User Interest'
+
+    def __str__(self):
+        return f"UserInterest(user_id={self.user_id})"
+
+
+class MutualFollowCount(models.Model):
+    """
+    How many of the users ``user`` follows also follow ``candidate``, kept
+    up to date from follow changes (see apps.recommendations.mutuals).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mutual_follow_counts')
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    mutuals = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'MutualFollowCount'
+        verbose_name = 'Mutual Follow Count'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'candidate'], name='unique_mutual_follow_count'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-mutuals'], name='mutualfollow_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"MutualFollowCount(user_id={self.user_id}, candidate_id={self.candidate_id})"
+
+
 class PostRecommendationCache(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='post_recommendation_cache')
     recommended_post_ids = models.JSONField(default=list)  # Store only IDs for efficiency
     scores = models.JSONField(default=dict)  # {post_id: score}
+    explanations = models.JSONField(default=dict)  # {post_id: diversity re-rank explanation}
     generated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -57,16 +159,17 @@ class PostRecommendationCache(models.Model):
     def get_recommended_posts(self, limit=20):
         """Return actual Post objects from cached IDs"""
         if not self.recommended_post_ids:
-            return Post.objects.none()
+            return []
 
-        # Preserve order and add scores
-        posts = Post.objects.filter(
-            id__in=self.recommended_post_ids[:limit]
-        ).select_related('author').prefetch_related('likes', 'clicks')
+        posts = load_posts(self.recommended_post_ids[:limit], self.user)
 
         # Annotate score for each post (from cache)
         for post in posts:
             post.cached_score = self.scores.get(str(post.id), 0.0)
+            post.final_score = post.cached_score
+
+        # Cached ids can outlive the posts they point at
+        posts = [post for post in posts if post.is_active and not post.is_deleted]
 
         # Re-order by cached score (since DB order may differ)
         posts = sorted(posts, key=lambda p: getattr(p, 'cached_score', 0), reverse=True)
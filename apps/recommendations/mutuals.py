@@ -0,0 +1,131 @@
+"""
+"People you may know" mutual-follow counts.
+
+MutualFollowCount(user, candidate).mutuals is the number of users ``user``
+follows who follow ``candidate``. A follow A -> B creates the paths
+U -> A -> B for each follower U of A, and A -> B -> C for each user C that B
+follows, so each follow change is two set-based upserts instead of a
+per-request aggregate over the follow table.
+
+The upserts run in the transaction that changes the follows, together with
+the followers_count / following_count updates, after both endpoints are
+locked in id order: two changes sharing a user are serialized, so a path
+made of two changed edges is counted (or removed) by exactly one of them.
+
+Only fan-outs of up to MUTUAL_COUNT_MAX_FANOUT rows run inline. When the
+target follows more accounts than that, the source user's counts are rebuilt
+by a task after commit; when the source has more followers, that side is
+left to the nightly per-user rebuild, which also repairs any drift.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import MutualFollowCount
+
+User = get_user_model()
+
+FOLLOWING_TABLE = User.following.through._meta.db_table
+MUTUALS_TABLE = MutualFollowCount._meta.db_table
+
+# Paths U -> source -> target, for each follower U of source.
+_FOLLOWERS_OF_SOURCE_SQL = f"""
+    INSERT INTO "{MUTUALS_TABLE}" (user_id, candidate_id, mutuals)
+    SELECT f.from_user_id, %(target)s, %(delta)s
+    FROM "{FOLLOWING_TABLE}" f
+    WHERE f.to_user_id = %(source)s AND f.from_user_id <> %(target)s
+    ON CONFLICT (user_id, candidate_id)
+    DO UPDATE SET mutuals = "{MUTUALS_TABLE}".mutuals + EXCLUDED.mutuals
+"""
+
+# Paths source -> target -> C, for each user C that target follows.
+_FOLLOWING_OF_TARGET_SQL = f"""
+    INSERT INTO "{MUTUALS_TABLE}" (user_id, candidate_id, mutuals)
+    SELECT %(source)s, f.to_user_id, %(delta)s
+    FROM "{FOLLOWING_TABLE}" f
+    WHERE f.from_user_id = %(target)s AND f.to_user_id <> %(source)s
+    ON CONFLICT (user_id, candidate_id)
+    DO UPDATE SET mutuals = "{MUTUALS_TABLE}".mutuals + EXCLUDED.mutuals
+"""
+
+_REBUILD_USER_SQL = f"""
+    INSERT INTO "{MUTUALS_TABLE}" (user_id, candidate_id, mutuals)
+    SELECT first.from_user_id, second.to_user_id, COUNT(*)
+    FROM "{FOLLOWING_TABLE}" first
+    JOIN "{FOLLOWING_TABLE}" second ON second.from_user_id = first.to_user_id
+    WHERE first.from_user_id = %(user)s AND second.to_user_id <> %(user)s
+    GROUP BY first.from_user_id, second.to_user_id
+"""
+
+
+def apply_follow_changes(edges, delta: int) -> None:
+    """
+    Add (delta=1) or remove (delta=-1) each follow (source, target) in
+    ``edges`` from the follow counters and the mutual counts. Run inside the
+    transaction that made the change, after the follow rows were written or
+    deleted.
+    """
+    edges = list(edges)
+    user_ids = sorted({user_id for edge in edges for user_id in edge})
+
+    with transaction.atomic():
+        # Every row is locked here, in the same order everywhere, before any
+        # is written, so concurrent changes queue instead of deadlocking.
+        list(User.objects.select_for_update().filter(pk__in=user_ids).order_by("pk").values_list("pk", flat=True))
+        _update_follow_counts(edges, delta)
+        for source_id, target_id in edges:
+            _apply_follow_change(source_id, target_id, delta)
+
+
+def _update_follow_counts(edges, delta: int) -> None:
+    for field, user_ids in (
+        ("following_count", Counter(source for source, _ in edges)),
+        ("followers_count", Counter(target for _, target in edges)),
+    ):
+        by_delta = {}
+        for user_id, total in user_ids.items():
+            by_delta.setdefault(total * delta, []).append(user_id)
+
+        for change, ids in by_delta.items():
+            User.objects.filter(pk__in=ids).update(**{field: Greatest(F(field) + change, 0)})
+
+
+def _apply_follow_change(source_id: int, target_id: int, delta: int) -> None:
+    max_fanout = getattr(settings, "MUTUAL_COUNT_MAX_FANOUT", 500)
+    source_followers, target_following = (
+        User.objects.filter(pk=source_id).values_list("followers_count", flat=True).first() or 0,
+        User.objects.filter(pk=target_id).values_list("following_count", flat=True).first() or 0,
+    )
+    params = {"source": source_id, "target": target_id, "delta": delta}
+
+    with connection.cursor() as cursor:
+        if source_followers <= max_fanout:
+            cursor.execute(_FOLLOWERS_OF_SOURCE_SQL, params)
+        if target_following <= max_fanout:
+            cursor.execute(_FOLLOWING_OF_TARGET_SQL, params)
+
+        if delta < 0:
+            MutualFollowCount.objects.filter(candidate_id=target_id, mutuals__lte=0).delete()
+            MutualFollowCount.objects.filter(user_id=source_id, mutuals__lte=0).delete()
+
+    if target_following > max_fanout:
+        # Only the source's own rows change on this side: recount them all.
+        from .tasks import rebuild_user_mutual_counts
+
+        transaction.on_commit(lambda: rebuild_user_mutual_counts.delay(source_id))
+
+
+def rebuild_mutual_counts(user_id: int) -> int:
+    """
+    Recount every mutual for one user from the follow table.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        MutualFollowCount.objects.filter(user_id=user_id).delete()
+        cursor.execute(_REBUILD_USER_SQL, {"user": user_id})
+        return cursor.rowcount
+
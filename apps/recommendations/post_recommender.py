@@ -1,9 +1,9 @@
 import logging
 import math
-import random
 import re
 from datetime import timedelta
 
+import numpy as np
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.search import SearchQuery, SearchRank
@@ -27,11 +27,16 @@ from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.utils.text import slugify
 
-from apps.posts.models import Post, Asset, SearchHistory
+from apps.posts.loader import load_posts
+from apps.posts.models import Post, Asset, PostClick, SearchHistory
+from apps.posts.seen import filter_unseen, seen_mask
+from apps.users.graph import get_graph
+from .diversity import build_features, mmr_rerank, post_feature_blocks, session_rng
+from .features import live_controversy_multiplier, live_count
 from .models import UserInteraction, PostRecommendationCache
+from .similarity import interest_vector, similarity_expression
 from ..ballot.models import BallotVote
 from ..petition.models import PetitionSupport
-from ..posts.querysets import annotate_post_metrics
 from ..survey.models import Response
 
 User = get_user_model()
@@ -39,7 +44,7 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 # Bump this when the recommendation algorithm changes materially.
-RECOMMENDER_CACHE_VERSION = "2026-08-07_v2"
+RECOMMENDER_CACHE_VERSION = "2026-10-19_v3"
 
 DEFAULT_SCORING_WEIGHTS = {
     "location": 0.20,
@@ -62,6 +67,14 @@ DEFAULT_ENGAGEMENT_WEIGHTS = {
     "reposts": 3.0,
 }
 
+# Similarity used to spread the re-ranked feed across kinds of post.
+DEFAULT_DIVERSITY_WEIGHTS = {
+    "content_type": 0.25,
+    "region": 0.20,
+    "hashtags": 0.25,
+    "embedding": 0.30,
+}
+
 DEFAULT_TRENDING_POST_WEIGHTS = {
     "likes": 3.0,
     "bookmarks": 3.0,
@@ -72,8 +85,9 @@ DEFAULT_TRENDING_POST_WEIGHTS = {
 
 
 class PostRecommender:
-    def __init__(self, user: User):
+    def __init__(self, user: User, session_key=None):
         self.user = user
+        self.session_key = session_key
         self.random_seed = None
         self.config = settings.POST_RECOMMENDER_CONFIG
 
@@ -171,6 +185,7 @@ class PostRecommender:
                 user=self.user,
                 recommended_post_ids=cached_data.get("post_ids", []),
                 scores=cached_data.get("scores", {}),
+                explanations=cached_data.get("explanations", {}),
                 generated_at=generated_at,
             )
 
@@ -185,13 +200,18 @@ class PostRecommender:
                 .first()
             )
 
-    def _save_to_cache(self, scored_list):
+    def _save_to_cache(self, scored_list, ranked=()):
         post_ids = [post.id for post in scored_list if post.id is not None]
         scores = {
             str(post.id): round(float(getattr(post, "final_score", 0.0) or 0.0), 4)
             for post in scored_list
             if post.id is not None
         }
+        explanations = {
+            str(post.id): post.diversity_explanation
+            for post in ranked
+            if getattr(post, "diversity_explanation", None) is not None
+        }
 
         now = timezone.now()
 
@@ -200,6 +220,7 @@ class PostRecommender:
             defaults={
                 "recommended_post_ids": post_ids,
                 "scores": scores,
+                "explanations": explanations,
                 "generated_at": now,
             },
         )
@@ -210,6 +231,7 @@ class PostRecommender:
                 "version": RECOMMENDER_CACHE_VERSION,
                 "post_ids": post_ids,
                 "scores": scores,
+                "explanations": explanations,
                 "generated_at": now.isoformat(),
             },
             timeout=self._as_int("CACHE.TIMEOUT", 60 * 30),
@@ -223,7 +245,12 @@ class PostRecommender:
             force_refresh=False,
             exclude_post_ids=None,
             diversity_factor=None,
+            exclude_seen=False,
     ):
+        """
+        ``exclude_seen`` drops posts in the user's seen set (apps.posts.seen)
+        after retrieval, over-fetching candidates to make up for them.
+        """
         if exclude_post_ids is None:
             exclude_post_ids = []
 
@@ -240,11 +267,22 @@ class PostRecommender:
             diversity_factor = float(diversity_factor)
 
         fetch_limit = max(limit * 2, limit + 10, 20)
+        candidate_limit = fetch_limit
+        if exclude_seen:
+            candidate_limit *= self._as_int("RECOMMENDATIONS.SEEN_OVERFETCH", 4)
 
         if not force_refresh:
             cached = self._get_from_cache()
 
             if cached and not cached.is_stale():
+                if exclude_seen:
+                    # Filter ids before hydrating, so only unseen posts are loaded.
+                    post_ids = cached.recommended_post_ids
+                    seen = seen_mask(self.user.id, post_ids)
+                    cached.recommended_post_ids = [
+                        post_id for post_id, was_seen in zip(post_ids, seen) if not was_seen
+                    ]
+
                 scored_list = cached.get_recommended_posts(limit=fetch_limit)
 
                 if exclude_set:
@@ -255,16 +293,19 @@ class PostRecommender:
 
         scored_list = self._compute_scored_posts(
             exclude_post_ids=list(exclude_set),
-            fetch_limit=fetch_limit,
+            fetch_limit=candidate_limit,
         )
+        unseen = filter_unseen(self.user.id, scored_list) if exclude_seen else scored_list
 
-        self._save_to_cache(scored_list)
+        ranked = self._apply_diversity(unseen, diversity_factor, limit)
+        self._save_to_cache(scored_list, ranked)
 
-        return self._apply_diversity(scored_list, diversity_factor, limit)
+        return ranked
 
-    def get_trending_posts(self, limit=None, exclude_post_ids=None):
+    def get_trending_posts(self, limit=None, exclude_post_ids=None, exclude_seen=False):
         """
-        Returns top trending posts from the configured trending window.
+        Returns top trending posts from the configured trending window,
+        optionally without the ones in the user's seen set.
         """
         if exclude_post_ids is None:
             exclude_post_ids = []
@@ -276,6 +317,7 @@ class PostRecommender:
         else:
             limit = int(limit)
 
+        fetch_limit = limit * self._as_int("RECOMMENDATIONS.SEEN_OVERFETCH", 4) if exclude_seen else limit
         window_days = self._as_int("TRENDING_POSTS.WINDOW_DAYS", 1)
         weights = self._get_weights("TRENDING_POSTS.WEIGHTS", DEFAULT_TRENDING_POST_WEIGHTS)
         now = timezone.now()
@@ -291,54 +333,25 @@ class PostRecommender:
             repost_type=Post.RepostType.REPOST
         ).exclude(
             id__in=list(exclude_set)
-        ).exclude(
-            author_id__in=self.user.muted.values_list("id", flat=True)
-        ).exclude(
-            author_id__in=self.user.blocked.values_list("id", flat=True)
         )
-
-        base_qs = annotate_post_metrics(base_qs, self.user)
+        base_qs = self._exclude_hidden_authors(base_qs)
 
         if window_days > 0:
             base_qs = base_qs.filter(
                 published_at__gte=now - timedelta(days=window_days)
             )
 
-        base_qs = base_qs.select_related(
-            "author",
-            "ballot",
-            "petition",
-            "broadcast",
-            "survey",
-            "section",
-        ).prefetch_related(
-            "assets",
-        )
-
-        repost_filter = Q(
-            reply_to__isnull=True,
-            community_note_of__isnull=True,
-            status="published",
-            is_active=True,
-            is_deleted=False,
-        )
-
-        base_qs = base_qs.annotate(
-            reposts_count=Count(
-                "reposts",
-                filter=repost_filter,
-                distinct=True,
-            )
-        )
-
+        # Interaction counts come from PostFeatures rather than a join per relation.
         raw_trending_score = Coalesce(
             ExpressionWrapper(
-                Count("likes", distinct=True) * Value(float(weights.get("likes", 3.0)), output_field=FloatField()) +
-                Count("bookmarks", distinct=True) * Value(float(weights.get("bookmarks", 3.0)),
-                                                          output_field=FloatField()) +
-                Count("clicks", distinct=True) * Value(float(weights.get("clicks", 2.0)), output_field=FloatField()) +
+                self._stored_count("likes_count") * Value(float(weights.get("likes", 3.0)), output_field=FloatField()) +
+                self._stored_count("bookmarks_count") * Value(float(weights.get("bookmarks", 3.0)),
+                                                              output_field=FloatField()) +
+                self._stored_count("clicks_count") * Value(float(weights.get("clicks", 2.0)),
+                                                           output_field=FloatField()) +
                 F("views") * Value(float(weights.get("views", 1.0)), output_field=FloatField()) +
-                F("reposts_count") * Value(float(weights.get("reposts", 5.0)), output_field=FloatField()),
+                self._stored_count("reposts_count") * Value(float(weights.get("reposts", 5.0)),
+                                                            output_field=FloatField()),
                 output_field=FloatField(),
             ),
             Value(0.0, output_field=FloatField()),
@@ -349,7 +362,7 @@ class PostRecommender:
 
         trending_ceiling = self._as_float("TRENDING_POSTS.NORMALIZATION_CEILING", 10000.0)
 
-        trending_posts = base_qs.annotate(
+        ranked = base_qs.annotate(
             trending_score=self._log_normalize_score(
                 F("raw_trending_score"),
                 trending_ceiling,
@@ -358,9 +371,18 @@ class PostRecommender:
             "-trending_score",
             "-raw_trending_score",
             "-published_at",
-        )[:limit]
+        ).values_list("id", "trending_score")[:fetch_limit]
 
-        return list(trending_posts)
+        scores = dict(ranked)
+        if exclude_seen:
+            seen = seen_mask(self.user.id, list(scores))
+            scores = dict([item for item, was_seen in zip(scores.items(), seen) if not was_seen][:limit])
+        trending_posts = load_posts(list(scores), self.user)
+
+        for post in trending_posts:
+            post.trending_score = scores.get(post.id, 0.0)
+
+        return trending_posts
 
     def get_trending_hashtags(self, limit=None, days=None):
         """
@@ -611,31 +633,16 @@ class PostRecommender:
             published_at__lte=now,
         )
         base_qs = base_qs.exclude(repost_type=Post.RepostType.REPOST)
-        base_qs = base_qs.exclude(author_id__in=self.user.muted.values_list("id", flat=True))
-        base_qs = base_qs.exclude(author_id__in=self.user.blocked.values_list("id", flat=True))
+        base_qs = self._exclude_hidden_authors(base_qs)
         if exclude_post_ids:
             base_qs = base_qs.exclude(id__in=exclude_post_ids)
 
-        base_qs = annotate_post_metrics(base_qs, self.user)
-
         # --- 2. Participation Fatigue (Soft Penalty) ---
         voted_ballots = BallotVote.objects.filter(user=self.user).values_list('ballot_id', flat=True)
         signed_petitions = PetitionSupport.objects.filter(user=self.user).values_list('petition_id', flat=True)
         answered_surveys = Response.objects.filter(user=self.user).values_list('survey_id', flat=True)
 
-        # --- 3. Controversy & Misinformation Penalty ---
-        contested_note_subquery = Post.objects.filter(
-            community_note_of=OuterRef("pk"),
-            status="published", is_active=True, is_deleted=False
-        ).annotate(
-            ups=Count("upvotes", distinct=True),
-            downs=Count("downvotes", distinct=True)
-        ).filter(
-            downs__gt=F("ups") * 2,
-            downs__gte=5
-        ).values("pk")[:1]
-
-        # --- 4. Search Intent ---
+        # --- 3. Search Intent ---
         recent_searches = SearchHistory.objects.filter(
             user=self.user, search_term__isnull=False
         ).exclude(search_term='').order_by('-created_at').values_list('search_term', flat=True)[:5]
@@ -651,29 +658,16 @@ class PostRecommender:
         else:
             base_qs = base_qs.annotate(raw_search_rank=Value(0.0, output_field=FloatField()))
 
-        # --- 5. Core Annotations ---
-        base_qs = base_qs.select_related(
-            "author", "ballot", "petition", "broadcast", "survey", "section"
-        ).prefetch_related("assets", "reports")
-
-        repost_filter = Q(reply_to__isnull=True, community_note_of__isnull=True, status="published", is_active=True,
-                          is_deleted=False)
-
-        base_qs = base_qs.annotate(
-            reposts_count=Count("reposts", filter=repost_filter, distinct=True),
-            report_count=Count("reports", distinct=True),
-        )
-
-        # Calculate raw engagement
-        raw_engagement_score = Coalesce(
-            ExpressionWrapper(
-                Count("likes", distinct=True) * Value(float(engagement_weights.get("likes", 2.0))) +
-                Count("bookmarks", distinct=True) * Value(float(engagement_weights.get("bookmarks", 2.0))) +
-                F("views") * Value(float(engagement_weights.get("views", 0.5))) +
-                F("reposts_count") * Value(float(engagement_weights.get("reposts", 3.0))),
-                output_field=FloatField(),
-            ),
-            Value(0.0, output_field=FloatField()),
+        # --- 4. Stored Features ---
+        # Viewer-independent components are read from PostFeatures
+        # (apps.recommendations.features). Posts not stored yet fall back to
+        # the live expressions, which Postgres only evaluates for those rows.
+        raw_engagement_score = ExpressionWrapper(
+            self._stored_count("likes_count") * Value(float(engagement_weights.get("likes", 2.0))) +
+            self._stored_count("bookmarks_count") * Value(float(engagement_weights.get("bookmarks", 2.0))) +
+            F("views") * Value(float(engagement_weights.get("views", 0.5))) +
+            self._stored_count("reposts_count") * Value(float(engagement_weights.get("reposts", 3.0))),
+            output_field=FloatField(),
         )
 
         # Define ceilings for normalization
@@ -681,26 +675,26 @@ class PostRecommender:
         engagement_ceiling = self._as_float("SCORING.ENGAGEMENT_CEILING", 1000.0)
         search_ceiling = self._as_float("SCORING.SEARCH_CEILING", 5.0)
 
-        # Get user-specific click filter
-        click_filter = self._get_user_click_filter()
+        # --- 5. Per-User Layer ---
+        clicked_posts = self._get_user_clicked_posts()
 
         # --- 6. Final Score Assembly ---
         scored_qs = base_qs.annotate(
             # Annotate raw metrics needed for normalization
             raw_engagement_score=raw_engagement_score,
-            click_count=Coalesce(
-                Count("clicks", filter=click_filter, distinct=True),
-                Value(0, output_field=FloatField()),
+            click_count=Case(
+                When(id__in=clicked_posts, then=Value(1.0)),
+                default=Value(0.0),
                 output_field=FloatField(),
             ),
             # Additive Scores (0.0 to 1.0)
             location_score=self._get_location_score(),
-            content_type_score=self._get_content_type_score(),
-            media_score=self._get_media_score(),
+            content_type_score=self._stored_score("content_type_score", self._get_content_type_score()),
+            media_score=self._stored_score("media_score", self._get_media_score()),
             following_score=self._get_following_score(),
-            freshness_score=self._get_freshness_score(now=now),
+            freshness_score=self._stored_score("freshness_score", self._get_freshness_score(now=now)),
             similarity_score=self._get_content_similarity_score(),
-            note_quality_score=self._get_note_quality_score(),
+            note_quality_score=self._stored_score("note_quality_score", self._get_note_quality_score()),
             search_intent_score=self._log_normalize_score(F("raw_search_rank"), search_ceiling),
 
             # Normalized Behavioral Scores
@@ -715,12 +709,7 @@ class PostRecommender:
                 default=Value(1.0),
                 output_field=FloatField()
             ),
-            controversy_multiplier=Case(
-                When(report_count__gte=10, then=Value(0.40)),
-                When(Exists(contested_note_subquery), then=Value(0.30)),
-                default=Value(1.0),
-                output_field=FloatField()
-            ),
+            controversy_multiplier=self._stored_score("controversy_multiplier", live_controversy_multiplier()),
         ).annotate(
             # Calculate the weighted sum of ALL additive scores
             base_weighted_score=ExpressionWrapper(
@@ -745,28 +734,47 @@ class PostRecommender:
         ).order_by(
             "-final_score",
             "-published_at",
-        )[:scored_limit]
+        ).values_list("id", "final_score")[:scored_limit]
 
-        return list(scored_qs)
+        # Score on ids only; display fields and counters come from the post cache.
+        scores = dict(scored_qs)
+        posts = load_posts(list(scores), self.user)
 
-    def _get_user_click_filter(self):
-        """
-        Return the Q filter used to count clicks by the current user.
+        for post in posts:
+            post.final_score = scores.get(post.id, 0.0)
 
-        Current assumption:
-            Post.clicks is a M2M relationship to User.
+        return posts
 
-        If instead you have a Click model like:
+    def _exclude_hidden_authors(self, queryset):
+        """
+        Drop posts by authors the user muted or blocked, using the social graph
+        when it is loaded.
+        """
+        graph = get_graph()
+        if graph is None:
+            queryset = queryset.exclude(author_id__in=self.user.muted.values_list("id", flat=True))
+            return queryset.exclude(author_id__in=self.user.blocked.values_list("id", flat=True))
+
+        hidden_author_ids = np.union1d(
+            graph.neighbours("muted", self.user.id),
+            graph.neighbours("blocked", self.user.id),
+        )
+        if not len(hidden_author_ids):
+            return queryset
+        return queryset.exclude(author_id__in=hidden_author_ids.tolist())
 
-            class Click(models.Model):
-                post = models.ForeignKey(Post, related_name="clicks")
-                user = models.ForeignKey(User)
+    def _stored_score(self, field, fallback):
+        # COALESCE only evaluates the live fallback for posts without stored features.
+        return Coalesce(F(f"features__{field}"), fallback, output_field=FloatField())
 
-        change this to:
+    def _stored_count(self, field):
+        return Coalesce(F(f"features__{field}"), live_count(field), output_field=FloatField())
 
-            return Q(clicks__user=self.user)
+    def _get_user_clicked_posts(self):
+        """
+        Ids of the posts the current user has clicked.
         """
-        return Q(clicks=self.user)
+        return PostClick.objects.filter(user=self.user).values("post_id")
 
     def _log_normalize_score(self, expression, ceiling):
         """
@@ -805,58 +813,44 @@ class PostRecommender:
 
     def _apply_diversity(self, scored_list, diversity_factor=0.08, limit=20):
         """
-        Apply light score jitter plus author-level diversity.
+        MMR re-rank over content type, region, hashtag and embedding
+        similarity, with light seeded score jitter and a per-author cap.
+        Each returned post carries a ``diversity_explanation``.
         """
         if not scored_list:
             return []
 
-        limit = int(limit)
-        diversity_factor = float(diversity_factor or 0.0)
-
-        if diversity_factor > 0:
-            rng = random.Random(self.random_seed)
-
-            for post in scored_list:
-                base_score = float(getattr(post, "final_score", 0.0) or 0.0)
-                jitter = rng.uniform(-diversity_factor, diversity_factor)
-                post.final_score_with_jitter = base_score + jitter
-        else:
-            for post in scored_list:
-                post.final_score_with_jitter = float(getattr(post, "final_score", 0.0) or 0.0)
-
-        ranked = sorted(
-            scored_list,
-            key=lambda post: getattr(post, "final_score_with_jitter", 0.0),
-            reverse=True,
+        post_ids = [post.id for post in scored_list]
+        weights = self._get_weights("DIVERSITY.WEIGHTS", DEFAULT_DIVERSITY_WEIGHTS)
+        features, block_slices = build_features(post_feature_blocks(post_ids), weights, len(post_ids))
+
+        order, explanations = mmr_rerank(
+            [float(getattr(post, "final_score", 0.0) or 0.0) for post in scored_list],
+            features,
+            limit=int(limit),
+            lambda_=self._as_float("DIVERSITY.LAMBDA", 0.7),
+            groups=[post.author_id for post in scored_list],
+            max_per_group=self._as_int("RECOMMENDATIONS.MAX_POSTS_PER_AUTHOR", 2),
+            jitter=float(diversity_factor or 0.0),
+            rng=self._rng(),
+            block_slices=block_slices,
         )
 
-        max_posts_per_author = self._as_int("RECOMMENDATIONS.MAX_POSTS_PER_AUTHOR", 2)
-
-        if max_posts_per_author <= 0:
-            return ranked[:limit]
-
-        selected = []
-        deferred = []
-        author_counts = {}
-
-        for post in ranked:
-            author_id = getattr(post, "author_id", None)
+        ranked = []
+        for index, explanation in zip(order, explanations):
+            post = scored_list[index]
+            if explanation["similar_to"] is not None:
+                explanation["similar_to"] = post_ids[explanation["similar_to"]]
+            post.final_score_with_jitter = explanation["relevance"]
+            post.diversity_explanation = explanation
+            ranked.append(post)
 
-            if author_id is None or author_counts.get(author_id, 0) < max_posts_per_author:
-                selected.append(post)
+        return ranked
 
-                if author_id is not None:
-                    author_counts[author_id] = author_counts.get(author_id, 0) + 1
-            else:
-                deferred.append(post)
-
-            if len(selected) >= limit:
-                return selected[:limit]
-
-        if len(selected) < limit:
-            selected.extend(deferred[: limit - len(selected)])
-
-        return selected[:limit]
+    def _rng(self):
+        if self.random_seed is not None:
+            return np.random.default_rng(self.random_seed)
+        return session_rng(getattr(self.user, "id", None), self.session_key)
 
     # ====================== SCORE COMPONENTS ======================
 
@@ -1007,6 +1001,18 @@ class PostRecommender:
         )
 
     def _get_content_similarity_score(self):
+        """
+        Inner product of each post's embedding with the user's interest vector
+        (apps.recommendations.similarity). Users without one yet fall back to
+        matching the ballots, surveys, petitions and broadcasts they engaged with.
+        """
+        interest = interest_vector(self.user)
+        if interest is None:
+            return self._get_related_item_similarity_score()
+
+        return similarity_expression(interest, self._as_float("SIMILARITY_SCORES.DEFAULT", 0.3))
+
+    def _get_related_item_similarity_score(self):
         default_score = self._as_float("SIMILARITY_SCORES.DEFAULT", 0.3)
         max_interacted_posts = self._as_int("SIMILARITY_SCORES.MAX_INTERACTED_POSTS", 1000)
 
@@ -2,8 +2,12 @@ from django.contrib.auth import get_user_model
 from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import receiver
 
-from apps.posts.models import PostLike, PostClick, Post
+from apps.posts.models import Asset, PostLike, PostClick, Post, Report
 from apps.recommendations import tasks
+from apps.recommendations.features import schedule_post_features_refresh
+from apps.recommendations.mutuals import apply_follow_changes
+from apps.recommendations.similarity import schedule_post_embedding
+from apps.users.graph import changed_edges
 from apps.users.models import ProfileVisit
 
 User = get_user_model()
@@ -77,6 +81,60 @@ def on_post_like_deletion(sender, instance, **kwargs):
     tasks.refresh_post_recommendations.delay(instance.user.id, force=True)
 
 
+# === POST FEATURES ===
+@receiver(post_save, sender=Post)
+def refresh_features_on_post_save(sender, instance: Post, **kwargs):
+    """A post's own features, and the repost count / note quality of its parent"""
+    schedule_post_features_refresh([instance.id, instance.repost_of_id, instance.community_note_of_id])
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+@receiver(post_save, sender=PostClick)
+@receiver(post_delete, sender=PostClick)
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def refresh_features_on_related_change(sender, instance, **kwargs):
+    schedule_post_features_refresh([instance.post_id])
+
+
+@receiver(m2m_changed, sender=Post.clicks.through)
+@receiver(m2m_changed, sender=Post.likes.through)
+@receiver(m2m_changed, sender=Post.bookmarks.through)
+def refresh_features_on_interaction(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    schedule_post_features_refresh((pk_set or []) if reverse else [instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.upvotes.through)
+@receiver(m2m_changed, sender=Post.downvotes.through)
+def refresh_features_on_note_vote(sender, instance, action, reverse, pk_set, **kwargs):
+    """Note votes change the note quality and controversy of the post the note is on"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        parent_ids = Post.objects.filter(
+            id__in=pk_set or [], community_note_of__isnull=False,
+        ).values_list('community_note_of_id', flat=True)
+        schedule_post_features_refresh(list(parent_ids))
+    else:
+        schedule_post_features_refresh([instance.community_note_of_id])
+
+
+# === POST EMBEDDINGS ===
+@receiver(post_save, sender=Post)
+def embed_post_on_save(sender, instance: Post, **kwargs):
+    """Only posts that can be recommended are embedded"""
+    if instance.reply_to_id or instance.community_note_of_id or instance.repost_type == Post.RepostType.REPOST:
+        return
+    if instance.status != 'published' or not instance.is_active or instance.is_deleted:
+        return
+    schedule_post_embedding(instance.id)
+
+
 # === PROFILE INTERACTIONS ===
 @receiver(m2m_changed, sender=User.following.through)
 def on_follow_change(sender, instance, action, **kwargs):
@@ -84,6 +142,20 @@ def on_follow_change(sender, instance, action, **kwargs):
         tasks.refresh_follow_recommendations.delay(instance.id, force=True)
 
 
+@receiver(m2m_changed, sender=User.following.through)
+def update_follow_counts_on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Follower / following counters and mutual-follow counts, updated together
+    under one set of row locks (apps.recommendations.mutuals).
+    """
+    changed = changed_edges(sender, instance, action, reverse, pk_set)
+    if not changed or not changed[2]:
+        return
+
+    _, change, edges = changed
+    apply_follow_changes(edges, 1 if change == 'add' else -1)
+
+
 @receiver(m2m_changed, sender=User.muted.through)
 @receiver(m2m_changed, sender=User.blocked.through)
 def on_mute_block_change(sender, instance, action, **kwargs):
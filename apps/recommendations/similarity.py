@@ -0,0 +1,236 @@
+"""
+Embedding-based content similarity for PostRecommender.
+
+Each candidate post stores a unit-length embedding of its text (PostEmbedding)
+and each user an interest vector (UserInterest): the decayed running mean of
+the embeddings of the posts they interacted with, weighted by interaction
+type. The similarity score of a post is then a single inner product against
+the normalized interest vector, computed in Postgres while scoring.
+"""
+
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from pgvector.django import MaxInnerProduct
+
+from apps.posts.models import Post
+from apps.utils.coalesce import schedule_coalesced
+from apps.utils.embedding import clean_text_for_embedding, embed_texts
+from .models import PostEmbedding, UserInterest
+
+# How strongly each interaction type pulls the interest vector toward a post.
+INTERACTION_WEIGHTS = {
+    "view": 0.2,
+    "click": 0.5,
+    "like": 1.0,
+    "bookmark": 1.5,
+    "reply": 1.5,
+    "repost": 2.0,
+}
+
+
+def unit(vector) -> np.ndarray | None:
+    """
+    ``vector`` scaled to unit length, or None if it is empty or all zeros.
+    """
+    if vector is None:
+        return None
+
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not vector.size or not norm:
+        return None
+
+    return vector / norm
+
+
+def post_embedding_text(post: Post) -> str:
+    """
+    Redacted text embedded for a post: its body plus the title of whatever
+    ballot, petition, survey or broadcast it shares.
+    """
+    parts = [post.body or ""]
+    for related in (post.ballot, post.petition, post.survey, post.broadcast):
+        if related is not None:
+            parts.append(related.title)
+
+    return clean_text_for_embedding("\n".join(part for part in parts if part))
+
+
+def embed_posts(post_ids) -> int:
+    """
+    Embed and upsert ``post_ids``, skipping posts whose text has not changed
+    since they were last embedded. Returns the number of posts written.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return 0
+
+    model = getattr(settings, "EMBEDDING_MODEL", "bge-m3")
+    posts = Post.objects.filter(id__in=post_ids).select_related("ballot", "petition", "survey", "broadcast")
+    stored = dict(
+        PostEmbedding.objects.filter(post_id__in=post_ids, model_name=model).values_list("post_id", "text_hash")
+    )
+
+    pending = []
+    for post in posts:
+        text = post_embedding_text(post)
+        if not text:
+            continue
+
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if stored.get(post.id) != text_hash:
+            pending.append((post.id, text, text_hash))
+
+    if not pending:
+        return 0
+
+    vectors = embed_texts([text for _, text, _ in pending])
+
+    embeddings = []
+    for (post_id, _, text_hash), vector in zip(pending, vectors):
+        vector = unit(vector)
+        if vector is None:
+            continue
+        embeddings.append(
+            PostEmbedding(post_id=post_id, embedding=vector, model_name=model, text_hash=text_hash)
+        )
+
+    PostEmbedding.objects.bulk_create(
+        embeddings,
+        update_conflicts=True,
+        unique_fields=["post"],
+        update_fields=["embedding", "model_name", "text_hash", "updated_at"],
+        batch_size=getattr(settings, "EMBEDDING_WRITE_BATCH_SIZE", 1000),
+    )
+
+    return len(embeddings)
+
+
+def embed_missing_posts(limit: int = 1000) -> int:
+    """
+    Embed recent candidate posts that have no embedding yet.
+    """
+    post_ids = list(
+        Post.objects.filter(
+            status="published", is_active=True, is_deleted=False,
+            reply_to__isnull=True, community_note_of__isnull=True,
+            embedding__isnull=True,
+        )
+        .exclude(repost_type=Post.RepostType.REPOST)
+        .order_by("-published_at")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    batch_size = getattr(settings, "EMBEDDING_BATCH_SIZE", 64)
+    return sum(
+        embed_posts(post_ids[start:start + batch_size])
+        for start in range(0, len(post_ids), batch_size)
+    )
+
+
+def decayed_mean(mean, weight: float, vector, vector_weight: float, hours: float):
+    """
+    Fold ``vector`` into a running ``mean`` whose total ``weight`` halves every
+    USER_INTEREST_HALF_LIFE_HOURS. Returns the new (mean, weight).
+    """
+    half_life = getattr(settings, "USER_INTEREST_HALF_LIFE_HOURS", 168)
+    decayed = weight * 0.5 ** (max(hours, 0.0) / half_life)
+    total = decayed + vector_weight
+
+    vector = np.asarray(vector, dtype=np.float32)
+    if mean is None or not decayed:
+        return vector, total
+
+    mean = np.asarray(mean, dtype=np.float32)
+    return (mean * decayed + vector * vector_weight) / total, total
+
+
+def update_user_interest(user_id: int, post_id: int, interaction_type: str, now=None) -> bool:
+    """
+    Move a user's interest vector toward a post they interacted with.
+    Returns False if the post could not be embedded.
+    """
+    vector_weight = INTERACTION_WEIGHTS.get(interaction_type)
+    if not vector_weight:
+        return False
+
+    embedding = PostEmbedding.objects.filter(post_id=post_id).values_list("embedding", flat=True).first()
+    if embedding is None:
+        embed_posts([post_id])
+        embedding = PostEmbedding.objects.filter(post_id=post_id).values_list("embedding", flat=True).first()
+        if embedding is None:
+            return False
+
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        interest = UserInterest.objects.select_for_update().filter(user_id=user_id).first()
+
+        if interest is None:
+            UserInterest.objects.bulk_create(
+                [UserInterest(user_id=user_id, embedding=embedding, weight=0.0, updated_at=now)],
+                ignore_conflicts=True,
+            )
+            interest = UserInterest.objects.select_for_update().get(user_id=user_id)
+
+        hours = (now - interest.updated_at) / timedelta(hours=1)
+        mean = interest.embedding if interest.weight else None
+        interest.embedding, interest.weight = decayed_mean(mean, interest.weight, embedding, vector_weight, hours)
+        interest.interactions += 1
+        interest.updated_at = now
+        interest.save(update_fields=["embedding", "weight", "interactions", "updated_at"])
+
+    return True
+
+
+def interest_vector(user) -> np.ndarray | None:
+    """
+    The user's normalized interest vector, or None before their first
+    embedded interaction.
+    """
+    if not getattr(user, "pk", None):
+        return None
+
+    embedding = UserInterest.objects.filter(user_id=user.pk).values_list("embedding", flat=True).first()
+    return unit(embedding)
+
+
+def similarity_expression(interest, default: float):
+    """
+    SQL inner product of a post's embedding with ``interest``, floored at 0.
+    Posts that are not embedded yet score ``default``.
+    """
+    # <#> is the negative inner product. GREATEST skips NULLs, hence the Case.
+    return Case(
+        When(
+            embedding__isnull=False,
+            then=Greatest(
+                Value(0.0) - MaxInnerProduct("embedding__embedding", interest.tolist()),
+                Value(0.0),
+            ),
+        ),
+        default=Value(default),
+        output_field=FloatField(),
+    )
+
+
+def post_embedding_key(post_id: int) -> str:
+    return f"post-embedding:{post_id}"
+
+
+def schedule_post_embedding(post_id: int) -> None:
+    """
+    Queue an embedding refresh for a post, at most once per
+    POST_EMBEDDING_REFRESH_INTERVAL_MS.
+    """
+    from .tasks import embed_post_task
+
+    interval_ms = getattr(settings, "POST_EMBEDDING_REFRESH_INTERVAL_MS", 10_000)
+    schedule_coalesced(embed_post_task, post_embedding_key(post_id), interval_ms, post_id)
@@ -0,0 +1,350 @@
+"""
+Reproducible synthetic civic data for recommender benchmarks.
+
+generate_dataset() builds counties, constituencies and wards, users spread
+over them, a follow graph with a popularity skew, ballots / petitions /
+surveys, posts (some sharing a civic item, some replies, some community
+notes with votes), hashtags, likes, clicks and views. The same options and
+seed always produce the same dataset. Rows are bulk-inserted, so post save
+signals do not run: search vectors, follow counters and PostFeatures are
+filled in afterwards. Post embeddings are not generated, so similarity uses
+the related-item fallback.
+
+Every generated row is marked by SYNTHETIC_PREFIX so flush_dataset() can
+remove it again.
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVector
+from django.db import connection, transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from apps.ballot.models import Ballot, Option
+from apps.geo.models import Constituency, County, Ward
+from apps.petition.models import Petition
+from apps.posts.models import Post, PostClick, PostLike
+from apps.survey.models import Survey
+from apps.users.tasks import reconcile_follow_counts
+from .features import recompute_post_features
+from .models import UserInteraction
+
+SYNTHETIC_PREFIX = "synthetic"
+
+User = get_user_model()
+
+WORDS = (
+    "budget", "water", "roads", "health", "schools", "county", "ward", "youth",
+    "jobs", "security", "taxes", "hospital", "market", "drainage", "electricity",
+    "farmers", "teachers", "bursary", "transport", "housing", "corruption",
+    "election", "assembly", "governor", "senator", "constitution", "rights",
+    "climate", "drought", "floods", "internet", "women", "elders", "sports",
+)
+HASHTAGS = ("budget2026", "waterforall", "fixourroads", "healthcare", "youthjobs", "opengov")
+
+
+@dataclass
+class DatasetOptions:
+    users: int = 10_000
+    counties: int = 47
+    constituencies_per_county: int = 6
+    wards_per_constituency: int = 5
+    follows_per_user: int = 20
+    posts_per_user: float = 3.0
+    likes_per_user: int = 30
+    clicks_per_user: int = 40
+    ballots: int = 50
+    petitions: int = 50
+    surveys: int = 50
+    civic_post_rate: float = 0.15
+    reply_rate: float = 0.2
+    note_rate: float = 0.02
+    hashtag_rate: float = 0.3
+    days: int = 30
+    seed: int = 42
+    batch_size: int = 50_000
+
+
+def _skewed_choice(rng, size: int, count: int, skew: float = 1.1) -> np.ndarray:
+    """
+    ``count`` indexes into ``range(size)``, Zipf-skewed towards a shuffled
+    set of popular indexes.
+    """
+    weights = 1.0 / np.arange(1, size + 1) ** skew
+    weights /= weights.sum()
+    order = rng.permutation(size)
+    return order[rng.choice(size, size=count, p=weights)]
+
+
+def _insert_pairs(table: str, columns: tuple, left: np.ndarray, right: np.ndarray,
+                  batch_size: int, extra: dict | None = None) -> None:
+    """
+    Insert (left, right) id pairs with ``extra`` constant columns, skipping
+    duplicates, in unnest() batches.
+    """
+    extra = extra or {}
+    names = ", ".join(list(columns) + list(extra))
+    values = ", ".join(["unnest(%s::bigint[])", "unnest(%s::bigint[])"] + ["%s"] * len(extra))
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(left), batch_size):
+            cursor.execute(
+                f'INSERT INTO "{table}" ({names}) SELECT {values} ON CONFLICT DO NOTHING',
+                [left[start:start + batch_size].tolist(), right[start:start + batch_size].tolist(),
+                 *extra.values()],
+            )
+
+
+def _post_body(rng) -> str:
+    return " ".join(rng.choice(WORDS, size=int(rng.integers(6, 30))))
+
+
+@transaction.atomic
+def generate_dataset(options: DatasetOptions | None = None, log=print) -> dict:
+    """
+    Generate one synthetic dataset. Returns the row counts created.
+    """
+    options = options or DatasetOptions()
+    rng = np.random.default_rng(options.seed)
+    now = timezone.now()
+    batch_size = options.batch_size
+
+    # --- Regions ---
+    counties = County.objects.bulk_create(
+        County(name=f"{SYNTHETIC_PREFIX} county {index}") for index in range(options.counties)
+    )
+    constituencies = Constituency.objects.bulk_create(
+        Constituency(name=f"{SYNTHETIC_PREFIX} constituency {county.id}-{index}", county=county)
+        for county in counties for index in range(options.constituencies_per_county)
+    )
+    wards = Ward.objects.bulk_create(
+        Ward(name=f"{SYNTHETIC_PREFIX} ward {constituency.id}-{index}", constituency=constituency)
+        for constituency in constituencies for index in range(options.wards_per_constituency)
+    )
+    log(f"Created {len(counties)} counties, {len(constituencies)} constituencies, {len(wards)} wards")
+
+    # --- Users, skewed towards populous wards ---
+    county_by_constituency = {constituency.id: constituency.county_id for constituency in constituencies}
+    ward_index = _skewed_choice(rng, len(wards), options.users, skew=0.8)
+    login_hours = rng.exponential(24 * 7, size=options.users).astype(int)
+    user_ids = []
+
+    for start in range(0, options.users, 10_000):
+        created = User.objects.bulk_create(
+            User(
+                username=f"{SYNTHETIC_PREFIX}{index}",
+                name=f"Synthetic {index}",
+                password="",
+                ward=wards[ward_index[index]],
+                constituency_id=wards[ward_index[index]].constituency_id,
+                county_id=county_by_constituency[wards[ward_index[index]].constituency_id],
+                last_login=now - timedelta(hours=int(login_hours[index])),
+            )
+            for index in range(start, min(start + 10_000, options.users))
+        )
+        user_ids.extend(user.id for user in created)
+
+    user_ids = np.array(user_ids, dtype=np.int64)
+    log(f"Created {len(user_ids)} users")
+
+    # --- Follow graph with popular accounts ---
+    follows = options.users * options.follows_per_user
+    followers = user_ids[rng.integers(0, len(user_ids), size=follows)]
+    followed = user_ids[_skewed_choice(rng, len(user_ids), follows)]
+    keep = followers != followed
+    _insert_pairs(
+        User.following.through._meta.db_table, ("from_user_id", "to_user_id"),
+        followers[keep], followed[keep], batch_size,
+    )
+    reconcile_follow_counts()
+    log(f"Created up to {int(keep.sum())} follows")
+
+    # --- Civic items ---
+    def region(index):
+        # Half national, the rest county-wide.
+        return {"county": counties[index % len(counties)]} if index % 2 else {}
+
+    ballots = Ballot.objects.bulk_create(
+        Ballot(
+            title=f"{SYNTHETIC_PREFIX} ballot on {WORDS[index % len(WORDS)]}",
+            start_time=now - timedelta(days=options.days),
+            end_time=now + timedelta(days=options.days),
+            **region(index),
+        )
+        for index in range(options.ballots)
+    )
+    Option.objects.bulk_create(
+        Option(ballot=ballot, number=number, text=text)
+        for ballot in ballots for number, text in enumerate(("Yes", "No"), start=1)
+    )
+    petitions = Petition.objects.bulk_create(
+        Petition(
+            author_id=int(user_ids[index % len(user_ids)]),
+            title=f"{SYNTHETIC_PREFIX} petition on {WORDS[index % len(WORDS)]}",
+            image="defaults/petition.jpg",
+            **region(index),
+        )
+        for index in range(options.petitions)
+    )
+    surveys = Survey.objects.bulk_create(
+        Survey(
+            title=f"{SYNTHETIC_PREFIX} survey on {WORDS[index % len(WORDS)]}",
+            start_time=now - timedelta(days=options.days),
+            end_time=now + timedelta(days=options.days),
+            **region(index),
+        )
+        for index in range(options.surveys)
+    )
+    log(f"Created {len(ballots)} ballots, {len(petitions)} petitions, {len(surveys)} surveys")
+
+    # --- Posts ---
+    post_count = int(options.users * options.posts_per_user)
+    authors = user_ids[_skewed_choice(rng, len(user_ids), post_count, skew=0.9)]
+    ages = rng.uniform(0, options.days * 24 * 60, size=post_count)
+    views = rng.zipf(1.8, size=post_count).clip(max=1_000_000)
+    civic = rng.random(post_count) < options.civic_post_rate
+    civic_items = [("ballot", ballots), ("petition", petitions), ("survey", surveys)]
+    civic_items = [(field, items) for field, items in civic_items if items]
+
+    post_ids = []
+    for start in range(0, post_count, 10_000):
+        batch = []
+        for index in range(start, min(start + 10_000, post_count)):
+            post = Post(
+                author_id=int(authors[index]),
+                body=_post_body(rng),
+                status="published",
+                published_at=now - timedelta(minutes=float(ages[index])),
+                views=int(views[index]),
+            )
+            if civic[index] and civic_items:
+                field, items = civic_items[index % len(civic_items)]
+                setattr(post, field, items[int(rng.integers(0, len(items)))])
+            batch.append(post)
+        post_ids.extend(post.id for post in Post.objects.bulk_create(batch))
+
+    post_ids = np.array(post_ids, dtype=np.int64)
+
+    # Replies and community notes point at earlier top-level posts.
+    replies = int(post_count * options.reply_rate)
+    notes = int(post_count * options.note_rate)
+    reply_parents = post_ids[_skewed_choice(rng, len(post_ids), replies)]
+    note_parents = post_ids[rng.integers(0, len(post_ids), size=notes)]
+    responders = user_ids[rng.integers(0, len(user_ids), size=replies + notes)]
+
+    Post.objects.bulk_create(
+        [
+            Post(author_id=int(responders[index]), body=_post_body(rng), status="published",
+                 reply_to_id=int(parent), published_at=now)
+            for index, parent in enumerate(reply_parents)
+        ] + [
+            Post(author_id=int(responders[replies + index]), body=_post_body(rng), status="published",
+                 community_note_of_id=int(parent), published_at=now)
+            for index, parent in enumerate(note_parents)
+        ],
+        batch_size=10_000,
+    )
+
+    note_ids = np.array(
+        Post.objects.filter(author__username__startswith=SYNTHETIC_PREFIX, community_note_of__isnull=False)
+        .values_list("id", flat=True),
+        dtype=np.int64,
+    )
+    if len(note_ids):
+        voters = user_ids[rng.integers(0, len(user_ids), size=len(note_ids) * 8)]
+        voted = np.repeat(note_ids, 8)
+        upvote = rng.random(len(voted)) < 0.7
+        _insert_pairs(Post.upvotes.through._meta.db_table, ("post_id", "user_id"),
+                      voted[upvote], voters[upvote], batch_size)
+        _insert_pairs(Post.downvotes.through._meta.db_table, ("post_id", "user_id"),
+                      voted[~upvote], voters[~upvote], batch_size)
+
+    Post.objects.filter(author__username__startswith=SYNTHETIC_PREFIX).update(
+        search_vector=SearchVector("body", config="english"),
+        trending_vector=SearchVector("body", config="simple"),
+    )
+    log(f"Created {post_count} posts, {replies} replies, {notes} community notes")
+
+    # --- Hashtags ---
+    tags = [Tag.objects.get_or_create(name=name, defaults={"slug": name})[0] for name in HASHTAGS]
+    tagged = post_ids[rng.random(len(post_ids)) < options.hashtag_rate]
+    tag_index = _skewed_choice(rng, len(tags), len(tagged))
+    content_type = ContentType.objects.get_for_model(Post)
+    TaggedItem.objects.bulk_create(
+        (
+            TaggedItem(tag=tags[tag_index[index]], content_type=content_type, object_id=int(post_id))
+            for index, post_id in enumerate(tagged)
+        ),
+        batch_size=10_000,
+    )
+
+    # --- Likes, clicks, bookmarks, and the matching interactions ---
+    for model, per_user, time_field, interaction_type in (
+            (PostLike, options.likes_per_user, "liked_at", "like"),
+            (PostClick, options.clicks_per_user, "clicked_at", "click"),
+    ):
+        total = options.users * per_user
+        users = user_ids[rng.integers(0, len(user_ids), size=total)]
+        posts = post_ids[_skewed_choice(rng, len(post_ids), total)]
+        _insert_pairs(model._meta.db_table, ("user_id", "post_id"), users, posts, batch_size,
+                      extra={time_field: now})
+        _insert_pairs(UserInteraction._meta.db_table, ("user_id", "post_id"), users, posts, batch_size,
+                      extra={"interaction_type": interaction_type, "created_at": now})
+
+    bookmarks = options.users * max(1, options.likes_per_user // 10)
+    _insert_pairs(
+        Post.bookmarks.through._meta.db_table, ("user_id", "post_id"),
+        user_ids[rng.integers(0, len(user_ids), size=bookmarks)],
+        post_ids[_skewed_choice(rng, len(post_ids), bookmarks)],
+        batch_size,
+    )
+    log("Created likes, clicks and bookmarks")
+
+    features = recompute_post_features()
+    log(f"Computed features for {features} posts")
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return {
+        "options": asdict(options),
+        "users": len(user_ids),
+        "posts": post_count,
+        "replies": replies,
+        "notes": notes,
+        "features": features,
+    }
+
+
+@transaction.atomic
+def flush_dataset() -> int:
+    """
+    Delete every synthetic row. Returns the number of users removed.
+    """
+    synthetic_posts = Post.objects.filter(author__username__startswith=SYNTHETIC_PREFIX)
+    TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Post),
+        object_id__in=synthetic_posts.values("id"),
+    ).delete()
+
+    # Posts first: they PROTECT the ballots, petitions and surveys they share.
+    synthetic_posts.delete()
+
+    Ballot.objects.filter(title__startswith=SYNTHETIC_PREFIX).delete()
+    Survey.objects.filter(title__startswith=SYNTHETIC_PREFIX).delete()
+    Petition.objects.filter(title__startswith=SYNTHETIC_PREFIX).delete()
+
+    users = User.objects.filter(username__startswith=SYNTHETIC_PREFIX)
+    removed = users.count()
+    users.delete()
+
+    Ward.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+    Constituency.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+    County.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+
+    return removed
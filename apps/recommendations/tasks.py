@@ -4,7 +4,9 @@ from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
+from apps.recommendations import features, mutuals, similarity
 from apps.recommendations.models import UserInteraction
+from apps.utils.coalesce import release_coalesced
 
 User = get_user_model()
 
@@ -47,13 +49,18 @@ def record_interaction(user_id: int, post_id: int, interaction_type: str):
         return
 
     # Record the interaction
-    UserInteraction.objects.get_or_create(
+    _, created = UserInteraction.objects.get_or_create(
         user_id=user_id,
         post_id=post_id,
         interaction_type=interaction_type,
         defaults={'created_at': timezone.now()}
     )
 
+    if created:
+        transaction.on_commit(
+            lambda: update_user_interest.delay(user_id, post_id, interaction_type)
+        )
+
     # Set rate limit
     cache.set(cache_key, True, timeout=limit_seconds)
 
@@ -92,3 +99,64 @@ def refresh_all_active_users():
 
     for user_id in active_users:
         refresh_follow_recommendations.delay(user_id)
+
+
+@shared_task
+def refresh_post_features_task(post_id: int):
+    """Recompute one post's stored ranking features (see apps.recommendations.features)"""
+    # Release first so changes landing while we read schedule the next refresh.
+    release_coalesced(features.post_features_key(post_id))
+    features.refresh_post_features([post_id])
+
+
+@shared_task
+def refresh_post_freshness():
+    """Re-bucket stored freshness scores as posts age"""
+    return features.refresh_freshness_scores()
+
+
+@shared_task
+def recompute_post_features():
+    """Full recompute of stored post features, repairing any missed updates"""
+    return features.recompute_post_features()
+
+
+@shared_task
+def embed_post_task(post_id: int):
+    """Embed one post for the similarity score (see apps.recommendations.similarity)"""
+    release_coalesced(similarity.post_embedding_key(post_id))
+    similarity.embed_posts([post_id])
+
+
+@shared_task
+def embed_missing_posts():
+    """Backfill embeddings for posts the save signal missed"""
+    return similarity.embed_missing_posts()
+
+
+@shared_task
+def update_user_interest(user_id: int, post_id: int, interaction_type: str):
+    """Fold a new interaction into the user's interest vector"""
+    similarity.update_user_interest(user_id, post_id, interaction_type)
+
+
+@shared_task
+def rebuild_user_mutual_counts(user_id: int):
+    """Recount one user's mutuals after a follow whose fan-out was too big to apply inline"""
+    return mutuals.rebuild_mutual_counts(user_id)
+
+
+@shared_task
+def rebuild_active_mutual_counts():
+    """Recount mutuals for recently active users, repairing drift and skipped fan-outs"""
+    from datetime import timedelta
+
+    active_users = User.objects.filter(
+        last_login__gte=timezone.now() - timedelta(hours=24)
+    ).values_list('id', flat=True)
+
+    rebuilt = 0
+    for user_id in active_users.iterator():
+        mutuals.rebuild_mutual_counts(user_id)
+        rebuilt += 1
+    return rebuilt
@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.posts.models import Post
+from apps.recommendations.benchmark import ENTRY_POINTS, run_benchmarks
+from apps.recommendations.models import PostFeatures
+from apps.recommendations.synthetic import SYNTHETIC_PREFIX, DatasetOptions, flush_dataset, generate_dataset
+
+SMALL = DatasetOptions(
+    users=60, counties=2, constituencies_per_county=2, wards_per_constituency=2,
+    follows_per_user=5, posts_per_user=2, likes_per_user=5, clicks_per_user=5,
+    ballots=2, petitions=2, surveys=2, seed=7,
+)
+
+
+class TestSyntheticBenchmark(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_dataset_is_reproducible(self):
+        generate_dataset(SMALL, log=lambda message: None)
+        first = list(Post.objects.order_by('id').values_list('author__username', 'body', 'views'))
+        flush_dataset()
+        self.assertFalse(Post.objects.exists())
+
+        generate_dataset(SMALL, log=lambda message: None)
+        second = list(Post.objects.order_by('id').values_list('author__username', 'body', 'views'))
+        self.assertEqual(first, second)
+
+    def test_benchmark_reports_every_entry_point(self):
+        summary = generate_dataset(SMALL, log=lambda message: None)
+        self.assertEqual(PostFeatures.objects.count(), summary['features'])
+
+        report = run_benchmarks(viewers=3, iterations=1, with_plan=True)
+
+        self.assertEqual(report['viewers'], 3)
+        self.assertEqual(set(report['results']), set(ENTRY_POINTS))
+        for result in report['results'].values():
+            self.assertEqual(result['calls'], 3)
+            self.assertEqual(set(result['latency_ms']), {'p50', 'p90', 'p95', 'p99'})
+            self.assertGreater(result['queries']['max'], 0)
+        self.assertIn('Execution Time', report['results']['posts.scored']['plan'])
+        self.assertTrue(Post.objects.filter(author__username__startswith=SYNTHETIC_PREFIX).exists())
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.recommendations.diversity import build_features, mmr_rerank, one_hot, session_rng
+
+
+class TestMMRRerank(SimpleTestCase):
+    def setUp(self):
+        # Three near-duplicates at the top, then two different items.
+        self.features, self.slices = build_features(
+            {'region': one_hot([1, 1, 1, 2, 3]), 'content_type': one_hot([0, 0, 0, 1, 1])},
+            {'region': 0.5, 'content_type': 0.5},
+            5,
+        )
+        self.relevance = [1.0, 0.99, 0.98, 0.9, 0.5]
+
+    def test_pure_relevance_keeps_score_order(self):
+        order, _ = mmr_rerank(self.relevance, self.features, limit=5, lambda_=1.0)
+
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+
+    def test_similar_items_are_pushed_down(self):
+        order, explanations = mmr_rerank(
+            self.relevance, self.features, limit=3, lambda_=0.3, block_slices=self.slices,
+        )
+
+        self.assertEqual(order, [0, 3, 4])
+        self.assertIsNone(explanations[0]['similar_to'])
+        self.assertEqual(explanations[1]['shared'], {})
+        self.assertEqual(explanations[2]['similar_to'], 3)
+        self.assertEqual(set(explanations[2]['shared']), {'content_type'})
+
+    def test_group_cap_defers_instead_of_dropping(self):
+        order, explanations = mmr_rerank(
+            self.relevance, self.features, limit=4, lambda_=1.0, groups=['a', 'a', 'a', 'a', 'b'], max_per_group=1,
+        )
+
+        self.assertEqual(order, [0, 4, 1, 2])
+        self.assertEqual([explanation['capped'] for explanation in explanations], [False, False, True, True])
+
+    def test_jitter_is_deterministic_per_session(self):
+        rerank = lambda session: mmr_rerank(
+            np.zeros(20), np.zeros((20, 0)), limit=20, jitter=0.1, rng=session_rng(7, session),
+        )[0]
+
+        self.assertEqual(rerank('a'), rerank('a'))
+        self.assertNotEqual(rerank('a'), rerank('b'))
+
+
+class TestMMRRerankPools(SimpleTestCase):
+    def _rerank(self, candidates: int):
+        rng = np.random.default_rng(42)
+        blocks = {
+            'content_type': one_hot(rng.integers(0, 6, candidates).tolist()),
+            'region': one_hot(rng.integers(0, 1450, candidates).tolist()),
+            'hashtags': one_hot(rng.integers(0, 500, candidates).tolist()),
+            'embedding': rng.standard_normal((candidates, 384)),
+        }
+        features, slices = build_features(blocks, {name: 0.25 for name in blocks}, candidates)
+        relevance = rng.random(candidates)
+        groups = rng.integers(0, candidates // 3, candidates)
+
+        order, _ = mmr_rerank(relevance, features, limit=20, groups=groups, max_per_group=2, block_slices=slices)
+        return order, relevance, groups
+
+    def test_large_candidate_pools(self):
+        for candidates in (50, 500):
+            with self.subTest(candidates=candidates):
+                order, relevance, groups = self._rerank(candidates)
+
+                self.assertEqual(len(set(order)), 20)
+                self.assertEqual(order[0], int(np.argmax(relevance)))
+                self.assertLessEqual(max(Counter(groups[order].tolist()).values()), 2)
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.posts.models import Post, Report
+from apps.recommendations.features import live_controversy_multiplier, refresh_post_features
+from apps.recommendations.models import PostFeatures
+from apps.recommendations.post_recommender import PostRecommender
+
+User = get_user_model()
+
+
+class TestPostFeatures(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.viewer = User.objects.create(username='viewer', email='viewer@gmail.com', name='Viewer')
+        self.posts = [
+            Post.objects.create(author=self.author, body=f'post {index}', status='published')
+            for index in range(3)
+        ]
+
+    def test_stores_counts_and_controversy(self):
+        post = self.posts[0]
+        post.likes.add(self.viewer)
+        post.bookmarks.add(self.viewer)
+        Post.objects.create(author=self.viewer, repost_of=post, repost_type=Post.RepostType.QUOTE, body='quote')
+        for index in range(10):
+            reporter = User.objects.create(username=f'r{index}', email=f'r{index}@gmail.com', name='Reporter')
+            Report.objects.create(post=post, user=reporter, issue='spam')
+
+        self.assertEqual(refresh_post_features([post.pk]), 1)
+
+        features = PostFeatures.objects.get(post=post)
+        self.assertEqual(
+            (features.likes_count, features.bookmarks_count, features.reposts_count, features.reports_count),
+            (1, 1, 1, 10),
+        )
+        self.assertEqual(features.controversy_multiplier, 0.40)
+
+    def test_recommendations_score_stored_and_unstored_posts(self):
+        refresh_post_features([self.posts[0].pk])
+
+        scored = PostRecommender(self.viewer)._compute_scored_posts(exclude_post_ids=[])
+
+        self.assertEqual({post.pk for post in scored}, {post.pk for post in self.posts})
+        self.assertTrue(all(post.final_score > 0 for post in scored))
+
+    def test_unstored_posts_fall_back_to_live_counts(self):
+        stored, unstored = self.posts[0], self.posts[1]
+        for post in (stored, unstored):
+            post.likes.add(self.viewer)
+            for index in range(10):
+                reporter, _ = User.objects.get_or_create(
+                    username=f'r{index}', defaults={'email': f'r{index}@gmail.com', 'name': 'Reporter'})
+                Report.objects.create(post=post, user=reporter, issue='spam')
+        refresh_post_features([stored.pk])
+
+        recommender = PostRecommender(self.viewer)
+        rows = {
+            pk: (likes, controversy)
+            for pk, likes, controversy in Post.objects.filter(pk__in=[stored.pk, unstored.pk]).annotate(
+                stored_likes=recommender._stored_count('likes_count'),
+                stored_controversy=recommender._stored_score('controversy_multiplier', live_controversy_multiplier()),
+            ).values_list('pk', 'stored_likes', 'stored_controversy')
+        }
+
+        self.assertEqual(rows, {stored.pk: (1.0, 0.40), unstored.pk: (1.0, 0.40)})
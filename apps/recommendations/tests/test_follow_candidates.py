@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from apps.posts.models import Post
+from apps.recommendations.follow_recommender import FollowRecommender
+from apps.recommendations.models import MutualFollowCount, UserInteraction
+from apps.recommendations.mutuals import rebuild_mutual_counts
+
+User = get_user_model()
+
+
+class TestFollowCandidates(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='user', email='user@gmail.com', name='User')
+        self.friend = User.objects.create(username='friend', email='friend@gmail.com', name='Friend')
+        self.friend_of_friend = User.objects.create(username='fof', email='fof@gmail.com', name='Fof')
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.stranger = User.objects.create(username='stranger', email='stranger@gmail.com', name='Stranger')
+
+        self.user.following.add(self.friend)
+        self.friend.following.add(self.friend_of_friend, self.user)
+
+        post = Post.objects.create(author=self.author, body='a post', status='published')
+        UserInteraction.objects.create(user=self.user, post=post, interaction_type='like')
+
+    def test_candidates_come_from_graph_and_engagement(self):
+        candidate_ids = FollowRecommender(self.user)._generate_candidate_ids()
+
+        self.assertEqual(candidate_ids[:2], [self.friend_of_friend.id, self.author.id])
+        self.assertNotIn(self.friend.id, candidate_ids)
+        self.assertNotIn(self.user.id, candidate_ids)
+
+    def test_only_candidates_are_scored(self):
+        rebuild_mutual_counts(self.user.id)
+        scored = FollowRecommender(self.user)._compute_candidates()
+
+        scored_ids = {user.id for user in scored}
+        self.assertIn(self.friend_of_friend.id, scored_ids)
+        self.assertIn(self.author.id, scored_ids)
+        self.assertNotIn(self.friend.id, scored_ids)
+        self.assertEqual(next(user for user in scored if user.id == self.friend_of_friend.id).mutual_count, 1)
+
+
+class TestMutualFollowCounts(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f'user{index}', email=f'user{index}@gmail.com', name='User')
+            for index in range(4)
+        ]
+
+    def counts(self, user):
+        user.refresh_from_db(fields=['followers_count', 'following_count'])
+        return user.followers_count, user.following_count
+
+    def rebuilt(self):
+        counts = set(MutualFollowCount.objects.values_list('user_id', 'candidate_id', 'mutuals'))
+        for user in self.users:
+            rebuild_mutual_counts(user.id)
+        self.assertEqual(set(MutualFollowCount.objects.values_list('user_id', 'candidate_id', 'mutuals')), counts)
+        return counts
+
+    def test_follow_changes_match_a_rebuild(self):
+        a, b, c, d = self.users
+
+        a.following.add(b)
+        c.following.add(d)
+
+        # b -> c adds the paths a -> b -> c and b -> c -> d.
+        b.following.add(c)
+        self.assertEqual(self.rebuilt(), {(a.id, c.id, 1), (b.id, d.id, 1)})
+
+        b.following.remove(c)
+        self.assertEqual(self.rebuilt(), set())
+
+    def test_both_edges_of_a_path_change_together(self):
+        a, b, c, _ = self.users
+
+        with transaction.atomic():
+            a.following.add(b)
+            b.following.add(c)
+        self.assertEqual(self.rebuilt(), {(a.id, c.id, 1)})
+
+        with transaction.atomic():
+            b.following.remove(c)
+            a.following.remove(b)
+        self.assertEqual(self.rebuilt(), set())
+
+    @override_settings(MUTUAL_COUNT_MAX_FANOUT=0)
+    def test_large_fan_out_is_recounted_after_commit(self):
+        a, b, c, d = self.users
+        c.following.add(d)
+
+        with mock.patch('apps.recommendations.tasks.rebuild_user_mutual_counts.delay') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                b.following.add(c)
+
+        rebuild.assert_called_once_with(b.id)
+        self.assertEqual(self.counts(b), (0, 1))
+        self.assertEqual(self.counts(c), (1, 1))
@@ -0,0 +1,77 @@
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.posts.models import Post
+from apps.recommendations import similarity
+from apps.recommendations.models import PostEmbedding, UserInterest
+from apps.recommendations.post_recommender import PostRecommender
+
+User = get_user_model()
+
+
+def fake_embed(texts):
+    # One-hot on the first word, so posts sharing it have similarity 1 and others 0.
+    vectors = []
+    for text in texts:
+        vector = np.zeros(settings.EMBEDDING_DIMENSIONS, dtype=np.float32)
+        vector[sum(map(ord, text.split()[0])) % settings.EMBEDDING_DIMENSIONS] = 1.0
+        vectors.append(vector.tolist())
+    return vectors
+
+
+@override_settings(USER_INTEREST_HALF_LIFE_HOURS=24)
+class TestDecayedMean(SimpleTestCase):
+    def test_old_interest_halves_every_half_life(self):
+        mean, weight = similarity.decayed_mean([1.0, 0.0], 2.0, [0.0, 1.0], 1.0, hours=24)
+
+        self.assertAlmostEqual(weight, 2.0)
+        np.testing.assert_allclose(mean, [0.5, 0.5])
+
+    def test_first_interaction_is_the_mean(self):
+        mean, weight = similarity.decayed_mean(None, 0.0, [0.0, 1.0], 1.5, hours=0)
+
+        self.assertEqual(weight, 1.5)
+        np.testing.assert_allclose(mean, [0.0, 1.0])
+
+
+@mock.patch('apps.recommendations.similarity.embed_texts', side_effect=fake_embed)
+class TestContentSimilarity(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@gmail.com', name='Author')
+        self.viewer = User.objects.create(username='viewer', email='viewer@gmail.com', name='Viewer')
+        self.water = Post.objects.create(author=self.author, body='water rationing in the ward', status='published')
+        self.roads = Post.objects.create(author=self.author, body='roads need repair', status='published')
+        self.more_water = Post.objects.create(author=self.author, body='water prices are up', status='published')
+
+    def test_unchanged_posts_are_not_re_embedded(self, embed):
+        self.assertEqual(similarity.embed_posts([self.water.pk, self.roads.pk]), 2)
+        self.assertEqual(similarity.embed_posts([self.water.pk, self.roads.pk]), 0)
+        self.assertEqual(embed.call_count, 1)
+
+    def test_interest_follows_interactions(self, embed):
+        similarity.update_user_interest(self.viewer.pk, self.water.pk, 'like')
+
+        interest = similarity.interest_vector(self.viewer)
+        water = PostEmbedding.objects.get(post=self.water).embedding
+
+        np.testing.assert_allclose(interest, water)
+        self.assertEqual(UserInterest.objects.get(user=self.viewer).interactions, 1)
+
+    def test_recommender_scores_by_interest(self, embed):
+        similarity.embed_posts([self.water.pk, self.roads.pk, self.more_water.pk])
+        similarity.update_user_interest(self.viewer.pk, self.water.pk, 'bookmark')
+
+        recommender = PostRecommender(self.viewer)
+        scores = dict(
+            Post.objects.filter(pk__in=[self.roads.pk, self.more_water.pk])
+            .annotate(similarity_score=recommender._get_content_similarity_score())
+            .values_list('pk', 'similarity_score')
+        )
+
+        self.assertEqual(scores, {self.roads.pk: 0.0, self.more_water.pk: 1.0})
@@ -0,0 +1,421 @@
+"""
+Throughput benchmarks for the survey summary pipeline.
+
+Each benchmark_* function times one stage and returns a JSON-serialisable
+report; benchmark_survey_pipeline prints them. The test suite only checks
+the stages' results (it borrows the stub LLM server from here). Stages that
+need data build a throwaway survey inside a transaction that is rolled back
+afterwards.
+"""
+
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.survey.models import Choice, ChoiceAnswer, Page, Question, Survey, TextAnswer, TextAnswerEmbedding
+from apps.utils.pii import redact_texts
+
+# Free-text answers with and without PII, in the proportions seen in surveys.
+SAMPLE_ANSWERS = [
+    "I think the county should fix the roads near the market",
+    "Email me at jane.doe@example.com or call 0712 345 678",
+    "See www.example.com/budget for the 2024 figures",
+    "My id no 12345678 and account number 0123456789012",
+    "Paid with 4111 1111 1111 1111, born on March 3, 1985",
+    "Water access in our ward has improved since the new borehole",
+    "The clinic needs more nurses, the queues are too long",
+    "Reach our chairman on +254 722 000 111 about the youth fund",
+]
+
+
+def best_of(run, repeat: int = 3) -> float:
+    """
+    Fastest of ``repeat`` timed calls of ``run()``, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def sample_answers(count: int) -> list[str]:
+    return [SAMPLE_ANSWERS[index % len(SAMPLE_ANSWERS)] for index in range(count)]
+
+
+def benchmark_redaction(texts: int = 20_000, modes=("regex", "hybrid"), processes: int | None = None,
+                        repeat: int = 3) -> dict:
+    """
+    Texts per second through redact_texts() in each PII_MODE.
+    """
+    answers = sample_answers(texts)
+    results = {}
+
+    for mode in modes:
+        with override_settings(PII_MODE=mode):
+            seconds = best_of(lambda: redact_texts(answers, processes=processes), repeat)
+        results[mode] = {"seconds": round(seconds, 3), "texts_per_second": round(texts / seconds)}
+
+    return {"texts": texts, "processes": processes, "results": results}
+
+
+@contextmanager
+def throwaway_survey():
+    """
+    A survey with one page, rolled back (with everything added to it) on exit.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        survey = Survey.objects.create(
+            title="Benchmark", start_time=now - timedelta(days=7), end_time=now - timedelta(days=1),
+        )
+        page = Page.objects.create(survey=survey, number=1, title="Benchmark")
+        try:
+            yield survey, page
+        finally:
+            transaction.set_rollback(True)
+
+
+def insert_answers(survey: Survey, question: Question, count: int, text_sql: str = "'answer ' || id") -> None:
+    """
+    ``count`` responses to ``survey``, each with one TextAnswer to
+    ``question``. ``text_sql`` builds the answer text from the response id.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO "Response" (survey_id, start_time, end_time, created_at, updated_at)
+            SELECT %s, now(), now(), now(), now() FROM generate_series(1, %s)
+            """,
+            [survey.id, count],
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO "TextAnswer" (response_id, question_id, text, redacted_text, pii_entities)
+            SELECT id, %s, {text_sql}, '', '[]' FROM "Response" WHERE survey_id = %s
+            """,
+            [question.id, survey.id],
+        )
+
+
+def insert_embeddings(survey: Survey, question: Question, clusters: int = 100, seed: int = 42,
+                      batch_size: int = 2000) -> int:
+    """
+    Clustered unit-noise embeddings for every text answer to ``question``.
+    """
+    rng = np.random.default_rng(seed)
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    centers = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+    answer_ids = list(question.text_answers.order_by("id").values_list("id", flat=True))
+
+    for start in range(0, len(answer_ids), batch_size):
+        batch = answer_ids[start:start + batch_size]
+        vectors = centers[rng.integers(0, clusters, len(batch))]
+        vectors += 0.3 * rng.standard_normal(vectors.shape, dtype=np.float32)
+        TextAnswerEmbedding.objects.bulk_create(
+            TextAnswerEmbedding(text_answer_id=answer_id, survey=survey, question=question, embedding=vector)
+            for answer_id, vector in zip(batch, vectors)
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE "TextAnswerEmbedding"')
+    return len(answer_ids)
+
+
+def benchmark_clustering(rows: int = 100_000, clusters: int = 100) -> dict:
+    """
+    Seconds per stage of cluster_question_embeddings() (export, select,
+    train, merge, representatives, assign) over ``rows`` embeddings.
+    """
+    # Imported here: apps.survey.tasks pulls in Celery and scikit-learn.
+    from apps.survey.tasks import cluster_question_embeddings
+
+    with throwaway_survey() as (survey, page):
+        question = Question.objects.create(page=page, number=1, type=Question.Type.TEXT, text="Why?")
+        insert_answers(survey, question, rows)
+        embeddings = insert_embeddings(survey, question, clusters=clusters)
+
+        metrics = cluster_question_embeddings(survey.id, question, embeddings)
+
+    return {
+        "rows": rows,
+        "dimensions": settings.EMBEDDING_DIMENSIONS,
+        "results": {
+            "clustering": {
+                **{f"{stage}_seconds": seconds for stage, seconds in metrics["seconds"].items()},
+                "k": metrics["k"],
+                "clusters": metrics["clusters"],
+            },
+        },
+    }
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """
+    Ollama /api/chat stand-in that answers every request after ``latency``
+    seconds and records how many requests were in flight at once.
+    """
+    # Seconds per /api/chat request, roughly a short local-model completion.
+    latency = 0.2
+    lock = threading.Lock()
+    calls = 0
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        cls = type(self)
+        with cls.lock:
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(self.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        body = json.dumps({
+            "model": payload["model"],
+            "message": {
+                "role": "assistant",
+                "content": json.dumps({"label": "Stub theme", "summary": "Stub summary."}),
+            },
+            "done": True,
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def stub_ollama(latency: float = 0.2, concurrency: int | None = None):
+    """
+    Run a StubOllamaHandler server and point the LLM settings at it, with
+    the response cache off so every call reaches the server.
+    """
+    handler = type("StubOllama", (StubOllamaHandler,), {"latency": latency, "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with override_settings(
+            LOCAL_LLM_BACKEND="ollama", LLM_CACHE_ENABLED=False,
+            LLM_CONCURRENCY=concurrency or settings.LLM_CONCURRENCY,
+            OLLAMA_BASE_URL=f"http://127.0.0.1:{server.server_port}",
+        ):
+            yield handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def benchmark_llm(answers: int = 2000, latency: float = 0.2, concurrency: int | None = None) -> dict:
+    """
+    Wall-clock seconds to summarize one text question of ``answers`` answers
+    against a stub LLM, one call at a time and on LLM_CONCURRENCY threads.
+    """
+    from apps.survey.tasks import summarize_small_text_question
+
+    concurrency = concurrency or settings.LLM_CONCURRENCY
+    results = {}
+
+    with throwaway_survey() as (survey, page):
+        question = Question.objects.create(page=page, number=1, type=Question.Type.TEXT, text="Why?")
+        insert_answers(survey, question, answers)
+        # Pre-redacted, so only the LLM calls are timed.
+        question.text_answers.update(redacted_text=F("text"))
+
+        for name, threads in (("sequential", 1), ("concurrent", concurrency)):
+            with stub_ollama(latency, threads) as handler:
+                started = time.perf_counter()
+                summarize_small_text_question(survey, question)
+                seconds = time.perf_counter() - started
+
+            results[name] = {
+                "concurrency": threads,
+                "seconds": round(seconds, 3),
+                "calls": handler.calls,
+                "max_in_flight": handler.max_in_flight,
+            }
+
+    return {"answers": answers, "latency": latency, "results": results}
+
+
+def legacy_choice_stats(survey: Survey):
+    """
+    build_choice_stats before it aggregated every question in one query.
+    """
+    stats = []
+
+    questions = (
+        Question.objects.filter(
+            page__survey=survey,
+            type__in=[
+                Question.Type.SINGLE_CHOICE,
+                Question.Type.MULTIPLE_CHOICE,
+            ],
+        )
+        .order_by("page__number", "number")
+    )
+
+    for question in questions:
+        rows = list(
+            ChoiceAnswer.objects.filter(question=question)
+            .values("choice_id", "choice__text")
+            .annotate(total=Count("id"))
+            .order_by("-total")
+        )
+
+        total_answers = sum(row["total"] for row in rows)
+
+        choices = []
+
+        for row in rows:
+            percent = 0
+
+            if total_answers:
+                percent = round((row["total"] / total_answers) * 100, 2)
+
+            choices.append(
+                {
+                    "choice_id": row["choice_id"],
+                    "text": row["choice__text"],
+                    "count": row["total"],
+                    "percent": percent,
+                }
+            )
+
+        stats.append(
+            {
+                "question_id": question.id,
+                "question": question.text,
+                "type": question.type,
+                "total_answers": total_answers,
+                "choices": choices[:50],
+            }
+        )
+
+    return stats
+
+
+def legacy_number_stats(survey: Survey):
+    """
+    build_number_stats before the SQL cast: every answer is streamed and
+    parsed in Python.
+    """
+    stats = []
+
+    questions = Question.objects.filter(
+        page__survey=survey,
+        type=Question.Type.NUMBER,
+    ).order_by("page__number", "number")
+
+    for question in questions:
+        count = 0
+        total = 0.0
+        min_value = None
+        max_value = None
+
+        values = TextAnswer.objects.filter(question=question).values_list(
+            "text",
+            flat=True,
+        )
+
+        for raw in values.iterator(chunk_size=2000):
+            cleaned = re.sub(r"[^\d.\-]", "", raw or "")
+
+            if not cleaned:
+                continue
+
+            try:
+                value = float(cleaned)
+            except ValueError:
+                continue
+
+            count += 1
+            total += value
+
+            if min_value is None or value < min_value:
+                min_value = value
+
+            if max_value is None or value > max_value:
+                max_value = value
+
+        if count:
+            stats.append(
+                {
+                    "question_id": question.id,
+                    "question": question.text,
+                    "count": count,
+                    "average": round(total / count, 2),
+                    "min": min_value,
+                    "max": max_value,
+                }
+            )
+
+    return stats
+
+
+def benchmark_stats(responses: int = 1_000_000, repeat: int = 3) -> dict:
+    """
+    Seconds for build_number_stats() and build_choice_stats() against the
+    per-question Python code they replaced, over ``responses`` responses.
+    """
+    from apps.survey.tasks import build_choice_stats, build_number_stats
+
+    results = {}
+
+    with throwaway_survey() as (survey, page):
+        number_question = Question.objects.create(page=page, number=1, type=Question.Type.NUMBER, text="How many?")
+        choice_question = Question.objects.create(
+            page=page, number=2, type=Question.Type.SINGLE_CHOICE, text="Which one?",
+        )
+        yes = Choice.objects.create(question=choice_question, number=1, text="Yes")
+        no = Choice.objects.create(question=choice_question, number=2, text="No")
+
+        # Every seventh answer needs cleaning ("KES 123"), as free-typed numbers do.
+        insert_answers(
+            survey, number_question, responses,
+            text_sql="CASE WHEN id %% 7 = 0 THEN 'KES ' ELSE '' END || (id %% 1000)::text",
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO "ChoiceAnswer" (response_id, question_id, choice_id)
+                SELECT id, %s, CASE WHEN id %% 3 = 0 THEN %s ELSE %s END FROM "Response" WHERE survey_id = %s
+                """,
+                [choice_question.id, no.id, yes.id, survey.id],
+            )
+            cursor.execute('ANALYZE "Response", "TextAnswer", "ChoiceAnswer"')
+
+        for name, current, legacy in (
+            ("number", build_number_stats, legacy_number_stats),
+            ("choice", build_choice_stats, legacy_choice_stats),
+        ):
+            seconds = best_of(lambda: current(survey), repeat)
+            legacy_seconds = best_of(lambda: legacy(survey), repeat)
+            results[name] = {
+                "seconds": round(seconds, 3),
+                "legacy_seconds": round(legacy_seconds, 3),
+                "speedup": round(legacy_seconds / seconds, 1),
+            }
+
+    return {"responses": responses, "results": results}
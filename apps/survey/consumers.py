@@ -6,13 +6,16 @@ from djangochannelsrestframework.generics import GenericAsyncAPIConsumer
 from djangochannelsrestframework.mixins import RetrieveModelMixin
 from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 
+from apps.geo.audience import get_user_regions, is_in_region
 from apps.survey.models import Response, Survey, SurveySummary
+from apps.survey.schema import SurveySchema, get_survey_schema
 from apps.survey.serializers import ResponseSerializer, SurveySerializer, SurveySummarySerializer
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import interaction_rate_limit, rate_limit
 
 
-class SurveyConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
+class SurveyConsumer(InstrumentedConsumerMixin, RetrieveModelMixin, GenericAsyncAPIConsumer):
     serializer_class = SurveySerializer
     lookup_field = "pk"
     page_size = 20
@@ -123,8 +126,7 @@ class SurveyConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
     @database_sync_to_async
     def get_user_regions(self):
-        user = self.scope['user']
-        return user.county, user.constituency, user.ward
+        return get_user_regions(self.scope['user'].pk)
 
     @database_sync_to_async
     def list_(self, page_size: int, **kwargs):
@@ -155,7 +157,11 @@ class SurveyConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
 
     @database_sync_to_async
     def submit_(self, data: dict):
-        """Validate and store a survey response, returning the updated survey."""
+        """Validate and store a survey response, returning a small acknowledgement.
+
+        Validation runs against the cached survey schema, so a submission costs
+        the response upsert and answer writes, not a reload of the survey.
+        """
         if not isinstance(data, dict):
             raise ValidationError('Invalid payload.')
 
@@ -163,43 +169,35 @@ class SurveyConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
         if survey_id is None:
             raise ValidationError({'survey': 'This field is required.'})
 
-        survey = self.get_survey(survey_id)
+        schema = get_survey_schema(survey_id)
+        if schema is None or not schema.is_active:
+            raise NotFound('Survey not found')
 
-        if not self._user_can_submit(survey=survey):
+        if not self._user_can_submit(survey=schema):
             raise PermissionDenied('You are not a registered voter in the region')
 
         now = timezone.now()
-        if now < survey.start_time:
+        if now < schema.start_time:
             raise PermissionDenied('Survey has not started yet')
-        if now > survey.end_time:
+        if now > schema.end_time:
             raise PermissionDenied('Survey has ended')
 
-        serializer = ResponseSerializer(data=data, context={'scope': self.scope})
+        serializer = ResponseSerializer(
+            data=data,
+            context={'scope': self.scope, 'survey_schema': schema},
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save()  # atomic; replaces any previous response by this user
-
-        return SurveySerializer(survey, context={'scope': self.scope}).data
+        response = serializer.save()  # atomic; upserts this user's response
 
-    def get_survey(self, survey_id: int) -> Survey:
-        try:
-            return self.get_queryset().get(pk=survey_id)
-        except (Survey.DoesNotExist, ValueError, TypeError):
-            raise NotFound('Survey not found')
+        return {
+            'survey': schema.id,
+            'response': response.pk,
+            'submitted_at': response.updated_at.isoformat(),
+        }
 
-    def _user_can_submit(self, survey: Survey) -> bool:
+    def _user_can_submit(self, survey: Survey | SurveySchema) -> bool:
         """The survey's target region must match the user's region."""
-        user = self.scope['user']
-
-        if not survey.county_id:
-            return True  # National survey
-
-        if survey.county_id != getattr(user, 'county_id', None):
-            return False
-        if survey.constituency_id and survey.constituency_id != getattr(user, 'constituency_id', None):
-            return False
-        if survey.ward_id and survey.ward_id != getattr(user, 'ward_id', None):
-            return False
-        return True
+        return is_in_region(get_user_regions(self.scope['user'].pk), survey)
 
     @action()
     @rate_limit(limit=40, period=60)
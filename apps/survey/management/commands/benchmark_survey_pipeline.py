@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.survey import benchmark
+
+
+class Command(BaseCommand):
+    help = "Time the survey summary pipeline stages (see apps.survey.benchmark)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("stage", choices=["redaction", "clustering", "llm", "stats"])
+        parser.add_argument("--repeat", type=int, default=3, help="Report the fastest of this many runs.")
+        parser.add_argument("--texts", type=int, default=20_000, help="Answers to redact.")
+        parser.add_argument("--processes", type=int, default=None, help="Redaction worker processes.")
+        parser.add_argument("--rows", type=int, default=100_000, help="Embeddings to cluster.")
+        parser.add_argument("--clusters", type=int, default=100, help="Clusters in the generated embeddings.")
+        parser.add_argument("--answers", type=int, default=2000, help="Answers to summarize.")
+        parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM seconds per call.")
+        parser.add_argument("--concurrency", type=int, default=None, help="LLM threads (default LLM_CONCURRENCY).")
+        parser.add_argument("--responses", type=int, default=1_000_000, help="Responses to aggregate.")
+        parser.add_argument("--json", dest="json_path", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        stage = options["stage"]
+
+        if stage == "redaction":
+            report = benchmark.benchmark_redaction(
+                texts=options["texts"], processes=options["processes"], repeat=options["repeat"],
+            )
+        elif stage == "clustering":
+            report = benchmark.benchmark_clustering(rows=options["rows"], clusters=options["clusters"])
+        elif stage == "llm":
+            report = benchmark.benchmark_llm(
+                answers=options["answers"], latency=options["latency"], concurrency=options["concurrency"],
+            )
+        elif stage == "stats":
+            report = benchmark.benchmark_stats(responses=options["responses"], repeat=options["repeat"])
+
+        for name, result in report["results"].items():
+            self.stdout.write(f"{stage} {name}: " + ", ".join(f"{key} {value}" for key, value in result.items()))
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
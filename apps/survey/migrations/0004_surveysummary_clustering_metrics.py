@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("survey", "0003_add_text_answer_embedding_hnsw"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="surveysummary",
+            name="clustering_metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
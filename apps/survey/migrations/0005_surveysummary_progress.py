@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("survey", "0004_surveysummary_clustering_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="surveysummary",
+            name="progress",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
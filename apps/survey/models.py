@@ -210,6 +210,20 @@ class SurveySummary(BaseModel):
 
     sampled = models.BooleanField(default=False)
 
+    # Cluster-count sweep, merges, timings and LLM label counts per run.
+    clustering_metrics = models.JSONField(default=dict, blank=True)
+    # Current LLM stage as {"stage", "done", "total", "updated_at"}.
+    progress = models.JSONField(default=dict, blank=True)
+
+    # Pipeline checkpoints: {"stages": {name: {...}}, "questions": {id: {step: {...}}}}.
+    # A resumed run skips every stage and question step recorded here.
+    checkpoints = models.JSONField(default=dict, blank=True)
+    stage = models.CharField(max_length=32, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Touched by every checkpoint and progress write; stale RUNNING rows are reaped.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
     model_name = models.CharField(max_length=255, blank=True)
     prompt_version = models.CharField(max_length=100, blank=True)
 
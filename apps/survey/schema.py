@@ -0,0 +1,164 @@
+"""
+Compiled survey schemas.
+
+Submitting a response only needs the survey's window, region and the shape of
+its questions and choices. That is compiled once into a SurveySchema, cached
+per survey and dropped by apps.survey.signals whenever the survey, a page, a
+question or a choice changes, so validating a submission runs no queries.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+
+from apps.survey.models import Choice, Question, Survey
+
+# Bump this when the cached schema shape changes.
+SURVEY_SCHEMA_VERSION = "v1"
+
+TEXT_TYPES = frozenset({Question.Type.TEXT, Question.Type.NUMBER})
+CHOICE_TYPES = frozenset({Question.Type.SINGLE_CHOICE, Question.Type.MULTIPLE_CHOICE})
+
+
+@dataclass(frozen=True)
+class QuestionSchema:
+    id: int
+    type: str
+    is_required: bool
+    dependency_id: int | None
+
+
+@dataclass(frozen=True)
+class SurveySchema:
+    id: int
+    is_active: bool
+    start_time: datetime
+    end_time: datetime
+
+    # Region ids, so apps.geo.audience.is_in_region() can take the schema itself.
+    county_id: int | None
+    constituency_id: int | None
+    ward_id: int | None
+
+    questions: dict[int, QuestionSchema] = field(default_factory=dict)
+    # choice_id -> question_id
+    choices: dict[int, int] = field(default_factory=dict)
+
+
+def survey_schema_key(survey_id: int) -> str:
+    return f"survey:schema:{SURVEY_SCHEMA_VERSION}:{survey_id}"
+
+
+def invalidate_survey_schema(survey_id: int) -> None:
+    if survey_id:
+        cache.delete(survey_schema_key(survey_id))
+
+
+def compile_survey_schema(survey_id: int) -> SurveySchema | None:
+    survey = (
+        Survey.objects.filter(pk=survey_id)
+        .values("id", "is_active", "start_time", "end_time", "county_id", "constituency_id", "ward_id")
+        .first()
+    )
+
+    if survey is None:
+        return None
+
+    questions = {
+        question_id: QuestionSchema(question_id, question_type, is_required, dependency_id)
+        for question_id, question_type, is_required, dependency_id in (
+            Question.objects.filter(page__survey_id=survey_id)
+            .values_list("id", "type", "is_required", "dependency_id")
+        )
+    }
+
+    choices = dict(
+        Choice.objects.filter(question__page__survey_id=survey_id).values_list("id", "question_id")
+    )
+
+    return SurveySchema(questions=questions, choices=choices, **survey)
+
+
+def get_survey_schema(survey_id) -> SurveySchema | None:
+    """
+    Cached SurveySchema for a survey, or None if it does not exist.
+    """
+    try:
+        survey_id = int(survey_id)
+    except (TypeError, ValueError):
+        return None
+
+    key = survey_schema_key(survey_id)
+    schema = cache.get(key)
+
+    if schema is None:
+        schema = compile_survey_schema(survey_id)
+        if schema is None:
+            return None
+        cache.set(key, schema, timeout=getattr(settings, "SURVEY_SCHEMA_CACHE_TIMEOUT", 60 * 60))
+
+    return schema
+
+
+def validate_answers(schema: SurveySchema, text_answers: list[dict], choice_answers: list[dict]) -> None:
+    """
+    Check submitted answers against the survey's questions and choices.
+
+    Raises serializers.ValidationError on the first problem found.
+    """
+    questions = schema.questions
+
+    # Every answer must reference a question that belongs to this survey.
+    for answer in text_answers + choice_answers:
+        if answer['question_id'] not in questions:
+            raise serializers.ValidationError(
+                'Answer references a question outside this survey.')
+
+    # Text answers: correct question type, one per question.
+    for answer in text_answers:
+        if questions[answer['question_id']].type not in TEXT_TYPES:
+            raise serializers.ValidationError(
+                'Text answers are only allowed for text/number questions.')
+
+    text_counts = Counter(answer['question_id'] for answer in text_answers)
+    choice_counts = Counter(answer['question_id'] for answer in choice_answers)
+
+    if any(count > 1 for count in text_counts.values()):
+        raise serializers.ValidationError(
+            'Multiple text answers were submitted for the same question.')
+
+    # Choice answers: correct question type, valid choice, sensible cardinality.
+    for answer in choice_answers:
+        question = questions[answer['question_id']]
+        if question.type not in CHOICE_TYPES:
+            raise serializers.ValidationError(
+                'Choice answers are only allowed for choice questions.')
+        if schema.choices.get(answer['choice_id']) != answer['question_id']:
+            raise serializers.ValidationError(
+                'Submitted choice does not belong to the question.')
+
+    pair_counts = Counter(
+        (answer['question_id'], answer['choice_id']) for answer in choice_answers)
+    if any(count > 1 for count in pair_counts.values()):
+        raise serializers.ValidationError(
+            'The same choice was submitted twice for a question.')
+
+    for question_id, count in choice_counts.items():
+        if count > 1 and questions[question_id].type == Question.Type.SINGLE_CHOICE:
+            raise serializers.ValidationError(
+                'Single-choice questions accept only one answer.')
+
+    # Enforce required questions, skipping ones hidden by an unmet dependency.
+    selected_choice_ids = {answer['choice_id'] for answer in choice_answers}
+    answered_ids = set(text_counts) | set(choice_counts)
+    for question in questions.values():
+        if not question.is_required or question.id in answered_ids:
+            continue
+        if question.dependency_id is not None and question.dependency_id not in selected_choice_ids:
+            continue  # Hidden by dependency -> not required right now.
+        raise serializers.ValidationError(
+            f'Required question {question.id} was not answered.')
@@ -1,12 +1,11 @@
-from collections import Counter
-
 from django.db import transaction
 from rest_framework import serializers
 
 from apps.geo.serializers import CountySerializer, ConstituencySerializer, WardSerializer
 from apps.survey.models import Choice, ChoiceAnswer, Page, Question, Response, Survey, TextAnswer, SurveySummary, \
     SurveyTextCluster
-from apps.survey.tasks import embed_response_text_answers
+from apps.survey.schema import get_survey_schema, validate_answers
+from apps.survey.tasks import embed_response_text_answers, enqueue_response_embedding
 from apps.utils.serializer_user import get_current_user
 
 
@@ -68,6 +67,7 @@ class ChoiceAnswerSerializer(serializers.ModelSerializer):
 class ResponseSerializer(serializers.ModelSerializer):
     text_answers = TextAnswerSerializer(many=True, required=False)
     choice_answers = ChoiceAnswerSerializer(many=True, required=False)
+    survey = serializers.IntegerField(source='survey_id', write_only=True)
 
     class Meta:
         model = Response
@@ -79,82 +79,21 @@ class ResponseSerializer(serializers.ModelSerializer):
             'text_answers',
             'choice_answers',
         )
-        extra_kwargs = {'id': {'read_only': True}, 'survey': {'write_only': True}}
+        extra_kwargs = {'id': {'read_only': True}}
 
     def validate(self, attrs):
         start_time, end_time = attrs.get('start_time'), attrs.get('end_time')
         if start_time and end_time and end_time < start_time:
             raise serializers.ValidationError('Response end time cannot be before start time.')
 
-        survey = attrs['survey']
+        schema = self.context.get('survey_schema') or get_survey_schema(attrs['survey_id'])
+        if schema is None or schema.id != attrs['survey_id']:
+            raise serializers.ValidationError({'survey': 'Survey not found.'})
+
         text_answers = attrs.get('text_answers') or []
         choice_answers = attrs.get('choice_answers') or []
 
-        questions = {
-            question.id: question
-            for question in Question.objects.filter(page__survey=survey)
-        }
-
-        text_types = {Question.Type.TEXT, Question.Type.NUMBER}
-        choice_types = {Question.Type.SINGLE_CHOICE, Question.Type.MULTIPLE_CHOICE}
-
-        # Every answer must reference a question that belongs to this survey.
-        for answer in text_answers + choice_answers:
-            if answer['question_id'] not in questions:
-                raise serializers.ValidationError(
-                    'Answer references a question outside this survey.')
-
-        # Text answers: correct question type, one per question.
-        for answer in text_answers:
-            if questions[answer['question_id']].type not in text_types:
-                raise serializers.ValidationError(
-                    'Text answers are only allowed for text/number questions.')
-
-        text_counts = Counter(answer['question_id'] for answer in text_answers)
-        choice_counts = Counter(answer['question_id'] for answer in choice_answers)
-
-        if any(count > 1 for count in text_counts.values()):
-            raise serializers.ValidationError(
-                'Multiple text answers were submitted for the same question.')
-
-        # Choice answers: correct question type, valid choice, sensible cardinality.
-        if choice_answers:
-            valid_pairs = set(
-                Choice.objects.filter(
-                    question__page__survey=survey,
-                    id__in=[answer['choice_id'] for answer in choice_answers],
-                ).values_list('question_id', 'id')
-            )
-            for answer in choice_answers:
-                question = questions[answer['question_id']]
-                if question.type not in choice_types:
-                    raise serializers.ValidationError(
-                        'Choice answers are only allowed for choice questions.')
-                if (answer['question_id'], answer['choice_id']) not in valid_pairs:
-                    raise serializers.ValidationError(
-                        'Submitted choice does not belong to the question.')
-
-            pair_counts = Counter(
-                (answer['question_id'], answer['choice_id']) for answer in choice_answers)
-            if any(count > 1 for count in pair_counts.values()):
-                raise serializers.ValidationError(
-                    'The same choice was submitted twice for a question.')
-
-            for question_id, count in choice_counts.items():
-                if count > 1 and questions[question_id].type == Question.Type.SINGLE_CHOICE:
-                    raise serializers.ValidationError(
-                        'Single-choice questions accept only one answer.')
-
-        # Enforce required questions, skipping ones hidden by an unmet dependency.
-        selected_choice_ids = {answer['choice_id'] for answer in choice_answers}
-        answered_ids = set(text_counts) | set(choice_counts)
-        for question in questions.values():
-            if not question.is_required or question.id in answered_ids:
-                continue
-            if question.dependency_id is not None and question.dependency_id not in selected_choice_ids:
-                continue  # Hidden by dependency -> not required right now.
-            raise serializers.ValidationError(
-                f'Required question {question.id} was not answered.')
+        validate_answers(schema, text_answers, choice_answers)
 
         attrs['text_answers'] = text_answers
         attrs['choice_answers'] = choice_answers
@@ -166,20 +105,57 @@ class ResponseSerializer(serializers.ModelSerializer):
         text_answers = validated_data.pop('text_answers', [])
         choice_answers = validated_data.pop('choice_answers', [])
 
-        # One response per (survey, user): replace any previous submission.
-        Response.objects.filter(
-            survey=validated_data['survey'],
-            user=validated_data['user'],
-        ).delete()
-
-        response = Response.objects.create(**validated_data)
+        # One response per (survey, user): upsert on unique_response_per_survey_user.
+        response, = Response.objects.bulk_create(
+            [Response(**validated_data)],
+            update_conflicts=True,
+            unique_fields=['survey', 'user'],
+            update_fields=['start_time', 'end_time', 'updated_at'],
+        )
 
-        TextAnswer.objects.bulk_create(
-            TextAnswer(response=response, **answer) for answer in text_answers
+        # Unchanged text answers keep their redaction and embedding.
+        submitted_texts = {answer['question_id']: answer['text'] for answer in text_answers}
+        kept_questions = set()
+        stale_text_ids = []
+        for answer_id, question_id, text in TextAnswer.objects.filter(
+                response=response).values_list('id', 'question_id', 'text'):
+            if question_id not in kept_questions and submitted_texts.get(question_id) == text:
+                kept_questions.add(question_id)
+            else:
+                stale_text_ids.append(answer_id)
+
+        if stale_text_ids:
+            TextAnswer.objects.filter(id__in=stale_text_ids).delete()
+
+        new_text_answers = TextAnswer.objects.bulk_create(
+            TextAnswer(response=response, question_id=question_id, text=text)
+            for question_id, text in submitted_texts.items()
+            if question_id not in kept_questions
         )
+
+        submitted_choices = {(answer['question_id'], answer['choice_id']) for answer in choice_answers}
+        existing_choices = {}
+        for answer_id, question_id, choice_id in ChoiceAnswer.objects.filter(
+                response=response).values_list('id', 'question_id', 'choice_id'):
+            existing_choices.setdefault((question_id, choice_id), []).append(answer_id)
+
+        stale_choice_ids = [
+            answer_id
+            for pair, answer_ids in existing_choices.items()
+            for answer_id in (answer_ids if pair not in submitted_choices else answer_ids[1:])
+        ]
+        if stale_choice_ids:
+            ChoiceAnswer.objects.filter(id__in=stale_choice_ids).delete()
+
         ChoiceAnswer.objects.bulk_create(
-            ChoiceAnswer(response=response, **answer) for answer in choice_answers
+            ChoiceAnswer(response=response, question_id=question_id, choice_id=choice_id)
+            for question_id, choice_id in submitted_choices
+            if (question_id, choice_id) not in existing_choices
         )
+
+        if new_text_answers:
+            transaction.on_commit(lambda: enqueue_response_embedding(response.id))
+
         return response
 
 
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.survey.models import Choice, Page, Question, Survey
+from apps.survey.schema import invalidate_survey_schema
+
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def invalidate_schema_on_survey(sender, instance: Survey, **kwargs):
+    invalidate_survey_schema(instance.pk)
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def invalidate_schema_on_page(sender, instance: Page, **kwargs):
+    invalidate_survey_schema(instance.survey_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_schema_on_question(sender, instance: Question, **kwargs):
+    survey_id = Page.objects.filter(pk=instance.page_id).values_list("survey_id", flat=True).first()
+    invalidate_survey_schema(survey_id)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_schema_on_choice(sender, instance: Choice, **kwargs):
+    survey_id = (
+        Question.objects.filter(pk=instance.question_id)
+        .values_list("page__survey_id", flat=True)
+        .first()
+    )
+    invalidate_survey_schema(survey_id)
@@ -1,33 +1,48 @@
 import re
-from collections import Counter
+import time
+from datetime import timedelta
 from typing import Iterable, List
 
 import numpy as np
-from celery import chain, shared_task
+from celery import chain, chord, group, shared_task
+from celery.exceptions import Ignore
 from celery.utils.log import get_task_logger
 from django.conf import settings
-from django.db import connection
-from django.db.models import Count, Q
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
+from django_redis import get_redis_connection
 from sklearn.cluster import MiniBatchKMeans
-from sklearn.preprocessing import normalize
 
 from apps.survey.models import (
     ChoiceAnswer,
     Question,
-    Response,
     Survey,
     SurveySummary,
     SurveyTextCluster,
     TextAnswer,
     TextAnswerEmbedding,
 )
+from apps.utils.clustering import (
+    CentroidTopK,
+    candidate_cluster_counts,
+    merge_similar_centroids,
+    select_cluster_count,
+)
+from apps.utils.coalesce import release_coalesced, schedule_coalesced
 from apps.utils.embedding import embed_texts, clean_text_for_embedding
-from apps.utils.pii import redact_text
+from apps.utils.embedding_dispatcher import dispatch_embeddings
+from apps.utils.vectors import export_vector_matrix, update_from_values, vector_block_size
+from apps.utils.pii import redact_text, redact_texts
 from apps.utils.llm import chat_json
+from apps.utils.llm_runner import LLMJobRunner, run_llm_jobs
 
 logger = get_task_logger(__name__)
 
+# Texts shown to the LLM per cluster, picked while clustering.
+REPRESENTATIVE_TEXTS = 12
+
 
 # ======================
 # Utility helpers
@@ -57,18 +72,22 @@ def redacted_text_answers(queryset):
     Streams redacted text answers.
     """
 
-    for answer in queryset.only("id", "text", "redacted_text").iterator(chunk_size=2000):
-        if answer.redacted_text:
-            text = answer.redacted_text
-        else:
-            text = redact_text(answer.text)["text"]
+    answers = queryset.only("id", "text", "redacted_text").iterator(chunk_size=2000)
 
-        text = re.sub(r"\s+", " ", text or "")
-        text = text.strip()
-        text = text[:1000]
+    for batch in chunked(answers, 2000):
+        missing = [answer for answer in batch if not answer.redacted_text]
+        redacted = redact_texts([answer.text for answer in missing])
+        redacted_by_id = {answer.id: result["text"] for answer, result in zip(missing, redacted)}
 
-        if text:
-            yield text
+        for answer in batch:
+            text = answer.redacted_text or redacted_by_id.get(answer.id)
+
+            text = re.sub(r"\s+", " ", text or "")
+            text = text.strip()
+            text = text[:1000]
+
+            if text:
+                yield text
 
 
 def truncate_prompt(value: str, max_chars: int) -> str:
@@ -93,7 +112,8 @@ def safe_chat_json(messages: list[dict], temperature: float = 0.2) -> dict:
     """
     Wrapper around your existing chat_json().
 
-    Returns {} if the local LLM fails or returns invalid JSON.
+    Returns {} if the local LLM fails or returns invalid JSON. Successful
+    responses come from the chat_json cache when a pipeline is re-run.
     """
 
     try:
@@ -154,24 +174,19 @@ def prepare_redacted_text_answers(answers):
     """
 
     items = []
-    answers_to_update = []
+    answers = list(answers)
     now = timezone.now()
 
-    for answer in answers:
-        if answer.redacted_text:
-            redacted = answer.redacted_text
-        else:
-            result = redact_text(answer.text)
-
-            answer.redacted_text = result["text"]
-            answer.pii_entities = result["entities"]
-            answer.pii_redacted_at = now
-
-            answers_to_update.append(answer)
+    answers_to_update = [answer for answer in answers if not answer.redacted_text]
+    results = redact_texts([answer.text for answer in answers_to_update])
 
-            redacted = answer.redacted_text
+    for answer, result in zip(answers_to_update, results):
+        answer.redacted_text = result["text"]
+        answer.pii_entities = result["entities"]
+        answer.pii_redacted_at = now
 
-        cleaned = normalize_redacted_text(redacted)
+    for answer in answers:
+        cleaned = normalize_redacted_text(answer.redacted_text)
 
         if cleaned:
             items.append((answer, cleaned))
@@ -186,16 +201,222 @@ def prepare_redacted_text_answers(answers):
     return items
 
 
+# ======================
+# Pipeline checkpoints
+# ======================
+
+class RunSuperseded(Ignore):
+    """
+    The pipeline run was reaped or replaced by a newer one. Raised instead of
+    writing its results; as an Ignore it stops the chain without error callbacks.
+    """
+
+
+def run_filter(run: int | None) -> dict:
+    """
+    Lookups matching the summary only while ``run`` (its attempt number) owns it.
+    Tasks called outside a pipeline pass None and always match.
+    """
+    if run is None:
+        return {}
+    return {"status": SurveySummary.Status.RUNNING, "attempts": run}
+
+
+def pipeline_heartbeat(survey_id: int, run: int | None = None, interval: float = 30.0):
+    """
+    Callable for long batch loops: refreshes the heartbeat at most every
+    ``interval`` seconds (or when called with force=True) and raises
+    RunSuperseded once ``run`` no longer owns the summary.
+    """
+    last_beat = [float("-inf")]
+
+    def beat(force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - last_beat[0] < interval:
+            return
+        last_beat[0] = now
+
+        updated = SurveySummary.objects.filter(survey_id=survey_id, **run_filter(run)).update(
+            heartbeat_at=timezone.now(),
+        )
+        if run is not None and not updated:
+            raise RunSuperseded(f"Survey {survey_id} summary run {run} was superseded")
+
+    return beat
+
+
+def update_checkpoints(survey_id: int, update=None, run: int | None = None, **fields) -> dict:
+    """
+    Apply ``update(checkpoints)`` and ``fields`` to the survey's summary and
+    refresh its heartbeat. With ``run``, raises RunSuperseded instead of
+    writing once that run no longer owns the summary.
+
+    Question tasks run in parallel, so the read-modify-write holds a row lock.
+    """
+
+    with transaction.atomic():
+        summary = (
+            SurveySummary.objects.select_for_update()
+            .filter(survey_id=survey_id, **run_filter(run))
+            .only("id", "checkpoints")
+            .first()
+        )
+
+        if summary is None:
+            if run is not None:
+                raise RunSuperseded(f"Survey {survey_id} summary run {run} was superseded")
+            return {}
+
+        checkpoints = summary.checkpoints or {}
+        if update is not None:
+            update(checkpoints)
+
+        SurveySummary.objects.filter(pk=summary.pk).update(
+            checkpoints=checkpoints,
+            heartbeat_at=timezone.now(),
+            **fields,
+        )
+
+    return checkpoints
+
+
+def get_checkpoints(survey_id: int) -> dict:
+    return (
+        SurveySummary.objects.filter(survey_id=survey_id)
+        .values_list("checkpoints", flat=True)
+        .first()
+    ) or {}
+
+
+def stage_completed(survey_id: int, stage: str) -> bool:
+    return stage in get_checkpoints(survey_id).get("stages", {})
+
+
+def start_stage(survey_id: int, stage: str, run: int | None = None) -> None:
+    update_checkpoints(survey_id, run=run, stage=stage)
+
+
+def complete_stage(survey_id: int, stage: str, started: float, run: int | None = None, **details) -> None:
+    """
+    Record a survey-wide stage as done, with its duration.
+    """
+
+    def update(checkpoints):
+        checkpoints.setdefault("stages", {})[stage] = {
+            "completed_at": timezone.now().isoformat(),
+            "seconds": round(time.perf_counter() - started, 3),
+            **details,
+        }
+
+    update_checkpoints(survey_id, update, run=run)
+
+
+def question_checkpoint(survey_id: int, question_id: int) -> dict:
+    return get_checkpoints(survey_id).get("questions", {}).get(str(question_id), {})
+
+
+def complete_question_step(survey_id: int, question_id: int, step: str, started: float,
+                           run: int | None = None, **values) -> None:
+    """
+    Record one step ("cluster", "label" or "summary") of a question as done.
+    """
+
+    def update(checkpoints):
+        entry = checkpoints.setdefault("questions", {}).setdefault(str(question_id), {})
+        entry[step] = {
+            "completed_at": timezone.now().isoformat(),
+            "seconds": round(time.perf_counter() - started, 3),
+            **values,
+        }
+
+    update_checkpoints(survey_id, update, run=run)
+
+
+def question_progress(survey_id: int, question_id: int, stage: str, run: int | None = None):
+    """
+    LLMJobRunner progress callback for one question's checkpoint entry.
+    """
+
+    def report(done: int, total: int) -> None:
+        def update(checkpoints):
+            entry = checkpoints.setdefault("questions", {}).setdefault(str(question_id), {})
+            entry["progress"] = {
+                "stage": stage,
+                "done": done,
+                "total": total,
+                "updated_at": timezone.now().isoformat(),
+            }
+
+        update_checkpoints(survey_id, update, run=run)
+
+    return report
+
+
+@shared_task
+def fail_survey_summary(request, exc, traceback, survey_id: int, run: int | None = None):
+    """
+    Error callback for the pipeline. Completed checkpoints are kept, so the
+    retry from check_ended_surveys resumes where this run stopped. A failure
+    in a superseded run leaves the newer run alone.
+    """
+
+    logger.error("Survey summary pipeline failed for survey %s: %s", survey_id, exc)
+
+    attempts = {"attempts": run} if run is not None else {}
+    SurveySummary.objects.filter(survey_id=survey_id, **attempts).exclude(
+        status=SurveySummary.Status.COMPLETED,
+    ).update(
+        status=SurveySummary.Status.FAILED,
+        error=str(exc)[:10000],
+        heartbeat_at=timezone.now(),
+    )
+
+
+@shared_task
+def reap_stuck_survey_summaries():
+    """
+    Periodic task.
+
+    Marks RUNNING summaries whose pipeline stopped reporting (worker lost,
+    chain dropped) as FAILED, so check_ended_surveys can resume them.
+    """
+
+    now = timezone.now()
+    cutoff = now - timedelta(minutes=getattr(settings, "SURVEY_SUMMARY_STALE_MINUTES", 45))
+
+    stuck = SurveySummary.objects.filter(status=SurveySummary.Status.RUNNING).filter(
+        Q(heartbeat_at__lte=cutoff) | Q(heartbeat_at__isnull=True, updated_at__lte=cutoff)
+    )
+
+    reaped = stuck.update(
+        status=SurveySummary.Status.FAILED,
+        error="Pipeline stopped reporting progress; it will resume from the last checkpoint.",
+        heartbeat_at=now,
+    )
+
+    if reaped:
+        logger.warning("Reaped %s stuck survey summaries", reaped)
+
+    return {"reaped": reaped}
+
+
 # ======================
 # Survey end detection
 # ======================
 
 @shared_task(queue="pii")
-def redact_survey_text_answers(survey_id: int):
+def redact_survey_text_answers(survey_id: int, run: int | None = None):
     """
     Backfill PII redaction for all text answers in a survey.
     """
 
+    if stage_completed(survey_id, "redact"):
+        return survey_id
+
+    started = time.perf_counter()
+    start_stage(survey_id, "redact", run=run)
+    heartbeat = pipeline_heartbeat(survey_id, run)
+
     queryset = (
         TextAnswer.objects.filter(
             question__page__survey_id=survey_id,
@@ -208,8 +429,11 @@ def redact_survey_text_answers(survey_id: int):
     )
 
     for batch in chunked(queryset.iterator(chunk_size=1000), 1000):
+        heartbeat()
         prepare_redacted_text_answers(batch)
 
+    complete_stage(survey_id, "redact", started, run=run)
+
     return survey_id
 
 
@@ -222,12 +446,19 @@ def check_ended_surveys():
     """
 
     now = timezone.now()
+    retry_cutoff = now - timedelta(minutes=15)
+    max_attempts = getattr(settings, "SURVEY_SUMMARY_MAX_ATTEMPTS", 5)
 
     survey_ids = (
         Survey.objects.filter(end_time__lte=now)
         .filter(
             Q(summary__isnull=True)
             | Q(summary__status=SurveySummary.Status.PENDING)
+            | (
+                    Q(summary__status=SurveySummary.Status.FAILED)
+                    & Q(summary__attempts__lt=max_attempts)
+                    & Q(summary__heartbeat_at__lte=retry_cutoff)
+            )
         )
         .values_list("id", flat=True)
         .distinct()
@@ -249,40 +480,131 @@ def start_survey_summary_pipeline(survey_id: int):
 
     summary, _ = SurveySummary.objects.get_or_create(survey=survey)
 
-    if summary.status == SurveySummary.Status.COMPLETED:
-        return
+    now = timezone.now()
+    fields = {
+        "status": SurveySummary.Status.RUNNING,
+        "attempts": F("attempts") + 1,
+        "started_at": now,
+        "heartbeat_at": now,
+        "error": "",
+        "progress": {},
+    }
+
+    # A resumed run keeps the metrics of the stages it skips.
+    if not summary.checkpoints:
+        fields["clustering_metrics"] = {}
+
+    # Claim the run; a concurrent start or a finished summary leaves nothing to update.
+    claimed = (
+        SurveySummary.objects.filter(pk=summary.pk)
+        .exclude(status__in=[SurveySummary.Status.RUNNING, SurveySummary.Status.COMPLETED])
+        .update(**fields)
+    )
 
-    if summary.status == SurveySummary.Status.RUNNING:
+    if not claimed:
         return
 
-    SurveySummary.objects.filter(pk=summary.pk).update(
-        status=SurveySummary.Status.RUNNING,
-        error="",
-    )
+    # The attempt number identifies this run; its tasks stop once it changes.
+    run = SurveySummary.objects.filter(pk=summary.pk).values_list("attempts", flat=True).first()
 
     chain(
-        redact_survey_text_answers.s(survey_id),
-        ensure_survey_text_embeddings.s(survey_id),
-        cluster_survey_text_answers.s(),
-        summarize_survey_clusters.s(),
-        finalize_survey_summary.s(),
-    ).apply_async()
+        redact_survey_text_answers.si(survey_id, run),
+        ensure_survey_text_embeddings.si(survey_id, run),
+        fan_out_survey_questions.si(survey_id, run),
+    ).apply_async(link_error=fail_survey_summary.s(survey_id=survey_id, run=run))
+
+    return survey_id
+
+
+@shared_task(queue="survey_summary")
+def fan_out_survey_questions(survey_id: int, run: int | None = None):
+    """
+    Cluster and summarize every TEXT question in its own task, on any
+    survey_summary worker, then join them in finalize_survey_summary.
+    """
+
+    question_ids = list(
+        Question.objects.filter(
+            page__survey_id=survey_id,
+            type=Question.Type.TEXT,
+        )
+        .order_by("page__number", "number")
+        .values_list("id", flat=True)
+    )
+
+    start_stage(survey_id, "questions", run=run)
+    finalize = finalize_survey_summary.si(survey_id, run)
+    on_error = fail_survey_summary.s(survey_id=survey_id, run=run)
+
+    if not question_ids:
+        finalize.apply_async(link_error=on_error)
+        return survey_id
+
+    chord(
+        group(summarize_survey_question.si(survey_id, question_id, run) for question_id in question_ids),
+        finalize,
+    ).apply_async(link_error=on_error)
 
     return survey_id
 
 
+@shared_task(queue="survey_summary")
+def summarize_survey_question(survey_id: int, question_id: int, run: int | None = None):
+    """
+    Cluster, label and summarize one TEXT question.
+
+    Each step is checkpointed, so a retried question skips the steps that
+    already finished.
+    """
+
+    try:
+        survey = Survey.objects.get(pk=survey_id)
+        question = Question.objects.get(pk=question_id)
+    except (Survey.DoesNotExist, Question.DoesNotExist):
+        logger.warning("Survey %s question %s does not exist", survey_id, question_id)
+        return question_id
+
+    done = question_checkpoint(survey_id, question_id)
+    heartbeat = pipeline_heartbeat(survey_id, run)
+    heartbeat(force=True)
+
+    if "cluster" not in done:
+        started = time.perf_counter()
+        metrics = cluster_question_text_answers(survey_id, question, heartbeat=heartbeat)
+        complete_question_step(survey_id, question_id, "cluster", started, run=run, metrics=metrics)
+
+    if "label" not in done:
+        started = time.perf_counter()
+        metrics = label_question_clusters(survey_id, question, heartbeat=heartbeat, run=run)
+        complete_question_step(survey_id, question_id, "label", started, run=run, metrics=metrics)
+
+    if "summary" not in done:
+        started = time.perf_counter()
+        theme = build_question_theme(survey, question)
+        complete_question_step(survey_id, question_id, "summary", started, run=run, theme=theme)
+
+    return question_id
+
+
 # ======================
 # Embedding tasks
 # ======================
 
 @shared_task(queue="embeddings")
-def ensure_survey_text_embeddings(survey_id: int):
+def ensure_survey_text_embeddings(survey_id: int, run: int | None = None):
     """
     Backfill missing embeddings for all TEXT answers in a survey.
 
     Uses persisted redacted text.
     """
 
+    if stage_completed(survey_id, "embed"):
+        return survey_id
+
+    started = time.perf_counter()
+    start_stage(survey_id, "embed", run=run)
+    heartbeat = pipeline_heartbeat(survey_id, run)
+
     missing_answers = (
         TextAnswer.objects.filter(
             question__page__survey_id=survey_id,
@@ -295,21 +617,85 @@ def ensure_survey_text_embeddings(survey_id: int):
         .order_by("id")
     )
 
+    def source():
+        for batch in chunked(missing_answers.iterator(chunk_size=1000), 500):
+            heartbeat()
+            for answer, text in prepare_redacted_text_answers(batch):
+                yield (answer.id, answer.question_id), text
+
+    def write(results):
+        heartbeat(force=True)
+        TextAnswerEmbedding.objects.bulk_create(
+            [
+                TextAnswerEmbedding(
+                    text_answer_id=answer_id,
+                    survey_id=survey_id,
+                    question_id=question_id,
+                    embedding=vector,
+                )
+                for (answer_id, question_id), vector in results
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    try:
+        stats = dispatch_embeddings(source(), write)
+    except RunSuperseded:
+        raise
+    except Exception:
+        logger.exception("Embedding failed for survey %s", survey_id)
+        raise
+
+    logger.info(
+        "Embedded %s/%s answers for survey %s in %.1fs (%.1f texts/s, %s requests, %s failed)",
+        stats.embedded, stats.texts, survey_id, stats.seconds,
+        stats.texts_per_second, stats.requests, stats.failed,
+    )
+
+    complete_stage(survey_id, "embed", started, run=run, embedded=stats.embedded, failed=stats.failed)
+
+    return survey_id
+
+
+@shared_task(queue="embeddings")
+def embed_response_text_answers(response_id: int):
+    """
+    Optional incremental embedding task.
+    """
+    embed_responses_text_answers([response_id])
+
+
+@shared_task(queue="embeddings")
+def embed_responses_text_answers(response_ids: list[int]):
+    """
+    Embed the TEXT answers of a batch of responses in one embedding call per
+    EMBEDDING_BATCH_SIZE answers. Fed by the submission queue below.
+    """
+
+    answers = (
+        TextAnswer.objects.filter(
+            response_id__in=response_ids,
+            question__type=Question.Type.TEXT,
+            embedding__isnull=True,
+        )
+        .exclude(text="")
+        .exclude(text__regex=r"^\s*$")
+        .annotate(survey_id=F("response__survey_id"))
+        .only("id", "question_id", "response", "text", "redacted_text", "pii_entities")
+        .order_by("id")
+    )
+
     embedding_batch_size = getattr(settings, "EMBEDDING_BATCH_SIZE", 64)
 
-    for batch in chunked(missing_answers.iterator(chunk_size=1000), embedding_batch_size):
+    for batch in chunked(answers, embedding_batch_size):
         items = prepare_redacted_text_answers(batch)
 
         if not items:
             continue
 
         texts = [text for _, text in items]
-
-        try:
-            vectors = embed_texts(texts)
-        except Exception:
-            logger.exception("Embedding failed for survey %s", survey_id)
-            raise
+        vectors = embed_texts(texts)
 
         embeddings_to_create = []
 
@@ -320,7 +706,7 @@ def ensure_survey_text_embeddings(survey_id: int):
             embeddings_to_create.append(
                 TextAnswerEmbedding(
                     text_answer_id=answer.id,
-                    survey_id=survey_id,
+                    survey_id=answer.survey_id,
                     question_id=answer.question_id,
                     embedding=vector,
                 )
@@ -328,106 +714,108 @@ def ensure_survey_text_embeddings(survey_id: int):
 
         TextAnswerEmbedding.objects.bulk_create(
             embeddings_to_create,
-            batch_size=len(embeddings_to_create),
+            batch_size=embedding_batch_size,
             ignore_conflicts=True,
         )
 
-    return survey_id
 
+# ======================
+# Submission embedding queue
+# ======================
 
-@shared_task(queue="embeddings")
-def embed_response_text_answers(response_id: int):
+# Submissions push their response id onto a Redis list; a full batch is
+# dispatched straight away and stragglers are flushed after a short delay,
+# so a rush of submissions costs one embedding task per batch, not per response.
+
+EMBEDDING_QUEUE_COALESCE_KEY = "survey:embedding-queue"
+
+
+def _embedding_queue_key() -> str:
+    return cache.make_key("survey:embedding-queue")
+
+
+def _pop_embedding_batch(redis, size: int) -> list[int]:
+    key = _embedding_queue_key()
+    with redis.pipeline() as pipe:
+        pipe.lrange(key, 0, size - 1)
+        pipe.ltrim(key, size, -1)
+        response_ids, _ = pipe.execute()
+    return [int(response_id) for response_id in response_ids]
+
+
+def enqueue_response_embedding(response_id: int) -> None:
     """
-    Optional incremental embedding task.
+    Queue a submitted response for embedding. Call after commit.
     """
+    batch_size = getattr(settings, "SURVEY_EMBEDDING_QUEUE_BATCH_SIZE", 32)
+    flush_ms = getattr(settings, "SURVEY_EMBEDDING_QUEUE_FLUSH_MS", 2000)
 
     try:
-        response = Response.objects.get(pk=response_id)
-    except Response.DoesNotExist:
-        return
+        redis = get_redis_connection("default")
+        queued = redis.rpush(_embedding_queue_key(), response_id)
 
-    answers = (
-        TextAnswer.objects.filter(
-            response=response,
-            question__type=Question.Type.TEXT,
-            embedding__isnull=True,
-        )
-        .exclude(text="")
-        .exclude(text__regex=r"^\s*$")
-        .only("id", "question_id", "response", "text", "redacted_text", "pii_entities")
-    )
-
-    items = prepare_redacted_text_answers(answers)
-
-    if not items:
-        return
+        if queued >= batch_size:
+            batch = _pop_embedding_batch(redis, batch_size)
+            if batch:
+                embed_responses_text_answers.delay(batch)
+        else:
+            schedule_coalesced(flush_response_embedding_queue, EMBEDDING_QUEUE_COALESCE_KEY, flush_ms)
 
-    texts = [text for _, text in items]
-    vectors = embed_texts(texts)
+    except Exception:
+        logger.exception("Could not queue response %s for embedding", response_id)
+        embed_response_text_answers.delay(response_id)
 
-    embeddings_to_create = []
 
-    for (answer, _text), vector in zip(items, vectors):
-        if not vector:
-            continue
+@shared_task
+def flush_response_embedding_queue():
+    """
+    Dispatch whatever is left in the submission embedding queue.
+    """
+    release_coalesced(EMBEDDING_QUEUE_COALESCE_KEY)
 
-        embeddings_to_create.append(
-            TextAnswerEmbedding(
-                text_answer_id=answer.id,
-                survey_id=response.survey_id,
-                question_id=answer.question_id,
-                embedding=vector,
-            )
-        )
+    batch_size = getattr(settings, "SURVEY_EMBEDDING_QUEUE_BATCH_SIZE", 32)
+    redis = get_redis_connection("default")
 
-    TextAnswerEmbedding.objects.bulk_create(
-        embeddings_to_create,
-        batch_size=len(embeddings_to_create),
-        ignore_conflicts=True,
-    )
+    while batch := _pop_embedding_batch(redis, batch_size):
+        embed_responses_text_answers.delay(batch)
 
 
 # ======================
-# Clustering stage
+# Clustering
 # ======================
 
-@shared_task(queue="survey_summary")
-def cluster_survey_text_answers(survey_id: int):
-    """
-    Clusters text-answer embeddings per TEXT question.
+def cluster_question_text_answers(survey_id: int, question: Question, heartbeat=None) -> dict | None:
     """
+    Clusters the text-answer embeddings of one TEXT question.
 
-    questions = Question.objects.filter(
-        page__survey_id=survey_id,
-        type=Question.Type.TEXT,
-    ).order_by("page__number", "number")
+    Returns the clustering metrics, or None if the question has too few
+    embeddings to cluster. ``heartbeat`` is a pipeline_heartbeat callable.
+    """
 
     min_text_answers = getattr(settings, "CLUSTER_MIN_TEXT_ANSWERS", 200)
 
-    for question in questions:
-        embedding_count = TextAnswerEmbedding.objects.filter(
-            survey_id=survey_id,
-            question=question,
-        ).count()
-
-        if embedding_count == 0:
-            continue
+    embedding_count = TextAnswerEmbedding.objects.filter(
+        survey_id=survey_id,
+        question=question,
+    ).count()
 
-        if embedding_count < min_text_answers:
-            logger.info(
-                "Skipping clustering for question %s because it has only %s embeddings",
-                question.id,
-                embedding_count,
-            )
-            continue
+    if embedding_count == 0:
+        return None
 
-        cluster_question_embeddings(
-            survey_id=survey_id,
-            question=question,
-            embedding_count=embedding_count,
+    if embedding_count < min_text_answers:
+        logger.info(
+            "Skipping clustering for question %s because it has only %s embeddings",
+            question.id,
+            embedding_count,
         )
+        return None
 
-    return survey_id
+    return cluster_question_embeddings(
+        survey_id=survey_id,
+        question=question,
+        embedding_count=embedding_count,
+        heartbeat=heartbeat,
+    )
 
 
 def choose_number_of_clusters(embedding_count: int) -> int:
@@ -457,177 +845,274 @@ def cluster_question_embeddings(
         survey_id: int,
         question: Question,
         embedding_count: int,
-):
+        heartbeat=None,
+) -> dict:
     """
     Uses MiniBatchKMeans so that vectors can be processed in batches.
 
     Embeddings are normalized so Euclidean KMeans approximates cosine
-    similarity behavior.
+    similarity behavior. The cluster count is picked by a sweep around
+    choose_number_of_clusters(), and near-duplicate clusters are merged.
+
+    Returns timing and cluster-count metrics for the question.
     """
 
-    n_clusters = choose_number_of_clusters(embedding_count)
+    heartbeat = heartbeat or (lambda force=False: None)
+    block_size = vector_block_size()
+    table = TextAnswerEmbedding._meta.db_table
+    filters = {"survey_id": survey_id, "question_id": question.id}
+    timings = {}
+
+    # One export serves selection, training and assignment; it is removed on exit.
+    started = time.perf_counter()
+    with export_vector_matrix(table, filters, count=embedding_count) as matrix:
+        timings["export"] = time.perf_counter() - started
+        heartbeat()
+
+        started = time.perf_counter()
+        candidates = candidate_cluster_counts(len(matrix), choose_number_of_clusters(len(matrix)))
+        n_clusters, sweep = select_cluster_count(matrix.vectors, candidates)
+        timings["select"] = time.perf_counter() - started
+        heartbeat()
+
+        started = time.perf_counter()
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=block_size,
+            n_init=3,
+            random_state=42,
+        )
 
-    kmeans = MiniBatchKMeans(
-        n_clusters=n_clusters,
-        batch_size=4096,
-        n_init=3,
-        random_state=42,
-    )
+        for _ids, X in matrix.blocks(block_size):
+            kmeans.partial_fit(X)
+            heartbeat()
 
-    embeddings_qs = (
-        TextAnswerEmbedding.objects.filter(
-            survey_id=survey_id,
-            question=question,
+        labels = np.concatenate([kmeans.predict(X) for _ids, X in matrix.blocks(block_size)])
+        timings["train"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        remap, centers, sizes = merge_similar_centroids(
+            kmeans.cluster_centers_,
+            np.bincount(labels, minlength=n_clusters),
         )
-        .order_by("id")
-    )
+        labels = remap[labels]
+        timings["merge"] = time.perf_counter() - started
 
-    # Train in batches.
-    for batch in embeddings_qs.values_list("embedding", flat=True).iterator(chunk_size=4096):
-        if not batch:
-            continue
+        # Representative texts: the answers nearest each centroid, kept per block.
+        started = time.perf_counter()
+        nearest = CentroidTopK(centers, k=REPRESENTATIVE_TEXTS)
+        offset = 0
+        for ids, X in matrix.blocks(block_size):
+            nearest.add(ids, X, labels[offset:offset + len(ids)])
+            offset += len(ids)
 
-        X = np.asarray(batch, dtype=np.float32)
+        examples = load_representative_texts(nearest.ids_by_label())
+        timings["representatives"] = time.perf_counter() - started
 
-        if X.ndim == 1:
-            X = X.reshape(1, -1)
+        started = time.perf_counter()
 
-        if X.shape[0] == 0:
-            continue
+        # Only the run that owns the summary replaces the clusters.
+        heartbeat(force=True)
 
-        X = normalize(X, norm="l2")
-        kmeans.partial_fit(X)
+        # Remove previous clusters for this question.
+        SurveyTextCluster.objects.filter(
+            survey_id=survey_id,
+            question=question,
+        ).delete()
 
-    # Remove previous clusters for this question.
-    SurveyTextCluster.objects.filter(
-        survey_id=survey_id,
-        question=question,
-    ).delete()
+        # Create new cluster rows.
+        clusters = SurveyTextCluster.objects.bulk_create([
+            SurveyTextCluster(
+                survey_id=survey_id,
+                question=question,
+                external_cluster_id=label,
+                centroid=centroid.tolist(),
+                size=int(size),
+                representative_texts=examples.get(label, []),
+            )
+            for label, (centroid, size) in enumerate(zip(centers, sizes))
+        ])
+        cluster_ids = np.array([cluster.id for cluster in clusters], dtype=np.int64)
 
-    # Create new cluster rows.
-    centers = normalize(kmeans.cluster_centers_, norm="l2")
+        # Assign whole blocks.
+        offset = 0
+        for ids, _X in matrix.blocks(block_size):
+            update_from_values(table, "cluster_id", ids, cluster_ids[labels[offset:offset + len(ids)]])
+            offset += len(ids)
 
-    clusters_by_label = {}
+        timings["assign"] = time.perf_counter() - started
 
-    for label, centroid in enumerate(centers):
-        cluster = SurveyTextCluster.objects.create(
-            survey_id=survey_id,
-            question=question,
-            external_cluster_id=int(label),
-            centroid=centroid.tolist(),
-            size=0,
-        )
-        clusters_by_label[int(label)] = cluster
+    logger.info(
+        "Clustered question %s into %s clusters (k=%s) from %s embeddings",
+        question.id,
+        len(clusters),
+        n_clusters,
+        embedding_count,
+    )
 
-    # Assign embeddings to clusters in batches.
-    sizes = Counter()
-    update_buffer = []
+    return {
+        "question_id": question.id,
+        "embeddings": len(labels),
+        "candidates": candidates,
+        "sweep": sweep,
+        "k": n_clusters,
+        "clusters": len(clusters),
+        "merged": n_clusters - len(clusters),
+        "seconds": {name: round(value, 3) for name, value in timings.items()},
+    }
 
-    for embeddings in embeddings_qs.only("id", "embedding").iterator(chunk_size=2000):
-        if not embeddings:
-            continue
 
-        X = np.asarray([item.embedding for item in embeddings], dtype=np.float32)
+def load_representative_texts(embedding_ids_by_label: dict[int, list[int]]) -> dict[int, list[str]]:
+    """
+    Redacted texts for the chosen embeddings, in one query, keyed by label.
+    """
+    embedding_ids = [embedding_id for ids in embedding_ids_by_label.values() for embedding_id in ids]
+
+    texts = dict(
+        TextAnswerEmbedding.objects.filter(id__in=embedding_ids)
+        .values_list("id", "text_answer__redacted_text")
+    )
+
+    examples = {}
+    for label, ids in embedding_ids_by_label.items():
+        cleaned = (normalize_redacted_text(texts.get(embedding_id))[:800] for embedding_id in ids)
+        examples[label] = [text for text in cleaned if text]
 
-        if X.ndim == 1:
-            X = X.reshape(1, -1)
+    return examples
 
-        X = normalize(X, norm="l2")
 
-        labels = kmeans.predict(X)
+def survey_progress(survey_id: int, stage: str):
+    """
+    LLMJobRunner progress callback that stores progress on SurveySummary.
+    """
 
-        for item, label in zip(embeddings, labels):
-            label = int(label)
+    def report(done: int, total: int) -> None:
+        now = timezone.now()
+        SurveySummary.objects.filter(survey_id=survey_id).update(
+            progress={
+                "stage": stage,
+                "done": done,
+                "total": total,
+                "updated_at": now.isoformat(),
+            },
+            heartbeat_at=now,
+        )
 
-            item.cluster_id = clusters_by_label[label].id
-            sizes[label] += 1
-            update_buffer.append(item)
+    return report
 
-        if len(update_buffer) >= 1000:
-            TextAnswerEmbedding.objects.bulk_update(
-                update_buffer,
-                ["cluster_id"],
-                batch_size=1000,
-            )
-            update_buffer = []
 
-    if update_buffer:
-        TextAnswerEmbedding.objects.bulk_update(
-            update_buffer,
-            ["cluster_id"],
-            batch_size=1000,
+def record_clustering_metrics(survey_id: int, **metrics) -> None:
+    """
+    Merge ``metrics`` into SurveySummary.clustering_metrics.
+    """
+    with transaction.atomic():
+        summary = (
+            SurveySummary.objects.select_for_update()
+            .filter(survey_id=survey_id)
+            .only("id", "clustering_metrics")
+            .first()
         )
 
-    # Save cluster sizes.
-    for label, cluster in clusters_by_label.items():
-        cluster.size = sizes.get(label, 0)
-        cluster.save(update_fields=["size", "updated_at"])
+        if summary is None:
+            return
 
-    logger.info(
-        "Clustered question %s into %s clusters from %s embeddings",
-        question.id,
-        n_clusters,
-        embedding_count,
-    )
+        SurveySummary.objects.filter(pk=summary.pk).update(
+            clustering_metrics={**summary.clustering_metrics, **metrics},
+        )
+
+
+def collect_question_metrics(checkpoints: dict) -> dict:
+    """
+    Clustering and labelling metrics of every question, from its checkpoints.
+    """
+    entries = checkpoints.get("questions", {}).values()
+    clustered = [entry["cluster"] for entry in entries if entry.get("cluster")]
+    labelled = [entry["label"] for entry in entries if entry.get("label")]
+
+    return {
+        "clustering": {
+            "questions": [step["metrics"] for step in clustered if step.get("metrics")],
+            "seconds": round(sum(step["seconds"] for step in clustered), 3),
+        },
+        "summarization": {
+            "clusters": sum(step["metrics"]["clusters"] for step in labelled),
+            "llm_calls": sum(step["metrics"]["llm_calls"] for step in labelled),
+            "seconds": round(sum(step["seconds"] for step in labelled), 3),
+        },
+    }
 
 
 # ======================
-# Cluster summarization stage
+# Cluster labelling
 # ======================
 
-@shared_task(queue="survey_summary")
-def summarize_survey_clusters(survey_id: int):
+def label_question_clusters(survey_id: int, question: Question, heartbeat=None, run: int | None = None) -> dict:
     """
-    Uses local Qwen to label and summarize each discovered cluster.
+    Uses local Qwen to label and summarize each discovered cluster of a question.
     """
 
-    questions = Question.objects.filter(
-        page__survey_id=survey_id,
-        type=Question.Type.TEXT,
-    ).order_by("page__number", "number")
-
     max_clusters = getattr(settings, "SURVEY_MAX_CLUSTERS_TO_SUMMARIZE", 30)
+    runner = LLMJobRunner(on_progress=question_progress(survey_id, question.id, "labelling clusters", run=run))
+    labelled = []
 
-    for question in questions:
-        clusters = (
-            SurveyTextCluster.objects.filter(
-                survey_id=survey_id,
-                question=question,
-            )
-            .order_by("-size")[:max_clusters]
+    clusters = (
+        SurveyTextCluster.objects.filter(
+            survey_id=survey_id,
+            question=question,
         )
+        .order_by("-size")[:max_clusters]
+    )
 
-        for cluster in clusters:
-            examples = get_representative_texts(cluster=cluster, limit=12)
+    for rank, cluster in enumerate(clusters):
+        # Picked while clustering; the query is for clusters built before that.
+        examples = cluster.representative_texts or get_representative_texts(
+            cluster=cluster,
+            limit=REPRESENTATIVE_TEXTS,
+        )
 
-            cluster.representative_texts = examples
+        cluster.representative_texts = examples
 
-            if examples:
-                label, summary = generate_cluster_label_and_summary(
-                    question=question,
-                    cluster=cluster,
-                    examples=examples,
-                )
-            else:
-                label = f"Theme {cluster.external_cluster_id}"
-                summary = ""
-
-            cluster.label = label
-            cluster.summary = summary
-
-            cluster.save(
-                update_fields=[
-                    "label",
-                    "summary",
-                    "representative_texts",
-                    "updated_at",
-                ]
+        if examples:
+            # The largest themes are labelled first.
+            job = runner.submit(
+                generate_cluster_label_and_summary,
+                question=question,
+                cluster=cluster,
+                examples=examples,
+                priority=rank,
             )
+        else:
+            job = None
 
-    return survey_id
+        labelled.append((cluster, job))
+
+    results = runner.run()
+    now = timezone.now()
+
+    if heartbeat is not None:
+        heartbeat(force=True)
 
+    for cluster, job in labelled:
+        cluster.updated_at = now
+        if job is None:
+            cluster.label = f"Theme {cluster.external_cluster_id}"
+            cluster.summary = ""
+        else:
+            cluster.label, cluster.summary = results[job]
 
-def get_representative_texts(cluster: SurveyTextCluster, limit: int = 12) -> List[str]:
+    SurveyTextCluster.objects.bulk_update(
+        [cluster for cluster, _ in labelled],
+        ["label", "summary", "representative_texts", "updated_at"],
+        batch_size=500,
+    )
+
+    return {
+        "clusters": len(labelled),
+        "llm_calls": len(results),
+    }
+
+
+def get_representative_texts(cluster: SurveyTextCluster, limit: int = REPRESENTATIVE_TEXTS) -> List[str]:
     """
     Fetches redacted text answers nearest to the cluster centroid.
     """
@@ -734,12 +1219,12 @@ Representative respondent answers:
 # ======================
 
 @shared_task(queue="survey_summary")
-def finalize_survey_summary(survey_id: int):
+def finalize_survey_summary(survey_id: int, run: int | None = None):
     """
     Builds the final SurveySummary from:
     - choice answer aggregation
     - number answer aggregation
-    - clustered text themes
+    - clustered text themes, joined from the question checkpoints
     """
 
     try:
@@ -750,7 +1235,13 @@ def finalize_survey_summary(survey_id: int):
 
     summary, _ = SurveySummary.objects.get_or_create(survey=survey)
 
+    if summary.status == SurveySummary.Status.COMPLETED:
+        return survey_id
+
     try:
+        started = time.perf_counter()
+        start_stage(survey_id, "finalize", run=run)
+
         total_responses = survey.responses.count()
 
         choice_stats = build_choice_stats(survey)
@@ -766,7 +1257,10 @@ def finalize_survey_summary(survey_id: int):
             text_themes=text_themes,
         )
 
-        SurveySummary.objects.filter(pk=summary.pk).update(
+        record_clustering_metrics(survey_id, **collect_question_metrics(get_checkpoints(survey_id)))
+        complete_stage(survey_id, "finalize", started, run=run)
+
+        completed = SurveySummary.objects.filter(pk=summary.pk, **run_filter(run)).update(
             status=SurveySummary.Status.COMPLETED,
             summary=executive_summary,
             choice_stats=choice_stats,
@@ -778,17 +1272,26 @@ def finalize_survey_summary(survey_id: int):
             model_name=getattr(settings, "LOCAL_QWEN_MODEL", ""),
             prompt_version="embed-cluster-v1",
             completed_at=timezone.now(),
+            heartbeat_at=timezone.now(),
             error="",
         )
 
+        if not completed:
+            raise RunSuperseded(f"Survey {survey_id} summary run {run} was superseded")
+
         logger.info("Completed survey summary for survey %s", survey_id)
 
+    except RunSuperseded:
+        raise
+
     except Exception as exc:
         logger.exception("Failed to finalize summary for survey %s", survey_id)
 
-        SurveySummary.objects.filter(pk=summary.pk).update(
+        attempts = {"attempts": run} if run is not None else {}
+        SurveySummary.objects.filter(pk=summary.pk, **attempts).update(
             status=SurveySummary.Status.FAILED,
             error=str(exc)[:10000],
+            heartbeat_at=timezone.now(),
         )
 
         raise
@@ -799,9 +1302,10 @@ def finalize_survey_summary(survey_id: int):
 # ======================
 
 def build_choice_stats(survey: Survey):
-    stats = []
-
-    questions = (
+    """
+    Answer counts per choice for every choice question, from one grouped query.
+    """
+    questions = list(
         Question.objects.filter(
             page__survey=survey,
             type__in=[
@@ -812,14 +1316,20 @@ def build_choice_stats(survey: Survey):
         .order_by("page__number", "number")
     )
 
-    for question in questions:
-        rows = list(
-            ChoiceAnswer.objects.filter(question=question)
-            .values("choice_id", "choice__text")
+    rows_by_question = {question.id: [] for question in questions}
+
+    for row in (
+            ChoiceAnswer.objects.filter(question_id__in=list(rows_by_question))
+            .values("question_id", "choice_id", "choice__text")
             .annotate(total=Count("id"))
-            .order_by("-total")
-        )
+            .order_by("question_id", "-total", "choice_id")
+    ):
+        rows_by_question[row["question_id"]].append(row)
 
+    stats = []
+
+    for question in questions:
+        rows = rows_by_question[question.id]
         total_answers = sum(row["total"] for row in rows)
 
         choices = []
@@ -852,62 +1362,121 @@ def build_choice_stats(survey: Survey):
     return stats
 
 
-def build_number_stats(survey: Survey):
-    """
-    Basic numeric aggregation for NUMBER questions.
+NUMBER_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+# Answers are cleaned the way people type numbers ("KES 1,200", "~35"):
+# everything but digits, '.' and '-' is dropped, and what is left must be a
+# plain decimal. Overlong values are skipped rather than overflowing the cast.
+NUMBER_STATS_SQL = r"""
+    WITH cleaned AS (
+        SELECT question_id, regexp_replace(text, '[^0-9.-]', '', 'g') AS value
+        FROM "TextAnswer"
+        WHERE question_id = ANY(%(question_ids)s)
+    ),
+    numbers AS (
+        SELECT question_id, value::double precision AS value
+        FROM cleaned
+        WHERE value ~ '^-?([0-9]+\.?[0-9]*|\.[0-9]+)$' AND length(value) <= 300
+    ),
+    stats AS (
+        SELECT
+            question_id,
+            COUNT(*) AS count,
+            AVG(value) AS average,
+            MIN(value) AS min,
+            MAX(value) AS max,
+            STDDEV_SAMP(value) AS stddev,
+            percentile_cont(%(percentiles)s::double precision[]) WITHIN GROUP (ORDER BY value) AS percentiles
+        FROM numbers
+        GROUP BY question_id
+    ),
+    histogram AS (
+        SELECT
+            n.question_id,
+            CASE
+                WHEN s.max > s.min THEN LEAST(width_bucket(n.value, s.min, s.max, %(buckets)s), %(buckets)s)
+                ELSE 1
+            END AS bucket,
+            COUNT(*) AS count
+        FROM numbers n
+        JOIN stats s USING (question_id)
+        GROUP BY 1, 2
+    )
+    SELECT
+        s.question_id, s.count, s.average, s.min, s.max, s.stddev, s.percentiles,
+        (SELECT json_object_agg(h.bucket, h.count) FROM histogram h WHERE h.question_id = s.question_id)
+    FROM stats s
+"""
 
-    For very large datasets, consider using SQL casting/aggregation instead.
-    """
 
-    stats = []
+def _histogram(min_value: float, max_value: float, counts: dict, buckets: int) -> list[dict]:
+    if max_value <= min_value:
+        return [{"from": min_value, "to": max_value, "count": sum(counts.values())}]
 
-    questions = Question.objects.filter(
-        page__survey=survey,
-        type=Question.Type.NUMBER,
-    ).order_by("page__number", "number")
+    width = (max_value - min_value) / buckets
+    return [
+        {
+            "from": round(min_value + index * width, 4),
+            "to": round(min_value + (index + 1) * width, 4),
+            "count": int(counts.get(str(index + 1), 0)),
+        }
+        for index in range(buckets)
+    ]
 
-    for question in questions:
-        count = 0
-        total = 0.0
-        min_value = None
-        max_value = None
-
-        values = TextAnswer.objects.filter(question=question).values_list(
-            "text",
-            flat=True,
-        )
 
-        for raw in values.iterator(chunk_size=2000):
-            cleaned = re.sub(r"[^\d.\-]", "", raw or "")
+def build_number_stats(survey: Survey):
+    """
+    Count, mean, spread, percentiles and a histogram for every NUMBER
+    question, parsed and aggregated in one SQL statement.
+    """
+    questions = list(
+        Question.objects.filter(
+            page__survey=survey,
+            type=Question.Type.NUMBER,
+        ).order_by("page__number", "number")
+    )
 
-            if not cleaned:
-                continue
+    if not questions:
+        return []
 
-            try:
-                value = float(cleaned)
-            except ValueError:
-                continue
+    buckets = int(getattr(settings, "SURVEY_NUMBER_HISTOGRAM_BUCKETS", 10))
 
-            count += 1
-            total += value
+    with connection.cursor() as cursor:
+        cursor.execute(
+            NUMBER_STATS_SQL,
+            {
+                "question_ids": [question.id for question in questions],
+                "percentiles": list(NUMBER_PERCENTILES),
+                "buckets": buckets,
+            },
+        )
+        rows = {row[0]: row[1:] for row in cursor.fetchall()}
 
-            if min_value is None or value < min_value:
-                min_value = value
+    stats = []
 
-            if max_value is None or value > max_value:
-                max_value = value
+    for question in questions:
+        if question.id not in rows:
+            continue
 
-        if count:
-            stats.append(
-                {
-                    "question_id": question.id,
-                    "question": question.text,
-                    "count": count,
-                    "average": round(total / count, 2),
-                    "min": min_value,
-                    "max": max_value,
-                }
-            )
+        count, average, min_value, max_value, stddev, percentiles, histogram = rows[question.id]
+        percentiles = dict(zip(NUMBER_PERCENTILES, percentiles))
+
+        stats.append(
+            {
+                "question_id": question.id,
+                "question": question.text,
+                "count": count,
+                "average": round(average, 2),
+                "min": min_value,
+                "max": max_value,
+                "stddev": round(stddev, 2) if stddev is not None else None,
+                "median": percentiles[0.5],
+                "percentiles": {
+                    f"p{round(fraction * 100)}": value for fraction, value in percentiles.items()
+                },
+                "histogram": _histogram(min_value, max_value, histogram or {}, buckets),
+            }
+        )
 
     return stats
 
@@ -920,102 +1489,118 @@ def build_text_themes(survey: Survey):
     """
     Builds qualitative summaries per TEXT question.
 
+    Themes already built by summarize_survey_question are read from the
+    checkpoints; any question without one is summarized here, side by side.
     If clusters exist, it uses cluster summaries.
     If not, it falls back to sampled direct summarization.
     """
 
-    results = []
-    processed_total = 0
-    sampled_any = False
+    questions = list(
+        Question.objects.filter(
+            page__survey=survey,
+            type=Question.Type.TEXT,
+        ).order_by("page__number", "number")
+    )
 
-    questions = Question.objects.filter(
-        page__survey=survey,
-        type=Question.Type.TEXT,
-    ).order_by("page__number", "number")
+    done = get_checkpoints(survey.id).get("questions", {})
+    missing = [question for question in questions if "summary" not in done.get(str(question.id), {})]
 
-    max_clusters = getattr(settings, "SURVEY_MAX_CLUSTERS_TO_SUMMARIZE", 30)
+    built = run_llm_jobs(
+        lambda question: build_question_theme(survey, question),
+        missing,
+        on_progress=survey_progress(survey.id, "summarizing questions"),
+    )
+    built = dict(zip([question.id for question in missing], built))
 
-    for question in questions:
-        clusters = list(
-            SurveyTextCluster.objects.filter(
-                survey=survey,
-                question=question,
-            )
-            .exclude(summary="")
-            .order_by("-size")[:max_clusters]
-        )
+    themes = [
+        built[question.id] if question.id in built else done[str(question.id)]["summary"]["theme"]
+        for question in questions
+    ]
 
-        if clusters:
-            cluster_json = []
-            cluster_lines = []
+    results = [theme for theme in themes if theme]
+    processed_total = sum(theme["processed_answers"] for theme in results)
+    sampled_any = any(theme["sampled"] for theme in results)
 
-            for cluster in clusters:
-                label = cluster.label or f"Theme {cluster.external_cluster_id}"
+    return results, processed_total, sampled_any
 
-                cluster_lines.append(
-                    f"Theme: {label}\n"
-                    f"Size: {cluster.size}\n"
-                    f"Summary: {cluster.summary}"
-                )
 
-                cluster_json.append(
-                    {
-                        "cluster_id": cluster.external_cluster_id,
-                        "label": label,
-                        "size": cluster.size,
-                        "summary": cluster.summary,
-                        "representative_texts": cluster.representative_texts[:5],
-                    }
-                )
+def build_question_theme(survey: Survey, question: Question) -> dict | None:
+    """
+    Qualitative summary for one TEXT question, or None if it has no answers.
+    """
 
-            if len(cluster_lines) == 1:
-                question_summary = clusters[0].summary
-            else:
-                question_summary = reduce_cluster_summaries(
-                    question=question,
-                    cluster_lines=cluster_lines,
-                )
+    max_clusters = getattr(settings, "SURVEY_MAX_CLUSTERS_TO_SUMMARIZE", 30)
 
-            processed = TextAnswerEmbedding.objects.filter(
-                survey=survey,
-                question=question,
-            ).count()
+    clusters = list(
+        SurveyTextCluster.objects.filter(
+            survey=survey,
+            question=question,
+        )
+        .exclude(summary="")
+        .order_by("-size")[:max_clusters]
+    )
+
+    if clusters:
+        cluster_json = []
+        cluster_lines = []
+
+        for cluster in clusters:
+            label = cluster.label or f"Theme {cluster.external_cluster_id}"
+
+            cluster_lines.append(
+                f"Theme: {label}\n"
+                f"Size: {cluster.size}\n"
+                f"Summary: {cluster.summary}"
+            )
 
-            results.append(
+            cluster_json.append(
                 {
-                    "question_id": question.id,
-                    "question": question.text,
-                    "summary": question_summary,
-                    "processed_answers": processed,
-                    "sampled": False,
-                    "clusters": cluster_json,
+                    "cluster_id": cluster.external_cluster_id,
+                    "label": label,
+                    "size": cluster.size,
+                    "summary": cluster.summary,
+                    "representative_texts": cluster.representative_texts[:5],
                 }
             )
 
-            processed_total += processed
-
+        if len(cluster_lines) == 1:
+            question_summary = clusters[0].summary
         else:
-            summary, processed, sampled = summarize_small_text_question(
-                survey=survey,
+            question_summary = reduce_cluster_summaries(
                 question=question,
+                cluster_lines=cluster_lines,
             )
 
-            if summary:
-                results.append(
-                    {
-                        "question_id": question.id,
-                        "question": question.text,
-                        "summary": summary,
-                        "processed_answers": processed,
-                        "sampled": sampled,
-                        "clusters": [],
-                    }
-                )
+        processed = TextAnswerEmbedding.objects.filter(
+            survey=survey,
+            question=question,
+        ).count()
 
-                processed_total += processed
-                sampled_any = sampled_any or sampled
+        return {
+            "question_id": question.id,
+            "question": question.text,
+            "summary": question_summary,
+            "processed_answers": processed,
+            "sampled": False,
+            "clusters": cluster_json,
+        }
+
+    summary, processed, sampled = summarize_small_text_question(
+        survey=survey,
+        question=question,
+    )
 
-    return results, processed_total, sampled_any
+    if not summary:
+        return None
+
+    return {
+        "question_id": question.id,
+        "question": question.text,
+        "summary": summary,
+        "processed_answers": processed,
+        "sampled": sampled,
+        "clusters": [],
+    }
 
 
 # ======================
@@ -1051,32 +1636,19 @@ def summarize_small_text_question(survey: Survey, question: Question):
         queryset = queryset.filter(id__mod=step)
         sampled = True
 
-    summaries = []
-    processed = 0
-
     batch_size = getattr(settings, "SURVEY_TEXT_BATCH_SIZE", 100)
     reduce_group_size = 8
 
-    for batch in chunked(redacted_text_answers(queryset), batch_size):
-        summary = summarize_answer_batch_json(
-            question=question,
-            answers=batch,
-        )
-
-        if summary:
-            summaries.append(summary)
-            processed += len(batch)
+    batches = list(chunked(redacted_text_answers(queryset), batch_size))
 
-        while len(summaries) >= reduce_group_size:
-            head = summaries[:reduce_group_size]
-            tail = summaries[reduce_group_size:]
+    # Map every batch at once, then reduce level by level.
+    batch_summaries = run_llm_jobs(
+        lambda batch: summarize_answer_batch_json(question=question, answers=batch),
+        batches,
+    )
 
-            summaries = [
-                            reduce_text_summaries_json(
-                                question=question,
-                                summaries=head,
-                            )
-                        ] + tail
+    summaries = [summary for summary in batch_summaries if summary]
+    processed = sum(len(batch) for batch, summary in zip(batches, batch_summaries) if summary)
 
     while len(summaries) > 1:
         groups = [
@@ -1084,13 +1656,10 @@ def summarize_small_text_question(survey: Survey, question: Question):
             for i in range(0, len(summaries), reduce_group_size)
         ]
 
-        summaries = [
-            reduce_text_summaries_json(
-                question=question,
-                summaries=group,
-            )
-            for group in groups
-        ]
+        summaries = run_llm_jobs(
+            lambda group: reduce_text_summaries_json(question=question, summaries=group),
+            groups,
+        )
 
     final_summary = summaries[0] if summaries else ""
 
@@ -1239,7 +1808,7 @@ def build_executive_summary(
     for item in number_stats[:20]:
         lines.append(
             f"Number question: {item['question']}\n"
-            f"Average: {item['average']}, Min: {item['min']}, Max: {item['max']}"
+            f"Average: {item['average']}, Median: {item.get('median')}, Min: {item['min']}, Max: {item['max']}"
         )
 
     for item in text_themes[:20]:
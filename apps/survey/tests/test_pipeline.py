@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.survey import tasks
+from apps.survey.models import Survey, SurveySummary
+
+
+class TestSurveySummaryCheckpoints(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.survey = Survey.objects.create(
+            title='Survey',
+            start_time=now - timedelta(days=7),
+            end_time=now - timedelta(days=1),
+        )
+        self.summary = SurveySummary.objects.create(
+            survey=self.survey,
+            status=SurveySummary.Status.RUNNING,
+        )
+
+    def test_completed_stages_are_skipped(self):
+        tasks.complete_stage(self.survey.id, 'embed', started=0)
+
+        with mock.patch('apps.survey.tasks.dispatch_embeddings') as dispatch:
+            tasks.ensure_survey_text_embeddings(self.survey.id)
+
+        dispatch.assert_not_called()
+
+    def test_reaped_runs_are_retried(self):
+        stale = timezone.now() - timedelta(hours=2)
+        SurveySummary.objects.filter(pk=self.summary.pk).update(heartbeat_at=stale)
+
+        self.assertEqual(tasks.reap_stuck_survey_summaries(), {'reaped': 1})
+        self.summary.refresh_from_db()
+        self.assertEqual(self.summary.status, SurveySummary.Status.FAILED)
+
+        # Retried once the retry delay has passed.
+        SurveySummary.objects.filter(pk=self.summary.pk).update(heartbeat_at=stale)
+        with mock.patch('apps.survey.tasks.start_survey_summary_pipeline.delay') as start:
+            tasks.check_ended_surveys()
+
+        start.assert_called_once_with(self.survey.id)
+
+    def test_superseded_runs_stop_before_writing(self):
+        SurveySummary.objects.filter(pk=self.summary.pk).update(attempts=2)
+
+        with self.assertRaises(tasks.RunSuperseded):
+            tasks.complete_stage(self.survey.id, 'embed', started=0, run=1)
+        with self.assertRaises(tasks.RunSuperseded):
+            tasks.pipeline_heartbeat(self.survey.id, run=1)()
+        self.assertFalse(tasks.stage_completed(self.survey.id, 'embed'))
+
+        tasks.complete_stage(self.survey.id, 'embed', started=0, run=2)
+        self.assertTrue(tasks.stage_completed(self.survey.id, 'embed'))
+
+    def test_batch_loops_keep_the_heartbeat_fresh(self):
+        stale = timezone.now() - timedelta(hours=2)
+        SurveySummary.objects.filter(pk=self.summary.pk).update(heartbeat_at=stale, attempts=1)
+
+        tasks.pipeline_heartbeat(self.survey.id, run=1)()
+
+        self.assertEqual(tasks.reap_stuck_survey_summaries(), {'reaped': 0})
@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.survey.models import Question
+from apps.survey.schema import QuestionSchema, SurveySchema, validate_answers
+
+
+class TestValidateAnswers(SimpleTestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.schema = SurveySchema(
+            id=1,
+            is_active=True,
+            start_time=now,
+            end_time=now,
+            county_id=None,
+            constituency_id=None,
+            ward_id=None,
+            questions={
+                10: QuestionSchema(10, Question.Type.SINGLE_CHOICE, True, None),
+                11: QuestionSchema(11, Question.Type.TEXT, True, 100),
+                12: QuestionSchema(12, Question.Type.NUMBER, False, None),
+            },
+            choices={100: 10, 101: 10},
+        )
+
+    def test_accepts_answers_with_hidden_required_question(self):
+        validate_answers(self.schema, [], [{'question_id': 10, 'choice_id': 101}])
+
+    def test_requires_question_revealed_by_dependency(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_answers(self.schema, [], [{'question_id': 10, 'choice_id': 100}])
+
+    def test_rejects_choice_from_another_question(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_answers(self.schema, [], [{'question_id': 10, 'choice_id': 999}])
+
+    def test_rejects_two_answers_to_single_choice(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_answers(self.schema, [], [
+                {'question_id': 10, 'choice_id': 100},
+                {'question_id': 10, 'choice_id': 101},
+            ])
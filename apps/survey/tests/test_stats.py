@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.survey.benchmark import legacy_choice_stats, legacy_number_stats
+from apps.survey.models import Choice, ChoiceAnswer, Page, Question, Response, Survey, TextAnswer
+from apps.survey.tasks import build_choice_stats, build_number_stats
+
+
+class SurveyStatsMixin:
+    def create_survey(self):
+        now = timezone.now()
+        self.survey = Survey.objects.create(
+            title='Survey',
+            start_time=now - timedelta(days=7),
+            end_time=now - timedelta(days=1),
+        )
+        page = Page.objects.create(survey=self.survey, number=1, title='Page')
+        self.number_question = Question.objects.create(
+            page=page, number=1, type=Question.Type.NUMBER, text='How many?')
+        self.choice_question = Question.objects.create(
+            page=page, number=2, type=Question.Type.SINGLE_CHOICE, text='Which one?')
+        self.empty_question = Question.objects.create(
+            page=page, number=3, type=Question.Type.MULTIPLE_CHOICE, text='Which ones?')
+        self.yes = Choice.objects.create(question=self.choice_question, number=1, text='Yes')
+        self.no = Choice.objects.create(question=self.choice_question, number=2, text='No')
+
+
+class TestSurveyStats(SurveyStatsMixin, TestCase):
+    def setUp(self):
+        self.create_survey()
+        now = timezone.now()
+        answers = ['10', 'KES 20', '~30', '40', 'forty', '']
+        for number, text in enumerate(answers):
+            response = Response.objects.create(survey=self.survey, start_time=now, end_time=now)
+            TextAnswer.objects.create(response=response, question=self.number_question, text=text)
+            ChoiceAnswer.objects.create(
+                response=response,
+                question=self.choice_question,
+                choice=self.yes if number % 3 else self.no,
+            )
+
+    def test_choice_stats(self):
+        with self.assertNumQueries(2):
+            stats = build_choice_stats(self.survey)
+
+        self.assertEqual([item['question_id'] for item in stats], [self.choice_question.id, self.empty_question.id])
+        self.assertEqual(stats[0]['total_answers'], 6)
+        self.assertEqual(
+            [(choice['text'], choice['count'], choice['percent']) for choice in stats[0]['choices']],
+            [('Yes', 4, 66.67), ('No', 2, 33.33)],
+        )
+        self.assertEqual(stats[1]['total_answers'], 0)
+        self.assertEqual(stats[1]['choices'], [])
+
+    def test_number_stats(self):
+        with self.settings(SURVEY_NUMBER_HISTOGRAM_BUCKETS=3), self.assertNumQueries(2):
+            stats = build_number_stats(self.survey)
+
+        self.assertEqual(len(stats), 1)
+        item = stats[0]
+        self.assertEqual((item['count'], item['average'], item['min'], item['max']), (4, 25.0, 10.0, 40.0))
+        self.assertEqual(item['median'], 25.0)
+        self.assertEqual(item['stddev'], 12.91)
+        self.assertEqual(item['percentiles']['p25'], 17.5)
+        self.assertEqual([bucket['count'] for bucket in item['histogram']], [1, 1, 2])
+
+    def test_matches_the_code_it_replaced(self):
+        number, = build_number_stats(self.survey)
+        expected, = legacy_number_stats(self.survey)
+        self.assertEqual(
+            {key: number[key] for key in ('question_id', 'count', 'average', 'min', 'max')},
+            {key: expected[key] for key in ('question_id', 'count', 'average', 'min', 'max')},
+        )
+
+        self.assertEqual(build_choice_stats(self.survey), legacy_choice_stats(self.survey))
@@ -15,16 +15,18 @@ from apps.broadcast.services import BroadcastParticipantService
 from apps.petition.models import Petition
 from apps.posts.models import Post
 from apps.recommendations.follow_recommender import FollowRecommender
+from apps.users.graph import get_graph
 from apps.users.models import ProfileVisit
 from apps.users.querysets import annotate_user_queryset
 from apps.users.serializers import UserSerializer
+from apps.utils.instrumentation import InstrumentedConsumerMixin
 from apps.utils.list_paginator import list_paginator
 from apps.utils.throttles import rate_limit, interaction_rate_limit
 
 User = get_user_model()
 
 
-class UserConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
+class UserConsumer(InstrumentedConsumerMixin, RetrieveModelMixin, GenericAsyncAPIConsumer):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     lookup_field = "pk"
@@ -141,10 +143,16 @@ class UserConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
         if not target.is_active and not current.is_staff:
             raise NotFound("User not found")
 
-        current_blocked_target = current.blocked.filter(pk=target.pk).exists()
-        target_blocked_current = target.blocked.filter(pk=current.pk).exists()
+        graph = get_graph()
+        if graph is not None:
+            blocked = graph.is_blocked_pair(current.pk, target.pk)
+        else:
+            blocked = (
+                current.blocked.filter(pk=target.pk).exists()
+                or target.blocked.filter(pk=current.pk).exists()
+            )
 
-        if current_blocked_target or target_blocked_current:
+        if blocked:
             raise PermissionDenied("You cannot view this profile.")
 
     def exclude_blocked_users(self, queryset: QuerySet) -> QuerySet:
@@ -153,9 +161,16 @@ class UserConsumer(RetrieveModelMixin, GenericAsyncAPIConsumer):
         """
         current = self.scope.get("user")
 
-        if current and current.is_authenticated:
-            queryset = queryset.exclude(pk__in=current.blocked.values("pk"))
-            queryset = queryset.exclude(pk__in=current.blockers.values("pk"))
+        if not current or not current.is_authenticated:
+            return queryset
+
+        graph = get_graph()
+        if graph is not None:
+            hidden_ids = graph.hidden_ids(current.pk)
+            return queryset.exclude(pk__in=hidden_ids.tolist()) if len(hidden_ids) else queryset
+
+        queryset = queryset.exclude(pk__in=current.blocked.values("pk"))
+        queryset = queryset.exclude(pk__in=current.blockers.values("pk"))
 
         return queryset
 
@@ -0,0 +1,461 @@
+"""
+In-memory social graph.
+
+Holds the following / muted / blocked / notifiers relations as CSR adjacency
+(sorted NumPy id arrays), forward and reverse, so membership, neighbour and
+mutual-follow checks on hot paths need no SQL.
+
+rebuild_social_graph() snapshots the relations into Redis (apps.users.tasks
+runs it periodically). Each process loads the current snapshot, then replays
+the change stream written by the m2m_changed signals, at most once per
+SOCIAL_GRAPH_SYNC_INTERVAL_MS. Changes made in the process itself apply
+immediately. Until the first snapshot exists, or while Redis is unreachable,
+get_graph() returns None and callers fall back to the database.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+RELATIONS = ("following", "muted", "blocked", "notifiers")
+DIRECTIONS = ("forward", "reverse")
+ARRAYS = ("sources", "indptr", "targets")
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def _current_key() -> str:
+    return cache.make_key("social-graph:current")
+
+
+def _stream_key() -> str:
+    return cache.make_key("social-graph:changes")
+
+
+def _snapshot_key(generation: int, relation: str, direction: str, array: str) -> str:
+    return cache.make_key(f"social-graph:{generation}:{relation}:{direction}:{array}")
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+# ======================
+# CSR adjacency
+# ======================
+
+class CSRAdjacency:
+    """
+    Out-neighbours per source id: ``targets[indptr[i]:indptr[i + 1]]`` are the
+    sorted targets of ``sources[i]``, and ``sources`` is sorted.
+    """
+
+    def __init__(self, sources: np.ndarray, indptr: np.ndarray, targets: np.ndarray):
+        self.sources = sources
+        self.indptr = indptr
+        self.targets = targets
+
+    @classmethod
+    def from_edges(cls, edges: np.ndarray) -> "CSRAdjacency":
+        """
+        Build from an (n, 2) array of (source, target) rows.
+        """
+        if not len(edges):
+            return cls(EMPTY, np.zeros(1, dtype=np.int64), EMPTY)
+
+        edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+        sources, starts = np.unique(edges[:, 0], return_index=True)
+        indptr = np.append(starts, len(edges)).astype(np.int64)
+
+        return cls(sources, indptr, np.ascontiguousarray(edges[:, 1]))
+
+    def row(self, source: int) -> np.ndarray:
+        index = np.searchsorted(self.sources, source)
+        if index >= len(self.sources) or self.sources[index] != source:
+            return EMPTY
+        return self.targets[self.indptr[index]:self.indptr[index + 1]]
+
+    def contains(self, source: int, target: int) -> bool:
+        row = self.row(source)
+        index = np.searchsorted(row, target)
+        return bool(index < len(row) and row[index] == target)
+
+    def __len__(self):
+        return len(self.targets)
+
+
+class Relation:
+    """
+    One relation, forward and reverse, plus the edges added or removed since
+    the snapshot it was loaded from.
+    """
+
+    def __init__(self, forward: CSRAdjacency, reverse: CSRAdjacency):
+        self.adjacency = {"forward": forward, "reverse": reverse}
+        self.added = {"forward": {}, "reverse": {}}
+        self.removed = {"forward": {}, "reverse": {}}
+        self._lock = threading.Lock()
+
+    def apply(self, action: str, source: int, target: int) -> None:
+        with self._lock:
+            for direction, (a, b) in (("forward", (source, target)), ("reverse", (target, source))):
+                added = self.added[direction].setdefault(a, set())
+                removed = self.removed[direction].setdefault(a, set())
+                if action == "add":
+                    removed.discard(b)
+                    added.add(b)
+                else:
+                    added.discard(b)
+                    removed.add(b)
+
+    def neighbours(self, user_id: int, direction: str = "forward") -> np.ndarray:
+        row = self.adjacency[direction].row(user_id)
+        # apply() may run on another thread; copy the patches before reading them.
+        with self._lock:
+            added = list(self.added[direction].get(user_id, ()))
+            removed = list(self.removed[direction].get(user_id, ()))
+
+        if removed:
+            row = np.setdiff1d(row, np.array(removed, dtype=np.int64), assume_unique=True)
+        if added:
+            row = np.union1d(row, np.array(added, dtype=np.int64))
+        return row
+
+    def contains(self, source: int, target: int) -> bool:
+        if target in self.added["forward"].get(source, ()):
+            return True
+        if target in self.removed["forward"].get(source, ()):
+            return False
+        return self.adjacency["forward"].contains(source, target)
+
+
+class SocialGraph:
+    def __init__(self, relations: dict[str, Relation], generation: int, position: str):
+        self.relations = relations
+        self.generation = generation
+        self.position = position
+
+    def apply(self, relation: str, action: str, edges) -> None:
+        for source, target in edges:
+            self.relations[relation].apply(action, source, target)
+
+    def neighbours(self, relation: str, user_id: int) -> np.ndarray:
+        """
+        Sorted ids ``user_id`` points at: who they follow, mute, block or get
+        notified by.
+        """
+        return self.relations[relation].neighbours(user_id, "forward")
+
+    def inbound(self, relation: str, user_id: int) -> np.ndarray:
+        """
+        Sorted ids pointing at ``user_id``: their followers, muters, blockers.
+        """
+        return self.relations[relation].neighbours(user_id, "reverse")
+
+    def has_edge(self, relation: str, source: int, target: int) -> bool:
+        return self.relations[relation].contains(source, target)
+
+    def is_blocked_pair(self, user_id: int, other_id: int) -> bool:
+        return self.has_edge("blocked", user_id, other_id) or self.has_edge("blocked", other_id, user_id)
+
+    def hidden_ids(self, user_id: int) -> np.ndarray:
+        """
+        Users hidden from ``user_id`` either way: blocked by or blocking them.
+        """
+        return np.union1d(self.neighbours("blocked", user_id), self.inbound("blocked", user_id))
+
+    def mutual_follows(self, user_id: int, other_id: int) -> np.ndarray:
+        """
+        Users ``user_id`` follows who also follow ``other_id``.
+        """
+        return np.intersect1d(
+            self.neighbours("following", user_id),
+            self.inbound("following", other_id),
+            assume_unique=True,
+        )
+
+
+# ======================
+# Snapshots
+# ======================
+
+def _load_edges(relation: str, batch_size: int = 100_000) -> np.ndarray:
+    through = getattr(User, relation).through
+    rows = through.objects.values_list("from_user_id", "to_user_id").order_by()
+
+    chunks = []
+    chunk = []
+    for row in rows.iterator(chunk_size=batch_size):
+        chunk.append(row)
+        if len(chunk) >= batch_size:
+            chunks.append(np.array(chunk, dtype=np.int64))
+            chunk = []
+    if chunk:
+        chunks.append(np.array(chunk, dtype=np.int64))
+
+    return np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.int64)
+
+
+def rebuild_social_graph() -> dict:
+    """
+    Snapshot every relation into Redis under a new generation and point
+    readers at it. Returns the edge count per relation.
+    """
+    redis = _redis()
+
+    # Changes logged after this id are replayed on top of the snapshot; any
+    # that the snapshot already contains are re-applied harmlessly.
+    latest = redis.xrevrange(_stream_key(), count=1)
+    position = latest[0][0].decode() if latest else "0-0"
+
+    previous = _read_current(redis)
+    generation = (previous["generation"] + 1) if previous else 1
+
+    counts = {}
+    pipe = redis.pipeline()
+    for relation in RELATIONS:
+        edges = _load_edges(relation)
+        counts[relation] = len(edges)
+
+        for direction, adjacency in (
+            ("forward", CSRAdjacency.from_edges(edges)),
+            ("reverse", CSRAdjacency.from_edges(edges[:, ::-1])),
+        ):
+            for array in ARRAYS:
+                pipe.set(_snapshot_key(generation, relation, direction, array), getattr(adjacency, array).tobytes())
+    pipe.execute()
+
+    redis.set(_current_key(), json.dumps({"generation": generation, "position": position}))
+
+    if previous:
+        redis.delete(*[
+            _snapshot_key(previous["generation"], relation, direction, array)
+            for relation in RELATIONS for direction in DIRECTIONS for array in ARRAYS
+        ])
+
+    return counts
+
+
+def _read_current(redis) -> dict | None:
+    current = redis.get(_current_key())
+    return json.loads(current) if current else None
+
+
+def _load_snapshot(redis, current: dict) -> SocialGraph | None:
+    keys = [
+        _snapshot_key(current["generation"], relation, direction, array)
+        for relation in RELATIONS for direction in DIRECTIONS for array in ARRAYS
+    ]
+    values = iter(redis.mget(keys))
+
+    relations = {}
+    for relation in RELATIONS:
+        adjacency = {}
+        for direction in DIRECTIONS:
+            arrays = [next(values) for _ in ARRAYS]
+            if any(value is None for value in arrays):
+                # Replaced by a newer generation while we were reading.
+                return None
+            adjacency[direction] = CSRAdjacency(*(np.frombuffer(value, dtype=np.int64) for value in arrays))
+        relations[relation] = Relation(adjacency["forward"], adjacency["reverse"])
+
+    return SocialGraph(relations, current["generation"], current["position"])
+
+
+# ======================
+# Change stream
+# ======================
+
+def relation_for(sender) -> str:
+    """
+    The relation name of an m2m_changed ``sender`` through model.
+    """
+    return next(relation for relation in RELATIONS if getattr(User, relation).through is sender)
+
+
+def changed_edges(sender, instance, action, reverse, pk_set):
+    """
+    (relation, "add" | "remove", [(source, target), ...]) for a post_* m2m
+    change on one of RELATIONS, or None for other actions. Removals use the
+    ids stashed by apps.users.signals.remember_removed_relations.
+    """
+    if action == "post_add":
+        change = "add"
+    elif action in ("post_remove", "post_clear"):
+        change = "remove"
+        pk_set = getattr(instance, "_removed_social_ids", None)
+    else:
+        return None
+
+    if reverse:
+        edges = [(pk, instance.pk) for pk in pk_set or ()]
+    else:
+        edges = [(instance.pk, pk) for pk in pk_set or ()]
+
+    return relation_for(sender), change, edges
+
+
+def _encode_edges(edges) -> str:
+    return ",".join(f"{source}:{target}" for source, target in edges)
+
+
+def _decode_edges(value: str):
+    for pair in value.split(","):
+        if pair:
+            source, target = pair.split(":")
+            yield int(source), int(target)
+
+
+def publish_edges(relation: str, action: str, edges) -> None:
+    """
+    Log an add/remove of ``edges`` for other processes and apply it locally,
+    once the surrounding transaction commits. If Redis is unreachable the
+    change is kept and logged, in order, by the next successful sync.
+    """
+    edges = [(int(source), int(target)) for source, target in edges]
+    if not edges:
+        return
+
+    def publish():
+        with _lock:
+            _state.pending.append({"relation": relation, "action": action, "edges": _encode_edges(edges)})
+
+            graph = _state.graph
+            if graph is not None:
+                graph.apply(relation, action, edges)
+
+            try:
+                _flush_pending(_redis())
+            except RedisError as exc:
+                logger.warning("Could not log social graph change, will retry on next sync: %s", exc)
+
+    transaction.on_commit(publish)
+
+
+def _flush_pending(redis) -> None:
+    """
+    Log the changes this process could not publish yet. Caller holds _lock.
+    """
+    while _state.pending:
+        redis.xadd(
+            _stream_key(),
+            _state.pending[0],
+            maxlen=getattr(settings, "SOCIAL_GRAPH_STREAM_MAXLEN", 100_000),
+            approximate=True,
+        )
+        _state.pending.popleft()
+
+
+def _replay(redis, graph: SocialGraph) -> bool:
+    """
+    Apply logged changes newer than the graph's position. False if some of
+    them may already have been trimmed from the stream.
+    """
+    if graph.position != "0-0":
+        first = redis.xrange(_stream_key(), count=1)
+        if first and _stream_id_lt(graph.position, first[0][0].decode()):
+            return False
+
+    for entry_id, fields in redis.xrange(_stream_key(), min=f"({graph.position}"):
+        graph.apply(
+            fields[b"relation"].decode(),
+            fields[b"action"].decode(),
+            _decode_edges(fields[b"edges"].decode()),
+        )
+        graph.position = entry_id.decode()
+
+    return True
+
+
+def _stream_id_lt(left: str, right: str) -> bool:
+    return tuple(map(int, left.split("-"))) < tuple(map(int, right.split("-")))
+
+
+# ======================
+# Process-wide graph
+# ======================
+
+class _State:
+    graph: SocialGraph | None = None
+    synced_at: float = 0.0
+
+    def __init__(self):
+        # Changes committed here but not logged to the stream yet.
+        self.pending = deque()
+
+
+_state = _State()
+_lock = threading.Lock()
+
+
+def get_graph() -> SocialGraph | None:
+    """
+    This process's graph, synced with Redis at most once per
+    SOCIAL_GRAPH_SYNC_INTERVAL_MS. None before the first snapshot or when
+    Redis cannot be reached.
+    """
+    interval = getattr(settings, "SOCIAL_GRAPH_SYNC_INTERVAL_MS", 1000) / 1000
+
+    if time.monotonic() - _state.synced_at < interval:
+        return _state.graph
+
+    with _lock:
+        if time.monotonic() - _state.synced_at >= interval:
+            try:
+                _sync()
+            except RedisError as exc:
+                # Changes from other processes can't be seen; use the database.
+                logger.warning("Social graph sync failed, falling back to the database: %s", exc)
+                _state.graph = None
+            _state.synced_at = time.monotonic()
+
+    return _state.graph
+
+
+def _sync() -> None:
+    redis = _redis()
+    _flush_pending(redis)
+
+    current = _read_current(redis)
+
+    if current is None:
+        _state.graph = None
+        return
+
+    graph = _state.graph
+    if graph is None or graph.generation != current["generation"]:
+        graph = _load_snapshot(redis, current)
+        if graph is None:
+            return
+
+    if not _replay(redis, graph):
+        # Fell behind the trimmed stream; start over from the snapshot.
+        graph = _load_snapshot(redis, current)
+        if graph is None or not _replay(redis, graph):
+            _state.graph = None
+            return
+
+    _state.graph = graph
+
+
+def reset_graph() -> None:
+    """
+    Drop this process's graph so the next get_graph() reloads it.
+    """
+    with _lock:
+        _state.graph = None
+        _state.synced_at = 0.0
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='followers count'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='following count'),
+        ),
+        migrations.RunSQL(
+            sql="""
+            UPDATE "User" SET following_count = counts.total
+            FROM (SELECT from_user_id, COUNT(*) AS total FROM "User_following" GROUP BY from_user_id) AS counts
+            WHERE "User".id = counts.from_user_id;
+
+            UPDATE "User" SET followers_count = counts.total
+            FROM (SELECT to_user_id, COUNT(*) AS total FROM "User_following" GROUP BY to_user_id) AS counts
+            WHERE "User".id = counts.to_user_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
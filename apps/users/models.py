@@ -96,6 +96,15 @@ class User(AbstractBaseUser, PermissionsMixin):
         through_fields=("visitor", "visited"),
         related_name="profiles_visited",
     )
+    # Maintained from the following m2m_changed signal (apps.users.signals).
+    followers_count = models.PositiveIntegerField(
+        _("followers count"),
+        default=0,
+    )
+    following_count = models.PositiveIntegerField(
+        _("following count"),
+        default=0,
+    )
 
     county = models.ForeignKey(
         County,
@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Exists, OuterRef
+from django.db.models import Exists, OuterRef
 
 from apps.users.models import ProfileVisit
 
@@ -8,13 +8,12 @@ User = get_user_model()
 
 def annotate_user_queryset(queryset, user):
     """
-    Annotate queryset with counts and current-user relation flags.
+    Annotate queryset with current-user relation flags. Follower and
+    following counts are stored on the user row.
 
     This dramatically reduces N+1 queries when serializing user lists.
     """
     queryset = queryset.annotate(
-        following_count=Count("following", distinct=True),
-        followers_count=Count("followers", distinct=True),
         is_followed=Exists(
             User.objects.filter(pk=user.pk, following__pk=OuterRef("pk"))
         ),
@@ -68,15 +68,11 @@ class UserSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_following(obj):
-        if hasattr(obj, "following_count"):
-            return obj.following_count
-        return obj.following.count()
+        return obj.following_count
 
     @staticmethod
     def get_followers(obj):
-        if hasattr(obj, "followers_count"):
-            return obj.followers_count
-        return obj.followers.count()
+        return obj.followers_count
 
     def get_email(self, obj):
         """
@@ -1,12 +1,102 @@
 from django.contrib.auth import user_logged_in, get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from apps.geo.audience import remove_user_audience, update_user_audience
+from apps.users.graph import changed_edges, publish_edges, relation_for
+
 User = get_user_model()
 
+AUDIENCE_FIELDS = {"county", "constituency", "ward", "is_active"}
+
+
 @receiver(user_logged_in)
 def update_last_login(sender, request, user, **kwargs):
     """
     Automatically update last_login field on every successful login.
     """
-    User.objects.filter(pk=user.pk).update(last_login=timezone.now())
\ No newline at end of file
+    User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_regions(sender, instance, update_fields=None, **kwargs):
+    """
+    Stash the stored regions so post_save can tell whether the audience changed.
+    """
+    if update_fields is not None and not AUDIENCE_FIELDS.intersection(update_fields):
+        instance._previous_audience = None
+        return
+
+    previous = None
+    if instance.pk:
+        previous = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("county_id", "constituency_id", "ward_id", "is_active")
+            .first()
+        )
+    instance._previous_audience = previous or (None, None, None, False)
+
+
+@receiver(post_save, sender=User)
+def update_region_audience(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_audience", None)
+    if previous is None:
+        return
+
+    *old_regions, was_active = previous
+    new_regions = (instance.county_id, instance.constituency_id, instance.ward_id)
+
+    if tuple(old_regions) == new_regions and was_active == instance.is_active:
+        return
+
+    update_user_audience(
+        user_id=instance.pk,
+        old_regions=tuple(old_regions),
+        new_regions=new_regions,
+        was_active=was_active,
+        is_active=instance.is_active,
+    )
+
+
+@receiver(post_delete, sender=User)
+def remove_region_audience(sender, instance, **kwargs):
+    remove_user_audience(
+        user_id=instance.pk,
+        regions=(instance.county_id, instance.constituency_id, instance.ward_id),
+    )
+
+
+@receiver(m2m_changed, sender=User.following.through)
+@receiver(m2m_changed, sender=User.muted.through)
+@receiver(m2m_changed, sender=User.blocked.through)
+@receiver(m2m_changed, sender=User.notifiers.through)
+def remember_removed_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    pk_set is empty for clears and unfiltered for removes, so look up the
+    rows that are actually about to go.
+    """
+    if action not in ("pre_remove", "pre_clear"):
+        return
+
+    relation = relation_for(sender)
+    accessor = User._meta.get_field(relation).remote_field.related_name if reverse else relation
+    existing = getattr(instance, accessor).all()
+
+    if action == "pre_remove":
+        existing = existing.filter(pk__in=pk_set or ())
+
+    instance._removed_social_ids = set(existing.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=User.following.through)
+@receiver(m2m_changed, sender=User.muted.through)
+@receiver(m2m_changed, sender=User.blocked.through)
+@receiver(m2m_changed, sender=User.notifiers.through)
+def patch_social_graph(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Log follow / mute / block / notify changes for the in-memory social graph.
+    """
+    changed = changed_edges(sender, instance, action, reverse, pk_set)
+    if changed:
+        publish_edges(*changed)
@@ -0,0 +1,50 @@
+import logging
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from apps.users.graph import rebuild_social_graph
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+@shared_task
+def rebuild_social_graph_snapshot():
+    """
+    Snapshot the follow / mute / block / notify relations for the in-memory social graph.
+    """
+    counts = rebuild_social_graph()
+    logger.info("Rebuilt social graph snapshot: %s", counts)
+    return counts
+
+
+@shared_task
+def reconcile_follow_counts():
+    """
+    Recount followers_count / following_count and repair any drift.
+    """
+    user_table = User._meta.db_table
+    follow_table = User.following.through._meta.db_table
+
+    repaired = 0
+    with connection.cursor() as cursor:
+        for field, column in (("following_count", "from_user_id"), ("followers_count", "to_user_id")):
+            cursor.execute(
+                f"""
+                UPDATE "{user_table}" AS u SET {field} = COALESCE(counts.total, 0)
+                FROM "{user_table}" AS target
+                LEFT JOIN (
+                    SELECT {column} AS user_id, COUNT(*) AS total
+                    FROM "{follow_table}" GROUP BY {column}
+                ) AS counts ON counts.user_id = target.id
+                WHERE u.id = target.id AND u.{field} IS DISTINCT FROM COALESCE(counts.total, 0)
+                """
+            )
+            repaired += cursor.rowcount
+
+    if repaired:
+        logger.warning("Repaired follow count drift on %s rows", repaired)
+    return repaired
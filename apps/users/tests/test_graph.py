@@ -0,0 +1,78 @@
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from redis.exceptions import ConnectionError
+
+from apps.users.graph import CSRAdjacency, Relation, get_graph, rebuild_social_graph, reset_graph
+
+User = get_user_model()
+
+
+class TestCSRAdjacency(SimpleTestCase):
+    def setUp(self):
+        edges = np.array([[3, 9], [1, 5], [3, 2], [1, 4]], dtype=np.int64)
+        self.relation = Relation(CSRAdjacency.from_edges(edges), CSRAdjacency.from_edges(edges[:, ::-1]))
+
+    def test_rows_are_sorted(self):
+        self.assertEqual(self.relation.neighbours(3).tolist(), [2, 9])
+        self.assertEqual(self.relation.neighbours(9, "reverse").tolist(), [3])
+        self.assertEqual(self.relation.neighbours(7).tolist(), [])
+
+    def test_patches_overlay_the_snapshot(self):
+        self.relation.apply("remove", 1, 4)
+        self.relation.apply("add", 1, 8)
+
+        self.assertEqual(self.relation.neighbours(1).tolist(), [5, 8])
+        self.assertEqual(self.relation.neighbours(8, "reverse").tolist(), [1])
+        self.assertFalse(self.relation.contains(1, 4))
+        self.assertTrue(self.relation.contains(1, 8))
+
+
+@override_settings(SOCIAL_GRAPH_SYNC_INTERVAL_MS=0)
+class TestSocialGraph(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_graph()
+        self.alice = User.objects.create(username='alice', email='alice@gmail.com', name='Alice')
+        self.bob = User.objects.create(username='bob', email='bob@gmail.com', name='Bob')
+        self.carol = User.objects.create(username='carol', email='carol@gmail.com', name='Carol')
+
+    def tearDown(self):
+        reset_graph()
+
+    def test_no_graph_before_first_snapshot(self):
+        self.assertIsNone(get_graph())
+
+    def test_snapshot_then_replays_changes(self):
+        self.alice.following.add(self.bob, self.carol)
+        self.bob.followers.add(self.carol)
+        rebuild_social_graph()
+
+        graph = get_graph()
+        self.assertEqual(graph.mutual_follows(self.alice.id, self.bob.id).tolist(), [self.carol.id])
+        self.assertEqual(graph.inbound('following', self.bob.id).tolist(), sorted([self.alice.id, self.carol.id]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.carol.blocked.add(self.alice)
+            self.bob.followers.clear()
+
+        graph = get_graph()
+        self.assertTrue(graph.is_blocked_pair(self.alice.id, self.carol.id))
+        self.assertEqual(graph.hidden_ids(self.alice.id).tolist(), [self.carol.id])
+        self.assertEqual(graph.neighbours('following', self.alice.id).tolist(), [self.carol.id])
+
+    def test_falls_back_while_redis_is_down(self):
+        rebuild_social_graph()
+        self.assertIsNotNone(get_graph())
+
+        with mock.patch('apps.users.graph._redis', side_effect=ConnectionError('connection refused')):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.carol.blocked.add(self.alice)
+            self.assertIsNone(get_graph())
+
+        # The change is logged once Redis is back, so other processes see it too.
+        reset_graph()
+        self.assertTrue(get_graph().is_blocked_pair(self.alice.id, self.carol.id))
@@ -19,3 +19,27 @@ class TestUsersAppModels(TestCase):
     def test_user_representation(self):
         self.assertEqual(self.user, self.user)
 
+
+class TestFollowCounts(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username='alice', email='alice@gmail.com', name='Alice')
+        self.bob = User.objects.create(username='bob', email='bob@gmail.com', name='Bob')
+        self.carol = User.objects.create(username='carol', email='carol@gmail.com', name='Carol')
+
+    def counts(self, user):
+        user.refresh_from_db(fields=['followers_count', 'following_count'])
+        return user.followers_count, user.following_count
+
+    def test_counts_follow_adds_removes_and_clears(self):
+        self.alice.following.add(self.bob, self.carol)
+        self.carol.followers.add(self.bob)
+        self.assertEqual(self.counts(self.alice), (0, 2))
+        self.assertEqual(self.counts(self.carol), (2, 0))
+
+        # Removing someone not followed changes nothing.
+        self.bob.following.remove(self.alice)
+        self.carol.followers.clear()
+
+        self.assertEqual(self.counts(self.alice), (0, 1))
+        self.assertEqual(self.counts(self.bob), (1, 0))
+        self.assertEqual(self.counts(self.carol), (0, 0))
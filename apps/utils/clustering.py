@@ -0,0 +1,187 @@
+"""
+Cluster-count selection and centroid merging for the summary pipelines.
+
+select_cluster_count() fits MiniBatchKMeans for a handful of candidate k on a
+sample of the (L2-normalised) embeddings, in parallel, and keeps the k with the
+best simplified silhouette: each point's distance to its own centroid against
+the nearest other centroid, which is one matrix product per k instead of the
+pairwise distances a full silhouette needs.
+
+merge_similar_centroids() then folds clusters whose centroids are nearly
+parallel into one, so the LLM is not asked to label the same theme twice, and
+CentroidTopK picks each cluster's representative rows in the same pass.
+"""
+
+import numpy as np
+from django.conf import settings
+from joblib import Parallel, delayed
+from sklearn.cluster import MiniBatchKMeans
+
+
+def candidate_cluster_counts(count: int, target: int) -> list[int]:
+    """
+    Candidate k around the size-ladder ``target`` for ``count`` vectors.
+    """
+    sample_size = min(count, getattr(settings, "CLUSTER_SELECTION_SAMPLE_SIZE", 5000))
+    upper = max(2, sample_size // 2)
+
+    candidates = {
+        max(2, min(int(round(target * factor)), upper))
+        for factor in (0.25, 0.5, 0.75, 1.0, 1.5, 2.0)
+    }
+    return sorted(candidates)
+
+
+def simplified_silhouette(X: np.ndarray, centers: np.ndarray, labels: np.ndarray) -> float:
+    """
+    Mean of (b - a) / max(a, b), where a is the distance to the assigned
+    centroid and b the distance to the nearest other centroid.
+    """
+    if len(centers) < 2:
+        return 0.0
+
+    distances = (
+        np.einsum("ij,ij->i", X, X)[:, None]
+        - 2 * X @ centers.T
+        + np.einsum("ij,ij->i", centers, centers)[None, :]
+    )
+    np.sqrt(np.maximum(distances, 0, out=distances), out=distances)
+
+    rows = np.arange(len(X))
+    own = distances[rows, labels].copy()
+    distances[rows, labels] = np.inf
+    nearest_other = distances.min(axis=1)
+
+    denominator = np.maximum(own, nearest_other)
+    scores = np.divide(nearest_other - own, denominator, out=np.zeros_like(own), where=denominator > 0)
+    return float(scores.mean())
+
+
+def _score_cluster_count(sample: np.ndarray, k: int, random_state: int) -> dict:
+    kmeans = MiniBatchKMeans(
+        n_clusters=k,
+        batch_size=min(len(sample), 4096),
+        n_init=3,
+        random_state=random_state,
+    ).fit(sample)
+
+    return {
+        "k": k,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": simplified_silhouette(sample, kmeans.cluster_centers_.astype(np.float32), kmeans.labels_),
+    }
+
+
+def select_cluster_count(vectors: np.ndarray, candidates: list[int], random_state: int = 42) -> tuple[int, list[dict]]:
+    """
+    Pick k from ``candidates`` for the row-normalised ``vectors``.
+
+    Returns (k, sweep), where sweep holds k, inertia and silhouette per candidate.
+    """
+    candidates = sorted(set(candidates))
+    if len(candidates) == 1:
+        return candidates[0], []
+
+    sample_size = min(len(vectors), getattr(settings, "CLUSTER_SELECTION_SAMPLE_SIZE", 5000))
+    rng = np.random.default_rng(random_state)
+    # Sorted indices keep reads from a memmap sequential.
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+
+    sweep = Parallel(n_jobs=getattr(settings, "CLUSTER_SELECTION_JOBS", 4), prefer="threads")(
+        delayed(_score_cluster_count)(sample, k, random_state) for k in candidates
+    )
+
+    # Highest silhouette wins; on a tie the smaller k means fewer LLM calls.
+    best = max(sweep, key=lambda result: (round(result["silhouette"], 3), -result["k"]))
+    return best["k"], sweep
+
+
+def merge_similar_centroids(centers: np.ndarray, sizes: np.ndarray,
+                            threshold: float | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge clusters whose centroids have cosine similarity above ``threshold``.
+    Empty clusters are dropped.
+
+    Returns (remap, centers, sizes): ``remap[old_label]`` is the new label, and
+    the merged centroids are size-weighted means, re-normalised.
+    """
+    threshold = threshold if threshold is not None else getattr(settings, "CLUSTER_MERGE_SIMILARITY", 0.92)
+    sizes = np.asarray(sizes, dtype=np.int64)
+
+    norms = np.linalg.norm(centers, axis=1, keepdims=True)
+    unit = np.divide(centers, norms, out=np.zeros_like(centers), where=norms > 0)
+    similarity = unit @ unit.T
+
+    # Union-find over the pairs above the threshold.
+    parent = np.arange(len(centers))
+
+    def find(label):
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    first, second = np.nonzero(np.triu(similarity > threshold, k=1))
+    for a, b in zip(first, second):
+        if sizes[a] and sizes[b]:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    roots = np.array([find(label) for label in range(len(centers))])
+    kept = [root for root in np.unique(roots) if sizes[roots == root].sum()]
+
+    remap = np.full(len(centers), -1, dtype=np.int64)
+    merged_centers = np.zeros((len(kept), centers.shape[1]), dtype=np.float32)
+    merged_sizes = np.zeros(len(kept), dtype=np.int64)
+
+    for new_label, root in enumerate(kept):
+        members = roots == root
+        remap[members] = new_label
+        merged_sizes[new_label] = sizes[members].sum()
+        merged_centers[new_label] = (unit[members] * sizes[members, None]).sum(axis=0)
+
+    norms = np.linalg.norm(merged_centers, axis=1, keepdims=True)
+    np.divide(merged_centers, norms, out=merged_centers, where=norms > 0)
+
+    return remap, merged_centers, merged_sizes
+
+
+class CentroidTopK:
+    """
+    Running top-k rows per cluster by cosine similarity to its centroid.
+
+    Feed it block by block; only k candidates per cluster are kept between
+    blocks, so memory stays at k * clusters however many rows pass through.
+    """
+
+    def __init__(self, centers: np.ndarray, k: int):
+        self.centers = centers
+        self.k = k
+        self.labels = np.empty(0, dtype=np.int64)
+        self.scores = np.empty(0, dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def add(self, ids: np.ndarray, X: np.ndarray, labels: np.ndarray) -> None:
+        scores = np.einsum("ij,ij->i", X, self.centers[labels])
+
+        labels = np.concatenate((self.labels, labels))
+        scores = np.concatenate((self.scores, scores))
+        ids = np.concatenate((self.ids, ids))
+
+        # Group by label, best score first, then keep the first k of each group.
+        order = np.lexsort((-scores, labels))
+        labels, scores, ids = labels[order], scores[order], ids[order]
+        rank = np.arange(len(labels)) - np.searchsorted(labels, labels)
+        keep = rank < self.k
+
+        self.labels, self.scores, self.ids = labels[keep], scores[keep], ids[keep]
+
+    def ids_by_label(self) -> dict[int, list[int]]:
+        """
+        {label: [id, ...]}, nearest first.
+        """
+        result = {}
+        for label, row_id in zip(self.labels.tolist(), self.ids.tolist()):
+            result.setdefault(label, []).append(row_id)
+        return result
@@ -0,0 +1,23 @@
+from django.core.cache import cache
+
+
+def schedule_coalesced(task, key: str, interval_ms: int, *args) -> bool:
+    """
+    Run ``task`` at most once per ``interval_ms`` for ``key``.
+
+    The first call in a window schedules the task for the end of the window;
+    later calls in the same window ride along with it. The task must call
+    release_coalesced(key) before it reads state, so changes landing while it
+    runs schedule the next window.
+    """
+    interval = max(interval_ms, 1) / 1000
+
+    # cache timeouts are whole seconds; the lock normally goes away with the task.
+    if cache.add(f"coalesce:{key}", 1, timeout=int(interval) + 5):
+        task.apply_async(args, countdown=interval)
+        return True
+    return False
+
+
+def release_coalesced(key: str) -> None:
+    cache.delete(f"coalesce:{key}")
@@ -1,7 +1,15 @@
+import hashlib
+import logging
 import re
 
+import numpy as np
 import requests
+import requests.adapters
 from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
 
 try:
     from apps.utils.pii import redact_text
@@ -66,9 +74,143 @@ def clean_text_for_embedding(value: str) -> str:
     return normalize_text_for_embedding(text)
 
 
+# ======================
+# Embedding cache
+# ======================
+
+# Bump when the stored vector format changes.
+EMBEDDING_CACHE_VERSION = "v1"
+
+_SESSION = None
+
+
+def _get_session() -> requests.Session:
+    """
+    Shared keep-alive session, so batches reuse connections to the model server.
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        pool_size = getattr(settings, "EMBEDDING_HTTP_POOL_SIZE", 10)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = session
+
+    return _SESSION
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"embedding:{EMBEDDING_CACHE_VERSION}:{model}:{digest}"
+
+
+def _stats_key() -> str:
+    return cache.make_key("embedding:cache-stats")
+
+
+def _record_cache_stats(hits: int, misses: int, deduplicated: int) -> None:
+    try:
+        with get_redis_connection("default").pipeline() as pipe:
+            pipe.hincrby(_stats_key(), "hits", hits)
+            pipe.hincrby(_stats_key(), "misses", misses)
+            pipe.hincrby(_stats_key(), "deduplicated", deduplicated)
+            pipe.hincrby(_stats_key(), "model_calls", 1 if misses else 0)
+            pipe.execute()
+    except Exception:
+        logger.debug("Could not record embedding cache stats", exc_info=True)
+
+
+def embedding_cache_stats() -> dict:
+    """
+    Cumulative cache counters and hit rate since the last reset.
+
+    hits/misses count unique texts per call; deduplicated counts repeats
+    inside a batch that were embedded once.
+    """
+    raw = get_redis_connection("default").hgetall(_stats_key())
+    stats = {
+        field: int(raw.get(field.encode(), 0))
+        for field in ("hits", "misses", "deduplicated", "model_calls")
+    }
+
+    looked_up = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / looked_up if looked_up else 0.0
+    return stats
+
+
+def reset_embedding_cache_stats() -> None:
+    get_redis_connection("default").delete(_stats_key())
+
+
 def embed_texts(texts: list[str]) -> list[list[float]]:
     """
-    Embed multiple texts using a local embedding model.
+    Embed multiple texts, serving repeats from the embedding cache.
+
+    Texts are whitespace-normalized and keyed by (model, sha256(text)).
+    Duplicates within the batch are embedded once, and only cache misses are
+    sent to the model. Vectors are returned in input order.
+    """
+
+    if not texts:
+        return []
+
+    model = getattr(settings, "EMBEDDING_MODEL", "bge-m3")
+    normalized = [" ".join(str(text or "").split()) for text in texts]
+    unique = list(dict.fromkeys(normalized))
+
+    if not getattr(settings, "EMBEDDING_CACHE_ENABLED", True):
+        vectors = dict(zip(unique, _embed_uncached(unique)))
+        return [vectors.get(text, []) for text in normalized]
+
+    keys = {text: embedding_cache_key(model, text) for text in unique}
+
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception:
+        logger.warning("Embedding cache unavailable", exc_info=True)
+        cached = {}
+
+    vectors = {}
+    for text, key in keys.items():
+        if key in cached:
+            vectors[text] = np.frombuffer(cached[key], dtype=np.float32).tolist()
+
+    missing = [text for text in unique if text not in vectors]
+
+    if missing:
+        fresh = _embed_uncached(missing)
+        to_cache = {}
+
+        for text, vector in zip(missing, fresh):
+            vectors[text] = vector
+
+            if vector:
+                to_cache[keys[text]] = np.asarray(vector, dtype=np.float32).tobytes()
+
+        if to_cache:
+            try:
+                cache.set_many(
+                    to_cache,
+                    timeout=getattr(settings, "EMBEDDING_CACHE_TIMEOUT", 60 * 60 * 24 * 30),
+                )
+            except Exception:
+                logger.warning("Could not store embeddings in cache", exc_info=True)
+
+    _record_cache_stats(
+        hits=len(unique) - len(missing),
+        misses=len(missing),
+        deduplicated=len(normalized) - len(unique),
+    )
+
+    return [vectors.get(text, []) for text in normalized]
+
+
+def _embed_uncached(texts: list[str]) -> list[list[float]]:
+    """
+    Embed texts with the configured model server.
 
     Supports:
     - Ollama /api/embed
@@ -80,6 +222,7 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
 
     backend = getattr(settings, "EMBEDDING_BACKEND", "ollama")
     model = getattr(settings, "EMBEDDING_MODEL", "bge-m3")
+    session = _get_session()
 
     if backend == "openai":
         base_url = getattr(
@@ -90,7 +233,7 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
 
         api_key = getattr(settings, "EMBEDDING_API_KEY", "local")
 
-        response = requests.post(
+        response = session.post(
             f"{base_url.rstrip('/')}/embeddings",
             json={
                 "model": model,
@@ -100,7 +243,7 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
             },
-            timeout=180,
+            timeout=getattr(settings, "EMBEDDING_REQUEST_TIMEOUT", 180),
         )
         response.raise_for_status()
 
@@ -112,13 +255,13 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
     # Default: Ollama
     base_url = getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")
 
-    response = requests.post(
+    response = session.post(
         f"{base_url}/api/embed",
         json={
             "model": model,
             "input": texts,
         },
-        timeout=180,
+        timeout=getattr(settings, "EMBEDDING_REQUEST_TIMEOUT", 180),
     )
 
     # Fallback for older Ollama versions.
@@ -139,13 +282,13 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
 
 
 def _embed_ollama_legacy(text: str, model: str, base_url: str) -> list[float]:
-    response = requests.post(
+    response = _get_session().post(
         f"{base_url}/api/embeddings",
         json={
             "model": model,
             "prompt": text,
         },
-        timeout=180,
+        timeout=getattr(settings, "EMBEDDING_REQUEST_TIMEOUT", 180),
     )
     response.raise_for_status()
 
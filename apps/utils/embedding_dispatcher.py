@@ -0,0 +1,298 @@
+"""
+Pipelined embedding dispatcher.
+
+    reader thread ──► batches ──► N in-flight embed calls ──► writer thread
+
+The reader pulls (key, text) items from the source (typically a queryset
+iterator) ahead of the model server, up to EMBEDDING_READ_AHEAD items. Batches
+are sized from observed latency and text length to stay near
+EMBEDDING_TARGET_BATCH_SECONDS. A failed batch is retried once and then split
+in half, so one bad text costs its own request instead of the whole stage.
+Results are handed to ``write`` in chunks of EMBEDDING_WRITE_BATCH_SIZE on a
+separate thread, so inserts overlap with embedding.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+
+from apps.utils.embedding import embed_texts
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class DispatchStats:
+    texts: int = 0
+    embedded: int = 0
+    failed: int = 0
+    requests: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.texts / self.seconds if self.seconds else 0.0
+
+
+class AdaptiveBatchSizer:
+    """
+    Picks the next batch size from a moving average of seconds per character.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_seconds: float):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+
+        self._seconds_per_char = None
+        self._chars_per_text = None
+        self._lock = threading.Lock()
+
+    def next_size(self) -> int:
+        with self._lock:
+            return self.size
+
+    def observe(self, texts: int, chars: int, seconds: float, alpha: float = 0.3) -> None:
+        if not texts or not chars:
+            return
+
+        with self._lock:
+            seconds_per_char = seconds / chars
+            chars_per_text = chars / texts
+
+            if self._seconds_per_char is None:
+                self._seconds_per_char = seconds_per_char
+                self._chars_per_text = chars_per_text
+            else:
+                self._seconds_per_char += alpha * (seconds_per_char - self._seconds_per_char)
+                self._chars_per_text += alpha * (chars_per_text - self._chars_per_text)
+
+            seconds_per_text = max(self._seconds_per_char * self._chars_per_text, 1e-6)
+            target = int(self.target_seconds / seconds_per_text)
+
+            # Move at most 2x per step so one outlier cannot swing the size.
+            target = max(self.size // 2, min(target, self.size * 2))
+            self.size = max(self.minimum, min(target, self.maximum))
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.size = max(self.minimum, self.size // 2)
+
+
+def dispatch_embeddings(items, write, embed=embed_texts, concurrency: int | None = None,
+                        batch_size: int | None = None) -> DispatchStats:
+    """
+    Embed ``items`` — an iterable of (key, text) — and call
+    ``write([(key, vector), ...])`` with the results.
+
+    ``items`` is consumed and ``write`` is called on their own threads, each
+    with its own database connection. Texts that still fail after retries and
+    bisection are skipped and counted in DispatchStats.failed; after
+    EMBEDDING_MAX_FAILURES of them the dispatch aborts with RuntimeError.
+    """
+
+    concurrency = concurrency or getattr(settings, "EMBEDDING_CONCURRENCY", 4)
+    initial = batch_size or getattr(settings, "EMBEDDING_BATCH_SIZE", 64)
+    read_ahead = getattr(settings, "EMBEDDING_READ_AHEAD", 2000)
+    write_batch_size = getattr(settings, "EMBEDDING_WRITE_BATCH_SIZE", 1000)
+    max_failures = getattr(settings, "EMBEDDING_MAX_FAILURES", 20)
+
+    sizer = AdaptiveBatchSizer(
+        initial=initial,
+        minimum=getattr(settings, "EMBEDDING_MIN_BATCH_SIZE", 8),
+        maximum=getattr(settings, "EMBEDDING_MAX_BATCH_SIZE", 256),
+        target_seconds=getattr(settings, "EMBEDDING_TARGET_BATCH_SECONDS", 2.0),
+    )
+
+    stats = DispatchStats()
+    stats_lock = threading.Lock()
+    errors = []
+    stop = threading.Event()
+
+    source = queue.Queue(maxsize=read_ahead)
+    results = queue.Queue(maxsize=max(concurrency * 2, 2))
+
+    def read():
+        try:
+            for item in items:
+                while not stop.is_set():
+                    try:
+                        source.put(item, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as exc:
+            errors.append(exc)
+            stop.set()
+        finally:
+            connection.close()
+            source.put(_DONE)
+
+    def write_results():
+        pending = []
+        finished = False
+        try:
+            while not finished:
+                chunk = results.get()
+                if chunk is _DONE:
+                    finished = True
+                else:
+                    pending.extend(chunk)
+                if pending and (finished or len(pending) >= write_batch_size):
+                    write(pending)
+                    pending = []
+        except Exception as exc:
+            errors.append(exc)
+            stop.set()
+            # Keep draining so the dispatcher never blocks on a full queue.
+            while not finished:
+                finished = results.get() is _DONE
+        finally:
+            connection.close()
+
+    def embed_batch(batch):
+        embedded = []
+        for pairs in _embed_with_bisection(batch, embed, sizer, stats, stats_lock):
+            embedded.extend(pairs)
+
+            # Checked per split so a dead server aborts before a batch is fully bisected.
+            if stats.failed >= max_failures:
+                stop.set()
+                raise RuntimeError(f"Embedding failed for {stats.failed} texts, aborting.")
+            if stop.is_set():
+                break
+
+        # Empty vectors are skipped, as the model returned nothing to store.
+        return [(key, vector) for key, vector in embedded if vector]
+
+    started = time.perf_counter()
+    reader = threading.Thread(target=read, name="embedding-reader", daemon=True)
+    writer = threading.Thread(target=write_results, name="embedding-writer", daemon=True)
+    reader.start()
+    writer.start()
+
+    in_flight = set()
+    exhausted = False
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embedding") as pool:
+            while not stop.is_set() and (not exhausted or in_flight):
+                while not exhausted and len(in_flight) < concurrency:
+                    batch = _take_batch(source, sizer.next_size())
+                    if batch is None:
+                        exhausted = True
+                        break
+                    if batch:
+                        with stats_lock:
+                            stats.texts += len(batch)
+                        in_flight.add(pool.submit(embed_batch, batch))
+
+                if not in_flight:
+                    continue
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    embedded = future.result()
+                    with stats_lock:
+                        stats.embedded += len(embedded)
+                    results.put(embedded)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        results.put(_DONE)
+        writer.join()
+        stop.set()
+        _drain(source)
+        reader.join()
+        stats.seconds = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+
+    return stats
+
+
+def _take_batch(source: queue.Queue, size: int):
+    """
+    Up to ``size`` items from the reader, or None once it is exhausted.
+    """
+    item = source.get()
+    if item is _DONE:
+        return None
+
+    batch = [item]
+    while len(batch) < size:
+        try:
+            item = source.get_nowait()
+        except queue.Empty:
+            break
+        if item is _DONE:
+            # Put the marker back so the next call sees the end.
+            source.put(_DONE)
+            break
+        batch.append(item)
+
+    return batch
+
+
+def _drain(source: queue.Queue) -> None:
+    while True:
+        try:
+            source.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _embed_with_bisection(batch, embed, sizer, stats, stats_lock, retried: bool = False):
+    """
+    Yield lists of (key, vector) for ``batch``, splitting it on failure.
+    """
+    texts = [text for _, text in batch]
+    started = time.perf_counter()
+
+    with stats_lock:
+        stats.requests += 1
+
+    try:
+        vectors = embed(texts)
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(vectors)}.")
+    except Exception as exc:
+        error = exc
+    else:
+        sizer.observe(len(texts), sum(len(text) for text in texts), time.perf_counter() - started)
+        yield [(key, vector) for (key, _text), vector in zip(batch, vectors)]
+        return
+
+    sizer.on_failure()
+    with stats_lock:
+        stats.retries += 1
+
+    if not retried:
+        # Transient errors usually clear on a plain retry.
+        yield from _embed_with_bisection(batch, embed, sizer, stats, stats_lock, retried=True)
+        return
+
+    if len(batch) == 1:
+        logger.warning("Embedding failed for %s: %s", batch[0][0], error)
+        with stats_lock:
+            stats.failed += 1
+        yield []
+        return
+
+    middle = len(batch) // 2
+    yield from _embed_with_bisection(batch[:middle], embed, sizer, stats, stats_lock)
+    yield from _embed_with_bisection(batch[middle:], embed, sizer, stats, stats_lock)
@@ -0,0 +1,222 @@
+"""
+Per-action instrumentation for channels consumers.
+
+InstrumentedConsumerMixin wraps handle_action() and records, per
+(consumer, action): total latency, SQL query count, DB time, serializer time
+and reply payload bytes, as Prometheus histograms.
+
+Actions run their ORM work in database_sync_to_async threads, so the stats
+for the running action live in a context variable (asgiref copies the
+context into those threads) and a database execute wrapper, installed on
+every connection, adds to them.
+
+An action can declare a query budget:
+
+    @action()
+    @query_budget(12)
+    @rate_limit(limit=40, period=60)
+    async def list(self, **kwargs):
+        ...
+
+Going over it logs a warning. The check runs after the reply is sent, so
+raising only makes sense in tests: with CONSUMER_QUERY_BUDGET_STRICT set
+(apps/utils/tests/test_query_budgets.py does) it raises QueryBudgetExceeded,
+so N+1 regressions fail the suite instead of reaching production.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotFound
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("consumer", "action")
+
+ACTION_LATENCY = Histogram(
+    "consumer_action_latency_seconds", "Total time spent handling a consumer action.", LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ACTION_DB_TIME = Histogram(
+    "consumer_action_db_seconds", "Time spent executing SQL for a consumer action.", LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+ACTION_QUERIES = Histogram(
+    "consumer_action_queries", "SQL queries executed for a consumer action.", LABELS,
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+ACTION_SERIALIZER_TIME = Histogram(
+    "consumer_action_serializer_seconds", "Time spent in serializer .data for a consumer action.", LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+ACTION_PAYLOAD_BYTES = Histogram(
+    "consumer_action_payload_bytes", "Encoded size of the replies sent for a consumer action.", LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when an action runs more queries than its declared budget in strict mode"""
+    pass
+
+
+@dataclass
+class ActionStats:
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    serializer_depth: int = 0
+    payload_bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+
+_current_stats: ContextVar[ActionStats | None] = ContextVar("consumer_action_stats", default=None)
+
+
+def current_stats() -> ActionStats | None:
+    return _current_stats.get()
+
+
+# ====================== Collectors ======================
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def _install_execute_wrapper(connection) -> None:
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    _install_execute_wrapper(connection)
+
+
+for _connection in connections.all(initialized_only=True):
+    _install_execute_wrapper(_connection)
+
+
+def _timed_data(data_property):
+    # Only the outermost .data is timed; nested serializers call
+    # to_representation() directly, and ListSerializer.data calls up to
+    # BaseSerializer.data.
+    def data(serializer):
+        stats = _current_stats.get()
+        if stats is None or stats.serializer_depth:
+            return data_property.fget(serializer)
+
+        stats.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data_property.fget(serializer)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+            stats.serializer_depth -= 1
+
+    data.instrumented = True
+    return property(data)
+
+
+if not getattr(BaseSerializer.data.fget, "instrumented", False):
+    BaseSerializer.data = _timed_data(BaseSerializer.data)
+
+
+# ====================== Budgets ======================
+
+def query_budget(limit: int):
+    """
+    Declare the most queries an action may run. Put it directly under
+    @action().
+    """
+    def decorator(func):
+        func.query_budget = limit
+        return func
+
+    return decorator
+
+
+def check_query_budget(consumer: str, action: str, queries: int, budget: int | None) -> None:
+    if budget is None or queries <= budget:
+        return
+
+    message = f"{consumer}.{action} ran {queries} queries, over its budget of {budget}"
+    if getattr(settings, "CONSUMER_QUERY_BUDGET_STRICT", False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+# ====================== Consumer mixin ======================
+
+class InstrumentedConsumerMixin:
+    """
+    Records latency, queries, DB time, serializer time and payload size for
+    every action. List it before GenericAsyncAPIConsumer.
+    """
+
+    def get_query_budget(self, action: str) -> int | None:
+        method_name = getattr(self, "available_actions", {}).get(action)
+        method = getattr(self, method_name, None) if method_name else None
+        return getattr(method, "query_budget", getattr(settings, "CONSUMER_DEFAULT_QUERY_BUDGET", None))
+
+    async def handle_action(self, action: str, request_id: str, **kwargs):
+        stats = ActionStats()
+        token = _current_stats.set(stats)
+        try:
+            await super().handle_action(action, request_id=request_id, **kwargs)
+        finally:
+            _current_stats.reset(token)
+            self._observe(action, stats)
+
+        check_query_budget(type(self).__name__, action, stats.queries, self.get_query_budget(action))
+
+    def _observe(self, action: str, stats: ActionStats) -> None:
+        labels = (type(self).__name__, action if action in getattr(self, "available_actions", {}) else "unknown")
+
+        ACTION_LATENCY.labels(*labels).observe(time.perf_counter() - stats.started)
+        ACTION_DB_TIME.labels(*labels).observe(stats.db_time)
+        ACTION_QUERIES.labels(*labels).observe(stats.queries)
+        ACTION_SERIALIZER_TIME.labels(*labels).observe(stats.serializer_time)
+        ACTION_PAYLOAD_BYTES.labels(*labels).observe(stats.payload_bytes)
+
+    @classmethod
+    async def encode_json(cls, content):
+        encoded = await super().encode_json(content)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.payload_bytes += len(encoded.encode("utf-8"))
+        return encoded
+
+
+# ====================== Exposition ======================
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires ``Authorization: Bearer <METRICS_TOKEN>``
+    when METRICS_TOKEN is set, and is hidden outside DEBUG otherwise.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponseNotFound()
+    elif not settings.DEBUG:
+        return HttpResponseNotFound()
+
+    return HttpResponse(generate_latest(), content_type=CONTENT_TYPE_LATEST)
@@ -1,14 +1,25 @@
+import hashlib
 import json
+import logging
 import re
+import threading
+import time
 
 import requests
+import requests.adapters
 from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django_redis import get_redis_connection
 
 try:
     from openai import OpenAI
 except ImportError:
     OpenAI = None
 
+logger = logging.getLogger(__name__)
+
 
 def extract_json(text: str):
     """
@@ -32,14 +43,203 @@ def extract_json(text: str):
     return {}
 
 
-def chat_json(messages, temperature: float = 0.1, timeout: int = 900):
+# ====================== LIMITS ======================
+
+_SLOTS = None
+_SLOTS_LOCK = threading.Lock()
+_SESSION = None
+_CLIENT = None
+
+
+def _call_slots() -> threading.BoundedSemaphore:
+    """
+    Process-wide cap on in-flight LLM requests, so nested job runners cannot
+    oversubscribe the model server.
+    """
+    global _SLOTS
+
+    with _SLOTS_LOCK:
+        if _SLOTS is None:
+            _SLOTS = threading.BoundedSemaphore(getattr(settings, "LLM_CONCURRENCY", 4))
+        return _SLOTS
+
+
+def _get_session() -> requests.Session:
+    """
+    Shared keep-alive session for the Ollama API.
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        pool_size = getattr(settings, "LLM_CONCURRENCY", 4)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = session
+
+    return _SESSION
+
+
+def _get_client():
+    global _CLIENT
+
+    if _CLIENT is None:
+        _CLIENT = OpenAI(
+            base_url=getattr(settings, "LOCAL_LLM_BASE_URL", "http://localhost:8000/v1"),
+            api_key="local",
+            # Retries are handled in chat_json().
+            max_retries=0,
+        )
+
+    return _CLIENT
+
+
+@receiver(setting_changed)
+def _reset_clients(*, setting, **kwargs):
+    global _SLOTS, _SESSION, _CLIENT
+
+    if setting in {"LLM_CONCURRENCY", "LOCAL_LLM_BASE_URL"}:
+        _SLOTS = _SESSION = _CLIENT = None
+
+
+# ====================== RESPONSE CACHE ======================
+
+# Bump when the stored response format changes.
+LLM_CACHE_VERSION = "v1"
+
+
+def normalize_messages(messages) -> list[dict]:
+    """
+    Role and whitespace-collapsed content of each message, the part of a
+    prompt that decides the response.
+    """
+    return [
+        {
+            "role": message.get("role", "user"),
+            "content": " ".join(str(message.get("content") or "").split()),
+        }
+        for message in messages
+    ]
+
+
+def llm_cache_key(backend: str, model: str, temperature: float, messages) -> str:
+    payload = json.dumps(normalize_messages(messages), ensure_ascii=False, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"llm:{LLM_CACHE_VERSION}:{backend}:{model}:{float(temperature):g}:{digest}"
+
+
+def _index_key() -> str:
+    # Sorted set of cached response keys, scored by last use.
+    return cache.make_key("llm:cache-index")
+
+
+def _cache_get(key: str):
+    try:
+        data = cache.get(key)
+        if data is not None:
+            get_redis_connection("default").zadd(_index_key(), {key: time.time()})
+        return data
+    except Exception:
+        logger.warning("LLM cache unavailable", exc_info=True)
+        return None
+
+
+def _cache_set(key: str, data) -> None:
+    """
+    Store a response, then evict the least recently used entries beyond
+    LLM_CACHE_MAX_ENTRIES.
+    """
+    timeout = getattr(settings, "LLM_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
+    max_entries = getattr(settings, "LLM_CACHE_MAX_ENTRIES", 50_000)
+
+    try:
+        cache.set(key, data, timeout=timeout)
+
+        now = time.time()
+        redis = get_redis_connection("default")
+        with redis.pipeline() as pipe:
+            pipe.zadd(_index_key(), {key: now})
+            # Entries unused for a whole TTL have expired already.
+            pipe.zremrangebyscore(_index_key(), 0, now - timeout)
+            pipe.zcard(_index_key())
+            size = pipe.execute()[-1]
+
+        if size > max_entries:
+            evicted = redis.zpopmin(_index_key(), size - max_entries)
+            cache.delete_many([member.decode() for member, _score in evicted])
+    except Exception:
+        logger.warning("Could not store LLM response in cache", exc_info=True)
+
+
+def clear_llm_cache() -> None:
+    redis = get_redis_connection("default")
+    members = redis.zrange(_index_key(), 0, -1)
+    if members:
+        cache.delete_many([member.decode() for member in members])
+    redis.delete(_index_key())
+
+
+# ====================== CALLS ======================
+
+def chat_json(messages, temperature: float = 0.1, timeout: int | None = None,
+              retries: int | None = None, use_cache: bool = True):
     """
     Call a local Qwen model and return parsed JSON.
 
     Supports:
       - Ollama
       - OpenAI-compatible server such as vLLM
+
+    Each attempt is limited to ``timeout`` seconds (LLM_CALL_TIMEOUT) and
+    failed attempts are retried ``retries`` times (LLM_CALL_RETRIES) with
+    exponential backoff.
+
+    Non-empty responses are cached per (backend, model, temperature, prompt)
+    when LLM_CACHE_ENABLED, so a re-run summary only calls the model for the
+    steps that did not succeed last time.
     """
+    use_cache = use_cache and getattr(settings, "LLM_CACHE_ENABLED", True)
+    key = None
+
+    if use_cache:
+        key = llm_cache_key(
+            getattr(settings, "LOCAL_LLM_BACKEND", "ollama"),
+            getattr(settings, "LOCAL_QWEN_MODEL", "qwen2.5:7b-instruct"),
+            temperature,
+            messages,
+        )
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+    data = _chat_json_with_retries(messages, temperature, timeout, retries)
+
+    # Empty means the model returned no usable JSON; try again next time.
+    if use_cache and data:
+        _cache_set(key, data)
+
+    return data
+
+
+def _chat_json_with_retries(messages, temperature: float, timeout: int | None, retries: int | None):
+    timeout = timeout or getattr(settings, "LLM_CALL_TIMEOUT", 300)
+    retries = retries if retries is not None else getattr(settings, "LLM_CALL_RETRIES", 2)
+    backoff = getattr(settings, "LLM_RETRY_BACKOFF", 2.0)
+
+    for attempt in range(retries + 1):
+        try:
+            with _call_slots():
+                return _chat_json_once(messages, temperature, timeout)
+        except Exception as exc:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            logger.warning("LLM call failed (%s), retrying in %.1fs", exc, delay)
+            time.sleep(delay)
+
+
+def _chat_json_once(messages, temperature: float, timeout: int):
     backend = getattr(settings, "LOCAL_LLM_BACKEND", "ollama")
     model = getattr(settings, "LOCAL_QWEN_MODEL", "qwen2.5:7b-instruct")
 
@@ -47,15 +247,11 @@ def chat_json(messages, temperature: float = 0.1, timeout: int = 900):
         if OpenAI is None:
             raise RuntimeError("The openai package is required for LOCAL_LLM_BACKEND=openai")
 
-        client = OpenAI(
-            base_url=getattr(settings, "LOCAL_LLM_BASE_URL", "http://localhost:8000/v1"),
-            api_key="local",
-        )
-
-        completion = client.chat.completions.create(
+        completion = _get_client().chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
+            timeout=timeout,
         )
 
         content = completion.choices[0].message.content
@@ -72,7 +268,7 @@ def chat_json(messages, temperature: float = 0.1, timeout: int = 900):
         },
     }
 
-    response = requests.post(
+    response = _get_session().post(
         f"{settings.OLLAMA_BASE_URL}/api/chat",
         json=payload,
         timeout=timeout,
@@ -0,0 +1,120 @@
+"""
+Concurrent LLM job runner.
+
+Summary stages queue their LLM calls (cluster labels, chunk summaries, merge
+steps) as jobs and run them on LLM_CONCURRENCY threads instead of one at a time.
+Jobs start in priority order (lower first, then submission order), so the
+work that matters most is done first if the stage is cut short. Per-call
+timeouts and retries live in apps.utils.llm.chat_json, which also caps
+in-flight requests for the whole process.
+
+    runner = LLMJobRunner(on_progress=lambda done, total: ...)
+    for cluster in clusters:
+        runner.submit(label_cluster, cluster, priority=rank)
+    labels = runner.run()
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class LLMJob:
+    priority: int
+    index: int
+    fn: Callable = field(compare=False)
+    args: tuple = field(default=(), compare=False)
+    kwargs: dict = field(default_factory=dict, compare=False)
+
+
+class LLMJobRunner:
+    def __init__(self, concurrency: int | None = None,
+                 on_progress: Callable[[int, int], Any] | None = None,
+                 progress_interval: float | None = None):
+        self.concurrency = concurrency or getattr(settings, "LLM_CONCURRENCY", 4)
+        self.on_progress = on_progress
+        self.progress_interval = (
+            progress_interval if progress_interval is not None
+            else getattr(settings, "LLM_PROGRESS_INTERVAL_SECONDS", 5)
+        )
+        self.jobs: list[LLMJob] = []
+
+    def submit(self, fn: Callable, *args, priority: int = 0, **kwargs) -> int:
+        """
+        Queue ``fn(*args, **kwargs)``. Returns its index in run()'s results.
+        """
+        self.jobs.append(LLMJob(priority, len(self.jobs), fn, args, kwargs))
+        return len(self.jobs) - 1
+
+    def run(self) -> list:
+        """
+        Run every queued job and return the results in submission order.
+
+        The first exception cancels the jobs that have not started and is
+        re-raised once the running ones finish.
+        """
+        jobs, self.jobs = sorted(self.jobs), []
+        results = [None] * len(jobs)
+        total = len(jobs)
+
+        if not jobs:
+            return results
+
+        done_count = 0
+        last_report = time.monotonic()
+
+        # The executor starts work in submission order, so sorting is the priority queue.
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, total), thread_name_prefix="llm") as pool:
+            pending = {pool.submit(_run_job, job): job for job in jobs}
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_EXCEPTION)
+
+                for future in done:
+                    job = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in pending:
+                            other.cancel()
+                        raise error
+                    results[job.index] = future.result()
+                    done_count += 1
+
+                now = time.monotonic()
+                if self.on_progress and (not pending or now - last_report >= self.progress_interval):
+                    last_report = now
+                    self._report(done_count, total)
+
+        return results
+
+    def _report(self, done: int, total: int) -> None:
+        try:
+            self.on_progress(done, total)
+        except Exception:
+            logger.exception("LLM progress callback failed")
+
+
+def _run_job(job: LLMJob):
+    try:
+        return job.fn(*job.args, **job.kwargs)
+    finally:
+        # Jobs may touch the ORM; each worker thread has its own connection.
+        connections.close_all()
+
+
+def run_llm_jobs(fn: Callable, items, priority: Callable | None = None, **runner_kwargs) -> list:
+    """
+    ``[fn(item) for item in items]`` on an LLMJobRunner.
+    """
+    runner = LLMJobRunner(**runner_kwargs)
+    for item in items:
+        runner.submit(fn, item, priority=priority(item) if priority else 0)
+    return runner.run()
@@ -1,6 +1,15 @@
+import logging
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 
 from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+logger = logging.getLogger(__name__)
 
 
 # ======================
@@ -59,8 +68,20 @@ _DOB_RE = re.compile(
     re.IGNORECASE,
 )
 
+# One pass over the text tells which detector families can possibly match:
+# emails need "@", URLs need a scheme or "www.", everything else needs a digit.
+_TRIGGER_RE = re.compile(
+    r"(?P<at>@)"
+    r"|(?P<web>https?://|www\.)"
+    r"|(?P<digit>\d+)",
+    re.IGNORECASE,
+)
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
 
 _ANALYZER = None
+_CONFIG = None
 
 
 # ======================
@@ -87,6 +108,97 @@ def _setting(name: str, default=None):
     return default
 
 
+@dataclass(frozen=True)
+class PiiConfig:
+    """
+    Snapshot of the PII_* settings, built once instead of on every call.
+    """
+
+    enabled: bool
+    mode: str
+    max_chars: int
+    # (trigger, detector) pairs, in the order entities were always collected.
+    detectors: tuple
+    presidio_entities: tuple
+    presidio_threshold: float
+    batch_size: int
+    processes: int
+    parallel_min_texts: int
+
+
+def get_pii_config() -> PiiConfig:
+    global _CONFIG
+
+    if _CONFIG is None:
+        _CONFIG = _build_config()
+
+    return _CONFIG
+
+
+@receiver(setting_changed)
+def _reset_pii_config(setting, **kwargs):
+    global _CONFIG
+
+    if setting.startswith(("PII_", "SURVEY_PII_")):
+        _CONFIG = None
+
+
+def _build_config() -> PiiConfig:
+    mode = str(_setting("MODE", "regex")).lower()
+
+    if mode not in {"regex", "presidio", "hybrid", "llm"}:
+        mode = "regex"
+
+    families = (
+        ("REDACT_EMAILS", "at", _email_entities),
+        ("REDACT_URLS", "web", _url_entities),
+        ("REDACT_IP_ADDRESSES", "digit", _ip_entities),
+        ("REDACT_PHONE_NUMBERS", "digit", _phone_entities),
+        ("REDACT_CREDIT_CARDS", "digit", _credit_card_entities),
+        (
+            "REDACT_ID_NUMBERS",
+            "digit",
+            partial(
+                _context_entities,
+                pattern=_ID_CONTEXT_RE,
+                entity_type="ID_NUMBER",
+                replacement="[ID_NUMBER]",
+                min_digits=5,
+                max_digits=20,
+            ),
+        ),
+        (
+            "REDACT_ACCOUNT_NUMBERS",
+            "digit",
+            partial(
+                _context_entities,
+                pattern=_ACCOUNT_CONTEXT_RE,
+                entity_type="ACCOUNT_NUMBER",
+                replacement="[ACCOUNT_NUMBER]",
+                min_digits=5,
+                max_digits=25,
+            ),
+        ),
+        ("REDACT_DATES_OF_BIRTH", "digit", _dob_entities),
+    )
+
+    return PiiConfig(
+        enabled=bool(_setting("ENABLED", True)),
+        mode=mode,
+        max_chars=int(_setting("MAX_INPUT_CHARS", 10000)),
+        detectors=tuple(
+            (trigger, detector)
+            for name, trigger, detector in families
+            if _setting(name, True)
+        ),
+        presidio_entities=tuple(_presidio_entity_list()),
+        presidio_threshold=float(_setting("PRESIDIO_SCORE_THRESHOLD", 0.5)),
+        batch_size=max(int(_setting("BATCH_SIZE", 64)), 1),
+        processes=max(int(_setting("PROCESSES", 1)), 1),
+        parallel_min_texts=int(_setting("PARALLEL_MIN_TEXTS", 2000)),
+    )
+
+
 # ======================
 # Public API
 # ======================
@@ -113,48 +225,104 @@ def redact_text(text: str) -> dict:
     This intentionally does NOT store the original matched PII text.
     """
 
-    if text is None:
-        return {
-            "text": "",
-            "entities": [],
-        }
+    return redact_texts([text])[0]
 
-    text = str(text)
 
-    if not _setting("ENABLED", True):
-        return {
-            "text": text,
-            "entities": [],
-        }
+def redact_texts(texts, processes: int | None = None) -> list[dict]:
+    """
+    Redact PII from many texts at once.
 
-    max_chars = int(_setting("MAX_INPUT_CHARS", 10000))
+    Same output as calling redact_text() on each text, but settings are read
+    once, regex detectors only run on texts that can match them, and Presidio
+    analyses the texts in spaCy nlp.pipe batches of PII_BATCH_SIZE.
 
-    if len(text) > max_chars:
-        text = text[:max_chars]
+    processes > 1 (default PII_PROCESSES) splits lists of at least
+    PII_PARALLEL_MIN_TEXTS texts across a process pool, for large backfills.
+    """
 
-    mode = str(_setting("MODE", "regex")).lower()
+    config = get_pii_config()
+    texts = list(texts)
 
-    if mode not in {"regex", "presidio", "hybrid", "llm"}:
-        mode = "regex"
+    results = [None] * len(texts)
+    pending = []
 
-    if mode == "llm":
-        return _llm_redact_text(text)
+    for index, text in enumerate(texts):
+        if text is None:
+            results[index] = {
+                "text": "",
+                "entities": [],
+            }
+            continue
 
-    entities = []
+        text = str(text)
 
-    if mode in {"regex", "hybrid", "presidio"}:
-        entities.extend(_regex_entities(text))
+        if not config.enabled:
+            results[index] = {
+                "text": text,
+                "entities": [],
+            }
+            continue
 
-    if mode in {"presidio", "hybrid"}:
-        entities.extend(_presidio_entities(text))
+        pending.append((index, text[:config.max_chars]))
 
-    entities = _merge_entities(entities)
-    redacted = _apply_entities(text, entities)
+    if not pending:
+        return results
 
-    return {
-        "text": redacted,
-        "entities": entities,
-    }
+    processes = config.processes if processes is None else max(int(processes), 1)
+    pending_texts = [text for _, text in pending]
+
+    if processes > 1 and len(pending_texts) >= config.parallel_min_texts:
+        redacted = _redact_parallel(pending_texts, processes, config)
+    else:
+        redacted = _redact_batch(pending_texts, config)
+
+    for (index, _text), result in zip(pending, redacted):
+        results[index] = result
+
+    return results
+
+
+def _redact_batch(texts: list[str], config: PiiConfig) -> list[dict]:
+    if config.mode == "llm":
+        return [_llm_redact_text(text) for text in texts]
+
+    entity_lists = [_regex_entities(text, config) for text in texts]
+
+    if config.mode in {"presidio", "hybrid"}:
+        for entities, found in zip(entity_lists, _presidio_entities_batch(texts, config)):
+            entities.extend(found)
+
+    results = []
+
+    for text, entities in zip(texts, entity_lists):
+        entities = _merge_entities(entities)
+        results.append({
+            "text": _apply_entities(text, entities),
+            "entities": entities,
+        })
+
+    return results
+
+
+def _redact_chunk(texts: list[str]) -> list[dict]:
+    return _redact_batch(texts, get_pii_config())
+
+
+def _redact_parallel(texts: list[str], processes: int, config: PiiConfig) -> list[dict]:
+    chunk_size = max(config.batch_size, -(-len(texts) // processes))
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+
+    try:
+        # fork: workers inherit configured Django settings and any loaded spaCy model.
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("fork"),
+        ) as pool:
+            return [result for chunk in pool.map(_redact_chunk, chunks) for result in chunk]
+    except Exception:
+        # e.g. inside a daemonic Celery worker, which may not fork children.
+        logger.warning("PII process pool unavailable, redacting in-process", exc_info=True)
+        return _redact_batch(texts, config)
 
 
 # ======================
@@ -170,76 +338,57 @@ def _entity(entity_type: str, start: int, end: int, replacement: str) -> dict:
     }
 
 
-def _regex_entities(text: str) -> list[dict]:
-    entities = []
+def _regex_entities(text: str, config: PiiConfig | None = None) -> list[dict]:
+    config = config or get_pii_config()
 
-    if _setting("REDACT_EMAILS", True):
-        for match in _EMAIL_RE.finditer(text):
-            entities.append(
-                _entity(
-                    entity_type="EMAIL_ADDRESS",
-                    start=match.start(),
-                    end=match.end(),
-                    replacement="[EMAIL]",
-                )
-            )
+    triggers = {match.lastgroup for match in _TRIGGER_RE.finditer(text)}
 
-    if _setting("REDACT_URLS", True):
-        for match in _URL_RE.finditer(text):
-            entities.append(
-                _entity(
-                    entity_type="URL",
-                    start=match.start(),
-                    end=match.end(),
-                    replacement="[URL]",
-                )
-            )
+    if not triggers:
+        return []
 
-    if _setting("REDACT_IP_ADDRESSES", True):
-        for match in _IPV4_RE.finditer(text):
-            entities.append(
-                _entity(
-                    entity_type="IP_ADDRESS",
-                    start=match.start(),
-                    end=match.end(),
-                    replacement="[IP_ADDRESS]",
-                )
-            )
+    entities = []
 
-    if _setting("REDACT_PHONE_NUMBERS", True):
-        entities.extend(_phone_entities(text))
+    for trigger, detector in config.detectors:
+        if trigger in triggers:
+            entities.extend(detector(text))
 
-    if _setting("REDACT_CREDIT_CARDS", True):
-        entities.extend(_credit_card_entities(text))
+    return entities
 
-    if _setting("REDACT_ID_NUMBERS", True):
-        entities.extend(
-            _context_entities(
-                text=text,
-                pattern=_ID_CONTEXT_RE,
-                entity_type="ID_NUMBER",
-                replacement="[ID_NUMBER]",
-                min_digits=5,
-                max_digits=20,
-            )
+
+def _email_entities(text: str) -> list[dict]:
+    return [
+        _entity(
+            entity_type="EMAIL_ADDRESS",
+            start=match.start(),
+            end=match.end(),
+            replacement="[EMAIL]",
         )
+        for match in _EMAIL_RE.finditer(text)
+    ]
 
-    if _setting("REDACT_ACCOUNT_NUMBERS", True):
-        entities.extend(
-            _context_entities(
-                text=text,
-                pattern=_ACCOUNT_CONTEXT_RE,
-                entity_type="ACCOUNT_NUMBER",
-                replacement="[ACCOUNT_NUMBER]",
-                min_digits=5,
-                max_digits=25,
-            )
+
+def _url_entities(text: str) -> list[dict]:
+    return [
+        _entity(
+            entity_type="URL",
+            start=match.start(),
+            end=match.end(),
+            replacement="[URL]",
         )
+        for match in _URL_RE.finditer(text)
+    ]
 
-    if _setting("REDACT_DATES_OF_BIRTH", True):
-        entities.extend(_dob_entities(text))
 
-    return entities
+def _ip_entities(text: str) -> list[dict]:
+    return [
+        _entity(
+            entity_type="IP_ADDRESS",
+            start=match.start(),
+            end=match.end(),
+            replacement="[IP_ADDRESS]",
+        )
+        for match in _IPV4_RE.finditer(text)
+    ]
 
 
 def _phone_entities(text: str) -> list[dict]:
@@ -252,7 +401,7 @@ def _phone_entities(text: str) -> list[dict]:
         if "@" in candidate or "://" in candidate:
             continue
 
-        digits = re.sub(r"\D", "", candidate)
+        digits = _NON_DIGIT_RE.sub("", candidate)
 
         if not 9 <= len(digits) <= 15:
             continue
@@ -277,7 +426,7 @@ def _credit_card_entities(text: str) -> list[dict]:
 
     for match in _CREDIT_CARD_RE.finditer(text):
         candidate = match.group(0)
-        digits = re.sub(r"\D", "", candidate)
+        digits = _NON_DIGIT_RE.sub("", candidate)
 
         if not 13 <= len(digits) <= 19:
             continue
@@ -313,7 +462,7 @@ def _context_entities(
         except IndexError:
             continue
 
-        digits = re.sub(r"\D", "", value)
+        digits = _NON_DIGIT_RE.sub("", value)
 
         if not min_digits <= len(digits) <= max_digits:
             continue
@@ -350,7 +499,7 @@ def _dob_entities(text: str) -> list[dict]:
 # Presidio detector
 # ======================
 
-def _presidio_entities(text: str) -> list[dict]:
+def _presidio_entities(text: str, config: PiiConfig | None = None) -> list[dict]:
     """
     Optional stronger detection using Microsoft Presidio.
 
@@ -360,28 +509,57 @@ def _presidio_entities(text: str) -> list[dict]:
     """
 
     try:
-        from presidio_analyzer import AnalyzerEngine
+        analyzer = _get_presidio_analyzer()
     except ImportError:
         return []
 
-    analyzer = _get_presidio_analyzer()
-
-    entities = _presidio_entity_list()
-    threshold = float(_setting("PRESIDIO_SCORE_THRESHOLD", 0.5))
+    config = config or get_pii_config()
 
     try:
         results = analyzer.analyze(
             text=text,
             language="en",
-            entities=entities,
+            entities=list(config.presidio_entities),
         )
     except Exception:
         return []
 
+    return _presidio_results_to_entities(results, config)
+
+
+def _presidio_entities_batch(texts: list[str], config: PiiConfig) -> list[list[dict]]:
+    """
+    Presidio over many texts, letting spaCy batch them through nlp.pipe.
+    """
+
+    try:
+        from presidio_analyzer import BatchAnalyzerEngine
+    except ImportError:
+        return [[] for _ in texts]
+
+    analyzer = _get_presidio_analyzer()
+
+    try:
+        batch_results = list(
+            BatchAnalyzerEngine(analyzer_engine=analyzer).analyze_iterator(
+                texts,
+                language="en",
+                batch_size=config.batch_size,
+                entities=list(config.presidio_entities),
+            )
+        )
+    except Exception:
+        # One bad text must not cost the whole batch its Presidio pass.
+        return [_presidio_entities(text, config) for text in texts]
+
+    return [_presidio_results_to_entities(results, config) for results in batch_results]
+
+
+def _presidio_results_to_entities(results, config: PiiConfig) -> list[dict]:
     found = []
 
     for result in results:
-        if result.score < threshold:
+        if result.score < config.presidio_threshold:
             continue
 
         found.append(
@@ -0,0 +1,47 @@
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from apps.utils.clustering import CentroidTopK, merge_similar_centroids, select_cluster_count
+
+
+def blobs(centers: int, per_center: int, dimensions: int = 32, noise: float = 0.05):
+    rng = np.random.default_rng(7)
+    means = rng.standard_normal((centers, dimensions))
+    X = np.repeat(means, per_center, axis=0) + noise * rng.standard_normal((centers * per_center, dimensions))
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    return X.astype(np.float32)
+
+
+@override_settings(CLUSTER_SELECTION_SAMPLE_SIZE=2000, CLUSTER_SELECTION_JOBS=2)
+class TestSelectClusterCount(SimpleTestCase):
+    def test_prefers_the_true_number_of_themes(self):
+        k, sweep = select_cluster_count(blobs(centers=6, per_center=200), [3, 6, 12, 24])
+
+        self.assertEqual(k, 6)
+        self.assertEqual([result["k"] for result in sweep], [3, 6, 12, 24])
+
+
+class TestMergeSimilarCentroids(SimpleTestCase):
+    def test_merges_parallel_centroids_and_drops_empty_ones(self):
+        centers = np.array([[1.0, 0.0], [0.99, 0.05], [0.0, 1.0], [-1.0, 0.0]], dtype=np.float32)
+
+        remap, merged, sizes = merge_similar_centroids(centers, np.array([10, 30, 5, 0]), threshold=0.95)
+
+        np.testing.assert_array_equal(remap, [0, 0, 1, -1])
+        np.testing.assert_array_equal(sizes, [40, 5])
+        np.testing.assert_allclose(np.linalg.norm(merged, axis=1), [1.0, 1.0], rtol=1e-6)
+
+
+class TestCentroidTopK(SimpleTestCase):
+    def test_keeps_the_nearest_rows_per_cluster_across_blocks(self):
+        centers = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        angles = np.linspace(0, np.pi / 2, 20)
+        X = np.column_stack((np.cos(angles), np.sin(angles))).astype(np.float32)
+        labels = (angles > np.pi / 4).astype(np.int64)
+        ids = np.arange(100, 120)
+
+        nearest = CentroidTopK(centers, k=3)
+        for start in range(0, 20, 6):
+            nearest.add(ids[start:start + 6], X[start:start + 6], labels[start:start + 6])
+
+        self.assertEqual(nearest.ids_by_label(), {0: [100, 101, 102], 1: [119, 118, 117]})
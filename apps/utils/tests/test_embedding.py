@@ -0,0 +1,25 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.utils.embedding import embed_texts
+
+
+def fake_embed(texts):
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+@override_settings(EMBEDDING_MODEL='test-model', EMBEDDING_CACHE_ENABLED=True)
+class TestEmbedTextsCache(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_dedups_within_batch_and_serves_repeats_from_cache(self):
+        with mock.patch('apps.utils.embedding._embed_uncached', side_effect=fake_embed) as embed:
+            first = embed_texts(['yes', 'no', 'yes', '  no '])
+            second = embed_texts(['no', 'I agree'])
+
+        self.assertEqual(first, [[3.0, 1.0], [2.0, 1.0], [3.0, 1.0], [2.0, 1.0]])
+        self.assertEqual(second, [[2.0, 1.0], [7.0, 1.0]])
+        self.assertEqual(embed.call_args_list, [mock.call(['yes', 'no']), mock.call(['I agree'])])
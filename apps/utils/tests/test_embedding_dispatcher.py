@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings, tag
+
+from apps.utils.embedding_dispatcher import dispatch_embeddings
+
+
+def fake_embed(texts):
+    if any('poison' in text for text in texts):
+        raise ValueError('model rejected input')
+    return [[float(len(text))] for text in texts]
+
+
+class TestDispatchEmbeddings(SimpleTestCase):
+    def test_bisects_around_a_bad_text(self):
+        items = [(index, 'poison' if index == 17 else f'text {index}') for index in range(100)]
+        written = []
+
+        stats = dispatch_embeddings(items, written.extend, embed=fake_embed, concurrency=3, batch_size=16)
+
+        self.assertEqual(stats.texts, 100)
+        self.assertEqual(stats.embedded, 99)
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(sorted(key for key, _ in written), [index for index in range(100) if index != 17])
+
+    @override_settings(EMBEDDING_MAX_FAILURES=5)
+    def test_aborts_when_the_server_is_down(self):
+        def down(texts):
+            raise ConnectionError('connection refused')
+
+        with self.assertRaises(RuntimeError):
+            dispatch_embeddings(((index, 'text') for index in range(1000)), list, embed=down)
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    # Seconds per request, plus seconds per text in the request.
+    latency = 0.05
+    latency_per_text = 0.001
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        texts = payload['input']
+        time.sleep(self.latency + self.latency_per_text * len(texts))
+
+        body = json.dumps({
+            'data': [
+                {'index': index, 'embedding': [float(len(text)), 1.0]}
+                for index, text in enumerate(texts)
+            ],
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@tag('benchmark')
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class BenchmarkDispatchEmbeddings(SimpleTestCase):
+    texts = 2000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubEmbeddingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_dispatcher_embeds_every_text_over_http(self):
+        cache.clear()
+        base_url = f'http://127.0.0.1:{self.server.server_port}/v1'
+        items = [(index, f'answer number {index} ' * (1 + index % 8)) for index in range(self.texts)]
+
+        with override_settings(EMBEDDING_BACKEND='openai', EMBEDDING_BASE_URL=base_url,
+                               EMBEDDING_CACHE_ENABLED=False, EMBEDDING_TARGET_BATCH_SECONDS=0.2):
+            written = []
+            stats = dispatch_embeddings(items, written.extend, concurrency=4, batch_size=64)
+
+        self.assertEqual(stats.embedded, self.texts)
+        self.assertLess(stats.requests, self.texts)
+        # The stub embeds each whitespace-normalized text as [len(text), 1.0].
+        expected = {key: [float(len(' '.join(text.split()))), 1.0] for key, text in items}
+        self.assertEqual(dict(written), expected)
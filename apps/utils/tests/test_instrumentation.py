@@ -0,0 +1,71 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from apps.users.serializers import SimpleUserSerializer
+from apps.utils.instrumentation import InstrumentedConsumerMixin, QueryBudgetExceeded, query_budget
+
+User = get_user_model()
+
+
+class FakeBaseConsumer:
+    # The slice of GenericAsyncAPIConsumer the mixin relies on.
+    available_actions = {'list': 'list', 'retrieve': 'retrieve'}
+
+    async def handle_action(self, action, request_id, **kwargs):
+        await getattr(self, self.available_actions[action])()
+
+    @classmethod
+    async def encode_json(cls, content):
+        return json.dumps(content)
+
+
+class FakeConsumer(InstrumentedConsumerMixin, FakeBaseConsumer):
+    @query_budget(1)
+    async def list(self):
+        data = await sync_to_async(self._load)()
+        await self.encode_json({'results': data})
+
+    async def retrieve(self):
+        await self.encode_json({})
+
+    def _load(self):
+        User.objects.count()
+        return SimpleUserSerializer(User.objects.all(), many=True).data
+
+
+def sample(name, action='list'):
+    return REGISTRY.get_sample_value(name, {'consumer': 'FakeConsumer', 'action': action}) or 0.0
+
+
+@override_settings(CONSUMER_QUERY_BUDGET_STRICT=False)
+class TestInstrumentedConsumer(TestCase):
+    def setUp(self):
+        User.objects.create(username='user', email='user@gmail.com', name='User')
+
+    async def test_records_queries_serializer_time_and_payload(self):
+        before = (sample('consumer_action_queries_sum'), sample('consumer_action_payload_bytes_sum'),
+                  sample('consumer_action_serializer_seconds_sum'))
+
+        with self.assertLogs('apps.utils.instrumentation', 'WARNING') as logs:
+            await FakeConsumer().handle_action('list', request_id=1)
+
+        self.assertEqual(sample('consumer_action_queries_sum') - before[0], 2)
+        self.assertGreater(sample('consumer_action_payload_bytes_sum') - before[1], len('{"results": []}'))
+        self.assertGreater(sample('consumer_action_serializer_seconds_sum'), before[2])
+        self.assertIn('FakeConsumer.list ran 2 queries, over its budget of 1', logs.output[0])
+
+    async def test_actions_without_a_budget_are_still_recorded(self):
+        before = sample('consumer_action_queries_count', 'retrieve')
+
+        await FakeConsumer().handle_action('retrieve', request_id=1)
+
+        self.assertEqual(sample('consumer_action_queries_count', 'retrieve') - before, 1)
+
+    @override_settings(CONSUMER_QUERY_BUDGET_STRICT=True)
+    async def test_strict_mode_fails_over_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            await FakeConsumer().handle_action('list', request_id=1)
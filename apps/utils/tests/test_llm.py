@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.utils.llm import chat_json, clear_llm_cache
+
+
+def fake_chat(messages, temperature, timeout):
+    return {'summary': messages[-1]['content'].strip()}
+
+
+@override_settings(LOCAL_LLM_BACKEND='ollama', LOCAL_QWEN_MODEL='test-model', LLM_CACHE_ENABLED=True)
+class TestChatJsonCache(SimpleTestCase):
+    def setUp(self):
+        clear_llm_cache()
+
+    def test_serves_repeated_prompts_from_cache(self):
+        with mock.patch('apps.utils.llm._chat_json_once', side_effect=fake_chat) as call:
+            first = chat_json([{'role': 'user', 'content': 'Summarize these answers'}])
+            repeat = chat_json([{'role': 'user', 'content': '  Summarize\nthese answers '}])
+            warmer = chat_json([{'role': 'user', 'content': 'Summarize these answers'}], temperature=0.7)
+
+        self.assertEqual(first, {'summary': 'Summarize these answers'})
+        self.assertEqual(repeat, first)
+        self.assertEqual(warmer, first)
+        self.assertEqual(call.call_count, 2)
+
+    def test_does_not_cache_empty_responses(self):
+        with mock.patch('apps.utils.llm._chat_json_once', return_value={}) as call:
+            chat_json([{'role': 'user', 'content': 'Label this cluster'}])
+            chat_json([{'role': 'user', 'content': 'Label this cluster'}])
+
+        self.assertEqual(call.call_count, 2)
+
+    @override_settings(LLM_CACHE_MAX_ENTRIES=2)
+    def test_evicts_least_recently_used_entries(self):
+        prompts = [[{'role': 'user', 'content': text}] for text in ('one', 'two', 'three')]
+
+        with mock.patch('apps.utils.llm._chat_json_once', side_effect=fake_chat) as call:
+            chat_json(prompts[0])
+            chat_json(prompts[1])
+            chat_json(prompts[0])
+            chat_json(prompts[2])
+            self.assertEqual(call.call_count, 3)
+
+            chat_json(prompts[0])
+            self.assertEqual(call.call_count, 3)
+            chat_json(prompts[1])
+            self.assertEqual(call.call_count, 4)
@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+
+from apps.survey.benchmark import stub_ollama
+from apps.utils.llm import chat_json
+from apps.utils.llm_runner import LLMJobRunner, run_llm_jobs
+
+
+class TestLLMJobRunner(SimpleTestCase):
+    def test_starts_jobs_by_priority_and_returns_submission_order(self):
+        started = []
+
+        def job(name):
+            started.append(name)
+            return name.upper()
+
+        runner = LLMJobRunner(concurrency=1)
+        for name, priority in (('c', 2), ('a', 0), ('b', 1), ('d', 2)):
+            runner.submit(job, name, priority=priority)
+
+        self.assertEqual(runner.run(), ['C', 'A', 'B', 'D'])
+        self.assertEqual(started, ['a', 'b', 'c', 'd'])
+
+    def test_reraises_the_first_failure(self):
+        def job(value):
+            if value == 3:
+                raise ValueError('bad chunk')
+            return value
+
+        with self.assertRaises(ValueError):
+            run_llm_jobs(job, range(10), concurrency=2)
+
+    def test_reports_final_progress(self):
+        progress = []
+        run_llm_jobs(str, range(5), on_progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(progress[-1], (5, 5))
+
+
+class TestLLMJobRunnerOverlap(SimpleTestCase):
+    calls = 8
+
+    def test_runner_overlaps_calls_up_to_the_concurrency_limit(self):
+        prompts = [[{'role': 'user', 'content': f'Label cluster {index}'}] for index in range(self.calls)]
+
+        with stub_ollama(latency=0.05, concurrency=4) as server:
+            sequential_results = [chat_json(messages) for messages in prompts]
+            self.assertEqual(server.max_in_flight, 1)
+
+            results = run_llm_jobs(chat_json, prompts)
+
+        self.assertEqual(results, sequential_results)
+        self.assertEqual(server.calls, 2 * self.calls)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertLessEqual(server.max_in_flight, 4)
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, override_settings
+
+from apps.utils.pii import redact_text, redact_texts
+
+SAMPLES = [
+    'I think the county should fix the roads near the market',
+    'Email me at jane.doe@example.com or call 0712 345 678',
+    'See www.example.com/budget for the 2024 figures',
+    'My id no 12345678 and account number 0123456789012',
+    'Paid with 4111 1111 1111 1111, born on March 3, 1985',
+    None,
+    '',
+]
+
+
+@override_settings(PII_MODE='regex')
+class TestRedactTexts(SimpleTestCase):
+    def test_batch_output(self):
+        def entity(entity_type, start, end, replacement):
+            return {'type': entity_type, 'start': start, 'end': end, 'replacement': replacement}
+
+        self.assertEqual(redact_texts(SAMPLES), [
+            {'text': SAMPLES[0], 'entities': []},
+            {
+                'text': 'Email me at [EMAIL] or call [PHONE_NUMBER]',
+                'entities': [
+                    entity('EMAIL_ADDRESS', 12, 32, '[EMAIL]'),
+                    entity('PHONE_NUMBER', 41, 53, '[PHONE_NUMBER]'),
+                ],
+            },
+            {
+                'text': 'See [URL] for the 2024 figures',
+                'entities': [entity('URL', 4, 26, '[URL]')],
+            },
+            {
+                'text': 'My id no [ID_NUMBER] and account number [PHONE_NUMBER]',
+                'entities': [
+                    entity('ID_NUMBER', 9, 17, '[ID_NUMBER]'),
+                    entity('PHONE_NUMBER', 37, 50, '[PHONE_NUMBER]'),
+                ],
+            },
+            {
+                'text': 'Paid with [CREDIT_CARD], born on [DATE_OF_BIRTH]',
+                'entities': [
+                    entity('CREDIT_CARD', 10, 29, '[CREDIT_CARD]'),
+                    entity('DATE_OF_BIRTH', 39, 52, '[DATE_OF_BIRTH]'),
+                ],
+            },
+            {'text': '', 'entities': []},
+            {'text': '', 'entities': []},
+        ])
+
+    def test_single_text(self):
+        self.assertEqual(redact_text('call 0712 345 678')['text'], 'call [PHONE_NUMBER]')
+
+    def test_redacts_each_family(self):
+        results = redact_texts(SAMPLES)
+        self.assertEqual(results[0]['entities'], [])
+        self.assertIn('[EMAIL]', results[1]['text'])
+        self.assertIn('[PHONE_NUMBER]', results[1]['text'])
+        self.assertIn('[URL]', results[2]['text'])
+        self.assertIn('[ID_NUMBER]', results[3]['text'])
+        self.assertIn('[CREDIT_CARD]', results[4]['text'])
+        self.assertEqual(results[5], {'text': '', 'entities': []})
+
+    @override_settings(PII_ENABLED=False)
+    def test_disabled_passes_text_through(self):
+        self.assertEqual(redact_texts(['call 0712 345 678'])[0]['text'], 'call 0712 345 678')
+
@@ -0,0 +1,102 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.ballot.consumers import BallotConsumer
+from apps.ballot.models import Ballot, Option
+from apps.chat.consumers import ChatConsumer
+from apps.chat.models import Chat, Message
+from apps.notification.consumers import NotificationConsumer
+from apps.notification.models import Notification
+from apps.posts.consumers import PostConsumer
+from apps.posts.models import Post, PostLike
+
+User = get_user_model()
+
+# More rows than any budget, so an N+1 query goes over it.
+ROWS = 30
+
+
+@override_settings(CONSUMER_QUERY_BUDGET_STRICT=True)
+class TestConsumerQueryBudgets(TransactionTestCase):
+    """
+    Each budgeted action run against a full page of data. Strict mode turns
+    an overrun into QueryBudgetExceeded, which fails the test.
+    """
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.user = User.objects.create(username='user', email='user@gmail.com', name='User')
+        authors = User.objects.bulk_create(
+            User(username=f'author{index}', email=f'author{index}@gmail.com', name=f'Author {index}')
+            for index in range(ROWS)
+        )
+
+        posts = [
+            Post.objects.create(author=author, body=f'post {index} #kenya', status='published')
+            for index, author in enumerate(authors)
+        ]
+        PostLike.objects.bulk_create(PostLike(user=self.user, post=post) for post in posts[::2])
+
+        for index in range(ROWS):
+            ballot = Ballot.objects.create(
+                title=f'Ballot {index}', start_time=now - timedelta(days=1), end_time=now + timedelta(days=1),
+            )
+            Option.objects.bulk_create(Option(ballot=ballot, number=number, text=f'Option {number}')
+                                       for number in range(1, 4))
+
+        for author in authors:
+            chat = Chat.objects.create()
+            chat.users.add(self.user, author)
+            Message.objects.create(chat=chat, uuid=uuid.uuid4(), author=author, text='hello')
+
+        Notification.objects.bulk_create(
+            Notification(recipient=self.user, text='liked your post', is_like=True, post=post) for post in posts
+        )
+
+    async def run_action(self, consumer_class, action, **kwargs):
+        replies = []
+
+        async def base_send(message):
+            replies.append(json.loads(message['text']))
+
+        consumer = consumer_class()
+        consumer.scope = {'type': 'websocket', 'user': self.user}
+        consumer.channel_name = 'test-channel'
+        consumer.base_send = base_send
+
+        await consumer.handle_action(action, request_id=1, **kwargs)
+
+        self.assertEqual(replies[-1]['response_status'], 200, replies[-1])
+        return replies[-1]['data']
+
+    async def test_posts_list(self):
+        data = await self.run_action(PostConsumer, 'list')
+        self.assertTrue(data['results'])
+
+    async def test_posts_search(self):
+        await self.run_action(PostConsumer, 'list', search_term='post')
+
+    async def test_posts_for_you(self):
+        await self.run_action(PostConsumer, 'for_you')
+
+    async def test_posts_trending(self):
+        await self.run_action(PostConsumer, 'trending')
+
+    async def test_ballot_list(self):
+        data = await self.run_action(BallotConsumer, 'list')
+        self.assertTrue(data['results'])
+
+    async def test_chat_list(self):
+        data = await self.run_action(ChatConsumer, 'list')
+        self.assertTrue(data['results'])
+
+    async def test_notification_list(self):
+        data = await self.run_action(NotificationConsumer, 'list')
+        self.assertTrue(data)
@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import normalize
+
+from apps.utils.vectors import (
+    COPY_HEADER,
+    COPY_SIGNATURE,
+    COPY_TRAILER,
+    VectorMatrix,
+    copy_row_dtype,
+    iter_vector_blocks,
+    parse_copy_stream,
+    update_from_values,
+)
+
+
+def encode_copy_rows(ids, vectors) -> bytes:
+    """
+    Binary COPY payload for (id bigint, embedding vector) rows.
+    """
+    dimensions = vectors.shape[1]
+    rows = np.zeros(len(ids), dtype=copy_row_dtype(dimensions))
+    rows["fields"] = 2
+    rows["id_length"] = 8
+    rows["id"] = ids
+    rows["vector_length"] = 4 + 4 * dimensions
+    rows["dimensions"] = dimensions
+    rows["vector"] = vectors
+    return COPY_HEADER.pack(COPY_SIGNATURE, 0, 0) + rows.tobytes() + COPY_TRAILER
+
+
+class TestParseCopyStream(SimpleTestCase):
+    def test_yields_fixed_size_blocks_across_chunk_boundaries(self):
+        ids = np.arange(1, 26, dtype=np.int64)
+        vectors = np.random.default_rng(0).random((25, 3), dtype=np.float32)
+        payload = encode_copy_rows(ids, vectors)
+        chunks = [payload[start:start + 7] for start in range(0, len(payload), 7)]
+
+        blocks = list(parse_copy_stream(chunks, dimensions=3, block_size=10))
+
+        self.assertEqual([len(block_ids) for block_ids, _ in blocks], [10, 10, 5])
+        np.testing.assert_array_equal(np.concatenate([block_ids for block_ids, _ in blocks]), ids)
+        np.testing.assert_array_equal(np.concatenate([block for _, block in blocks]), vectors)
+
+    def test_rejects_other_dimensions(self):
+        payload = encode_copy_rows(np.arange(4), np.ones((4, 3), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            list(parse_copy_stream([payload], dimensions=4, block_size=10))
+
+
+class TestVectorMatrix(SimpleTestCase):
+    def test_stores_normalised_rows_and_removes_files_on_exit(self):
+        with VectorMatrix.create(capacity=5, dimensions=2) as matrix:
+            matrix.append(np.array([7, 8]), np.array([[3.0, 4.0], [0.0, 2.0]], dtype=np.float32))
+            matrix.append(np.array([9]), np.array([[0.0, 0.0]], dtype=np.float32))
+            matrix.finish()
+            directory = matrix.directory
+
+            self.assertEqual(len(matrix), 3)
+            np.testing.assert_array_equal(matrix.ids, [7, 8, 9])
+            np.testing.assert_allclose(matrix.vectors, [[0.6, 0.8], [0.0, 1.0], [0.0, 0.0]])
+            self.assertEqual([len(ids) for ids, _ in matrix.blocks(2)], [2, 1])
+
+        self.assertFalse(os.path.exists(directory))
+
+
+class TestVectorBlocks(TestCase):
+    rows = 2500
+    dimensions = 16
+    clusters = 5
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        centers = rng.standard_normal((self.clusters, self.dimensions), dtype=np.float32)
+        vectors = centers[rng.integers(0, self.clusters, self.rows)]
+        vectors += 0.1 * rng.standard_normal(vectors.shape, dtype=np.float32)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE test_vectors (id bigint PRIMARY KEY, "
+                f"embedding vector({self.dimensions}) NOT NULL, cluster_id bigint)"
+            )
+        with connection.connection.cursor() as cursor:
+            with cursor.copy("COPY test_vectors (id, embedding) FROM STDIN (FORMAT BINARY)") as copy:
+                copy.write(encode_copy_rows(np.arange(1, self.rows + 1), vectors))
+
+    def blocks(self):
+        return iter_vector_blocks("test_vectors", {}, dimensions=self.dimensions, block_size=1000)
+
+    def test_streams_clusters_and_assigns_in_blocks(self):
+        blocks = list(self.blocks())
+        self.assertEqual([len(ids) for ids, _ in blocks], [1000, 1000, 500])
+
+        # Binary COPY must decode to the same floats as pgvector's text output.
+        ids, X = blocks[0]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT embedding::text FROM test_vectors WHERE id = ANY(%s) ORDER BY id", [ids[:20].tolist()],
+            )
+            parsed = [[float(value) for value in text[1:-1].split(",")] for (text,) in cursor.fetchall()]
+        np.testing.assert_allclose(X[:20], parsed, rtol=1e-6)
+
+        kmeans = MiniBatchKMeans(n_clusters=self.clusters, batch_size=1000, n_init=3, random_state=42)
+        for _ids, X in self.blocks():
+            kmeans.partial_fit(normalize(X, copy=False))
+
+        # Predict every block before updating: the COPY holds the connection.
+        assignments = [(ids, kmeans.predict(normalize(X, copy=False))) for ids, X in self.blocks()]
+        updated = sum(update_from_values("test_vectors", "cluster_id", ids, labels) for ids, labels in assignments)
+        self.assertEqual(updated, self.rows)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(DISTINCT cluster_id), COUNT(*) FILTER (WHERE cluster_id IS NULL) FROM test_vectors"
+            )
+            self.assertEqual(cursor.fetchone(), (self.clusters, 0))
@@ -0,0 +1,264 @@
+"""
+Block I/O for pgvector columns.
+
+Clustering reads every embedding of a question or option, so vectors are
+streamed with a binary COPY and decoded straight into fixed-size NumPy blocks:
+each row is (bigint id, vector) with a fixed width, so a whole block is one
+np.frombuffer call and no Python object is created per row. Results are written
+back with one UPDATE ... FROM (VALUES ...) per block.
+
+Large jobs export the rows once into a VectorMatrix, an L2-normalised float32
+.npy memmap with an int64 id sidecar on local disk, so every later step reads
+the same pages without going back to Postgres.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER = struct.Struct(">11sii")
+COPY_TRAILER = b"\xff\xff"
+
+
+def vector_block_size() -> int:
+    return getattr(settings, "CLUSTER_BLOCK_SIZE", 4096)
+
+
+def copy_row_dtype(dimensions: int) -> np.dtype:
+    """
+    Layout of one (id bigint, embedding vector) tuple in a binary COPY.
+
+    pgvector sends a vector as int16 dim, int16 unused, then dim float32,
+    all big-endian.
+    """
+    return np.dtype([
+        ("fields", ">i2"),
+        ("id_length", ">i4"),
+        ("id", ">i8"),
+        ("vector_length", ">i4"),
+        ("dimensions", ">i2"),
+        ("unused", ">i2"),
+        ("vector", ">f4", (dimensions,)),
+    ])
+
+
+def decode_copy_rows(data, dimensions: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode whole binary COPY tuples into (ids int64, vectors float32).
+    """
+    rows = np.frombuffer(data, dtype=copy_row_dtype(dimensions))
+
+    if len(rows) and ((rows["fields"] != 2).any() or (rows["dimensions"] != dimensions).any()):
+        raise ValueError(f"Unexpected COPY row layout, expected (id, vector({dimensions})).")
+
+    return rows["id"].astype(np.int64), rows["vector"].astype(np.float32)
+
+
+def parse_copy_stream(chunks, dimensions: int, block_size: int):
+    """
+    Turn raw binary COPY output into (ids, vectors) blocks of ``block_size`` rows.
+    """
+    row_size = copy_row_dtype(dimensions).itemsize
+    block_bytes = row_size * block_size
+    buffer = bytearray()
+    header_read = False
+
+    for chunk in chunks:
+        buffer += chunk
+
+        if not header_read:
+            if len(buffer) < COPY_HEADER.size:
+                continue
+            signature, _flags, extension_length = COPY_HEADER.unpack_from(buffer)
+            if signature != COPY_SIGNATURE:
+                raise ValueError("Not a binary COPY stream.")
+            header_length = COPY_HEADER.size + extension_length
+            if len(buffer) < header_length:
+                continue
+            del buffer[:header_length]
+            header_read = True
+
+        while len(buffer) >= block_bytes:
+            yield decode_copy_rows(bytes(buffer[:block_bytes]), dimensions)
+            del buffer[:block_bytes]
+
+    if buffer.endswith(COPY_TRAILER):
+        del buffer[-len(COPY_TRAILER):]
+
+    if len(buffer) % row_size:
+        raise ValueError("Truncated binary COPY stream.")
+
+    if buffer:
+        yield decode_copy_rows(bytes(buffer), dimensions)
+
+
+def _where(filters: dict[str, int], column: str) -> str:
+    quote = connection.ops.quote_name
+    conditions = [f"{quote(name)} = {int(value)}" for name, value in filters.items()]
+    conditions.append(f"{quote(column)} IS NOT NULL")
+    return " AND ".join(conditions)
+
+
+def iter_vector_blocks(table: str, filters: dict[str, int], column: str = "embedding",
+                       dimensions: int | None = None, block_size: int | None = None,
+                       limit: int | None = None):
+    """
+    Yield (ids, vectors) blocks for rows of ``table`` matching ``filters``,
+    ordered by id. ``filters`` maps column names to integer values.
+
+    The COPY holds the connection until the generator is exhausted, so do not
+    run other queries on it while iterating.
+    """
+    dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+    block_size = block_size or vector_block_size()
+    quote = connection.ops.quote_name
+    limit_sql = f" LIMIT {int(limit)}" if limit is not None else ""
+
+    sql = (
+        f"COPY (SELECT {quote('id')}::bigint, {quote(column)} FROM {quote(table)} "
+        f"WHERE {_where(filters, column)} ORDER BY {quote('id')}{limit_sql}) "
+        f"TO STDOUT (FORMAT BINARY)"
+    )
+
+    connection.ensure_connection()
+    with connection.connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            yield from parse_copy_stream(copy, dimensions, block_size)
+
+
+def update_from_values(table: str, column: str, ids, values) -> int:
+    """
+    Set ``column`` per id with a single UPDATE ... FROM (VALUES ...).
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+
+    if not len(ids):
+        return 0
+
+    quote = connection.ops.quote_name
+    rows = ", ".join(["(%s, %s)"] * len(ids))
+    params = np.column_stack((ids, values)).ravel().tolist()
+
+    sql = (
+        f"UPDATE {quote(table)} AS t SET {quote(column)} = v.value "
+        f"FROM (VALUES {rows}) AS v(id, value) WHERE t.{quote('id')} = v.id"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+# ====================== MEMORY-MAPPED EXPORT ======================
+
+class VectorMatrix:
+    """
+    Normalised vectors and their ids, memory-mapped from a scratch directory.
+
+    Use as a context manager; the files are removed on exit.
+    """
+
+    def __init__(self, directory: str, capacity: int, dimensions: int):
+        self.directory = directory
+        self.count = 0
+        # An empty memmap cannot be created, so keep at least one (unused) row.
+        capacity = max(capacity, 1)
+        self._ids = np.lib.format.open_memmap(
+            os.path.join(directory, "ids.npy"), mode="w+", dtype=np.int64, shape=(capacity,))
+        self._vectors = np.lib.format.open_memmap(
+            os.path.join(directory, "vectors.npy"), mode="w+", dtype=np.float32, shape=(capacity, dimensions))
+
+    @classmethod
+    def create(cls, capacity: int, dimensions: int) -> "VectorMatrix":
+        directory = tempfile.mkdtemp(prefix="vectors-", dir=getattr(settings, "CLUSTER_MMAP_DIR", None))
+        try:
+            return cls(directory, capacity, dimensions)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        end = self.count + len(ids)
+        self._ids[self.count:end] = ids
+
+        target = self._vectors[self.count:end]
+        target[:] = vectors
+        norms = np.linalg.norm(target, axis=1, keepdims=True)
+        np.divide(target, norms, out=target, where=norms > 0)
+
+        self.count = end
+
+    def finish(self) -> "VectorMatrix":
+        """
+        Flush the export and reopen it read-only, trimmed to the rows written.
+        """
+        self._ids.flush()
+        self._vectors.flush()
+        del self._ids, self._vectors
+
+        self._ids = np.load(os.path.join(self.directory, "ids.npy"), mmap_mode="r")
+        self._vectors = np.load(os.path.join(self.directory, "vectors.npy"), mmap_mode="r")
+        return self
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def blocks(self, block_size: int | None = None):
+        """
+        Yield (ids, vectors) views of at most ``block_size`` rows.
+        """
+        block_size = block_size or vector_block_size()
+        for start in range(0, self.count, block_size):
+            end = min(start + block_size, self.count)
+            yield self._ids[start:end], self._vectors[start:end]
+
+    def close(self) -> None:
+        self._ids = self._vectors = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_vector_matrix(table: str, filters: dict[str, int], count: int | None = None,
+                         column: str = "embedding", dimensions: int | None = None) -> VectorMatrix:
+    """
+    Copy the matching rows of ``table`` into a VectorMatrix in one pass.
+
+    ``count`` caps the export; rows inserted after it was taken are left for
+    the next run. It is counted here when not given.
+    """
+    dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+
+    if count is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)} WHERE {_where(filters, column)}")
+            count = cursor.fetchone()[0]
+
+    matrix = VectorMatrix.create(count, dimensions)
+    try:
+        for ids, vectors in iter_vector_blocks(table, filters, column, dimensions, limit=count):
+            matrix.append(ids, vectors)
+        return matrix.finish()
+    except BaseException:
+        matrix.close()
+        raise
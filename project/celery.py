@@ -28,6 +28,10 @@ app.conf.task_default_queue = "celery"
 app.conf.task_queues = (
     Queue("celery"),
     Queue("summarization"),
+    # Survey summary pipeline stages (celery_survey in docker/compose.yml).
+    Queue("survey_summary"),
+    Queue("pii"),
+    Queue("embeddings"),
 )
 
 # If you later add more queues dynamically, keep this enabled.
@@ -82,6 +86,21 @@ app.conf.beat_schedule = {
         "schedule": crontab(hour="*/1"),
     },
 
+    # Re-bucket stored post freshness as posts age; recompute all features nightly.
+    "refresh-post-freshness-every-5-min": {
+        "task": "apps.recommendations.tasks.refresh_post_freshness",
+        "schedule": crontab(minute="*/5"),
+    },
+    "recompute-post-features-nightly": {
+        "task": "apps.recommendations.tasks.recompute_post_features",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # Embed posts the save signal missed.
+    "embed-missing-posts-every-hour": {
+        "task": "apps.recommendations.tasks.embed_missing_posts",
+        "schedule": crontab(minute=15),
+    },
+
     "cleanup-broadcast-participants-every-5-min": {
         "task": "apps.broadcast.tasks.cleanup_broadcast_participants",
         "schedule": crontab(minute="*/5"),
@@ -106,4 +125,37 @@ app.conf.beat_schedule = {
         "task": "apps.survey.tasks.check_ended_surveys",
         "schedule": crontab(minute="*/1"),
     },
+    # Fail survey summaries whose pipeline stopped reporting so they resume.
+    "reap-stuck-survey-summaries-every-5-min": {
+        "task": "apps.survey.tasks.reap_stuck_survey_summaries",
+        "schedule": crontab(minute="*/5"),
+    },
+
+    # Re-snapshot the social graph so replayed change streams stay short.
+    "rebuild-social-graph-every-hour": {
+        "task": "apps.users.tasks.rebuild_social_graph_snapshot",
+        "schedule": crontab(minute=45),
+    },
+
+    # Repair follower/following counter drift and recount mutuals for active users.
+    "reconcile-follow-counts-nightly": {
+        "task": "apps.users.tasks.reconcile_follow_counts",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "rebuild-mutual-follow-counts-nightly": {
+        "task": "apps.recommendations.tasks.rebuild_active_mutual_counts",
+        "schedule": crontab(hour=4, minute=30),
+    },
+
+    # Recount recent ballots and repair any tally drift.
+    "reconcile-ballot-tallies-nightly": {
+        "task": "apps.ballot.tasks.reconcile_ballot_tallies",
+        "schedule": crontab(hour=3, minute=30),
+    },
+
+    # Rebuild region audience sets so drift from missed signals never lasts long.
+    "rebuild-region-audiences-nightly": {
+        "task": "apps.geo.tasks.rebuild_region_audiences",
+        "schedule": crontab(hour=2, minute=30),
+    },
 }
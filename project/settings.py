@@ -288,6 +288,32 @@ CACHES = {
     }
 }
 
+# Per-post object cache used by apps.posts.loader.load_posts
+POST_OBJECT_CACHE_TIMEOUT = config("POST_OBJECT_CACHE_TIMEOUT", cast=int, default=60 * 5)
+# Stored recommender features (apps.recommendations.features): at most one refresh per post per window
+POST_FEATURES_REFRESH_INTERVAL_MS = config("POST_FEATURES_REFRESH_INTERVAL_MS", cast=int, default=2000)
+# Post embeddings and user interest vectors (apps.recommendations.similarity)
+POST_EMBEDDING_REFRESH_INTERVAL_MS = config("POST_EMBEDDING_REFRESH_INTERVAL_MS", cast=int, default=10_000)
+USER_INTEREST_HALF_LIFE_HOURS = config("USER_INTEREST_HALF_LIFE_HOURS", cast=float, default=168)
+# In-memory social graph (apps.users.graph): change-stream sync interval and length
+SOCIAL_GRAPH_SYNC_INTERVAL_MS = config("SOCIAL_GRAPH_SYNC_INTERVAL_MS", cast=int, default=1000)
+SOCIAL_GRAPH_STREAM_MAXLEN = config("SOCIAL_GRAPH_STREAM_MAXLEN", cast=int, default=100_000)
+# Mutual-follow counts (apps.recommendations.mutuals): largest fan-out applied inside the follow request
+MUTUAL_COUNT_MAX_FANOUT = config("MUTUAL_COUNT_MAX_FANOUT", cast=int, default=500)
+# Per-user seen-post Bloom filters (apps.posts.seen): bits and hashes per daily bitmap, days kept
+SEEN_POSTS_BITS = config("SEEN_POSTS_BITS", cast=int, default=16384)
+SEEN_POSTS_HASHES = config("SEEN_POSTS_HASHES", cast=int, default=4)
+SEEN_POSTS_WINDOW_DAYS = config("SEEN_POSTS_WINDOW_DAYS", cast=int, default=7)
+# Consumer action metrics (apps.utils.instrumentation): raise on query budget overruns
+# instead of logging (the budget tests turn it on), and the bearer token for the
+# /metrics/ scrape endpoint
+CONSUMER_QUERY_BUDGET_STRICT = config("CONSUMER_QUERY_BUDGET_STRICT", cast=bool, default=False)
+METRICS_TOKEN = config("METRICS_TOKEN", default=None)
+BALLOT_TALLY_BROADCAST_INTERVAL_MS = config("BALLOT_TALLY_BROADCAST_INTERVAL_MS", cast=int, default=500)
+# Redis tally hashes (apps.ballot.services.tally) expire and reload from OptionTally after this long
+BALLOT_TALLY_TTL_SECONDS = config("BALLOT_TALLY_TTL_SECONDS", cast=int, default=600)
+PETITION_SUPPORT_BROADCAST_INTERVAL_MS = config("PETITION_SUPPORT_BROADCAST_INTERVAL_MS", cast=int, default=500)
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -428,6 +454,17 @@ LOCAL_LLM_BASE_URL = config("LOCAL_LLM_BASE_URL", default="http://localhost:8000
 # Model name
 LOCAL_QWEN_MODEL = config("LOCAL_QWEN_MODEL", default="qwen2.5:7b-instruct")
 
+# LLM call limits (apps.utils.llm) and the summary job runner (apps.utils.llm_runner)
+LLM_CONCURRENCY = config("LLM_CONCURRENCY", cast=int, default=4)
+LLM_CALL_TIMEOUT = config("LLM_CALL_TIMEOUT", cast=int, default=300)
+LLM_CALL_RETRIES = config("LLM_CALL_RETRIES", cast=int, default=2)
+LLM_RETRY_BACKOFF = config("LLM_RETRY_BACKOFF", cast=float, default=2.0)
+LLM_PROGRESS_INTERVAL_SECONDS = config("LLM_PROGRESS_INTERVAL_SECONDS", cast=float, default=5)
+# chat_json response cache, kept until the TTL or until the least recently used entries are evicted
+LLM_CACHE_ENABLED = config("LLM_CACHE_ENABLED", cast=bool, default=True)
+LLM_CACHE_TIMEOUT = config("LLM_CACHE_TIMEOUT", cast=int, default=60 * 60 * 24 * 7)
+LLM_CACHE_MAX_ENTRIES = config("LLM_CACHE_MAX_ENTRIES", cast=int, default=50_000)
+
 
 # Embedding
 EMBEDDING_BACKEND = config("EMBEDDING_BACKEND", "ollama")
@@ -436,6 +473,33 @@ EMBEDDING_DIMENSIONS = int(config("EMBEDDING_DIMENSIONS", "1024"))
 EMBEDDING_BASE_URL = config("EMBEDDING_BASE_URL", "http://localhost:11434/v1")
 EMBEDDING_API_KEY = config("EMBEDDING_API_KEY", "local")
 EMBEDDING_BATCH_SIZE = int(config("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_ENABLED = config("EMBEDDING_CACHE_ENABLED", cast=bool, default=True)
+EMBEDDING_CACHE_TIMEOUT = config("EMBEDDING_CACHE_TIMEOUT", cast=int, default=60 * 60 * 24 * 30)
+EMBEDDING_HTTP_POOL_SIZE = config("EMBEDDING_HTTP_POOL_SIZE", cast=int, default=10)
+EMBEDDING_REQUEST_TIMEOUT = config("EMBEDDING_REQUEST_TIMEOUT", cast=int, default=180)
+
+# Embedding dispatcher (apps.utils.embedding_dispatcher)
+EMBEDDING_CONCURRENCY = config("EMBEDDING_CONCURRENCY", cast=int, default=4)
+EMBEDDING_READ_AHEAD = config("EMBEDDING_READ_AHEAD", cast=int, default=2000)
+EMBEDDING_WRITE_BATCH_SIZE = config("EMBEDDING_WRITE_BATCH_SIZE", cast=int, default=1000)
+EMBEDDING_MIN_BATCH_SIZE = config("EMBEDDING_MIN_BATCH_SIZE", cast=int, default=8)
+EMBEDDING_MAX_BATCH_SIZE = config("EMBEDDING_MAX_BATCH_SIZE", cast=int, default=256)
+EMBEDDING_TARGET_BATCH_SECONDS = config("EMBEDDING_TARGET_BATCH_SECONDS", cast=float, default=2.0)
+EMBEDDING_MAX_FAILURES = config("EMBEDDING_MAX_FAILURES", cast=int, default=20)
+
+# Rows per NumPy block when streaming embeddings for clustering (apps.utils.vectors)
+CLUSTER_BLOCK_SIZE = config("CLUSTER_BLOCK_SIZE", cast=int, default=4096)
+# Scratch directory for memory-mapped embedding exports; None uses the system temp dir.
+CLUSTER_MMAP_DIR = config("CLUSTER_MMAP_DIR", default=None)
+# k-selection sweep and near-duplicate merging (apps.utils.clustering)
+CLUSTER_SELECTION_SAMPLE_SIZE = config("CLUSTER_SELECTION_SAMPLE_SIZE", cast=int, default=5000)
+CLUSTER_SELECTION_JOBS = config("CLUSTER_SELECTION_JOBS", cast=int, default=4)
+CLUSTER_MERGE_SIMILARITY = config("CLUSTER_MERGE_SIMILARITY", cast=float, default=0.92)
+
+# Survey submissions
+SURVEY_SCHEMA_CACHE_TIMEOUT = config("SURVEY_SCHEMA_CACHE_TIMEOUT", cast=int, default=60 * 60)
+SURVEY_EMBEDDING_QUEUE_BATCH_SIZE = config("SURVEY_EMBEDDING_QUEUE_BATCH_SIZE", cast=int, default=32)
+SURVEY_EMBEDDING_QUEUE_FLUSH_MS = config("SURVEY_EMBEDDING_QUEUE_FLUSH_MS", cast=int, default=2000)
 
 # Clustering thresholds
 BALLOT_CLUSTER_THRESHOLD = int(config("BALLOT_CLUSTER_THRESHOLD", "500"))
@@ -454,6 +518,11 @@ SURVEY_SMALL_TEXT_LIMIT = int(config("SURVEY_SMALL_TEXT_LIMIT", "2000"))
 CLUSTER_MIN_TEXT_ANSWERS = int(config("CLUSTER_MIN_TEXT_ANSWERS", "200"))
 SURVEY_MAX_CLUSTERS_TO_SUMMARIZE = int(config("SURVEY_MAX_CLUSTERS_TO_SUMMARIZE", "30"))
 SURVEY_SUMMARY_MAX_PROMPT_CHARS = int(config("SURVEY_SUMMARY_MAX_PROMPT_CHARS", "12000"))
+# Pipeline retries and the stuck-run reaper (apps.survey.tasks.reap_stuck_survey_summaries)
+SURVEY_SUMMARY_MAX_ATTEMPTS = config("SURVEY_SUMMARY_MAX_ATTEMPTS", cast=int, default=5)
+SURVEY_SUMMARY_STALE_MINUTES = config("SURVEY_SUMMARY_STALE_MINUTES", cast=int, default=45)
+# Histogram width for NUMBER questions (apps.survey.tasks.build_number_stats)
+SURVEY_NUMBER_HISTOGRAM_BUCKETS = config("SURVEY_NUMBER_HISTOGRAM_BUCKETS", cast=int, default=10)
 
 # ======================
 # PII redaction
@@ -485,6 +554,12 @@ PII_REDACT_DATES_OF_BIRTH = True
 PII_REDACT_PERSON = True
 PII_REDACT_LOCATION = False
 
+# Batch redaction (apps.utils.pii.redact_texts): texts per spaCy nlp.pipe
+# batch, and worker processes for backfills of at least PII_PARALLEL_MIN_TEXTS.
+PII_BATCH_SIZE = config("PII_BATCH_SIZE", cast=int, default=64)
+PII_PROCESSES = config("PII_PROCESSES", cast=int, default=1)
+PII_PARALLEL_MIN_TEXTS = config("PII_PARALLEL_MIN_TEXTS", cast=int, default=2000)
+
 LOG_LEVEL = 'DEBUG' if DEBUG else 'INFO'
 
 LOGGING = {
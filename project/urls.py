@@ -24,6 +24,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenBlacklistView
 
 from apps.recommendations.admin import recommendation_admin
+from apps.utils.instrumentation import metrics_view
 
 router = DefaultRouter()
 router.register("devices", FCMDeviceAuthorizedViewSet)
@@ -37,6 +38,7 @@ urlpatterns = [
     path('broadcast/', include('apps.broadcast.urls')),
     path('recommendation-admin/', recommendation_admin.urls),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view),
     path('nested_admin/', include('nested_admin.urls')),
     path('auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),